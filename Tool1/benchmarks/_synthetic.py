@@ -0,0 +1,89 @@
+"""
+Synthetic Wazuh / ZAP / Nmap / syslog records for Tool1 benchmarks.
+Deterministic (seeded) so runs are comparable across changes.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator
+
+_USERS = ["admin", "bob", "alice", "svc_backup", "root", "DOMAIN\\carol"]
+_RULES = [
+    ("sshd: authentication failed.", ["syslog", "sshd", "authentication_failed"]),
+    ("PAM: Login session opened.", ["pam", "syslog", "authentication_success"]),
+    ("Integrity checksum changed.", ["ossec", "syscheck", "syscheck_file"]),
+    ("Successful sudo to ROOT executed.", ["syslog", "sudo"]),
+    ("Windows Defender disabled by policy", ["windows", "policy_changed"]),
+    ("CVE-2021-44228 affects log4j-core", ["vulnerability-detector"]),
+]
+_ZAP = [
+    ("SQL Injection", "SQL injection may be possible.", "89"),
+    ("Cross Site Scripting (Reflected)", "XSS via reflected parameter.", "79"),
+    ("Path Traversal", "Directory traversal in file parameter.", "22"),
+    ("X-Frame-Options Header Not Set", "Missing anti-clickjacking header.", "1021"),
+]
+
+
+def wazuh_alert(rng: random.Random, ts: datetime) -> Dict[str, Any]:
+    desc, groups = rng.choice(_RULES)
+    host = f"10.0.{rng.randint(0, 3)}.{rng.randint(1, 254)}"
+    return {
+        "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "+0000",
+        "rule": {"level": rng.randint(3, 12), "description": desc, "id": str(rng.randint(500, 99999)),
+                 "groups": groups, "mitre": {"id": ["T1110"], "tactic": ["Credential Access"]}},
+        "agent": {"id": f"{rng.randint(1, 40):03d}", "name": f"host-{rng.randint(1, 40)}", "ip": host},
+        "manager": {"name": "wazuh-manager"},
+        "id": f"{ts.timestamp():.6f}",
+        "decoder": {"name": rng.choice(["sshd", "pam", "syscheck_integrity_changed", "windows_eventchannel"])},
+        "data": {"srcip": f"192.168.{rng.randint(0, 9)}.{rng.randint(1, 254)}", "srcuser": rng.choice(_USERS),
+                 "win": {"eventdata": {"targetUserName": rng.choice(_USERS)}}},
+        "full_log": f"{ts:%b %d %H:%M:%S} host sshd[{rng.randint(100, 9999)}]: {desc} for "
+                    f"{rng.choice(_USERS)} from 192.168.1.{rng.randint(1, 254)} port {rng.randint(1024, 65535)} ssh2",
+        "location": "/var/log/auth.log",
+    }
+
+
+def zap_instance(rng: random.Random, ts: datetime) -> Dict[str, Any]:
+    alert, desc, cwe = rng.choice(_ZAP)
+    return {
+        "pluginid": str(rng.randint(10000, 90000)), "alert": alert, "name": alert,
+        "riskcode": str(rng.randint(0, 3)), "confidence": "2", "riskdesc": "High (Medium)",
+        "desc": f"<p>{desc}</p>", "cweid": cwe, "wascid": "19",
+        "solution": "<p>Validate all input server side.</p>" * 3,
+        "uri": f"http://shop.local/item?id={rng.randint(1, 5000)}", "method": "GET", "param": "id",
+        "attack": "' OR '1'='1", "evidence": "", "otherinfo": "",
+    }
+
+
+def nmap_port(rng: random.Random, ts: datetime) -> Dict[str, Any]:
+    ip = f"10.1.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+    port, svc = rng.choice([(22, "ssh"), (80, "http"), (443, "https"), (445, "microsoft-ds"), (3389, "ms-wbt-server")])
+    return {
+        "source_host": ip, "hostname": ip, "host_state": "up", "os": "Linux 5.X",
+        "port": str(port), "protocol": "tcp", "service_name": svc, "service_product": "OpenSSH",
+        "service_version": "8.9p1", "port_state": "open", "script_output": "",
+        "scan_args": "nmap -sV -O 10.1.0.0/16", "scan_start": ts.strftime("%a %b %d %H:%M:%S %Y"),
+        "raw_text": f"Nmap: {ip}:{port}/tcp open - OpenSSH 8.9p1 ({svc})", "_parsing_type": "nmap_port",
+    }
+
+
+def syslog_line(rng: random.Random, ts: datetime) -> Dict[str, Any]:
+    user = rng.choice(_USERS)
+    msg = rng.choice([
+        f"Accepted password for {user} from 172.16.{rng.randint(0, 9)}.{rng.randint(1, 254)} port 51234 ssh2",
+        f"pam_unix(sudo:session): session opened for user root by {user}(uid=0)",
+        "CRON[2211]: (root) CMD (run-parts /etc/cron.hourly)",
+        f"kernel: [UFW BLOCK] IN=eth0 SRC=203.0.113.{rng.randint(1, 254)} DST=10.0.0.5 PROTO=TCP DPT=445",
+    ])
+    return {"raw_text": f"{ts:%b %d %H:%M:%S} gw {msg}", "_parsing_type": "raw_log"}
+
+
+_GENERATORS = (wazuh_alert, wazuh_alert, zap_instance, nmap_port, syslog_line)
+
+
+def events(n: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    """Yield n mixed raw records with increasing timestamps."""
+    rng = random.Random(seed)
+    ts = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    for _ in range(n):
+        ts += timedelta(milliseconds=rng.randint(1, 5000))
+        yield rng.choice(_GENERATORS)(rng, ts)
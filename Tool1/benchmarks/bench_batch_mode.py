@@ -0,0 +1,41 @@
+"""
+Throughput of the row-at-a-time path vs. columnar batch mode (events/sec).
+Run from the Tool1 directory:
+    python -m benchmarks.bench_batch_mode [n_events] [batch_size]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.ingestion.universal import UniversalIngestor
+from src.processing.batch import BatchProcessor
+from src.processing.pipeline import Pipeline
+
+from benchmarks._synthetic import events
+
+
+def main(n: int = 20000, batch_size: int = 2000) -> None:
+    raw = list(events(n))
+    with tempfile.NamedTemporaryFile(suffix=".ndjson") as tmp:
+        pipeline = Pipeline(UniversalIngestor(Path(tmp.name)))
+
+        start = time.perf_counter()
+        for record in raw:
+            pipeline._prepare(record)
+        row_secs = time.perf_counter() - start
+
+        processor = BatchProcessor(pipeline)
+        start = time.perf_counter()
+        for i in range(0, n, batch_size):
+            processor.process(raw[i:i + batch_size])
+        batch_secs = time.perf_counter() - start
+
+    print(f"events          : {n:,}")
+    print(f"row path        : {n / row_secs:>10,.0f} events/sec ({row_secs:.2f}s)")
+    print(f"batch mode      : {n / batch_secs:>10,.0f} events/sec ({batch_secs:.2f}s, batch_size={batch_size})")
+    print(f"speedup         : {row_secs / batch_secs:.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,76 @@
+"""
+Benchmark: `query` over the glob vs the persistent catalog.
+Writes a file-per-flush output tree (many small files), registers it in a
+catalog once, then times repeat analyst queries both ways: an hourly
+per-host rollup (full scan vs the materialized rollup) and a one-day count
+(WHERE on the timestamp over every file vs date-partition pruning).
+Run from the Tool1 directory:
+    python -m benchmarks.bench_catalog [n_events]
+"""
+import logging
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import duckdb
+
+from src.storage.catalog import Catalog
+
+from benchmarks.bench_parquet_writer import _FilePerFlushWriter, _events
+
+ROLLUP = ("SELECT strptime(substr(timestamp, 1, 13), '%Y-%m-%dT%H') AS hour, source_host, count(*) AS events "
+          "FROM {events} WHERE source_host IS NOT NULL GROUP BY ALL ORDER BY ALL")
+ONE_DAY = "SELECT count(*) FROM {events} WHERE timestamp >= '{day}' AND timestamp < '{day}T99'"
+
+
+def _best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(n: int = 200_000) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp) / "output"
+        writer = _FilePerFlushWriter()
+        writer.output_dir = output_dir
+        for event in _events(n):
+            writer.write(event)
+        writer.flush()
+
+        glob = str(output_dir / "**" / "*.parquet")
+        scan = f"read_parquet('{glob}', union_by_name=true)"
+        files = sorted(output_dir.glob("*/*.parquet"))
+        day = files[len(files) // 2].parent.name
+        conn = duckdb.connect()
+
+        with Catalog(Path(tmp) / "catalog.duckdb", output_dir) as catalog:
+            start = time.perf_counter()
+            catalog.refresh()
+            registered = time.perf_counter() - start
+
+            expected = conn.execute(ROLLUP.format(events=scan)).fetchall()
+            rollup = catalog.query("SELECT hour, source_host, events FROM events_per_host_hour "
+                                   "WHERE source_host IS NOT NULL ORDER BY ALL")
+            assert rollup.rows() == expected
+            one_day = conn.execute(ONE_DAY.format(events=scan, day=day)).fetchone()[0]
+            d = date.fromisoformat(day)
+            assert catalog.query(ONE_DAY.format(events="events", day=day), d, d).item() == one_day
+
+            print(f"{n:,} events in {len(files)} files; catalog built in {registered:.1f}s (once)")
+            print(f"  host/hour rollup : {_best_ms(lambda: conn.execute(ROLLUP.format(events=scan)).fetchall()):7.1f} ms"
+                  f" glob -> {_best_ms(lambda: catalog.query('SELECT * FROM events_per_host_hour')):6.1f} ms catalog")
+            print(f"  one-day count    : "
+                  f"{_best_ms(lambda: conn.execute(ONE_DAY.format(events=scan, day=day)).fetchone()):7.1f} ms"
+                  f" glob -> {_best_ms(lambda: catalog.query(ONE_DAY.format(events='events', day=day), d, d)):6.1f} ms"
+                  f" pruned ({len(catalog.files(d, d))} of {len(files)} files)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,54 @@
+"""
+Benchmark: compaction of a file-per-flush output tree (the pre-rolling layout).
+Reports file count, bytes and scan latency before/after, as `compact` does, plus
+a DuckDB count(*) over the glob.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_compact [n_events]
+"""
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+
+from src.storage.compact import Compactor
+
+from benchmarks.bench_parquet_writer import _FilePerFlushWriter, _events
+
+
+def _duckdb_ms(glob: str) -> float:
+    start = time.perf_counter()
+    duckdb.connect().execute(f"SELECT count(*) FROM read_parquet('{glob}', union_by_name=true)").fetchone()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(n: int = 200_000) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp) / "output"
+        writer = _FilePerFlushWriter()
+        writer.output_dir = output_dir
+        for event in _events(n):
+            writer.write(event)
+        writer.flush()
+
+        glob = str(output_dir / "**" / "*.parquet")
+        duck_before = _duckdb_ms(glob)
+        start = time.perf_counter()
+        report = Compactor(output_dir).run()
+        elapsed = time.perf_counter() - start
+        duck_after = _duckdb_ms(glob)
+
+        before = sum(p.bytes_before for p in report.partitions) / 1e6
+        after = sum(p.bytes_after for p in report.partitions) / 1e6
+        print(f"{n:,} events, {len(report.partitions)} partitions, compacted in {elapsed:.1f}s")
+        print(f"  files        : {report.files_before:6} -> {report.files_after}")
+        print(f"  size         : {before:6.1f} MB -> {after:.1f} MB")
+        print(f"  scan (Tool2) : {report.scan_seconds_before * 1000:6.0f} ms -> {report.scan_seconds_after * 1000:.0f} ms")
+        print(f"  duckdb count : {duck_before:6.0f} ms -> {duck_after:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,82 @@
+"""
+Benchmark: peak memory and throughput of compressed NDJSON / raw-log ingestion.
+Compares the previous read-everything gzip path (f.read() + splitlines) with
+the line-streaming UniversalIngestor._ingest_compressed, per codec.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_compressed_ingest [n_lines]
+"""
+import bz2
+import gzip
+import json
+import lzma
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.ingestion.universal import UniversalIngestor
+
+from benchmarks._synthetic import syslog_line, wazuh_alert
+
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def _write_archive(path: Path, n: int) -> None:
+    rng = random.Random(5)
+    ts = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    with _OPENERS[path.suffix](path, "wt", encoding="utf-8") as f:
+        for _ in range(n):
+            ts += timedelta(milliseconds=rng.randint(1, 500))
+            if rng.random() < 0.7:
+                f.write(json.dumps(wazuh_alert(rng, ts)) + "\n")
+            else:
+                f.write(syslog_line(rng, ts)["raw_text"] + "\n")
+
+
+def _read_whole(path: Path):
+    """The previous behaviour: inflate into one string, then split."""
+    with _OPENERS[path.suffix](path, "rt", encoding="utf-8", errors="replace") as f:
+        content = f.read()
+    try:
+        yield json.loads(content)
+    except json.JSONDecodeError:
+        for line in content.splitlines():
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield {"raw_text": line.strip(), "_parsing_type": "gz_raw"}
+
+
+def _measure(make_events):
+    """Throughput from an untraced run, peak memory from a tracemalloc run."""
+    start = time.perf_counter()
+    count = sum(1 for _ in make_events())
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    for _ in make_events():
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(n: int = 50000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in _OPENERS:
+            path = Path(tmp) / f"alerts.ndjson{suffix}"
+            _write_archive(path, n)
+            print(f"{suffix:4} archive: {path.stat().st_size / 1e6:.1f} MB compressed, {n} lines")
+            for name, make_events in (
+                ("read+split", lambda: _read_whole(path)),
+                ("streaming", lambda: UniversalIngestor(path)._ingest_compressed()),
+            ):
+                count, elapsed, peak = _measure(make_events)
+                print(f"  {name:10}: {count} events, {count / elapsed:9,.0f} ev/s, peak {peak / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,95 @@
+"""
+Benchmark: LANL auth CSV ingestion, old collect()+iter_rows vs batched reader.
+  read     - peak RSS / rows per second to read the whole file
+             (each variant runs in a fresh subprocess so ru_maxrss is its own)
+  prepare  - BatchProcessor.process(list of dicts) vs process_frame(DataFrame)
+Run from the Tool1 directory:
+    python -m benchmarks.bench_csv_batches [n_rows]
+"""
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import polars as pl
+
+from src.ingestion.auth_lanl import LANL_COLUMNS, LanlAuthIngestor
+
+_AUTH = ["NTLM", "Kerberos", "Negotiate", "?", "MICROSOFT_AUTHENTICATION_PACKAGE_V1_0"]
+_LOGON = ["Network", "Batch", "Service", "Interactive", "RemoteInteractive", "?"]
+
+
+def _write_lanl(path: Path, n: int) -> None:
+    rng = random.Random(9)
+    t = 1
+    with open(path, "w") as f:
+        for _ in range(n):
+            t += rng.random() < 0.3
+            src = f"C{rng.randint(1, 20000)}"
+            user = rng.choice([f"U{rng.randint(1, 9000)}@DOM1", f"{src}$@DOM1", "ANONYMOUS LOGON@C586"])
+            f.write(
+                f"{t},{user},{user},{src},C{rng.randint(1, 20000)},{rng.choice(_AUTH)},"
+                f"{rng.choice(_LOGON)},{rng.choice(['LogOn', 'LogOff', 'TGS', 'TGT'])},"
+                f"{'Success' if rng.random() < 0.97 else 'Fail'}\n"
+            )
+
+
+def _read(variant: str, path: Path) -> None:
+    start = time.perf_counter()
+    rows = 0
+    if variant == "collect":
+        q = pl.scan_csv(path, has_header=False, new_columns=LANL_COLUMNS, ignore_errors=True)
+        for _ in q.collect().iter_rows(named=True):
+            rows += 1
+    elif variant == "batches":
+        for frame in LanlAuthIngestor(path).iter_batches():
+            rows += frame.height
+    else:  # dicts from the batched reader
+        for _ in LanlAuthIngestor(path).ingest():
+            rows += 1
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"  {variant:8}: {rows / elapsed:12,.0f} rows/s, peak RSS {peak_mb:7.1f} MB")
+
+
+def _prepare(path: Path, n: int) -> None:
+    from src.processing.batch import BatchProcessor
+    from src.processing.pipeline import Pipeline
+
+    ingestor = LanlAuthIngestor(path)
+    processor = BatchProcessor(Pipeline(ingestor))
+    frame = next(ingestor.iter_batches()).head(n)
+    dicts = frame.to_dicts()
+
+    start = time.perf_counter()
+    processor.process(dicts)
+    per_record = time.perf_counter() - start
+
+    start = time.perf_counter()
+    processor.process_frame(frame)
+    columnar = time.perf_counter() - start
+
+    print(f"  process(dicts)     : {len(dicts) / per_record:9,.0f} ev/s")
+    print(f"  process_frame      : {len(dicts) / columnar:9,.0f} ev/s ({per_record / columnar:.2f}x)")
+
+
+def main(n: int = 2_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "auth.txt"
+        _write_lanl(path, n)
+        print(f"LANL auth file: {path.stat().st_size / 1e6:.0f} MB, {n:,} rows")
+        print("read")
+        for variant in ("collect", "batches", "dicts"):
+            subprocess.run([sys.executable, "-m", "benchmarks.bench_csv_batches", "--read", variant, str(path)], check=True)
+        print("prepare (20k events)")
+        _prepare(path, 20_000)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--read"]:
+        _read(sys.argv[2], Path(sys.argv[3]))
+    else:
+        main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,90 @@
+"""
+Benchmark: dedup index cost per event.
+Times DedupIndex.seen_or_add (one INSERT OR IGNORE for a new record) for new
+and for re-ingested keys, against a separate SELECT probe followed by an INSERT
+for new keys, and reports the end-to-end overhead on a re-ingest of the same file.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_dedup [n_keys]
+"""
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.config import settings
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline
+from src.storage.dedup import DedupIndex
+
+from benchmarks._synthetic import events
+
+CATEGORIES = ("network", "auth", "system", "web", "unknown")
+
+
+def _keys(n: int):
+    return [(CATEGORIES[i % len(CATEGORIES)], hashlib.sha256(str(i).encode()).hexdigest()) for i in range(n)]
+
+
+def _probe_then_insert(db: Path, keys) -> float:
+    """Baseline: look the key up, insert it when missing."""
+    conn = sqlite3.connect(str(db))
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("CREATE TABLE seen (category TEXT, raw_hash BLOB, PRIMARY KEY (category, raw_hash)) WITHOUT ROWID")
+    start = time.perf_counter()
+    for category, raw_hash in keys:
+        blob = bytes.fromhex(raw_hash)
+        if not conn.execute("SELECT 1 FROM seen WHERE category = ? AND raw_hash = ?", (category, blob)).fetchone():
+            conn.execute("INSERT INTO seen VALUES (?, ?)", (category, blob))
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def _ingest(path: Path, out: Path, dedup: bool) -> float:
+    pipeline = Pipeline(UniversalIngestor(path), dedup=dedup)
+    pipeline.summary_path = out / "summary.json"
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.run(max_lines=sys.maxsize)
+    return time.perf_counter() - start
+
+
+def main(n: int = 500_000) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        keys = _keys(n)
+        baseline = _probe_then_insert(tmp / "baseline.sqlite", keys)
+        index = DedupIndex(tmp / "dedup.sqlite")
+        start = time.perf_counter()
+        assert all(index.seen_or_add(c, h, h, "first") is None for c, h in keys)
+        index.commit()
+        new = time.perf_counter() - start
+        start = time.perf_counter()
+        assert all(index.seen_or_add(c, h, h, "again") for c, h in keys)
+        dup = time.perf_counter() - start
+        index.close()
+
+        print(f"{n:,} keys (µs/event)")
+        print(f"  SELECT probe + INSERT, new keys : {baseline / n * 1e6:6.2f}")
+        print(f"  seen_or_add, new keys           : {new / n * 1e6:6.2f}")
+        print(f"  seen_or_add, duplicates         : {dup / n * 1e6:6.2f}")
+
+        m = 20_000
+        settings.OUTPUT_DIR = tmp / "output"
+        path = tmp / "events.ndjson"
+        path.write_text("".join(json.dumps(e) + "\n" for e in events(m)), encoding="utf-8")
+        plain = _ingest(path, tmp, dedup=False)
+        first = _ingest(path, tmp, dedup=True)
+        again = _ingest(path, tmp, dedup=True)
+        print(f"{m:,}-event ingest: no dedup {plain:.2f}s, dedup {first:.2f}s, "
+              f"re-ingest (all duplicates) {again:.2f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,70 @@
+"""
+Benchmark: per-event cost of the hash chain + storage row, v1 vs v2 scheme,
+and ChainVerifier throughput over a written output directory.
+  v1  - sorted-key JSON of to_dict() (raw_source included), row rebuilt for the writer
+  v2  - positional canonical encoding of the cached storage row, reused by the writer
+Run from the Tool1 directory:
+    python -m benchmarks.bench_event_hash [n_events]
+"""
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.schema import HASH_SCHEME_V1, HASH_SCHEME_V2, CanonicalEvent
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline
+from src.storage.verify import ChainVerifier
+from src.storage.writer import StorageWriter
+
+from benchmarks._synthetic import events
+
+
+def _prepared(n: int):
+    pipeline = Pipeline(UniversalIngestor(Path(__file__)))
+    return [pipeline._prepare(raw) for raw in events(n)]
+
+
+def _chain(prepared, scheme: str):
+    previous = None
+    out = []
+    for enriched in prepared:
+        event = CanonicalEvent.create(
+            event_type=enriched["event_type"], timestamp=enriched["timestamp"], source_file="bench",
+            parser_version="2.0.0", raw_source=enriched["raw_source"], log_category=enriched["log_category"],
+            user=enriched.get("user"), source_host=enriched.get("source_host"), port=enriched.get("port"),
+            observed_cve_ids=enriched.get("observed_cve_ids"), risk_score=enriched.get("risk_score", 0.0),
+            previous_event_hash=previous, hash_scheme=scheme,
+        )
+        event.compute_event_hash(previous)
+        event.to_row()  # what StorageWriter.flush does with it
+        previous = event.event_hash
+        out.append(event)
+    return out
+
+
+def main(n: int = 20_000) -> None:
+    logging.disable(logging.WARNING)
+    prepared = _prepared(n)
+    print(f"{n:,} events")
+    for scheme in (HASH_SCHEME_V1, HASH_SCHEME_V2):
+        start = time.perf_counter()
+        chained = _chain(prepared, scheme)
+        elapsed = time.perf_counter() - start
+        print(f"  {scheme} create+hash+row: {elapsed / n * 1e6:6.1f} us/event")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = StorageWriter()
+            writer.output_dir = Path(tmp)
+            for event in chained:
+                writer.write(event)
+            writer.close()
+            start = time.perf_counter()
+            report = ChainVerifier(Path(tmp)).verify()
+            elapsed = time.perf_counter() - start
+            print(f"  {scheme} verify: {report.events / elapsed:9,.0f} events/s (ok={report.ok})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,162 @@
+"""
+Benchmark: Pipeline._extract_fields with and without per-shape extraction plans.
+Times field extraction alone over Wazuh alerts, LANL auth records and Nmap
+port records (one shape each), comparing the previous full candidate-list
+probe with the cached per-shape plans, after checking they extract
+identical fields.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_extraction_plans [n_records]
+"""
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import (
+    Pipeline, _IP_RE, _PORT_KEYS, _PROTOCOL_KEYS, _RAW_TEXT_KEYS, _SOURCE_HOST_KEYS, _TARGET_HOST_KEYS,
+    _USER_KEYS, _USER_RE,
+)
+
+
+def _records(n: int):
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            yield {
+                "timestamp": "2024-03-01T10:15:02.123+0000",
+                "rule": {"level": 5, "description": "sshd: authentication failed.", "groups": ["syslog", "sshd"]},
+                "agent": {"id": "001", "name": f"web-{i % 50:02d}", "ip": f"10.0.0.{i % 250}"},
+                "manager": {"name": "wazuh-manager"},
+                "data": {"srcip": "192.168.1.50", "srcuser": f"user{i % 300}"},
+                "full_log": f"Mar  1 10:15:02 web-01 sshd[811]: Failed password for user{i % 300} from 192.168.1.50",
+                "decoder": {"name": "sshd"},
+                "location": "/var/log/auth.log",
+            }
+        elif kind == 1:
+            yield {"time": 1709287200 + i, "source_user": f"U{i % 900}@DOM1", "source_computer": f"C{i % 400}",
+                   "dest_computer": f"C{i % 77}", "auth_type": "Kerberos", "status": "Success"}
+        else:
+            yield {"source_host": f"10.0.{i % 8}.{i % 250}", "hostname": "fileserver", "port": "445",
+                   "protocol": "tcp", "service_name": "microsoft-ds", "port_state": "open",
+                   "raw_text": "Nmap: 10.0.0.9:445/tcp open - Samba smbd 4.6 (microsoft-ds)",
+                   "scan_start": "Fri Mar  1 09:00:00 2024", "_parsing_type": "nmap_port"}
+
+
+def _old_extract_fields(pipeline, raw):
+    """The previous Pipeline._extract_fields: every candidate list probed through _get."""
+    if not isinstance(raw, dict):
+        return {"raw_text": str(raw)}
+
+    # ── Source Host ──────────────────────────────────────────────────────
+    source_host = pipeline._get(raw, *_SOURCE_HOST_KEYS)
+    # Wazuh agent fallback
+    if not source_host and isinstance(raw.get("agent"), dict):
+        source_host = raw["agent"].get("ip") or raw["agent"].get("name")
+
+    # Manager fallback for Wazuh
+    if not source_host and isinstance(raw.get("manager"), dict):
+        source_host = raw["manager"].get("name")
+
+    # ── Target Host ──────────────────────────────────────────────────────
+    target_host = pipeline._get(raw, *_TARGET_HOST_KEYS)
+
+    # ── User ─────────────────────────────────────────────────────────────
+    user = pipeline._get(raw, *_USER_KEYS)
+    # Wazuh data dict
+    if not user and isinstance(raw.get("data"), dict):
+        data = raw["data"]
+        user = (data.get("srcuser") or data.get("dstuser") or
+                data.get("win", {}).get("eventdata", {}).get("targetUserName") if isinstance(data.get("win"), dict) else None)
+
+    # ── Port ─────────────────────────────────────────────────────────────
+    port_raw = pipeline._get(raw, *_PORT_KEYS)
+    port = None
+    if port_raw and str(port_raw).isdigit():
+        port = int(port_raw)
+
+    # ── Protocol ─────────────────────────────────────────────────────────
+    protocol = pipeline._get(raw, *_PROTOCOL_KEYS)
+    if not protocol and isinstance(raw.get("decoder"), dict):
+        protocol = raw["decoder"].get("name")
+
+    # ── Rich Text (for enrichment) ────────────────────────────────────────
+    raw_text = pipeline._get(raw, *_RAW_TEXT_KEYS)
+    if not raw_text:
+        # Wazuh rule description
+        if isinstance(raw.get("rule"), dict):
+            raw_text = raw["rule"].get("description", "")
+        # Syscheck path as fallback
+        if not raw_text and isinstance(raw.get("syscheck"), dict):
+            sc = raw["syscheck"]
+            raw_text = f"File/registry {sc.get('event', 'modified')}: {sc.get('path', '')}"
+
+    # ── Agent Name ────────────────────────────────────────────────────────
+    agent_name = None
+    if isinstance(raw.get("agent"), dict):
+        agent_name = raw["agent"].get("name")
+
+    # ── Log Category ─────────────────────────────────────────────────────
+    log_category = raw.get("_wazuh_category") or raw.get("_parsing_type") or "generic"
+    if isinstance(raw.get("rule"), dict):
+        groups = raw["rule"].get("groups", [])
+        if groups:
+            if "syscheck" in groups:
+                log_category = "wazuh_syscheck"
+            elif "authentication" in groups:
+                log_category = "wazuh_auth"
+            else:
+                log_category = f"wazuh_{groups[0]}" if groups else "wazuh"
+
+    # ── Regex fallback for IPs / users from raw text ──────────────────────
+    if raw_text and not source_host:
+        ips = _IP_RE.findall(raw_text)
+        if ips:
+            source_host = ips[0]
+            if len(ips) > 1:
+                target_host = ips[1]
+
+    if raw_text and not user:
+        m = _USER_RE.search(raw_text)
+        if m:
+            user = m.group(1)
+
+    return {
+        "source_host": source_host,
+        "target_host": target_host,
+        "user": user,
+        "agent_name": agent_name,
+        "port": port,
+        "protocol": protocol,
+        "raw_text": raw_text or "",
+        "log_category": str(log_category),
+    }
+
+
+def main(n: int = 300_000) -> None:
+    logging.disable(logging.WARNING)
+    records = list(_records(n))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "empty.ndjson"
+        path.touch()
+        pipeline = Pipeline(UniversalIngestor(path))
+        assert [pipeline._extract_fields(r) for r in records[:3000]] == \
+               [_old_extract_fields(pipeline, r) for r in records[:3000]], "outputs differ"
+
+        timings = {}
+        for label, extract in (("full candidate lists", lambda raw: _old_extract_fields(pipeline, raw)),
+                               ("per-shape plans     ", pipeline._extract_fields)):
+            start = time.perf_counter()
+            for raw in records:
+                extract(raw)
+            timings[label] = time.perf_counter() - start
+
+    print(f"{n:,} records, 3 shapes (outputs identical)")
+    for label, elapsed in timings.items():
+        print(f"  _extract_fields, {label}: {elapsed / n * 1e6:6.2f} µs/record")
+    print(f"  plan cache: {pipeline.plans.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
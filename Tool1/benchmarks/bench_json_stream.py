@@ -0,0 +1,85 @@
+"""
+Benchmark: peak memory and throughput of UniversalIngestor._ingest_json on a
+generated Wazuh final_report.json (scripts/wazuh_filter.sh layout).
+Compares loading the whole document (the previous json.load path) with the
+streaming reader. Run from the Tool1 directory:
+    python -m benchmarks.bench_json_stream [n_alerts]
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.ingestion.universal import UniversalIngestor, WAZUH_CATEGORY_KEYS
+
+from benchmarks._synthetic import wazuh_alert
+
+# wazuh_filter.sh key order
+_CATEGORIES = ["vulnerability", "malware_behavior", "privilege_escalation", "persistence"]
+
+
+def _write_report(path: Path, n: int) -> None:
+    rng = random.Random(11)
+    ts = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    per_category = n // len(_CATEGORIES)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for c, category in enumerate(_CATEGORIES):
+            f.write(f'  "{category}": [\n')
+            for i in range(per_category):
+                ts += timedelta(milliseconds=rng.randint(1, 500))
+                sep = ",\n" if i < per_category - 1 else "\n"
+                f.write("    " + json.dumps(wazuh_alert(rng, ts)) + sep)
+            f.write("  ]" + (",\n" if c < len(_CATEGORIES) - 1 else "\n"))
+        f.write("}\n")
+
+
+def _load_whole(path: Path):
+    """The previous behaviour: json.load, then flatten the category arrays."""
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        data = json.load(f)
+    for key in WAZUH_CATEGORY_KEYS:
+        for item in data.get(key) or []:
+            tagged = dict(item)
+            tagged.setdefault("_wazuh_category", key)
+            yield tagged
+
+
+def _measure(events):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = 0
+    first_event = None
+    for _ in events:
+        if first_event is None:
+            first_event = time.perf_counter() - start
+        count += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, first_event or 0.0, peak
+
+
+def main(n: int = 40000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "final_report.json"
+        _write_report(path, n)
+        size_mb = path.stat().st_size / 1e6
+        print(f"report: {size_mb:.1f} MB, {n} alerts")
+        for name, events in (
+            ("json.load", _load_whole(path)),
+            ("streaming", UniversalIngestor(path)._ingest_json()),
+        ):
+            count, elapsed, first, peak = _measure(events)
+            print(
+                f"  {name:10}: {count} events, {count / elapsed:9,.0f} ev/s, "
+                f"first event after {first * 1000:7.1f} ms, peak {peak / 1e6:7.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
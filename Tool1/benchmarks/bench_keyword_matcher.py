@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: MITRE / event-type keyword matching on Wazuh and ZAP payloads.
+Compares the original per-rule `kw in text` scan with the Aho-Corasick matcher.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_keyword_matcher [n_events]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from src.processing.enricher import Enricher, _MITRE_RULES
+from src.processing.matcher import KeywordMatcher
+
+from benchmarks._synthetic import wazuh_alert, zap_instance
+
+
+def _loop(text):
+    best = (None, 0.0, None, None)
+    for tech_id, confidence, tactic, tech_name, keywords in _MITRE_RULES:
+        for kw in keywords:
+            if kw in text:
+                if confidence > best[1]:
+                    best = (tech_id, confidence, tactic, tech_name)
+                break
+    return best
+
+
+def _time(fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main(n: int = 5000) -> None:
+    rng = random.Random(3)
+    ts = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    enricher = Enricher()
+    payloads = {
+        "wazuh": [wazuh_alert(rng, ts) for _ in range(n)],
+        "zap": [zap_instance(rng, ts) for _ in range(n)],
+    }
+    groups = [rule[4] for rule in _MITRE_RULES]
+    backends = ["python"]
+    try:
+        import ahocorasick  # noqa: F401
+        backends.append("pyahocorasick")
+    except ImportError:
+        pass
+
+    for name, records in payloads.items():
+        texts = [enricher._build_enrichment_text(r.get("full_log") or r.get("desc", ""), r) for r in records]
+        avg_len = sum(map(len, texts)) / len(texts)
+        print(f"{name:6} payloads ({avg_len:.0f} chars avg)")
+        print(f"  {'keyword loop':28}: {_time(_loop, texts):7.1f} us/event")
+        for backend in backends:
+            matcher = KeywordMatcher(groups, backend=backend)
+            print(f"  {'aho-corasick/' + backend:28}: {_time(matcher.match, texts):7.1f} us/event")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,84 @@
+"""
+Benchmark: a directory of exports ingested as one run vs one run per file.
+Writes n events split over several gzip NDJSON files and times: a separate
+Pipeline per file (what one `ingest` subprocess per file did, minus interpreter
+start-up), then Pipeline.run_many with 1 and 4 reader threads. All runs must
+write the same events in the same order. Reader threads overlap reading,
+decompression and parsing of upcoming files with processing of the current
+one, so the gain depends on the cores available.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_multi_file [n_events] [n_files]
+"""
+import contextlib
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.config import settings
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline
+
+from benchmarks._synthetic import events
+
+
+def _pipeline(first: Path, out: Path, order: list) -> Pipeline:
+    pipeline = Pipeline(UniversalIngestor(first))
+    pipeline.summary_path = out / "summary.json"
+    pipeline.writer.output_dir = out
+    write = pipeline.writer.write
+    pipeline.writer.write = lambda event: (order.append(event.raw_hash), write(event))
+    return pipeline
+
+
+def _per_file(files, out: Path):
+    order = []
+    for path in files:
+        _pipeline(path, out, order).run(max_lines=sys.maxsize)
+    return order
+
+
+def _run_many(files, out: Path, readers: int):
+    order = []
+    _pipeline(files[0], out, order).run_many([UniversalIngestor(p) for p in files],
+                                             max_lines=sys.maxsize, readers=readers)
+    return order
+
+
+def main(n: int = 60_000, n_files: int = 24) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        settings.OUTPUT_DIR = tmp / "output"
+        settings.DEAD_LETTER_QUEUE_DIR = tmp / "dlq"
+        files = [tmp / "logs" / f"export_{i:03d}.ndjson.gz" for i in range(n_files)]
+        files[0].parent.mkdir()
+        handles = [gzip.open(p, "wt", encoding="utf-8") for p in files]
+        for i, event in enumerate(events(n)):
+            handles[i * n_files // n].write(json.dumps(event) + "\n")
+        for handle in handles:
+            handle.close()
+
+        print(f"{n:,} events in {n_files} gzip NDJSON files, {os.cpu_count()} CPUs")
+        runs = (("one run per file      ", lambda out: _per_file(files, out)),
+                ("run_many, 1 reader    ", lambda out: _run_many(files, out, 1)),
+                ("run_many, 4 readers   ", lambda out: _run_many(files, out, 4)))
+        reference = baseline = None
+        for i, (label, run) in enumerate(runs):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                order = run(tmp / f"out{i}")
+            elapsed = time.perf_counter() - start
+            reference = reference or order
+            baseline = baseline or elapsed
+            same = "same events" if order == reference else "EVENTS DIFFER"
+            print(f"  {label}: {elapsed:6.2f}s  {len(order) / elapsed:8,.0f} ev/s  {baseline / elapsed:4.2f}x  ({same})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,79 @@
+"""
+Benchmark: end-to-end ingest throughput with 1/2/4/8 worker processes.
+Runs Pipeline.run over a synthetic NDJSON file in row mode and batch mode and
+checks that every worker count writes the same events in the same order.
+Speedup is bounded by the cores available and by the ordered parent stage
+(CanonicalEvent build + hash chain + writer), reported as "commit stage".
+Run from the Tool1 directory:
+    python -m benchmarks.bench_parallel_workers [n_events]
+"""
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.core.config import settings
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline, _RunStats
+
+from benchmarks._synthetic import events
+
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def _run(path: Path, out: Path, workers: int, batch_size: int):
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.summary_path = out / "summary.json"
+    pipeline.writer.output_dir = out / f"w{workers}_b{batch_size}"
+    order = []
+    write = pipeline.writer.write
+    pipeline.writer.write = lambda event: (order.append(event.raw_hash), write(event))
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # per-100-event progress lines
+        summary = pipeline.run(max_lines=sys.maxsize, batch_size=batch_size, workers=workers)
+    return summary["success"], time.perf_counter() - start, order
+
+
+def _commit_stage(path: Path, n: int) -> float:
+    """Seconds per event spent in the ordered parent stage alone."""
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.writer.write = lambda event: None
+    prepared = [pipeline._prepare(raw) for raw in events(min(n, 20_000))]
+    start = time.perf_counter()
+    for enriched in prepared:
+        pipeline._commit(enriched, _RunStats())
+    return (time.perf_counter() - start) / len(prepared)
+
+
+def main(n: int = 100_000) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        settings.OUTPUT_DIR = tmp / "output"
+        settings.DEAD_LETTER_QUEUE_DIR = tmp / "dlq"
+        path = tmp / "events.ndjson"
+        with open(path, "w", encoding="utf-8") as f:
+            for event in events(n):
+                f.write(json.dumps(event) + "\n")
+        print(f"{n:,} events, {os.cpu_count()} CPUs")
+        print(f"commit stage: {_commit_stage(path, n) * 1e6:.1f} us/event")
+
+        for batch_size in (0, 1000):
+            print("row mode" if batch_size == 0 else f"batch mode (batch_size={batch_size})")
+            baseline = reference = None
+            for workers in WORKER_COUNTS:
+                count, elapsed, order = _run(path, tmp, workers, batch_size)
+                baseline = baseline or elapsed
+                reference = reference or order
+                same = "same order" if order == reference else "ORDER DIFFERS"
+                print(f"  workers={workers}: {count / elapsed:9,.0f} ev/s  {baseline / elapsed:5.2f}x  ({same})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,93 @@
+"""
+Benchmark: Parquet output layout, file-per-flush vs rolling row-group writer.
+  write - events/s through StorageWriter (the old layout is reproduced by
+          writing each 500-event flush to its own file, as before)
+  read  - glob + read_parquet over the whole output, and DuckDB count(*)
+Run from the Tool1 directory:
+    python -m benchmarks.bench_parquet_writer [n_events]
+"""
+import json
+import logging
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from src.core.schema import CanonicalEvent
+from src.storage.writer import StorageWriter
+
+from benchmarks._synthetic import events
+
+
+class _FilePerFlushWriter(StorageWriter):
+    """The previous layout: every flush writes events_<n>.parquet per date, pipe-joined ids."""
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        rows = []
+        for evt in self._buffer:
+            row = dict(evt.to_row())
+            row["observed_cve_ids"] = "|".join(row["observed_cve_ids"])
+            row["observed_cwe_ids"] = "|".join(row["observed_cwe_ids"])
+            rows.append(row)
+        df = pl.DataFrame(rows).with_columns(pl.col("timestamp").str.slice(0, 10).alias("_date"))
+        for (date_str,), part in df.partition_by("_date", as_dict=True, include_key=False).items():
+            part_dir = self.output_dir / date_str
+            part_dir.mkdir(parents=True, exist_ok=True)
+            part.write_parquet(part_dir / f"events_{self._write_count}.parquet")
+            self._write_count += part.height
+        self._buffer.clear()
+
+
+def _events(n: int):
+    previous = None
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    for i, raw in enumerate(events(n)):
+        text = json.dumps(raw)
+        event = CanonicalEvent.create(
+            event_type="auth_failure", timestamp=start + timedelta(seconds=i * 2), source_file="bench",
+            parser_version="2.0.0", raw_source=text, user=raw.get("user"),
+            observed_cve_ids=["CVE-2021-44228"] if "cve" in text.lower() else [],
+        ).compute_event_hash(previous)
+        previous = event.event_hash
+        yield event
+
+
+def main(n: int = 200_000) -> None:
+    logging.disable(logging.WARNING)
+    prepared = list(_events(n))
+    print(f"{n:,} events")
+    for name, cls in (("file-per-flush", _FilePerFlushWriter), ("rolling", StorageWriter)):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = cls()
+            writer.output_dir = Path(tmp)
+            start = time.perf_counter()
+            for event in prepared:
+                writer.write(event)
+            if isinstance(writer, _FilePerFlushWriter):
+                writer.flush()
+            else:
+                writer.close()
+            write_s = time.perf_counter() - start
+
+            files = list(Path(tmp).rglob("*.parquet"))
+            size_mb = sum(f.stat().st_size for f in files) / 1e6
+            glob = str(Path(tmp) / "**" / "*.parquet")
+            start = time.perf_counter()
+            height = pl.read_parquet(glob).height
+            read_s = time.perf_counter() - start
+            start = time.perf_counter()
+            duckdb.connect().execute(f"SELECT count(*) FROM read_parquet('{glob}', union_by_name=true)").fetchone()
+            duck_s = time.perf_counter() - start
+
+            print(f"  {name:15}: write {n / write_s:8,.0f} ev/s | {len(files):5} files {size_mb:6.1f} MB | "
+                  f"read_parquet {read_s * 1000:7.1f} ms ({height:,} rows) | duckdb count {duck_s * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
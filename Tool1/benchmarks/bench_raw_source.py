@@ -0,0 +1,68 @@
+"""
+Benchmark: raw_source from the original JSON line vs re-serializing the dict.
+Writes Wazuh-style NDJSON alerts, ingests them once, then runs
+Pipeline._prepare over the same records twice: as plain dicts (the previous
+behaviour, json.dumps per event) and as the RawEvents the ingestor now yields
+(line carried through). Prints the per-stage seconds the pipeline reports.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_raw_source [n_events]
+"""
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline
+
+
+def _write_alerts(path: Path, n: int) -> None:
+    rng = random.Random(7)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({
+                "timestamp": f"2024-03-01T10:{i // 60 % 60:02d}:{i % 60:02d}.000+0000",
+                "rule": {"level": rng.randint(3, 12), "description": "sshd: authentication failed.",
+                         "id": "5710", "groups": ["syslog", "sshd", "authentication_failed"],
+                         "mitre": {"id": ["T1110"], "tactic": ["Credential Access"]}},
+                "agent": {"id": f"{i % 40:03d}", "name": f"web-{i % 40:02d}", "ip": f"10.0.0.{i % 250}"},
+                "manager": {"name": "wazuh-manager"},
+                "data": {"srcip": f"192.168.{i % 16}.{rng.randint(1, 254)}", "srcuser": f"user{i % 300}",
+                         "srcport": str(rng.randint(1024, 65535))},
+                "full_log": f"Mar  1 10:15:02 web-01 sshd[{rng.randint(100, 9999)}]: Failed password for "
+                            f"user{i % 300} from 192.168.1.50 port 22 ssh2",
+                "decoder": {"name": "sshd", "parent": "sshd"},
+                "predecoder": {"program_name": "sshd", "hostname": "web-01"},
+                "location": "/var/log/auth.log",
+                "id": f"1709287{i:06d}.{rng.randint(1000, 9999)}",
+            }) + "\n")
+
+
+def _prepare_all(records):
+    pipeline = Pipeline(UniversalIngestor(Path(__file__)))
+    start = time.perf_counter()
+    for raw in records:
+        pipeline._prepare(raw)
+    return time.perf_counter() - start, pipeline.stage_seconds
+
+
+def main(n: int = 50_000) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "alerts.ndjson"
+        _write_alerts(path, n)
+        records = list(UniversalIngestor(path).ingest())
+    plain = [dict(r) for r in records]
+
+    print(f"{n:,} Wazuh alerts, _prepare only (µs/event per stage)")
+    for label, batch in (("json.dumps per event", plain), ("original line       ", records)):
+        elapsed, stages = _prepare_all(batch)
+        per_stage = "  ".join(f"{name}={seconds / n * 1e6:.2f}" for name, seconds in stages.items() if seconds)
+        print(f"  {label}: {elapsed / n * 1e6:6.2f} µs/event  [{per_stage}]")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
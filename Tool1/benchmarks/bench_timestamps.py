@@ -0,0 +1,67 @@
+"""
+Benchmark: timestamp normalization, dateutil per value vs TimestampParser.
+Generates Wazuh-style ISO strings (mostly distinct, millisecond resolution),
+syslog strings and epoch strings, and reports µs/value for the previous
+dateutil.parser.parse path and for the format-learning parser (cold, i.e.
+nothing cached yet), after checking both give the same datetimes.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_timestamps [n_values]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import dateutil.parser
+
+from src.processing.timestamps import TimestampParser
+
+
+def _old(raw_ts):
+    """The previous Normalizer.normalize_timestamp for strings."""
+    dt = dateutil.parser.parse(str(raw_ts))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _values(n: int):
+    rng = random.Random(11)
+    t0 = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        t = t0 + timedelta(milliseconds=i * 37 + rng.randint(0, 36))
+        kind = i % 10
+        if kind < 7:
+            yield "wazuh", t.strftime("%Y-%m-%dT%H:%M:%S.") + f"{t.microsecond // 1000:03d}+0000"
+        elif kind < 9:
+            yield "syslog", t.strftime("%b %d %H:%M:%S").replace(" 0", "  ", 1)
+        else:
+            yield "lanl", str(int(t.timestamp()))
+
+
+def main(n: int = 200_000) -> None:
+    sources, values = zip(*_values(n))
+    print(f"{n:,} timestamps ({len(set(values)):,} distinct): 70% Wazuh ISO, 20% syslog, 10% epoch")
+
+    start = time.perf_counter()
+    old = []
+    for value in values:
+        try:
+            old.append(_old(value))
+        except Exception:
+            old.append(None)  # epoch strings: the old path fell back to the wall clock
+    elapsed_old = time.perf_counter() - start
+
+    parser = TimestampParser()
+    start = time.perf_counter()
+    new = parser.parse_many(values, sources)
+    elapsed_new = time.perf_counter() - start
+
+    assert all(a == b for a, b in zip(old, new) if a is not None), "outputs differ"
+    print(f"  dateutil        : {elapsed_old / n * 1e6:6.2f} µs/value")
+    print(f"  TimestampParser : {elapsed_new / n * 1e6:6.2f} µs/value  ({elapsed_old / elapsed_new:.1f}x)")
+    print(f"  paths           : {parser.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,127 @@
+"""
+Benchmark: VulnIntel enrichment of event batches against a synthetic DB.
+  per-CVE connection - the previous bridge: connect + pragmas per cache miss, unbounded dict
+  batched SQLite     - one persistent connection, one IN (...) query per batch, LRU cache
+  score table        - memory-mapped precomputed cve_id -> (cvss, severity, kev)
+Each mode starts cold and processes the same batches.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_vulnintel_lookup [n_events] [n_cves]
+"""
+import logging
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.core import vulnintel_bridge as vib
+from src.core.config import settings
+
+_BATCH = 500
+_SEVERITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL", None]
+
+
+def _build_db(path: Path, n_cves: int) -> list:
+    rng = random.Random(7)
+    ids = [f"CVE-{2000 + i % 25}-{i:05d}" for i in range(n_cves)]
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")  # as VulnIntel leaves it; the old bridge re-set it per connection
+    conn.execute(
+        "CREATE TABLE cve (cve_id TEXT PRIMARY KEY, description TEXT, cvss_v3_score REAL, "
+        "cvss_v3_severity TEXT, attack_vector TEXT, affected_cpes TEXT)"
+    )
+    conn.execute("CREATE TABLE kev (id INTEGER PRIMARY KEY, cve_id TEXT)")
+    conn.executemany(
+        "INSERT INTO cve VALUES (?, ?, ?, ?, 'NETWORK', '')",
+        ((c, "synthetic " * 20, round(rng.uniform(0, 10), 1), rng.choice(_SEVERITIES)) for c in ids),
+    )
+    conn.executemany("INSERT INTO kev (cve_id) VALUES (?)", ((c,) for c in rng.sample(ids, n_cves // 100)))
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def _batches(ids: list, n: int) -> list:
+    # Skewed like real feeds: a few hot CVEs, a long tail, most events without any
+    rng = random.Random(11)
+    hot = ids[:50]
+    lists = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.6:
+            lists.append([])
+        elif roll < 0.85:
+            lists.append([rng.choice(hot)])
+        else:
+            lists.append(sorted({rng.choice(ids) for _ in range(rng.randint(1, 3))}))
+    return [lists[i:i + _BATCH] for i in range(0, n, _BATCH)]
+
+
+def _per_cve_connection(batches, db_path: Path) -> None:
+    cache, kev = {}, None
+    for batch in batches:
+        for cve_ids in batch:
+            if not cve_ids:
+                continue
+            if kev is None:
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                kev = {r[0] for r in conn.execute("SELECT cve_id FROM kev")}
+                conn.close()
+            for cve_id in cve_ids:
+                if cve_id in cache:
+                    continue
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA cache_size=-32000")
+                row = conn.execute(
+                    "SELECT cve_id, description, cvss_v3_score, cvss_v3_severity, attack_vector, affected_cpes "
+                    "FROM cve WHERE cve_id = ? LIMIT 1", (cve_id,)
+                ).fetchone()
+                cache[cve_id] = dict(row) if row else None
+                conn.close()
+
+
+def _bridge(batches) -> None:
+    vib.reset()
+    for batch in batches:
+        vib.enrich_many(batch)
+
+
+def main(n: int = 200_000, n_cves: int = 100_000) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "vuln.db"
+        ids = _build_db(db_path, n_cves)
+        batches = _batches(ids, n)
+        vib._VULN_DB_PATH = db_path
+        settings.VULNINTEL_SCORE_TABLE = Path(tmp) / "cve_scores.bin"
+        print(f"{n:,} events in batches of {_BATCH}, {n_cves:,} CVEs in the DB")
+
+        start = time.perf_counter()
+        _per_cve_connection(batches, db_path)
+        print(f"  per-CVE connection : {(time.perf_counter() - start) / n * 1e6:6.2f} us/event")
+
+        settings.VULNINTEL_USE_SCORE_TABLE = False
+        start = time.perf_counter()
+        _bridge(batches)
+        elapsed = time.perf_counter() - start
+        stats = vib.cache_stats()
+        print(f"  batched SQLite     : {elapsed / n * 1e6:6.2f} us/event  "
+              f"(cache hit rate {stats['hit_rate']:.1%}, {stats['size']:,} cached)")
+
+        start = time.perf_counter()
+        vib.build_score_table()
+        built = time.perf_counter() - start
+        settings.VULNINTEL_USE_SCORE_TABLE = True
+        start = time.perf_counter()
+        _bridge(batches)
+        elapsed = time.perf_counter() - start
+        print(f"  score table        : {elapsed / n * 1e6:6.2f} us/event  "
+              f"(built in {built:.2f}s, {settings.VULNINTEL_SCORE_TABLE.stat().st_size:,} bytes)")
+        vib.reset()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,96 @@
+"""
+Benchmark: Nmap XML ingestion, whole-document ET.parse vs streaming iterparse.
+Generates a /16-style sweep (every host with a few open ports, scripts and OS
+matches, plus down hosts) and reports total time, time to first event and peak
+Python heap for both, after checking that they produce identical events.
+Run from the Tool1 directory:
+    python -m benchmarks.bench_xml_ingest [n_hosts]
+"""
+import logging
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from src.ingestion.universal import UniversalIngestor
+
+_SERVICES = [
+    ("22", "ssh", "OpenSSH", "8.9p1"), ("80", "http", "nginx", "1.18.0"), ("443", "https", "nginx", "1.18.0"),
+    ("445", "microsoft-ds", "Samba smbd", "4.6"), ("3389", "ms-wbt-server", "xrdp", ""),
+]
+
+
+def _write_scan(path: Path, n_hosts: int) -> None:
+    rng = random.Random(3)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0"?>\n<nmaprun scanner="nmap" args="nmap -sV -O 10.0.0.0/16" '
+                'startstr="Fri Mar  1 09:00:00 2024">\n<scaninfo type="syn" protocol="tcp"/>\n')
+        for i in range(n_hosts):
+            ip = f"10.0.{i // 254 % 256}.{i % 254 + 1}"
+            if rng.random() < 0.3:
+                f.write(f'<host><status state="down"/><address addr="{ip}" addrtype="ipv4"/></host>\n')
+                continue
+            f.write(f'<host><status state="up"/><address addr="{ip}" addrtype="ipv4"/>'
+                    f'<hostnames><hostname name="host-{i}" type="PTR"/></hostnames><ports>'
+                    f'<extraports state="closed" count="995"/>')
+            for portid, name, product, version in rng.sample(_SERVICES, rng.randint(1, 4)):
+                f.write(f'<port protocol="tcp" portid="{portid}"><state state="open"/>'
+                        f'<service name="{name}" product="{product}" version="{version}"/>')
+                if rng.random() < 0.2:
+                    f.write(f'<script id="vulners" output="CVE-2023-{rng.randint(1000, 9999)} 7.5"/>')
+                f.write('</port>')
+            f.write('</ports><os><osmatch name="Linux 5.X" accuracy="96"/></os></host>\n')
+        f.write('<runstats><finished time="1709287300"/></runstats>\n</nmaprun>\n')
+
+
+def _whole_document(ingestor: UniversalIngestor):
+    """The previous implementation: ET.parse the file, then walk root.findall('host')."""
+    root = ET.parse(str(ingestor.file_path)).getroot()
+    scan_args, scan_start = root.get("args", "nmap"), root.get("startstr", "")
+    for host in root.findall("host"):
+        yield from ingestor._nmap_host_events(host, scan_args, scan_start)
+
+
+def _measure(events):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    out = []
+    for event in events:
+        if first is None:
+            first = time.perf_counter() - start
+        out.append(event)
+        if len(out) >= 10_000:  # consume like the pipeline does, without keeping everything
+            out.clear()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, first, peak
+
+
+def main(n_hosts: int = 100_000) -> None:
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sweep.xml"
+        _write_scan(path, n_hosts)
+        ingestor = UniversalIngestor(path)
+        assert list(_whole_document(ingestor)) == list(ingestor._ingest_xml()), "outputs differ"
+        events = sum(1 for _ in ingestor._ingest_xml())
+        print(f"{n_hosts:,} hosts, {events:,} events, {path.stat().st_size / 1e6:.1f} MB (outputs identical)")
+
+        for label, make in (("ET.parse  ", lambda: _whole_document(ingestor)),
+                            ("iterparse ", lambda: ingestor._ingest_xml())):
+            elapsed, first, peak = _measure(make())
+            # Untraced timing: tracemalloc slows allocation-heavy code unevenly
+            start = time.perf_counter()
+            sum(1 for _ in make())
+            untraced = time.perf_counter() - start
+            print(f"  {label}: {untraced:6.2f} s total, first event after {first * 1000:8.1f} ms (traced), "
+                  f"peak heap {peak / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -3,6 +3,7 @@ Tool 1 Configuration
 """
 import logging
 from pathlib import Path
+from typing import List, Optional, Union
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -18,7 +19,33 @@ class Settings:
     APP_NAME: str = "PredictPath Tool 1"
     LOG_LEVEL: str = "INFO"
     STRICT_VALIDATION: bool = False
-    MAX_INGEST_RATE: int = 1000  # Events per second (token bucket)
+    MAX_INGEST_RATE: int = 1000  # Events per second (token_bucket / adaptive starting rate)
+    INGEST_RATE_MODE: str = "unlimited"  # unlimited | token_bucket | adaptive
+    ADAPTIVE_FLUSH_TARGET_SECONDS: float = 0.5  # Adaptive mode backs off above this flush time
+    PARQUET_COMPRESSION: str = "zstd"  # snappy | zstd | gzip | lz4 | brotli | none
+    PARQUET_COMPRESSION_LEVEL: Optional[int] = None  # Codec default when None
+    PARQUET_USE_DICTIONARY: Union[bool, List[str]] = True  # True/False, or only these columns
+    PARQUET_ROW_GROUP_ROWS: int = 50_000  # Flushed rows held per partition before writing a row group
+    PARQUET_ROLL_BYTES: int = 128 * 1024 * 1024  # Start a new file per partition past this size...
+    PARQUET_ROLL_SECONDS: float = 300.0  # ...or once the open file is this old
+    PARQUET_PENDING_ROWS: int = 100_000  # Rows held across all partitions; past this the largest one is written
+    PARQUET_MAX_OPEN_FILES: int = 16  # Open partition files; past this the least recently written is finalized
+    COMPACT_ROWS_PER_FILE: int = 1_000_000  # compact: max rows per rewritten Parquet file
+    HASH_SCHEME: str = "v2"  # Event hash chain: v2 (positional canonical encoding) | v1 (legacy JSON)
+    PCAP_FLOW_IDLE_SECONDS: float = 60.0  # A flow with no packets for this long (capture time) is emitted...
+    PCAP_FLOW_ACTIVE_SECONDS: float = 1800.0  # ...as is one active for this long; it then starts afresh
+    PCAP_MAX_FLOWS: int = 100_000  # Concurrent flows held; the least recently seen is emitted beyond this
+    CVE_CACHE_SIZE: int = 50_000  # VulnIntel CVE records kept per process (LRU)
+    VULNINTEL_USE_SCORE_TABLE: bool = True  # Enrich from VULNINTEL_SCORE_TABLE when it exists and is current
+    TIMESTAMP_CACHE_SIZE: int = 100_000  # Distinct timestamp strings remembered by the parser (FIFO)
+    EXTRACTION_PLAN_CACHE_SIZE: int = 1024  # Record shapes (top-level key tuples) with a compiled field plan
+    FOLLOW_POLL_SECONDS: float = 0.5  # ingest --follow: sleep between polls of an idle file
+    FOLLOW_FLUSH_SECONDS: float = 10.0  # ...finalize Parquet + checkpoint once the oldest pending event is this old
+    FOLLOW_FLUSH_EVENTS: int = 10_000  # ...or this many events are pending
+    INGEST_READER_THREADS: int = 4  # Multi-file ingest: files read (and parsed) ahead on threads
+    DEDUP_ENABLED: bool = True  # Skip events an earlier ingest already stored (see storage.dedup)
+    DEDUP_FILE: str = ".dedup.sqlite"  # ...index of them, kept in the output directory it describes
+    CATALOG_ENABLED: bool = False  # Register finalized Parquet files (and their hourly rollups) in CATALOG_PATH
 
     def __init__(self):
         self.BASE_DIR: Path = _BASE_DIR
@@ -26,6 +53,8 @@ class Settings:
         self.DEAD_LETTER_QUEUE_DIR: Path = _BASE_DIR / "data" / "dlq"
         self.OUTPUT_DIR: Path = _BASE_DIR / "data" / "output"
         self.MODEL_DIR: Path = _BASE_DIR / "data" / "models"
+        self.CATALOG_PATH: Path = _BASE_DIR / "data" / "catalog.duckdb"  # query --catalog
+        self.VULNINTEL_SCORE_TABLE: Optional[Path] = _BASE_DIR / "data" / "cve_scores.bin"  # build-score-table
 
         # Create directories
         for d in (self.DATA_DIR, self.DEAD_LETTER_QUEUE_DIR, self.OUTPUT_DIR, self.MODEL_DIR):
@@ -3,13 +3,21 @@ CanonicalEvent Schema - Single Source of Truth for PredictPath AI.
 Production-grade, fully serializable, no strict-mode conflicts.
 """
 from datetime import datetime, timezone
-from typing import Optional, List, Any
-from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Any, Dict
+from dataclasses import dataclass, field, fields
 import hashlib
 import json
 import uuid
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Event hash schemes (stored per event in the hash_scheme column)
+# ─────────────────────────────────────────────────────────────────────────────
+HASH_SCHEME_V1 = "v1"  # sha256 of sorted-key JSON of to_dict(), raw_source included (legacy)
+HASH_SCHEME_V2 = "v2"  # sha256 of the positional canonical encoding; raw_hash stands in for raw_source
+HASH_SCHEMES = (HASH_SCHEME_V1, HASH_SCHEME_V2)
+
+
 @dataclass
 class CanonicalEvent:
     """
@@ -64,6 +72,7 @@ class CanonicalEvent:
     raw_hash: str                       # SHA256 of raw_source
     previous_event_hash: Optional[str]
     event_hash: Optional[str]           # SHA256 of canonical structure
+    hash_scheme: str = HASH_SCHEME_V1   # How event_hash was computed (see HASH_SCHEMES)
 
     @classmethod
     def create(
@@ -94,7 +103,10 @@ class CanonicalEvent:
         severity: str = "info",
         model_version: str = "v1.0",
         previous_event_hash: Optional[str] = None,
+        hash_scheme: str = HASH_SCHEME_V2,
     ) -> "CanonicalEvent":
+        if hash_scheme not in HASH_SCHEMES:
+            raise ValueError(f"Unknown hash scheme: {hash_scheme!r} (expected one of {HASH_SCHEMES})")
         now = datetime.now(timezone.utc)
         raw_hash = hashlib.sha256(raw_source.encode("utf-8", errors="replace")).hexdigest()
 
@@ -129,23 +141,34 @@ class CanonicalEvent:
             raw_hash=raw_hash,
             previous_event_hash=previous_event_hash,
             event_hash=None,
+            hash_scheme=hash_scheme,
         )
 
     def compute_event_hash(self, previous_hash: Optional[str] = None) -> "CanonicalEvent":
-        """Compute the event chain hash and return a new instance."""
-        d = self.to_dict()
-        d.pop("event_hash", None)
-        if previous_hash:
-            d["previous_event_hash"] = previous_hash
-        canonical_str = json.dumps(d, sort_keys=True, default=str)
-        event_hash = hashlib.sha256(canonical_str.encode("utf-8")).hexdigest()
-        self.event_hash = event_hash
-        self.previous_event_hash = previous_hash
+        """Compute the event chain hash (per self.hash_scheme) and return self."""
+        if self.hash_scheme == HASH_SCHEME_V1:
+            d = self.to_dict()
+            d.pop("event_hash", None)
+            d.pop("hash_scheme", None)
+            if previous_hash:
+                d["previous_event_hash"] = previous_hash
+            canonical_str = json.dumps(d, sort_keys=True, default=str)
+            self.event_hash = hashlib.sha256(canonical_str.encode("utf-8")).hexdigest()
+            self.previous_event_hash = previous_hash
+        else:
+            self.previous_event_hash = previous_hash
+            self._row = None
+            self.event_hash = compute_row_hash(self.to_row())
+        if self._row is not None:
+            self._row["previous_event_hash"] = self.previous_event_hash
+            self._row["event_hash"] = self.event_hash
         return self
 
     def to_dict(self) -> dict:
         """Serialize to plain dict, safe for Parquet/JSON storage."""
-        d = asdict(self)
+        # Shallow copy: every field is a scalar or a flat list of strings, so the
+        # recursive deepcopy done by dataclasses.asdict is pure overhead here
+        d = {name: getattr(self, name) for name in _FIELD_NAMES}
         # Convert datetimes to ISO strings for Parquet compatibility
         for k in ("timestamp", "ingest_timestamp"):
             if isinstance(d[k], datetime):
@@ -154,3 +177,62 @@ class CanonicalEvent:
         d["observed_cve_ids"] = "|".join(d.get("observed_cve_ids") or [])
         d["observed_cwe_ids"] = "|".join(d.get("observed_cwe_ids") or [])
         return d
+
+    def to_row(self) -> Dict[str, Any]:
+        """
+        The Parquet row for this event: to_dict() with storage types enforced.
+        Built once and cached (the v2 hash and StorageWriter share it); the
+        event is treated as immutable from here on, apart from its hash fields.
+        """
+        if self._row is None:
+            d = self.to_dict()
+            # Lists are stored natively (List[Utf8]), not pipe-joined as in to_dict()
+            d["observed_cve_ids"] = list(self.observed_cve_ids or [])
+            d["observed_cwe_ids"] = list(self.observed_cwe_ids or [])
+            d["port"] = int(d["port"]) if d.get("port") is not None else None
+            d["confidence_score"] = float(d.get("confidence_score") or 0.0)
+            d["data_quality_score"] = float(d.get("data_quality_score") or 0.0)
+            d["risk_score"] = float(d.get("risk_score") or 0.0)
+            d["cve_max_cvss"] = float(d["cve_max_cvss"]) if d.get("cve_max_cvss") is not None else None
+            d["is_kev"] = bool(d.get("is_kev", False))
+            self._row = d
+        return self._row
+
+    _row = None  # to_row() cache; a class attribute, so not a dataclass field
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(CanonicalEvent))
+
+# Stable field order of the v2 encoding: declaration order, minus the raw text
+# (covered by raw_hash) and the hash bookkeeping fields themselves
+_V2_FIELDS = tuple(name for name in _FIELD_NAMES if name not in ("raw_source", "event_hash", "hash_scheme"))
+
+# Compact, key-less JSON array of scalars and string lists, so the C encoder's
+# output is canonical (shortest round-trip floats, true/1/1.0 distinct) and much
+# faster than packing the fields one by one in Python
+_encode_values = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False).encode
+
+
+def canonical_bytes(row: Dict[str, Any]) -> bytes:
+    """
+    Canonical v2 encoding of a storage row (see CanonicalEvent.to_row): the
+    scheme tag followed by the _V2_FIELDS values in their fixed order.
+    """
+    values = [HASH_SCHEME_V2]
+    values.extend(row.get(name) for name in _V2_FIELDS)
+    return _encode_values(values).encode("utf-8", errors="surrogatepass")
+
+
+def compute_row_hash(row: Dict[str, Any]) -> str:
+    """event_hash of a storage row (an event's to_row() or a row read back from Parquet)."""
+    scheme = row.get("hash_scheme") or HASH_SCHEME_V1
+    if scheme == HASH_SCHEME_V2:
+        return hashlib.sha256(canonical_bytes(row)).hexdigest()
+    if scheme == HASH_SCHEME_V1:
+        # v1 hashed to_dict(), where list columns are pipe-joined strings
+        d = {
+            k: "|".join(v) if isinstance(v, list) else v
+            for k, v in row.items() if k not in ("event_hash", "hash_scheme")
+        }
+        return hashlib.sha256(json.dumps(d, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    raise ValueError(f"Unknown hash scheme: {scheme!r}")
@@ -1,22 +1,72 @@
 """
 VulnIntel Bridge - Queries the VulnIntel SQLite database for CVE/CWE enrichment.
 Fully production-safe: handles missing DB, closed connection, and empty results gracefully.
+
+Lookups go through one persistent read-only connection per process, are
+batched (one IN (...) query per event batch) and land in a bounded LRU cache.
+Optionally, enrichment reads a memory-mapped score table built from the DB
+(`build_score_table`, CLI: build-score-table) and never touches SQLite at all.
 """
+import atexit
+import math
+import mmap
+import os
 import sqlite3
 import re
 import logging
+import struct
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import Iterable, List, Tuple, Optional, Dict, Any
+
+from .config import settings
 
 logger = logging.getLogger(__name__)
 
 # Path to VulnIntel DB (relative to this file: Tool1/src/core/ -> ../../.. -> project root -> VulnIntel/data/db)
 _VULN_DB_PATH = Path(__file__).resolve().parent.parent.parent.parent / "VulnIntel" / "data" / "db" / "vuln.db"
 
-# Simple in-process cache to avoid repeated DB hits for the same CVE
-_cve_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+_CVE_COLUMNS = "cve_id, description, cvss_v3_score, cvss_v3_severity, attack_vector, affected_cpes"
+_IN_CHUNK = 900  # Stay under SQLITE_MAX_VARIABLE_NUMBER on old SQLite builds
+
 _kev_cache: Optional[set] = None
 _db_available: Optional[bool] = None
+_conn: Optional[sqlite3.Connection] = None
+_conn_pid: Optional[int] = None
+_lock = threading.RLock()
+
+
+class _LRUCache:
+    """CVE records (None for unknown ids) with least-recently-used eviction."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        if key in self.data:
+            self.data.move_to_end(key)
+            self.hits += 1
+            return True, self.data[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: str, value: Optional[Dict[str, Any]]) -> None:
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.capacity:
+            self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.hits = self.misses = 0
+
+
+_cve_cache = _LRUCache(settings.CVE_CACHE_SIZE)
 
 
 def _check_db() -> bool:
@@ -32,60 +82,113 @@ def _check_db() -> bool:
 
 
 def _get_conn() -> Optional[sqlite3.Connection]:
+    """The process-wide read-only connection, opened on first use."""
+    global _conn, _conn_pid
     if not _check_db():
         return None
+    if _conn is not None and _conn_pid == os.getpid():
+        return _conn
     try:
-        conn = sqlite3.connect(f"file:{_VULN_DB_PATH}?mode=ro", uri=True)
+        # Shared across threads; every use holds _lock
+        conn = sqlite3.connect(f"file:{_VULN_DB_PATH}?mode=ro", uri=True, check_same_thread=False)
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA query_only=ON")
         conn.execute("PRAGMA cache_size=-32000")
+        _conn, _conn_pid = conn, os.getpid()
         return conn
     except Exception as e:
         logger.error(f"Failed to connect to VulnIntel DB: {e}")
         return None
 
 
+def reset() -> None:
+    """Close the connection and score table and forget every cached lookup."""
+    global _conn, _conn_pid, _kev_cache, _db_available, _score_table, _score_table_checked
+    with _lock:
+        if _conn is not None and _conn_pid == os.getpid():
+            _conn.close()
+        _conn = _conn_pid = None
+        if _score_table is not None:
+            _score_table.close()
+        _score_table, _score_table_checked = None, False
+        _kev_cache = _db_available = None
+        _cve_cache.capacity = settings.CVE_CACHE_SIZE
+        _cve_cache.clear()
+
+
+atexit.register(reset)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Counters of the CVE record cache (per process)."""
+    lookups = _cve_cache.hits + _cve_cache.misses
+    if _get_score_table() is not None:
+        mode = "score_table"
+    else:
+        mode = "sqlite" if _check_db() else "disabled"
+    return {
+        "mode": mode,
+        "size": len(_cve_cache.data),
+        "capacity": _cve_cache.capacity,
+        "hits": _cve_cache.hits,
+        "misses": _cve_cache.misses,
+        "hit_rate": round(_cve_cache.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
 def extract_cve_ids(text: str) -> List[str]:
     """Extract all CVE-YYYY-NNNNN patterns from arbitrary text."""
     if not text:
         return []
-    return list(set(re.findall(r"CVE-\d{4}-\d{1,7}", text, re.IGNORECASE)))
+    return sorted(set(re.findall(r"CVE-\d{4}-\d{1,7}", text, re.IGNORECASE)))
 
 
 def extract_cwe_ids(text: str) -> List[str]:
     """Extract all CWE-NNN patterns from arbitrary text."""
     if not text:
         return []
-    return list(set(re.findall(r"CWE-\d+", text, re.IGNORECASE)))
+    return sorted(set(re.findall(r"CWE-\d+", text, re.IGNORECASE)))
 
 
-def get_cve_data(cve_id: str) -> Optional[Dict[str, Any]]:
-    """Return CVE record from VulnIntel DB, or None if not found."""
-    cve_id = cve_id.upper()
-    if cve_id in _cve_cache:
-        return _cve_cache[cve_id]
+def lookup_cves(cve_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    CVE records for many ids at once (keys upper-cased, None when not in the DB).
+    Cache misses are fetched with one IN (...) query per 900 ids.
+    """
+    found: Dict[str, Optional[Dict[str, Any]]] = {}
+    missing: List[str] = []
+    with _lock:
+        for cve_id in dict.fromkeys(c.upper() for c in cve_ids):
+            hit, record = _cve_cache.get(cve_id)
+            if hit:
+                found[cve_id] = record
+            else:
+                missing.append(cve_id)
+        if not missing:
+            return found
 
-    conn = _get_conn()
-    if conn is None:
-        _cve_cache[cve_id] = None
-        return None
+        conn = _get_conn()
+        for start in range(0, len(missing), _IN_CHUNK):
+            chunk = missing[start:start + _IN_CHUNK]
+            rows: Dict[str, Dict[str, Any]] = {}
+            if conn is not None:
+                try:
+                    cur = conn.execute(
+                        f"SELECT {_CVE_COLUMNS} FROM cve WHERE cve_id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                    rows = {row["cve_id"].upper(): dict(row) for row in cur.fetchall()}
+                except Exception as e:
+                    logger.debug(f"CVE lookup failed for {len(chunk)} ids: {e}")
+            for cve_id in chunk:
+                found[cve_id] = rows.get(cve_id)
+                _cve_cache.put(cve_id, found[cve_id])
+    return found
 
-    try:
-        cur = conn.execute(
-            "SELECT cve_id, description, cvss_v3_score, cvss_v3_severity, attack_vector, affected_cpes "
-            "FROM cve WHERE cve_id = ? LIMIT 1",
-            (cve_id,)
-        )
-        row = cur.fetchone()
-        result = dict(row) if row else None
-        _cve_cache[cve_id] = result
-        return result
-    except Exception as e:
-        logger.debug(f"CVE lookup failed for {cve_id}: {e}")
-        _cve_cache[cve_id] = None
-        return None
-    finally:
-        conn.close()
+
+def get_cve_data(cve_id: str) -> Optional[Dict[str, Any]]:
+    """Return CVE record from VulnIntel DB, or None if not found."""
+    return lookup_cves([cve_id])[cve_id.upper()]
 
 
 def get_kev_ids() -> set:
@@ -94,22 +197,22 @@ def get_kev_ids() -> set:
     if _kev_cache is not None:
         return _kev_cache
 
-    conn = _get_conn()
-    if conn is None:
-        _kev_cache = set()
-        return _kev_cache
+    with _lock:
+        conn = _get_conn()
+        if conn is None:
+            table = _get_score_table()
+            _kev_cache = table.kev_ids() if table is not None else set()
+            return _kev_cache
 
-    try:
-        cur = conn.execute("SELECT cve_id FROM kev")
-        _kev_cache = {row[0].upper() for row in cur.fetchall()}
-        logger.info(f"Loaded {len(_kev_cache)} KEV entries from VulnIntel DB")
-        return _kev_cache
-    except Exception as e:
-        logger.debug(f"KEV lookup failed: {e}")
-        _kev_cache = set()
-        return _kev_cache
-    finally:
-        conn.close()
+        try:
+            cur = conn.execute("SELECT cve_id FROM kev")
+            _kev_cache = {row[0].upper() for row in cur.fetchall()}
+            logger.info(f"Loaded {len(_kev_cache)} KEV entries from VulnIntel DB")
+            return _kev_cache
+        except Exception as e:
+            logger.debug(f"KEV lookup failed: {e}")
+            _kev_cache = set()
+            return _kev_cache
 
 
 def enrich_with_vulnintel(
@@ -121,26 +224,54 @@ def enrich_with_vulnintel(
       - max_severity: severity label for that score (CRITICAL/HIGH/MEDIUM/LOW)
       - is_kev: True if any CVE is in CISA KEV catalog
     """
+    return enrich_many([cve_ids])[0]
+
+
+def enrich_many(
+    cve_lists: List[List[str]],
+) -> List[Tuple[Optional[float], Optional[str], bool]]:
+    """enrich_with_vulnintel for a whole batch, with one lookup for all its distinct CVEs."""
+    distinct = {c.upper() for ids in cve_lists if ids for c in ids}
+    if not distinct:
+        return [(None, None, False)] * len(cve_lists)
+
+    table = _get_score_table()
+    if table is not None:
+        scores = {cve_id: table.get(cve_id) for cve_id in distinct}
+    else:
+        kev_ids = get_kev_ids()
+        records = lookup_cves(distinct)
+        scores = {
+            cve_id: (
+                (record or {}).get("cvss_v3_score"),
+                (record or {}).get("cvss_v3_severity"),
+                cve_id in kev_ids,
+            )
+            for cve_id, record in records.items()
+        }
+    return [_combine(ids, scores) for ids in cve_lists]
+
+
+def _combine(
+    cve_ids: List[str],
+    scores: Dict[str, Tuple[Optional[float], Optional[str], bool]],
+) -> Tuple[Optional[float], Optional[str], bool]:
     if not cve_ids:
         return None, None, False
 
-    kev_ids = get_kev_ids()
-    is_kev = any(c.upper() in kev_ids for c in cve_ids)
-
     max_cvss: Optional[float] = None
     max_severity: Optional[str] = None
+    is_kev = False
 
     for cve_id in cve_ids:
-        data = get_cve_data(cve_id)
-        if not data:
-            continue
-        score = data.get("cvss_v3_score")
+        score, severity, kev = scores.get(cve_id.upper(), (None, None, False))
+        is_kev = is_kev or kev
         if score is not None:
             try:
                 score = float(score)
                 if max_cvss is None or score > max_cvss:
                     max_cvss = score
-                    max_severity = data.get("cvss_v3_severity") or _score_to_severity(score)
+                    max_severity = severity or _score_to_severity(score)
             except (TypeError, ValueError):
                 pass
 
@@ -156,3 +287,111 @@ def _score_to_severity(score: float) -> str:
         return "MEDIUM"
     else:
         return "LOW"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Score table: sorted fixed-width records, binary-searched over an mmap
+#   header: magic (8s) + record count (uint32)
+#   record: cve_id (20s, NUL-padded) + cvss (float64, NaN = none) + flags (uint8)
+#   flags:  low 7 bits = index into _SEVERITIES, 0x80 = in KEV
+# ─────────────────────────────────────────────────────────────────────────────
+_TABLE_MAGIC = b"PPCVSS01"
+_TABLE_HEADER = struct.Struct("<8sI")
+_TABLE_RECORD = struct.Struct("<20sdB")
+_SEVERITIES = (None, "NONE", "LOW", "MEDIUM", "HIGH", "CRITICAL")
+_KEV_FLAG = 0x80
+
+_score_table: Optional["ScoreTable"] = None
+_score_table_checked = False
+
+
+class ScoreTable:
+    """Read-only view of a score table file; pages are shared by every process mapping it."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _TABLE_HEADER.unpack_from(self._map, 0)
+        if magic != _TABLE_MAGIC or len(self._map) != _TABLE_HEADER.size + self.count * _TABLE_RECORD.size:
+            self._map.close()
+            raise ValueError(f"Not a CVE score table: {self.path}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        # Key of record i, so bisect can search the map directly
+        offset = _TABLE_HEADER.size + i * _TABLE_RECORD.size
+        return self._map[offset:offset + 20]
+
+    def get(self, cve_id: str) -> Tuple[Optional[float], Optional[str], bool]:
+        """(cvss, severity, is_kev) for an upper-case CVE id."""
+        key = cve_id.encode("ascii", "replace")[:20].ljust(20, b"\0")
+        i = bisect_left(self, key)
+        if i == self.count or self[i] != key:
+            return None, None, False
+        _, score, flags = _TABLE_RECORD.unpack_from(self._map, _TABLE_HEADER.size + i * _TABLE_RECORD.size)
+        severity = _SEVERITIES[flags & ~_KEV_FLAG] if flags & ~_KEV_FLAG < len(_SEVERITIES) else None
+        return (None if math.isnan(score) else score), severity, bool(flags & _KEV_FLAG)
+
+    def kev_ids(self) -> set:
+        return {
+            cve_id.rstrip(b"\0").decode("ascii")
+            for cve_id, _, flags in _TABLE_RECORD.iter_unpack(self._map[_TABLE_HEADER.size:])
+            if flags & _KEV_FLAG
+        }
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def _get_score_table() -> Optional[ScoreTable]:
+    """The configured score table, unless disabled, missing or older than the DB."""
+    global _score_table, _score_table_checked
+    if _score_table_checked:
+        return _score_table
+    with _lock:
+        if _score_table_checked:
+            return _score_table
+        _score_table_checked = True
+        path = settings.VULNINTEL_SCORE_TABLE
+        if not settings.VULNINTEL_USE_SCORE_TABLE or path is None or not Path(path).exists():
+            return None
+        if _VULN_DB_PATH.exists() and _VULN_DB_PATH.stat().st_mtime > Path(path).stat().st_mtime:
+            logger.warning(f"CVE score table {path} is older than the VulnIntel DB; using SQLite lookups")
+            return None
+        try:
+            _score_table = ScoreTable(path)
+            logger.info(f"CVE score table mapped: {path} ({len(_score_table)} entries)")
+        except Exception as e:
+            logger.error(f"Failed to map CVE score table {path}: {e}")
+        return _score_table
+
+
+def build_score_table(path: Optional[Path] = None, db_path: Optional[Path] = None) -> int:
+    """Precompute cve_id -> (cvss, severity, is_kev) from the DB into a score table; returns its size."""
+    path = Path(path or settings.VULNINTEL_SCORE_TABLE)
+    db_path = Path(db_path or _VULN_DB_PATH)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        entries: Dict[bytes, List[Any]] = {}
+        for cve_id, score, severity in conn.execute("SELECT cve_id, cvss_v3_score, cvss_v3_severity FROM cve"):
+            code = _SEVERITIES.index(severity.upper()) if severity and severity.upper() in _SEVERITIES else 0
+            entries[cve_id.upper().encode("ascii")] = [float("nan") if score is None else float(score), code]
+        for (cve_id,) in conn.execute("SELECT cve_id FROM kev"):
+            entries.setdefault(cve_id.upper().encode("ascii"), [float("nan"), 0])[1] |= _KEV_FLAG
+    finally:
+        conn.close()
+
+    keys = sorted(k for k in entries if len(k) <= 20)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_TABLE_HEADER.pack(_TABLE_MAGIC, len(keys)))
+        for key in keys:
+            score, flags = entries[key]
+            f.write(_TABLE_RECORD.pack(key, score, flags))
+    tmp_path.replace(path)
+    logger.info(f"CVE score table written: {path} ({len(keys)} entries)")
+    return len(keys)
@@ -8,6 +8,24 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+class RawEvent(dict):
+    """
+    A raw record decoded from one line of JSON text (NDJSON, JSON logs, archives).
+    Behaves as the decoded dict and keeps the line itself as source_text, so the
+    pipeline can store it as raw_source instead of re-serializing the dict.
+    """
+
+    __slots__ = ("source_text",)
+
+    def __init__(self, fields: Dict[str, Any], source_text: str):
+        super().__init__(fields)
+        self.source_text = source_text
+
+    def __reduce__(self):
+        return RawEvent, (dict(self), self.source_text)
+
+
 class BaseIngestor(ABC):
     """
     Abstract Base Class for all Ingestors.
@@ -28,6 +46,17 @@ class BaseIngestor(ABC):
         """
         pass
 
+    # Columnar ingestors set this and implement iter_batches()
+    supports_batches = False
+
+    def iter_batches(self) -> Iterator[pl.DataFrame]:
+        """
+        Optional: yields the source as record batches (Polars DataFrames), one
+        row per record with the same fields ingest() would yield. Lets batch mode
+        run without building a dict per row.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not provide record batches")
+
     def estimate_count(self) -> int:
         """Optional: Estimate number of records for progress bars."""
         return 0
@@ -0,0 +1,108 @@
+"""
+Batched CSV reading for the columnar ingestors (LANL auth, CIC-IDS).
+pyarrow's streaming CSV reader decodes one block at a time and each block is
+handed out as a Polars DataFrame, so memory is bounded by the block size no
+matter how many rows the file holds.
+"""
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 1 << 20  # bytes of CSV text per record batch
+
+
+def dedupe_column_names(names: Sequence[str]) -> List[str]:
+    """Rename repeated header names the way pl.scan_csv does (name_duplicated_0, ...)."""
+    seen: Dict[str, int] = {}
+    out = []
+    for name in names:
+        if name in seen:
+            out.append(f"{name}_duplicated_{seen[name]}")
+            seen[name] += 1
+        else:
+            out.append(name)
+            seen[name] = 0
+    return out
+
+
+def infer_dtypes(frame: pl.DataFrame) -> Dict[str, pl.DataType]:
+    """Int64 / Float64 / Boolean / Utf8 per column, from a batch read as strings."""
+    dtypes: Dict[str, pl.DataType] = {}
+    for name in frame.columns:
+        values = frame[name].drop_nulls()
+        dtypes[name] = pl.Utf8
+        if values.is_empty():
+            continue
+        for candidate in (pl.Int64, pl.Float64):
+            try:
+                values.cast(candidate, strict=True)
+            except pl.exceptions.InvalidOperationError:
+                continue
+            dtypes[name] = candidate
+            break
+        else:
+            if values.str.to_lowercase().is_in(["true", "false"]).all():
+                dtypes[name] = pl.Boolean
+    return dtypes
+
+
+def iter_csv_frames(
+    path: Path,
+    column_names: Optional[Sequence[str]] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    row_filter: Optional[pl.Expr] = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Yield a CSV file as DataFrames, one per reader block.
+    column_names=None reads them from the header row. Every column is decoded as
+    text, row_filter (e.g. dropping repeated header rows) is applied, and column
+    types are inferred once from the first non-empty batch; values that do not
+    fit the inferred type become null, like scan_csv(ignore_errors=True).
+    """
+    if column_names is None:
+        probe = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=block_size))
+        column_names = probe.schema.names
+        probe.close()
+        skip_rows = 1
+    else:
+        skip_rows = 0
+    column_names = dedupe_column_names(column_names)
+
+    skipped = 0
+
+    def skip_invalid(row) -> str:
+        nonlocal skipped
+        skipped += 1
+        return "skip"
+
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(column_names=column_names, skip_rows=skip_rows, block_size=block_size),
+        parse_options=pacsv.ParseOptions(invalid_row_handler=skip_invalid),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in column_names},
+            null_values=[""],
+            strings_can_be_null=True,
+        ),
+    )
+    dtypes = None
+    try:
+        for batch in reader:
+            frame = pl.from_arrow(batch)
+            if row_filter is not None:
+                frame = frame.filter(row_filter)
+            if frame.is_empty():
+                continue
+            if dtypes is None:
+                dtypes = infer_dtypes(frame)
+            yield frame.cast(dtypes, strict=False)
+    finally:
+        reader.close()
+        if skipped:
+            logger.warning(f"Skipped {skipped} malformed rows in {path}")
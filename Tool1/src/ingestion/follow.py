@@ -0,0 +1,274 @@
+"""
+FollowIngestor - Tails a growing line-oriented log (Wazuh alerts.json, NDJSON,
+syslog) with a checkpointed byte offset.
+Lines are yielded as they complete: JSON objects as RawEvent, anything else as
+a raw_log record, exactly as NDJSON ingestion does. The checkpoint records the
+file identity (device, inode, a fingerprint of its first bytes and how often it
+was truncated in place), the byte offset just past the last line whose events
+are durably stored, and the previous_event_hash at that point, so a restart
+resumes the stream and the hash chain where it stopped. Rotation by rename (a new file appears at the
+path) and by copytruncate (the file shrinks) are both followed; a rotation
+that happened while nothing was running is picked up from a sibling file
+(alerts.json.1, ...) that still has the checkpointed inode.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Generator, Iterator, Optional
+
+from .base import BaseIngestor, RawEvent
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BYTES = 1024  # Leading bytes hashed to tell a reused inode from the same file
+READ_CHUNK = 1 << 20
+
+
+@dataclass
+class Checkpoint:
+    """Resume point of a followed file."""
+    source: str
+    device: int = 0
+    inode: int = 0
+    fingerprint: str = ""
+    offset: int = 0
+    generation: int = 0  # Times the file was truncated in place (its offsets restarted)
+    previous_event_hash: Optional[str] = None
+    updated_at: str = ""
+
+    @classmethod
+    def load(cls, path: Path, source: Path) -> "Checkpoint":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        except FileNotFoundError:
+            return cls(source=str(source))
+        except Exception as e:
+            logger.warning(f"[Tool1] Unreadable checkpoint {path} ({e}); starting from the beginning")
+            return cls(source=str(source))
+
+    def save(self, path: Path) -> None:
+        """Atomic replace, so a crash leaves either the old or the new checkpoint."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+def default_checkpoint_path(source: Path) -> Path:
+    """One checkpoint per followed path, under DATA_DIR/checkpoints."""
+    digest = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:12]
+    return settings.DATA_DIR / "checkpoints" / f"{source.name}.{digest}.json"
+
+
+def _fingerprint(f, length: int) -> str:
+    """sha256 of the first min(length, FINGERPRINT_BYTES) bytes, restoring the file position."""
+    position = f.tell()
+    f.seek(0)
+    head = f.read(min(length, FINGERPRINT_BYTES))
+    f.seek(position)
+    return hashlib.sha256(head).hexdigest()
+
+
+def _parse_line(line: bytes) -> Dict[str, Any]:
+    text = line.decode("utf-8", errors="replace").strip()
+    try:
+        obj = json.loads(text)
+    except json.JSONDecodeError:
+        return {"raw_text": text, "_parsing_type": "raw_log"}
+    if isinstance(obj, dict):
+        return RawEvent(obj, text)
+    return {"raw_text": str(obj), "_parsing_type": "ndjson_scalar"}
+
+
+class FollowIngestor(BaseIngestor):
+    """
+    Tails file_path from checkpoint.offset. follow() yields events, and None
+    whenever a poll finds nothing new (so callers can run time-based flushes);
+    after each event, `position` is the offset just past its line and `read_at`
+    the monotonic time its bytes were read.
+    """
+
+    def __init__(self, file_path: Path, checkpoint: Optional[Checkpoint] = None,
+                 poll_seconds: Optional[float] = None, idle_timeout: float = 0.0):
+        super().__init__(file_path)
+        self.checkpoint = checkpoint or Checkpoint(source=str(file_path))
+        self.poll_seconds = settings.FOLLOW_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.idle_timeout = idle_timeout  # Stop after this long without new data (0 = never)
+        self.position = 0
+        self.read_at = 0.0
+        self.rotations = 0
+        self.generation = self.checkpoint.generation
+        self._file = None
+        self._stat: Optional[os.stat_result] = None
+        self._pending_path_switch = False  # Resumed on a rotated-away file: switch to the path at its EOF
+        self._stop = False
+
+    def stop(self) -> None:
+        """Ask follow() to return at its next poll."""
+        self._stop = True
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def ingest(self) -> Generator[Dict[str, Any], None, None]:
+        for event in self.follow():
+            if event is not None:
+                yield event
+
+    def follow(self) -> Iterator[Optional[Dict[str, Any]]]:
+        """Events as lines complete; None after each poll that found nothing. The file stays open for mark()."""
+        if self._file is None:
+            self._open_resumed()
+        buffer = b""
+        idle_since = time.monotonic()
+        while not self._stop:
+            chunk = self._file.read(READ_CHUNK)
+            if chunk:
+                idle_since = self.read_at = time.monotonic()
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    self.position += len(line) + 1
+                    if line.strip():
+                        yield _parse_line(line)
+                continue
+
+            change = self._check_rotation()
+            if change == "truncated":
+                buffer = b""
+                continue
+            if change == "rotated":
+                # The old file is complete: its unterminated last line is an event too
+                if buffer.strip():
+                    self.position += len(buffer)
+                    yield _parse_line(buffer)
+                buffer = b""
+                self._reopen()
+                continue
+
+            if self.idle_timeout and time.monotonic() - idle_since >= self.idle_timeout:
+                return
+            yield None
+            time.sleep(self.poll_seconds)
+
+    @property
+    def identity(self) -> str:
+        """The file being read, as a dedup source: offsets are unique within one identity."""
+        return f"{self.file_path.resolve()}@{self._stat.st_dev}:{self._stat.st_ino}.{self.generation}"
+
+    def mark(self, previous_event_hash: Optional[str]) -> Checkpoint:
+        """Checkpoint at the current position (call once the events before it are stored)."""
+        cp = self.checkpoint
+        cp.device, cp.inode = self._stat.st_dev, self._stat.st_ino
+        cp.fingerprint = _fingerprint(self._file, self.position)
+        cp.offset = self.position
+        cp.generation = self.generation
+        cp.previous_event_hash = previous_event_hash
+        cp.updated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return cp
+
+    # ─────────────────────────────────────────────────────────────────────────
+    def _open_resumed(self) -> None:
+        cp = self.checkpoint
+        f = open(self.file_path, "rb")
+        st = os.fstat(f.fileno())
+        if cp.offset and (st.st_dev, st.st_ino) == (cp.device, cp.inode):
+            if st.st_size >= cp.offset and _fingerprint(f, cp.offset) == cp.fingerprint:
+                self._attach(f, st, cp.offset)
+                return
+            logger.warning(f"[Tool1] {self.file_path} was truncated or replaced since the checkpoint; "
+                           f"reading it from the start")
+            self.generation += 1
+        elif cp.offset:
+            rotated = self._find_rotated(cp)
+            if rotated is not None:
+                # Finish the file we were reading, then continue with the new one
+                logger.info(f"[Tool1] Resuming rotated file {rotated} at offset {cp.offset}")
+                f.close()
+                f = open(rotated, "rb")
+                self._attach(f, os.fstat(f.fileno()), cp.offset)
+                self._pending_path_switch = True
+                return
+            logger.warning(f"[Tool1] {self.file_path} was rotated and the old file is gone; "
+                           f"events after offset {cp.offset} of it may be missing")
+        self._attach(f, st, 0)
+
+    def _attach(self, f, st: os.stat_result, offset: int) -> None:
+        f.seek(offset)
+        self._file, self._stat, self.position = f, st, offset
+
+    def _find_rotated(self, cp: Checkpoint) -> Optional[Path]:
+        for candidate in sorted(self.file_path.parent.glob(self.file_path.name + ".*")):
+            try:
+                st = candidate.stat()
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) == (cp.device, cp.inode) and st.st_size >= cp.offset:
+                with open(candidate, "rb") as f:
+                    if _fingerprint(f, cp.offset) == cp.fingerprint:
+                        return candidate
+        return None
+
+    def _check_rotation(self) -> Optional[str]:
+        """At EOF: "rotated" (a new file is at the path), "truncated" (rewound to 0), or None."""
+        if self._pending_path_switch:
+            return "rotated"
+        try:
+            st = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None  # Renamed, new file not created yet: keep waiting on the old one
+        if (st.st_dev, st.st_ino) != (self._stat.st_dev, self._stat.st_ino):
+            return "rotated"
+        if st.st_size < self.position:
+            logger.info(f"[Tool1] {self.file_path} was truncated; reading it from the start")
+            self._file.seek(0)
+            self.position = 0
+            self.rotations += 1
+            self.generation += 1
+            return "truncated"
+        return None
+
+    def _reopen(self) -> None:
+        self._file.close()
+        self._pending_path_switch = False
+        f = open(self.file_path, "rb")
+        self._attach(f, os.fstat(f.fileno()), 0)
+        self.rotations += 1
+        logger.info(f"[Tool1] {self.file_path} rotated; following the new file")
+
+
+class LatencyTracker:
+    """Read-to-visible latencies (seconds) of followed events: exact count/max, percentiles over the latest `window`."""
+
+    def __init__(self, window: int = 10_000):
+        self.count = 0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+        if not recent:
+            return {"events": 0}
+
+        def pct(q: float) -> float:
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))] * 1000, 1)
+
+        return {"events": self.count, "p50_ms": pct(0.50), "p95_ms": pct(0.95), "max_ms": round(self.max * 1000, 1)}
@@ -0,0 +1,157 @@
+"""
+JsonStreamReader - Incremental JSON walker over a text stream.
+Lets ingestors descend into a large document (top-level object keys, arrays)
+and decode one element at a time, so peak memory is bounded by the largest
+single element rather than by the file.
+"""
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+_WS = re.compile(r"[ \t\n\r]*")
+
+# A decode error this close to the end of the buffer may just be a value cut
+# in half by the chunk boundary (number, literal, \\uXXXX escape).
+_TRUNCATION_WINDOW = 16
+
+
+class JsonStreamReader:
+    """
+    Pull-style JSON reader.
+    iter_object()/iter_array() step through containers without decoding them;
+    read_value()/skip_value() decode (or discard) the value at the cursor.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = 1 << 20):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Buffer management
+    # ─────────────────────────────────────────────────────────────────────────
+    def _fill(self, min_chars: int = 0) -> bool:
+        """Read another chunk (at least min_chars). Returns False at EOF."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(max(self._chunk_size, min_chars))
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > len(self._buf) // 2:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch: str) -> None:
+        found = self.peek()
+        if found != ch:
+            raise json.JSONDecodeError(f"Expecting '{ch}'", self._buf, self._pos)
+        self._pos += 1
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Values
+    # ─────────────────────────────────────────────────────────────────────────
+    def read_value(self) -> Any:
+        """Decode the complete JSON value at the cursor."""
+        if not self.peek():
+            raise json.JSONDecodeError("Expecting value", self._buf, self._pos)
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                truncated = (
+                    e.msg.startswith("Unterminated string")
+                    or len(self._buf) - e.pos <= _TRUNCATION_WINDOW
+                )
+                # Grow geometrically so a large element is re-scanned O(log n) times
+                if truncated and self._fill(len(self._buf) - self._pos):
+                    continue
+                raise
+            # Numbers have no terminator: "12", "-0." or "1e" may continue in the next chunk
+            if (
+                isinstance(value, (int, float))
+                and len(self._buf) - end <= _TRUNCATION_WINDOW
+                and self._fill()
+            ):
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """
+        Discard the value at the cursor. Containers are skipped one child at a
+        time, so only the largest child is ever held in memory.
+        """
+        c = self.peek()
+        if c == "[":
+            for _ in self.iter_array():
+                self.read_value()
+        elif c == "{":
+            for _ in self.iter_object():
+                self.read_value()
+        else:
+            self.read_value()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Containers
+    # ─────────────────────────────────────────────────────────────────────────
+    def iter_array(self) -> Iterator[int]:
+        """
+        Step through an array. Yields each element index with the cursor on the
+        element; the caller must consume it (read_value, skip_value or descend).
+        """
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            c = self.peek()
+            self._pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", self._buf, self._pos - 1)
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Step through an object. Yields each key with the cursor on its value;
+        the caller must consume the value.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise json.JSONDecodeError("Expecting property name", self._buf, self._pos)
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            c = self.peek()
+            self._pos += 1
+            if c == "}":
+                return
+            if c != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", self._buf, self._pos - 1)
+
+    def expect_end(self) -> None:
+        """Raise if anything but whitespace follows the document (json.load's 'Extra data')."""
+        if self.peek():
+            raise json.JSONDecodeError("Extra data", self._buf, self._pos)
@@ -0,0 +1,146 @@
+"""
+Multi-file ingestion - Expands a glob or directory into source files and reads
+them concurrently.
+Each file's ingestor runs on a reader thread (file IO, decompression and
+parsing) that fills a bounded queue of record chunks; the pipeline consumes
+the files strictly in path order, so output order and the hash chain do not
+depend on which reader finishes first. While one file is being processed the
+next INGEST_READER_THREADS - 1 are already being read.
+"""
+import glob
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Generator, Iterator, List, Optional
+
+import polars as pl
+
+from .base import BaseIngestor
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_RECORDS = 256  # Records per queued chunk in record mode (frames are queued whole)
+QUEUE_CHUNKS = 8     # Chunks buffered per file ahead of the pipeline
+_DONE = object()
+
+
+def expand_sources(source: str) -> List[Path]:
+    """
+    Files named by source: a directory (every non-hidden file below it), a glob
+    pattern (** recurses), or a single path. Sorted, so runs are reproducible.
+    """
+    path = Path(source)
+    if path.is_dir():
+        files = [p for p in path.rglob("*")
+                 if p.is_file() and not any(part.startswith(".") for part in p.relative_to(path).parts)]
+    elif glob.has_magic(source):
+        files = [Path(p) for p in glob.glob(source, recursive=True) if Path(p).is_file()]
+    else:
+        files = [path] if path.exists() else []
+    return sorted(files)
+
+
+class PrefetchIngestor(BaseIngestor):
+    """
+    Wraps a file's ingestor; a reader thread runs its ingest() (or
+    iter_batches() when `batched` and supported) into a bounded queue that
+    ingest()/iter_batches() drain.
+    """
+
+    def __init__(self, inner: BaseIngestor, batched: bool = False):
+        super().__init__(inner.file_path)
+        self.inner = inner
+        self.parser_version = inner.parser_version
+        self.supports_batches = batched and inner.supports_batches
+        self.read_seconds = 0.0  # Wall time of the reader thread
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._closed = threading.Event()
+
+    def read(self) -> None:
+        """Reader thread body: produce chunks until the source is exhausted or close() is called."""
+        started = time.perf_counter()
+        try:
+            if self.supports_batches:
+                for frame in self.inner.iter_batches():
+                    if not self._put(frame):
+                        return
+                return
+            chunk: List[Dict[str, Any]] = []
+            try:
+                for record in self.inner.ingest():
+                    chunk.append(record)
+                    if len(chunk) >= CHUNK_RECORDS:
+                        if not self._put(chunk):
+                            return
+                        chunk = []
+            finally:
+                if chunk:  # records read before an error still reach the pipeline
+                    self._put(chunk)
+        except Exception as e:
+            self._put(e)
+        finally:
+            self.read_seconds = time.perf_counter() - started
+            self._put(_DONE)
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _chunks(self) -> Iterator[Any]:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the reader (e.g. the pipeline hit its limit); queued chunks are dropped."""
+        self._closed.set()
+
+    def ingest(self) -> Generator[Dict[str, Any], None, None]:
+        for chunk in self._chunks():
+            yield from chunk
+
+    def iter_batches(self) -> Iterator[pl.DataFrame]:
+        if not self.supports_batches:
+            return super().iter_batches()
+        return self._chunks()
+
+    def estimate_count(self) -> int:
+        return self.inner.estimate_count()
+
+
+def prefetch(ingestors: List[BaseIngestor], batched: bool = False,
+             readers: Optional[int] = None) -> Generator[PrefetchIngestor, None, None]:
+    """
+    Yield a PrefetchIngestor per ingestor, in order, each already being read
+    on one of `readers` threads. Readers that are still running when the
+    generator is closed are stopped.
+    """
+    readers = max(1, readers or settings.INGEST_READER_THREADS)
+    wrapped = [PrefetchIngestor(ingestor, batched) for ingestor in ingestors]
+    # Files are submitted in order and each reader only ever blocks on its own
+    # queue, so the file being consumed always has a running reader
+    with ThreadPoolExecutor(max_workers=readers, thread_name_prefix="tool1-reader") as pool:
+        try:
+            for ingestor in wrapped:
+                pool.submit(ingestor.read)
+            yield from wrapped
+        finally:
+            for ingestor in wrapped:
+                ingestor.close()
+
@@ -1,5 +1,6 @@
-from typing import Generator, Dict, Any
+from typing import Generator, Dict, Any, Iterator
 from .base import BaseIngestor
+from .csv_batches import DEFAULT_BLOCK_SIZE, iter_csv_frames
 import polars as pl
 import logging
 
@@ -10,20 +11,21 @@ class CicIdsIngestor(BaseIngestor):
     Ingestor for CIC-IDS Network Flow Logs (CSV).
     """
 
+    supports_batches = True
+
     def __init__(self, file_path):
         super().__init__(file_path)
         self.parser_version = "cic_ids_v1.0"
 
-    def ingest(self) -> Generator[Dict[str, Any], None, None]:
+    def iter_batches(self, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[pl.DataFrame]:
+        # CIC-IDS usually has headers. Columns keep their original names;
+        # the fields we care about are picked out downstream.
         try:
-             # CIC-IDS usually has headers.
-            q = pl.scan_csv(self.file_path, ignore_errors=True)
-            
-            # Normalize column names to lowercase to avoid issues
-            # We will grab specific columns we care about in the normalizer
-            for batch in q.collect(streaming=True).iter_rows(named=True):
-                yield batch
-
+            yield from iter_csv_frames(self.file_path, block_size=block_size)
         except Exception as e:
             logger.error(f"Error reading CIC-IDS file {self.file_path}: {e}")
             raise e
+
+    def ingest(self) -> Generator[Dict[str, Any], None, None]:
+        for frame in self.iter_batches():
+            yield from frame.iter_rows(named=True)
@@ -1,9 +1,12 @@
 import json
 import csv
+import io
 import struct
 from pathlib import Path
-from typing import Generator, Dict, Any, Optional
-from .base import BaseIngestor
+from typing import Generator, Dict, Any, Optional, Tuple
+from .base import BaseIngestor, RawEvent
+from .json_stream import JsonStreamReader
+from .pcap import capture_format, iter_flows
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,10 +23,30 @@ WAZUH_CATEGORY_KEYS = [
     "hits",
 ]
 
+# Longest first line considered when sniffing a .json file for NDJSON content
+NDJSON_SNIFF_LIMIT = 1 << 20
+
+# Compressed archives: extension → codec, magic bytes → codec, codec → label
+COMPRESSED_SUFFIXES = {
+    ".gz": "gz",
+    ".gzip": "gz",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zst",
+}
+COMPRESSION_MAGIC = [
+    (b"\x1f\x8b", "gz"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zst"),
+]
+COMPRESSION_LABELS = {"gz": "Gzip", "bz2": "Bzip2", "xz": "XZ", "zst": "Zstandard"}
+
 class UniversalIngestor(BaseIngestor):
     """
     Streaming ingestor for JSON, NDJSON, CSV, Parquet, XML (Nmap/generic),
-    PCAP/PCAPNG (binary packet captures), and raw text/log files.
+    PCAP/PCAPNG (binary packet captures), raw text/log files, and
+    gzip/bzip2/xz/zstd archives of any of the text formats.
     Implements runtime schema inference hints.
     Supports ALL log file extensions without crashing.
     """
@@ -45,8 +68,8 @@ class UniversalIngestor(BaseIngestor):
                 yield from self._ingest_xml()
             elif suffix in ['.pcap', '.pcapng', '.cap']:
                 yield from self._ingest_pcap()
-            elif suffix in ['.gz', '.gzip']:
-                yield from self._ingest_gzip()
+            elif suffix in COMPRESSED_SUFFIXES:
+                yield from self._ingest_compressed()
             else:
                 # Attempt smart detection: try JSON first, then NDJSON, then raw
                 yield from self._ingest_smart_detect()
@@ -60,96 +83,195 @@ class UniversalIngestor(BaseIngestor):
             }
 
     def _ingest_json(self):
+        """
+        Stream a JSON document without loading it whole.
+        Event arrays (ZAP site[].alerts[], WAZUH_CATEGORY_KEYS, top-level lists)
+        are decoded one element at a time while the file is read, so peak memory
+        is bounded by the largest single event rather than by the report.
+
+        Detection cases match the old json.load() implementation, except that
+        Wazuh category arrays are emitted in file order rather than in
+        WAZUH_CATEGORY_KEYS order, and a ZAP "site" only suppresses the
+        category arrays that follow it in the file. A document that turns out
+        to be malformed after events were yielded ends with an ingestion_error
+        record instead of being re-read as NDJSON.
+        """
+        if self._sniff_ndjson():
+            yield from self._ingest_ndjson()
+            return
+
         with open(self.file_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            second_pass: Dict[str, Any] = {}
+            yielded_count = 0
             try:
-                data = json.load(f)
-                yielded_count = 0
-
-                # ── CASE 1: ZAP Report ──────────────────────────────────────
-                # ZAP: { "site": [ { "alerts": [...] } ] }
-                if isinstance(data, dict) and "site" in data and isinstance(data["site"], list):
-                    for site in data["site"]:
-                        if isinstance(site, dict) and "alerts" in site and isinstance(site["alerts"], list):
-                            logger.info(f"Detected ZAP report for {site.get('@name', 'site')}")
-                            for alert_type in site["alerts"]:
-                                instances = alert_type.get("instances", [])
-                                if not instances:
-                                    yield alert_type
-                                    yielded_count += 1
-                                    continue
-                                for inst in instances:
-                                    event = alert_type.copy()
-                                    event.pop("instances", None)
-                                    event.update(inst)
-                                    yield event
-                                    yielded_count += 1
-                    if yielded_count > 0:
-                        return
-
-                # ── CASE 2: Wazuh / Generic Multi-Category Report ─────────
-                # Structure: { "category_name": [ {...}, {...} ], ... }
-                # We iterate ALL top-level keys that contain lists of dicts
-                if isinstance(data, dict):
-                    for key in WAZUH_CATEGORY_KEYS:
-                        target_data = data.get(key)
-                        if not target_data:
-                            continue
-
-                        # Handle Elasticsearch hits.hits
-                        if key == "hits" and isinstance(target_data, dict) and "hits" in target_data:
-                            target_data = target_data["hits"]
-
-                        if isinstance(target_data, list) and len(target_data) > 0:
-                            logger.info(f"Auto-flattening report array: '{key}' ({len(target_data)} events)")
-                            for item in target_data:
-                                if isinstance(item, dict):
-                                    # Tag each item with its category for downstream use
-                                    tagged = dict(item)
-                                    tagged.setdefault("_wazuh_category", key)
-                                    if isinstance(item, dict) and "_source" in item:
-                                        yield item["_source"]
-                                    else:
-                                        yield tagged
-                                    yielded_count += 1
-                                else:
-                                    # Scalar item in list → wrap
-                                    yield {"raw_text": str(item), "_wazuh_category": key}
-                                    yielded_count += 1
-
-                    if yielded_count > 0:
-                        return
-
-                    # ── CASE 3: Plain dict with no known top-level list keys ──
-                    # Scan ALL top-level keys for list-of-dicts
-                    for key, val in data.items():
-                        if isinstance(val, list) and len(val) > 0 and isinstance(val[0], dict):
-                            logger.info(f"Auto-discovered event array under key '{key}' ({len(val)} items)")
-                            for item in val:
-                                yield item
-                                yielded_count += 1
-                    if yielded_count > 0:
-                        return
-
-                    # ── CASE 4: Single dict record ────────────────────────────
-                    yield data
-                    return
-
-                # ── CASE 5: Top-level list ────────────────────────────────────
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict):
-                            yield item
-                        else:
-                            yield {"raw_text": str(item), "_parsing_type": "list_scalar"}
-                    return
-
-                # Fallback: yield raw
-                yield {"raw_text": str(data), "_parsing_type": "json_scalar"}
-
+                for event in self._stream_json_document(JsonStreamReader(f), second_pass):
+                    yield event
+                    yielded_count += 1
             except json.JSONDecodeError:
+                if yielded_count:
+                    raise
                 # Fallback to NDJSON if single object parse fails
                 f.seek(0)
                 yield from self._ingest_ndjson_from_file(f)
+                return
+
+            if yielded_count or "candidates" not in second_pass:
+                return
+
+            f.seek(0)
+            candidates = second_pass["candidates"]
+            if not candidates:
+                # ── CASE 4: Single dict record ────────────────────────────
+                yield json.load(f)
+                return
+
+            # ── CASE 3: Plain dict with no known top-level list keys ──────
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key not in candidates:
+                    reader.skip_value()
+                    continue
+                logger.info(f"Auto-discovered event array under key '{key}'")
+                for _ in reader.iter_array():
+                    yield reader.read_value()
+
+    def _sniff_ndjson(self) -> bool:
+        """True if the first line is a complete JSON value and more content follows."""
+        with open(self.file_path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            return self._sniff_text(f)[1]
+
+    def _stream_json_document(self, reader: JsonStreamReader, second_pass: Dict[str, Any]):
+        """
+        Single forward pass over the document. For a top-level dict that yields
+        nothing here, second_pass["candidates"] lists the keys holding arrays of
+        dicts (CASE 3); an empty list means the dict is itself the record (CASE 4).
+        """
+        first = reader.peek()
+        if first == "{":
+            yield from self._stream_json_object(reader, second_pass)
+
+        # ── CASE 5: Top-level list ────────────────────────────────────────
+        elif first == "[":
+            for _ in reader.iter_array():
+                item = reader.read_value()
+                if isinstance(item, dict):
+                    yield item
+                else:
+                    yield {"raw_text": str(item), "_parsing_type": "list_scalar"}
+
+        # Fallback: yield raw
+        else:
+            data = reader.read_value()
+            reader.expect_end()
+            yield {"raw_text": str(data), "_parsing_type": "json_scalar"}
+            return
+
+        reader.expect_end()
+
+    def _stream_json_object(self, reader: JsonStreamReader, second_pass: Dict[str, Any]):
+        zap_count = 0
+        category_count = 0
+        candidates = []
+
+        for key in reader.iter_object():
+            kind = reader.peek()
+
+            # ── CASE 1: ZAP Report ──────────────────────────────────────────
+            # ZAP: { "site": [ { "alerts": [...] } ] }
+            if key == "site" and kind == "[":
+                site_count = 0
+                has_dicts = False
+                for i in reader.iter_array():
+                    if i == 0:
+                        has_dicts = reader.peek() == "{"
+                    site_count += yield from self._stream_zap_site(reader)
+                zap_count += site_count
+                if not site_count and has_dicts:
+                    candidates.append(key)
+
+            # ── CASE 2: Wazuh / Generic Multi-Category Report ─────────────
+            # Structure: { "category_name": [ {...}, {...} ], ... }
+            # A ZAP report that produced alerts suppresses category flattening
+            elif key in WAZUH_CATEGORY_KEYS and not zap_count:
+                category_count += yield from self._stream_category(reader, key)
+
+            elif kind == "[":
+                for i in reader.iter_array():
+                    if i == 0 and reader.peek() == "{":
+                        candidates.append(key)
+                    reader.read_value()
+            else:
+                reader.skip_value()
+
+        if not zap_count and not category_count:
+            second_pass["candidates"] = candidates
+
+    def _stream_zap_site(self, reader: JsonStreamReader):
+        """Yield one event per alert instance of a ZAP site; returns the count."""
+        if reader.peek() != "{":
+            reader.skip_value()
+            return 0
+
+        yielded_count = 0
+        site_meta: Dict[str, Any] = {}
+        for key in reader.iter_object():
+            kind = reader.peek()
+            if key == "alerts" and kind == "[":
+                logger.info(f"Detected ZAP report for {site_meta.get('@name', 'site')}")
+                for _ in reader.iter_array():
+                    alert_type = reader.read_value()
+                    instances = alert_type.get("instances", [])
+                    if not instances:
+                        yield alert_type
+                        yielded_count += 1
+                        continue
+                    for inst in instances:
+                        event = alert_type.copy()
+                        event.pop("instances", None)
+                        event.update(inst)
+                        yield event
+                        yielded_count += 1
+            elif kind in "[{":
+                reader.skip_value()
+            else:
+                site_meta[key] = reader.read_value()
+        return yielded_count
+
+    def _stream_category(self, reader: JsonStreamReader, key: str):
+        """Flatten one report category array (or ES hits.hits); returns the count."""
+        # Handle Elasticsearch hits.hits
+        if key == "hits" and reader.peek() == "{":
+            yielded_count = 0
+            for inner in reader.iter_object():
+                if inner == "hits" and reader.peek() == "[":
+                    yielded_count += yield from self._stream_category_items(reader, key)
+                else:
+                    reader.skip_value()
+            return yielded_count
+
+        if reader.peek() != "[":
+            reader.skip_value()
+            return 0
+        return (yield from self._stream_category_items(reader, key))
+
+    def _stream_category_items(self, reader: JsonStreamReader, key: str):
+        logger.info(f"Auto-flattening report array: '{key}'")
+        yielded_count = 0
+        for _ in reader.iter_array():
+            item = reader.read_value()
+            if isinstance(item, dict):
+                if "_source" in item:
+                    yield item["_source"]
+                else:
+                    # Tag each item with its category for downstream use
+                    tagged = dict(item)
+                    tagged.setdefault("_wazuh_category", key)
+                    yield tagged
+            else:
+                # Scalar item in list → wrap
+                yield {"raw_text": str(item), "_wazuh_category": key}
+            yielded_count += 1
+        return yielded_count
 
     def _get_nested(self, data: Dict[str, Any], key_path: str) -> Any:
         """Helper to get value from nested dict using dot notation."""
@@ -174,7 +296,7 @@ class UniversalIngestor(BaseIngestor):
             try:
                 obj = json.loads(line)
                 if isinstance(obj, dict):
-                    yield obj
+                    yield RawEvent(obj, line)
                 else:
                     yield {"raw_text": str(obj), "_parsing_type": "ndjson_scalar"}
             except json.JSONDecodeError:
@@ -194,253 +316,315 @@ class UniversalIngestor(BaseIngestor):
 
     def _ingest_xml(self):
         """
-        Parse XML output into structured events.
+        Stream XML output as structured events with iterparse.
         Handles Nmap XML specifically, and generic XML as a fallback.
         Each open port on each host becomes one event dict.
+
+        Every top-level element is handled as soon as its end tag is read and
+        then dropped from the tree, so memory is bounded by the largest single
+        <host> (or generic record) and the first event is emitted right away.
+        Output matches the old ET.parse() implementation, except that a
+        generic document whose root is not <nmaprun> only switches to Nmap
+        parsing at its first top-level <host>; records before it are kept.
+        A document that turns out to be malformed after events were yielded
+        ends with an xml_parse_error record instead of producing nothing else.
         """
         import xml.etree.ElementTree as ET
+
+        root = None
+        nmap = False
+        scan_args = scan_start = ""
+        depth = 0
+        yielded = 0
         try:
-            tree = ET.parse(str(self.file_path))
-            root = tree.getroot()
+            for event, elem in ET.iterparse(str(self.file_path), events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if root is None:
+                        root = elem
+                        # Detect Nmap XML
+                        nmap = root.tag == "nmaprun"
+                        scan_args = root.get("args", "nmap")
+                        scan_start = root.get("startstr", "")
+                    continue
+
+                depth -= 1
+                if depth != 1:
+                    continue  # nested elements are handled with their top-level parent
+                if elem.tag == "host" and not nmap:
+                    nmap = True
+                    scan_args = root.get("args", "nmap")
+                    scan_start = root.get("startstr", "")
+
+                if nmap:
+                    if elem.tag == "host":
+                        for record in self._nmap_host_events(elem, scan_args, scan_start):
+                            yield record
+                            yielded += 1
+                else:
+                    # Generic XML: yield each child element as a flat dict
+                    record = {"_xml_tag": elem.tag}
+                    record.update(elem.attrib)
+                    # Add text content if present
+                    if elem.text and elem.text.strip():
+                        record["raw_text"] = elem.text.strip()
+                    # Add sub-children as string values
+                    for sub in elem:
+                        record[sub.tag] = sub.text or sub.get("name", "")
+                    yield record
+                    yielded += 1
+                root.remove(elem)
         except ET.ParseError as e:
             logger.error(f"XML parse error: {e}")
             yield {"raw_text": str(self.file_path.name), "_parsing_type": "xml_parse_error"}
             return
 
-        # Detect Nmap XML
-        if root.tag == "nmaprun" or root.find("host") is not None:
-            yield from self._parse_nmap_xml(root)
-            return
-
-        # Generic XML: yield each child element as a flat dict
-        yielded = 0
-        for child in root:
-            record = {"_xml_tag": child.tag}
-            record.update(child.attrib)
-            # Add text content if present
-            if child.text and child.text.strip():
-                record["raw_text"] = child.text.strip()
-            # Add sub-children as string values
-            for sub in child:
-                record[sub.tag] = sub.text or sub.get("name", "")
-            yield record
-            yielded += 1
-
-        if yielded == 0:
+        if nmap:
+            if yielded == 0:
+                yield {
+                    "raw_text": f"Nmap XML parsed but no hosts/ports found in {self.file_path.name}",
+                    "_parsing_type": "nmap_empty",
+                }
+            else:
+                logger.info(f"Nmap XML: yielded {yielded} port/host events from {self.file_path.name}")
+        elif yielded == 0:
             yield {
                 "raw_text": f"XML file parsed but no records found: {self.file_path.name}",
                 "_parsing_type": "xml_empty",
             }
 
-    def _parse_nmap_xml(self, root):
-        """Parse Nmap XML structure into port/host events."""
-        scan_args = root.get("args", "nmap")
-        scan_start = root.get("startstr", "")
-        yielded = 0
-
-        for host in root.findall("host"):
-            addr_el = host.find("address")
-            ip = addr_el.get("addr", "unknown") if addr_el is not None else "unknown"
-
-            hostname = ip
-            hostnames_el = host.find("hostnames")
-            if hostnames_el is not None:
-                hn_el = hostnames_el.find("hostname")
-                if hn_el is not None:
-                    hostname = hn_el.get("name", ip)
-
-            status_el = host.find("status")
-            host_state = status_el.get("state", "unknown") if status_el is not None else "unknown"
-
-            os_match = ""
-            os_el = host.find("os")
-            if os_el is not None:
-                osmatch = os_el.find("osmatch")
-                if osmatch is not None:
-                    os_match = osmatch.get("name", "")
-
-            ports_el = host.find("ports")
-            if ports_el is None:
-                yield {
-                    "source_host": ip,
-                    "hostname": hostname,
-                    "host_state": host_state,
-                    "os": os_match,
-                    "port": None,
-                    "protocol": "icmp",
-                    "service_name": "host_discovery",
-                    "service_product": "",
-                    "port_state": host_state,
-                    "scan_args": scan_args,
-                    "scan_start": scan_start,
-                    "raw_text": f"Nmap host {ip} ({hostname}) is {host_state}",
-                    "_parsing_type": "nmap_host",
-                }
-                yielded += 1
-                continue
-
-            for port_el in ports_el.findall("port"):
-                port_num = port_el.get("portid", "0")
-                proto = port_el.get("protocol", "tcp")
-
-                state_el = port_el.find("state")
-                port_state = state_el.get("state", "unknown") if state_el is not None else "unknown"
-
-                svc_el = port_el.find("service")
-                svc_name = svc_product = svc_version = svc_extra = ""
-                if svc_el is not None:
-                    svc_name = svc_el.get("name", "")
-                    svc_product = svc_el.get("product", "")
-                    svc_version = svc_el.get("version", "")
-                    svc_extra = svc_el.get("extrainfo", "")
-
-                script_outputs = []
-                for script_el in port_el.findall("script"):
-                    sid = script_el.get("id", "")
-                    out = script_el.get("output", "")
-                    script_outputs.append(f"{sid}: {out}")
-
-                raw_desc = (
-                    f"Nmap: {ip}:{port_num}/{proto} {port_state} - "
-                    f"{svc_product} {svc_version} ({svc_name}) {svc_extra}"
-                )
-                if script_outputs:
-                    raw_desc += " | Scripts: " + "; ".join(script_outputs[:3])
+    def _nmap_host_events(self, host, scan_args: str, scan_start: str):
+        """Port events (or one host-discovery event) for a single Nmap <host> element."""
+        addr_el = host.find("address")
+        ip = addr_el.get("addr", "unknown") if addr_el is not None else "unknown"
+
+        hostname = ip
+        hostnames_el = host.find("hostnames")
+        if hostnames_el is not None:
+            hn_el = hostnames_el.find("hostname")
+            if hn_el is not None:
+                hostname = hn_el.get("name", ip)
+
+        status_el = host.find("status")
+        host_state = status_el.get("state", "unknown") if status_el is not None else "unknown"
+
+        os_match = ""
+        os_el = host.find("os")
+        if os_el is not None:
+            osmatch = os_el.find("osmatch")
+            if osmatch is not None:
+                os_match = osmatch.get("name", "")
+
+        ports_el = host.find("ports")
+        if ports_el is None:
+            yield {
+                "source_host": ip,
+                "hostname": hostname,
+                "host_state": host_state,
+                "os": os_match,
+                "port": None,
+                "protocol": "icmp",
+                "service_name": "host_discovery",
+                "service_product": "",
+                "port_state": host_state,
+                "scan_args": scan_args,
+                "scan_start": scan_start,
+                "raw_text": f"Nmap host {ip} ({hostname}) is {host_state}",
+                "_parsing_type": "nmap_host",
+            }
+            return
 
-                yield {
-                    "source_host": ip,
-                    "hostname": hostname,
-                    "host_state": host_state,
-                    "os": os_match,
-                    "port": port_num,
-                    "protocol": proto,
-                    "service_name": svc_name,
-                    "service_product": svc_product,
-                    "service_version": svc_version,
-                    "port_state": port_state,
-                    "script_output": "; ".join(script_outputs),
-                    "scan_args": scan_args,
-                    "scan_start": scan_start,
-                    "raw_text": raw_desc,
-                    "_parsing_type": "nmap_port",
-                }
-                yielded += 1
+        for port_el in ports_el.findall("port"):
+            port_num = port_el.get("portid", "0")
+            proto = port_el.get("protocol", "tcp")
+
+            state_el = port_el.find("state")
+            port_state = state_el.get("state", "unknown") if state_el is not None else "unknown"
+
+            svc_el = port_el.find("service")
+            svc_name = svc_product = svc_version = svc_extra = ""
+            if svc_el is not None:
+                svc_name = svc_el.get("name", "")
+                svc_product = svc_el.get("product", "")
+                svc_version = svc_el.get("version", "")
+                svc_extra = svc_el.get("extrainfo", "")
+
+            script_outputs = []
+            for script_el in port_el.findall("script"):
+                sid = script_el.get("id", "")
+                out = script_el.get("output", "")
+                script_outputs.append(f"{sid}: {out}")
+
+            raw_desc = (
+                f"Nmap: {ip}:{port_num}/{proto} {port_state} - "
+                f"{svc_product} {svc_version} ({svc_name}) {svc_extra}"
+            )
+            if script_outputs:
+                raw_desc += " | Scripts: " + "; ".join(script_outputs[:3])
 
-        if yielded == 0:
             yield {
-                "raw_text": f"Nmap XML parsed but no hosts/ports found in {self.file_path.name}",
-                "_parsing_type": "nmap_empty",
+                "source_host": ip,
+                "hostname": hostname,
+                "host_state": host_state,
+                "os": os_match,
+                "port": port_num,
+                "protocol": proto,
+                "service_name": svc_name,
+                "service_product": svc_product,
+                "service_version": svc_version,
+                "port_state": port_state,
+                "script_output": "; ".join(script_outputs),
+                "scan_args": scan_args,
+                "scan_start": scan_start,
+                "raw_text": raw_desc,
+                "_parsing_type": "nmap_port",
             }
-        else:
-            logger.info(f"Nmap XML: yielded {yielded} port/host events from {self.file_path.name}")
 
     def _ingest_pcap(self):
         """
         Handle PCAP / PCAPNG binary packet captures.
-        Attempts to use scapy if available, otherwise yields metadata-only records.
+        The capture is decoded natively (see pcap.py) and streamed as one
+        record per network flow rather than per packet.
         """
         logger.info(f"Processing PCAP/PCAPNG: {self.file_path.name}")
-
-        # Try using scapy for rich data
         try:
-            from scapy.all import rdpcap, IP, TCP, UDP, ICMP
-            packets = rdpcap(str(self.file_path))
-            logger.info(f"Scapy loaded {len(packets)} packets from {self.file_path.name}")
+            with open(self.file_path, 'rb') as f:
+                head = f.read(24)
+            if len(head) < 24:
+                yield {"raw_text": f"PCAP file too small: {self.file_path.name}", "_parsing_type": "pcap_error"}
+                return
+            if capture_format(head) is None:
+                # Unknown binary format - treat as raw
+                magic = struct.unpack('<I', head[:4])[0]
+                yield {
+                    "raw_text": f"Unknown binary format (magic=0x{magic:08X}): {self.file_path.name}",
+                    "_parsing_type": "binary_unknown",
+                    "source_host": "binary_file",
+                }
+                return
+
             yielded = 0
-            for i, pkt in enumerate(packets):
-                try:
-                    record = {
-                        "_parsing_type": "pcap_packet",
-                        "raw_text": pkt.summary(),
-                        "protocol": "unknown",
-                    }
-                    if IP in pkt:
-                        record["source_host"] = pkt[IP].src
-                        record["target_host"] = pkt[IP].dst
-                        record["protocol"] = "ip"
-                    if TCP in pkt:
-                        record["port"] = str(pkt[TCP].dport)
-                        record["protocol"] = "tcp"
-                        record["raw_text"] = f"TCP {pkt[IP].src}:{pkt[TCP].sport} -> {pkt[IP].dst}:{pkt[TCP].dport}"
-                    elif UDP in pkt:
-                        record["port"] = str(pkt[UDP].dport)
-                        record["protocol"] = "udp"
-                        record["raw_text"] = f"UDP {pkt[IP].src}:{pkt[UDP].sport} -> {pkt[IP].dst}:{pkt[UDP].dport}"
-                    elif ICMP in pkt:
-                        record["protocol"] = "icmp"
-                    yield record
-                    yielded += 1
-                except Exception:
-                    continue
+            for flow in iter_flows(self.file_path):
+                yield flow
+                yielded += 1
             if yielded == 0:
                 yield {"raw_text": f"PCAP: no parseable packets in {self.file_path.name}", "_parsing_type": "pcap_empty"}
-            return
-        except ImportError:
-            logger.warning("scapy not installed; falling back to PCAP header-only parsing")
         except Exception as e:
-            logger.warning(f"scapy failed to read PCAP: {e}; falling back to header-only parsing")
+            yield {"raw_text": f"PCAP parse error: {e}", "_parsing_type": "pcap_error"}
 
-        # Fallback: parse PCAP/PCAPNG global header manually
+    def _ingest_compressed(self, codec: Optional[str] = None):
+        """
+        Stream a gzip / bzip2 / xz / zstd archive.
+        The decompressed text is sniffed on its first line: a JSON array is
+        decoded element by element, a single JSON object is yielded whole, and
+        everything else (NDJSON, raw logs) flows through line by line, so memory
+        stays constant regardless of the inflated size.
+        """
+        codec = codec or COMPRESSED_SUFFIXES.get(self.file_path.suffix.lower(), "gz")
         try:
-            with open(self.file_path, 'rb') as f:
-                header = f.read(24)
-                if len(header) < 24:
-                    yield {"raw_text": f"PCAP file too small: {self.file_path.name}", "_parsing_type": "pcap_error"}
-                    return
+            codec = self._detect_compression() or codec
+            with self._open_compressed(codec) as f:
+                first_char, is_ndjson = self._sniff_text(f)
 
-                magic = struct.unpack('<I', header[:4])[0]
-                is_pcap = magic in (0xA1B2C3D4, 0xD4C3B2A1, 0xA1B23C4D, 0x4D3CB2A1)
-                is_pcapng = magic == 0x0A0D0D0A
-
-                if is_pcap:
-                    yield {
-                        "raw_text": f"PCAP capture file: {self.file_path.name} (use scapy for full packet data)",
-                        "_parsing_type": "pcap_header",
-                        "protocol": "pcap",
-                        "source_host": "pcap_file",
-                    }
-                elif is_pcapng:
-                    yield {
-                        "raw_text": f"PCAPNG capture file: {self.file_path.name} (use scapy for full packet data)",
-                        "_parsing_type": "pcapng_header",
-                        "protocol": "pcapng",
-                        "source_host": "pcapng_file",
-                    }
-                else:
-                    # Unknown binary format - treat as raw
-                    yield {
-                        "raw_text": f"Unknown binary format (magic=0x{magic:08X}): {self.file_path.name}",
-                        "_parsing_type": "binary_unknown",
-                        "source_host": "binary_file",
-                    }
+            if first_char in ('[', '{') and not is_ndjson:
+                yielded_count = 0
+                try:
+                    with self._open_compressed(codec) as f:
+                        for event in self._stream_compressed_document(f, first_char):
+                            yield event
+                            yielded_count += 1
+                    return
+                except json.JSONDecodeError:
+                    if yielded_count:
+                        raise
+
+            # Treat as NDJSON / raw log lines
+            with self._open_compressed(codec) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        obj = json.loads(line)
+                    except json.JSONDecodeError:
+                        yield {"raw_text": line, "_parsing_type": f"{codec}_raw"}
+                        continue
+                    yield RawEvent(obj, line) if isinstance(obj, dict) else obj
         except Exception as e:
-            yield {"raw_text": f"PCAP parse error: {e}", "_parsing_type": "pcap_error"}
+            label = COMPRESSION_LABELS[codec]
+            logger.error(f"Failed to read {label} file: {e}")
+            yield {"raw_text": f"{label} read error: {e}", "_parsing_type": f"{codec}_error"}
+
+    @staticmethod
+    def _stream_compressed_document(f, first_char: str):
+        if first_char == '{':
+            data = json.load(f)
+            if isinstance(data, dict):
+                yield data
+            return
+        # Each element is held back until the delimiter after it has parsed, so
+        # raw logs that merely start with '[' ("[2024-03-01 ...") fall back to
+        # line mode before anything is yielded.
+        reader = JsonStreamReader(f)
+        pending = None
+        for _ in reader.iter_array():
+            if pending is not None:
+                yield pending
+            item = reader.read_value()
+            pending = item if isinstance(item, dict) else {"raw_text": str(item)}
+        reader.expect_end()
+        if pending is not None:
+            yield pending
+
+    def _detect_compression(self) -> Optional[str]:
+        """Compression codec from the file's magic bytes, if any."""
+        with open(self.file_path, 'rb') as f:
+            head = f.read(6)
+        for magic, codec in COMPRESSION_MAGIC:
+            if head.startswith(magic):
+                return codec
+        return None
+
+    def _open_compressed(self, codec: Optional[str]):
+        """Decompressing text stream over the file (read incrementally)."""
+        if codec == "gz":
+            import gzip
+            binary = gzip.open(self.file_path, 'rb')
+        elif codec == "bz2":
+            import bz2
+            binary = bz2.open(self.file_path, 'rb')
+        elif codec == "xz":
+            import lzma
+            binary = lzma.open(self.file_path, 'rb')
+        elif codec == "zst":
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("reading .zst archives requires the 'zstandard' package")
+            binary = zstandard.ZstdDecompressor().stream_reader(
+                open(self.file_path, 'rb'), read_across_frames=True, closefd=True
+            )
+        else:
+            raise ValueError(f"Unsupported compression codec: {codec}")
+        return io.TextIOWrapper(binary, encoding='utf-8-sig', errors='replace')
 
-    def _ingest_gzip(self):
-        """Handle .gz compressed files by detecting and decompressing."""
-        import gzip
+    @staticmethod
+    def _sniff_text(f) -> Tuple[str, bool]:
+        """
+        First non-blank character of a text stream, and whether the stream reads
+        as NDJSON (a complete JSON value on the first line, more content after).
+        """
+        line = f.readline(NDJSON_SNIFF_LIMIT)
+        while line and not line.strip():
+            line = f.readline(NDJSON_SNIFF_LIMIT)
+        first_char = line.lstrip()[:1]
+        if not line.endswith("\n"):
+            return first_char, False
         try:
-            with gzip.open(str(self.file_path), 'rt', encoding='utf-8', errors='replace') as f:
-                # Try JSON first
-                content = f.read()
-            try:
-                data = json.loads(content)
-                if isinstance(data, list):
-                    for item in data:
-                        yield item if isinstance(item, dict) else {"raw_text": str(item)}
-                elif isinstance(data, dict):
-                    yield data
-            except json.JSONDecodeError:
-                # Treat as NDJSON / raw log lines
-                for line in content.splitlines():
-                    if line.strip():
-                        try:
-                            yield json.loads(line)
-                        except json.JSONDecodeError:
-                            yield {"raw_text": line.strip(), "_parsing_type": "gz_raw"}
-        except Exception as e:
-            logger.error(f"Failed to read gzip file: {e}")
-            yield {"raw_text": f"Gzip read error: {e}", "_parsing_type": "gz_error"}
+            json.loads(line)
+        except json.JSONDecodeError:
+            return first_char, False
+        return first_char, any(rest.strip() for rest in f)
 
     def _ingest_smart_detect(self):
         """Try to auto-detect format for files with unknown extensions."""
@@ -450,10 +634,14 @@ class UniversalIngestor(BaseIngestor):
                 first_bytes = f.read(8)
 
             # PCAP magic
-            if len(first_bytes) >= 4:
-                magic = struct.unpack('<I', first_bytes[:4])[0]
-                if magic in (0xA1B2C3D4, 0xD4C3B2A1, 0xA1B23C4D, 0x4D3CB2A1, 0x0A0D0D0A):
-                    yield from self._ingest_pcap()
+            if capture_format(first_bytes) is not None:
+                yield from self._ingest_pcap()
+                return
+
+            # Compressed archive with an unfamiliar extension
+            for compression_magic, codec in COMPRESSION_MAGIC:
+                if first_bytes.startswith(compression_magic):
+                    yield from self._ingest_compressed(codec)
                     return
 
             # Try text: JSON, then NDJSON, then raw
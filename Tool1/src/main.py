@@ -4,16 +4,21 @@ Entry point: ingests any log file, normalizes, enriches, and stores to Parquet.
 Usage from Tool1 directory:
     .venv\Scripts\python.exe -m src.main ingest "<path_to_log_file>"
 """
+import glob
 import sys
 import logging
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 import typer
 
+from src.ingestion.base import BaseIngestor
+from src.ingestion.multi import expand_sources
 from src.ingestion.universal import UniversalIngestor
 from src.ingestion.auth_lanl import LanlAuthIngestor
 from src.ingestion.net_cicids import CicIdsIngestor
 from src.processing.pipeline import Pipeline
+from src.processing.governor import RateGovernor
 from src.core.config import settings, setup_logging
 
 setup_logging()
@@ -70,6 +75,51 @@ def _resolve_path(raw: str) -> Path:
     return p.resolve()
 
 
+def _resolve_sources(raw: str) -> Tuple[Path, List[Path]]:
+    """(source, files it names) for a file, a directory or a glob; the glob's fixed prefix is resolved like a path."""
+    cleaned = raw.strip("'\" \t\n\r")
+    if glob.has_magic(cleaned):
+        parts = Path(cleaned).parts
+        first = next(i for i, part in enumerate(parts) if glob.has_magic(part))
+        base = _resolve_path(str(Path(*parts[:first]))) if first else Path.cwd()
+        pattern = base.joinpath(*parts[first:])
+        return pattern, expand_sources(str(pattern))
+    path = _resolve_path(cleaned)
+    return path, expand_sources(str(path))
+
+
+def _select_ingestor(source_path: Path, log_type: str) -> BaseIngestor:
+    """Pick the ingestor for one file (--type, or auto by extension)."""
+    ext = source_path.suffix.lower()
+    ingest_type = log_type.lower()
+
+    if ingest_type == "auto":
+        if ext in (".csv", ".gz"):
+            ingest_type = "lanl_or_universal"
+        else:
+            ingest_type = "universal"
+
+    # Force universal for formats LANL/CICIDS can't handle
+    if ingest_type in ("lanl", "cicids") and ext not in (".csv", ".gz", ".txt", ""):
+        typer.secho(
+            f"[!] Type '{ingest_type}' expects CSV/GZ but got '{ext}' — switching to universal",
+            fg=typer.colors.YELLOW,
+        )
+        ingest_type = "universal"
+
+    if ingest_type == "lanl":
+        return LanlAuthIngestor(source_path)
+    if ingest_type == "cicids":
+        return CicIdsIngestor(source_path)
+    if ingest_type == "lanl_or_universal":
+        # Try LANL; fallback to universal
+        try:
+            return LanlAuthIngestor(source_path)
+        except Exception:
+            return UniversalIngestor(source_path)
+    return UniversalIngestor(source_path)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Commands
 # ─────────────────────────────────────────────────────────────────────────────
@@ -81,69 +131,110 @@ def ingest(
                                   help="Ingestor type: auto | universal | lanl | cicids"),
     limit: int = typer.Option(5000, "--limit", "-l",
                                help="Maximum events to ingest (default: 5000)"),
+    batch_size: int = typer.Option(0, "--batch-size", "-b",
+                                    help="Columnar batch mode: events per vectorized batch (0 = row-at-a-time)"),
+    rate_mode: str = typer.Option(settings.INGEST_RATE_MODE, "--rate-mode",
+                                   help="Rate governor: unlimited | token_bucket | adaptive"),
+    rate: int = typer.Option(settings.MAX_INGEST_RATE, "--rate",
+                              help="Events/sec for token_bucket (starting rate for adaptive)"),
+    workers: int = typer.Option(1, "--workers", "-w", min=1,
+                                 help="Worker processes for extraction/enrichment (1 = in-process)"),
+    readers: int = typer.Option(settings.INGEST_READER_THREADS, "--readers", min=1,
+                                help="Directory/glob sources: files read and parsed ahead on this many threads"),
+    dedup: bool = typer.Option(settings.DEDUP_ENABLED, "--dedup/--no-dedup",
+                               help="Skip events already stored by an earlier ingest (same record, same copy of it; "
+                                    "repeats within one source are kept)"),
+    follow: bool = typer.Option(False, "--follow", "-f",
+                                help="Tail a growing line log (NDJSON / syslog), resuming from a checkpoint; "
+                                     "ignores --limit, --batch-size and --workers"),
+    idle_timeout: float = typer.Option(0.0, "--idle-timeout", min=0.0,
+                                       help="--follow: stop after this many seconds without new lines (0 = never)"),
+    checkpoint: Optional[str] = typer.Option(None, "--checkpoint",
+                                             help="--follow: checkpoint file (default: data/checkpoints/<file>.<hash>.json)"),
 ):
     """
     Ingest a log file → normalize → enrich with MITRE + CVE → store as Parquet.
     Supports: JSON, NDJSON, XML (Nmap), CSV, PCAP, GZ, LOG, TXT and more.
+    SOURCE may also be a directory or a glob ("saved-logs/*.json"): every file
+    goes into one run with a combined summary (--limit applies per file).
     """
     # ── Resolve path ──────────────────────────────────────────────────────────
-    source_path = _resolve_path(source)
+    source_path, files = _resolve_sources(source)
 
-    if not source_path.exists():
+    if not files:
         typer.secho(f"✗ Error: Cannot find file: {source_path}", fg=typer.colors.RED, err=True)
         typer.secho(f"  Raw input was: {repr(source)}", fg=typer.colors.YELLOW, err=True)
         raise typer.Exit(code=1)
 
-    typer.secho(f"[Tool1] Source: {source_path}", fg=typer.colors.CYAN)
-    typer.secho(f"[Tool1] Size  : {source_path.stat().st_size:,} bytes", fg=typer.colors.CYAN)
-
-    # ── Select ingestor ───────────────────────────────────────────────────────
-    ext = source_path.suffix.lower()
-    ingest_type = log_type.lower()
-
-    if ingest_type == "auto":
-        if ext in (".csv", ".gz"):
-            ingest_type = "lanl_or_universal"
-        else:
-            ingest_type = "universal"
-
-    # Force universal for formats LANL/CICIDS can't handle
-    if ingest_type in ("lanl", "cicids") and ext not in (".csv", ".gz", ".txt", ""):
-        typer.secho(
-            f"[!] Type '{ingest_type}' expects CSV/GZ but got '{ext}' — switching to universal",
-            fg=typer.colors.YELLOW,
-        )
-        ingest_type = "universal"
+    many = files != [source_path]  # a directory or a glob
+    if many:
+        typer.secho(f"[Tool1] Source: {source_path} ({len(files)} files)", fg=typer.colors.CYAN)
+        typer.secho(f"[Tool1] Size  : {sum(p.stat().st_size for p in files):,} bytes", fg=typer.colors.CYAN)
+    else:
+        typer.secho(f"[Tool1] Source: {source_path}", fg=typer.colors.CYAN)
+        typer.secho(f"[Tool1] Size  : {source_path.stat().st_size:,} bytes", fg=typer.colors.CYAN)
 
     try:
-        if ingest_type == "lanl":
-            ingestor = LanlAuthIngestor(source_path)
-        elif ingest_type == "cicids":
-            ingestor = CicIdsIngestor(source_path)
-        elif ingest_type == "lanl_or_universal":
-            # Try LANL; fallback to universal
-            try:
-                ingestor = LanlAuthIngestor(source_path)
-            except Exception:
-                ingestor = UniversalIngestor(source_path)
-        else:
-            ingestor = UniversalIngestor(source_path)
-
-        typer.secho(f"[Tool1] Ingestor: {ingestor.__class__.__name__}", fg=typer.colors.CYAN)
-
-    except Exception as e:
-        typer.secho(f"✗ Failed to initialise ingestor: {e}", fg=typer.colors.RED, err=True)
+        governor = RateGovernor(mode=rate_mode, rate=rate)
+    except ValueError as e:
+        typer.secho(f"✗ {e}", fg=typer.colors.RED, err=True)
         raise typer.Exit(code=1)
 
+    if follow:
+        if many:
+            typer.secho("✗ Error: --follow takes a single file", fg=typer.colors.RED, err=True)
+            raise typer.Exit(code=1)
+        _follow(source_path, governor, idle_timeout, checkpoint, dedup)
+        return
+
+    # ── Select ingestor(s) ────────────────────────────────────────────────────
+    if many:
+        ingestors = []
+        for path in files:
+            try:
+                ingestors.append(_select_ingestor(path, log_type))
+            except Exception as e:
+                typer.secho(f"[!] Skipping {path.name}: {e}", fg=typer.colors.YELLOW, err=True)
+        if not ingestors:
+            typer.secho("✗ No readable files", fg=typer.colors.RED, err=True)
+            raise typer.Exit(code=1)
+    else:
+        try:
+            ingestor = _select_ingestor(source_path, log_type)
+            typer.secho(f"[Tool1] Ingestor: {ingestor.__class__.__name__}", fg=typer.colors.CYAN)
+        except Exception as e:
+            typer.secho(f"✗ Failed to initialise ingestor: {e}", fg=typer.colors.RED, err=True)
+            raise typer.Exit(code=1)
+
     # ── Run pipeline ──────────────────────────────────────────────────────────
     try:
-        pipeline = Pipeline(ingestor)
-        summary = pipeline.run(max_lines=limit)
+        if many:
+            pipeline = Pipeline(ingestors[0], governor=governor, dedup=dedup)
+            summary = pipeline.run_many(ingestors, max_lines=limit, batch_size=batch_size, workers=workers,
+                                        readers=readers, source=str(source_path))
+        else:
+            pipeline = Pipeline(ingestor, governor=governor, dedup=dedup)
+            summary = pipeline.run(max_lines=limit, batch_size=batch_size, workers=workers)
 
-        typer.secho("\n✅ Ingestion complete!", fg=typer.colors.GREEN)
+        if summary["success"]:
+            typer.secho("\n✅ Ingestion complete!", fg=typer.colors.GREEN)
+        else:
+            typer.secho("\n⚠  Ingestion stored no events", fg=typer.colors.YELLOW)
+        for result in summary.get("files", []):
+            line = (f"   {Path(result['path']).name}: {result['success']} ingested, {result['failed']} failed "
+                    f"({result['ingestor']}, {result['elapsed_seconds']}s)")
+            typer.secho(line + (f"  ERROR: {result['error']}" if result["error"] else ""),
+                        fg=typer.colors.RED if result["error"] else typer.colors.CYAN)
         typer.secho(f"   Events ingested: {summary['success']}", fg=typer.colors.GREEN)
         typer.secho(f"   Events failed  : {summary['failed']}", fg=typer.colors.YELLOW)
+        if summary["duplicates_skipped"]:
+            typer.secho(f"   Duplicates     : {summary['duplicates_skipped']} already stored, skipped",
+                        fg=typer.colors.YELLOW)
         typer.secho(f"   Output dir     : {summary['output_dir']}", fg=typer.colors.CYAN)
+        rate_stats = summary.get("throughput", {})
+        if rate_stats.get("achieved_rate"):
+            typer.secho(f"   Achieved rate  : {rate_stats['achieved_rate']:,.0f} events/sec ({rate_stats['mode']})",
+                        fg=typer.colors.CYAN)
 
         intel = summary.get("intelligence", {})
         if intel.get("mitre_breakdown"):
@@ -153,11 +244,15 @@ def ingest(
         if intel.get("cve_ids_observed"):
             typer.secho(f"   CVEs Observed: {intel['cve_ids_observed'][:5]}", fg=typer.colors.RED)
 
+        if summary["success"] == 0 and summary["duplicates_skipped"]:
+            typer.secho(f"⚠  Warning: nothing stored, all {summary['duplicates_skipped']} events were already in "
+                        f"{summary['output_dir']} (--no-dedup stores them again).", fg=typer.colors.YELLOW, err=True)
+            raise typer.Exit(code=2)
         if summary["success"] == 0:
             typer.secho("⚠  Warning: 0 events were successfully ingested.", fg=typer.colors.YELLOW, err=True)
             raise typer.Exit(code=2)
 
-    except SystemExit:
+    except (SystemExit, typer.Exit):
         raise
     except Exception as e:
         typer.secho(f"\n✗ Pipeline failed: {e}", fg=typer.colors.RED, err=True)
@@ -165,13 +260,46 @@ def ingest(
         raise typer.Exit(code=1)
 
 
+def _follow(source_path: Path, governor: RateGovernor, idle_timeout: float, checkpoint: Optional[str],
+            dedup: bool) -> None:
+    """ingest --follow: tail source_path with a checkpoint until idle or interrupted."""
+    from src.ingestion.follow import Checkpoint, FollowIngestor, default_checkpoint_path
+
+    checkpoint_path = _resolve_path(checkpoint) if checkpoint else default_checkpoint_path(source_path)
+    try:
+        ingestor = FollowIngestor(source_path, Checkpoint.load(checkpoint_path, source_path),
+                                  idle_timeout=idle_timeout)
+        summary = Pipeline(ingestor, governor=governor, dedup=dedup).follow(checkpoint_path)
+    except Exception as e:
+        typer.secho(f"\n✗ Follow failed: {e}", fg=typer.colors.RED, err=True)
+        logger.exception("Follow fatal error")
+        raise typer.Exit(code=1)
+
+    info = summary["follow"]
+    typer.secho("\n✅ Follow stopped", fg=typer.colors.GREEN)
+    typer.secho(f"   Events ingested: {summary['success']}", fg=typer.colors.GREEN)
+    typer.secho(f"   Events failed  : {summary['failed']}", fg=typer.colors.YELLOW)
+    typer.secho(f"   Checkpoint     : {info['checkpoint']} (offset {info['offset']:,})", fg=typer.colors.CYAN)
+    latency = info["read_to_visible_latency"]
+    if latency.get("events"):
+        typer.secho(f"   Read→visible   : p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms, "
+                    f"max {latency['max_ms']} ms", fg=typer.colors.CYAN)
+
+
 @app.command()
 def query(
-    sql: str = typer.Argument(..., help="DuckDB SQL query (SELECT ... FROM '<path>/**/*.parquet')"),
+    sql: str = typer.Argument(..., help="DuckDB SQL query (SELECT ... FROM '<path>/**/*.parquet'), or a WHERE clause"),
+    catalog: bool = typer.Option(False, "--catalog", help="Query the persistent catalog: `events`, "
+                                 "`events_per_{host,user,technique}_hour` and `catalog_files`"),
+    date_from: Optional[str] = typer.Option(None, "--from", help="--catalog: first date partition (YYYY-MM-DD)"),
+    date_to: Optional[str] = typer.Option(None, "--to", help="--catalog: last date partition (YYYY-MM-DD)"),
 ):
     """Query the processed Parquet events using DuckDB SQL."""
     import duckdb
-    import polars as pl
+
+    if catalog:
+        _query_catalog(sql, date_from, date_to)
+        return
 
     output_glob = str(settings.OUTPUT_DIR / "**" / "*.parquet").replace("\\", "/")
     typer.echo(f"Querying: {output_glob}")
@@ -189,5 +317,119 @@ def query(
         raise typer.Exit(code=1)
 
 
+def _query_catalog(sql: str, date_from: Optional[str], date_to: Optional[str]) -> None:
+    """query --catalog: sync the catalog with the output directory, then run sql against it."""
+    import time
+    from datetime import date
+
+    import polars as pl
+    from src.storage.catalog import Catalog
+
+    try:
+        start = date.fromisoformat(date_from) if date_from else None
+        end = date.fromisoformat(date_to) if date_to else None
+    except ValueError as e:
+        typer.secho(f"✗ Error: --from/--to must be YYYY-MM-DD ({e})", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    if not sql.strip().upper().startswith(("SELECT", "WITH")):
+        sql = f"SELECT * FROM events WHERE {sql}"
+    try:
+        with Catalog() as cat:
+            changes = cat.refresh()
+            started = time.perf_counter()
+            result = cat.query(sql, start, end)
+            elapsed = time.perf_counter() - started
+    except Exception as e:
+        typer.secho(f"Query error: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Catalog: {settings.CATALOG_PATH} ({changes['files']} files, "
+               f"+{changes['added']} / -{changes['removed']} since last query)")
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        typer.echo(str(result))
+    typer.echo(f"({len(result)} rows in {elapsed * 1000:.1f} ms)")
+
+
+@app.command()
+def verify(
+    path: str = typer.Argument(None, help="Output directory to verify (default: configured output dir)"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Recompute every event hash and check the previous_event_hash chain."""
+    import json
+    from src.storage.verify import ChainVerifier
+
+    output_dir = _resolve_path(path) if path else settings.OUTPUT_DIR
+    if not output_dir.is_dir():
+        typer.secho(f"✗ Error: Not a directory: {output_dir}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    report = ChainVerifier(output_dir).verify()
+    if as_json:
+        typer.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        color = typer.colors.GREEN if report.ok else typer.colors.RED
+        typer.secho(f"{'✅ Chain intact' if report.ok else '✗ Chain verification FAILED'}: {output_dir}", fg=color)
+        typer.echo(f"   Files / events : {report.files} / {report.events}  {report.schemes}")
+        typer.echo(f"   Chain heads    : {report.chain_heads}")
+        typer.echo(f"   Hash mismatches: {report.hash_mismatches}")
+        typer.echo(f"   Raw mismatches : {report.raw_mismatches}")
+        typer.echo(f"   Dangling links : {report.dangling_links}")
+        typer.echo(f"   Forks          : {report.forks}")
+        for kind, event_ids in report.examples.items():
+            typer.echo(f"   {kind}: {', '.join(event_ids)}")
+    if not report.ok:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def compact(
+    path: str = typer.Argument(None, help="Output directory to compact (default: configured output dir)"),
+    partition: Optional[List[str]] = typer.Option(None, "--partition", "-p",
+                                                  help="Only these YYYY-MM-DD partitions (dumps are not folded)"),
+    rows_per_file: int = typer.Option(settings.COMPACT_ROWS_PER_FILE, "--rows-per-file", min=1,
+                                      help="Maximum rows per rewritten file"),
+):
+    """Merge each date partition (and emergency JSONL dumps) into a few large sorted Parquet files."""
+    from src.storage.compact import Compactor
+
+    output_dir = _resolve_path(path) if path else settings.OUTPUT_DIR
+    if not output_dir.is_dir():
+        typer.secho(f"✗ Error: Not a directory: {output_dir}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    report = Compactor(output_dir, rows_per_file=rows_per_file).run(partitions=partition or None)
+    for result in report.partitions:
+        typer.echo(f"   {result.partition}: {result.files_before:5} -> {result.files_after:3} files, {result.rows:,} rows")
+    typer.secho(f"✅ Compacted {output_dir}", fg=typer.colors.GREEN)
+    typer.echo(f"   Files      : {report.files_before} -> {report.files_after}")
+    typer.echo(f"   Dumps      : {report.dumps_folded} emergency JSONL file(s) folded in")
+    typer.echo(f"   Scan time  : {report.scan_seconds_before * 1000:.1f} ms -> {report.scan_seconds_after * 1000:.1f} ms")
+
+
+
+@app.command("build-score-table")
+def build_score_table(
+    path: str = typer.Argument(None, help="Output file (default: configured VULNINTEL_SCORE_TABLE)"),
+):
+    """Precompute a memory-mapped CVE score table from the VulnIntel DB for SQLite-free enrichment."""
+    from src.core import vulnintel_bridge
+
+    if not vulnintel_bridge._check_db():
+        typer.secho(f"✗ Error: VulnIntel DB not found: {vulnintel_bridge._VULN_DB_PATH}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    out_path = _resolve_path(path) if path else settings.VULNINTEL_SCORE_TABLE
+    try:
+        count = vulnintel_bridge.build_score_table(out_path)
+    except Exception as e:
+        typer.secho(f"✗ Failed to build score table: {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    typer.secho(f"✅ CVE score table: {out_path}", fg=typer.colors.GREEN)
+    typer.echo(f"   Entries    : {count:,}")
+    typer.echo(f"   Size       : {out_path.stat().st_size:,} bytes")
+    if out_path != settings.VULNINTEL_SCORE_TABLE:
+        typer.echo("   Point VULNINTEL_SCORE_TABLE at this file to enrich from it")
+
 if __name__ == "__main__":
     app()
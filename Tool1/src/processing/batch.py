@@ -0,0 +1,481 @@
+"""
+BatchProcessor - Columnar batch mode for the Tool1 pipeline.
+Collects raw events into a Polars frame and runs event typing, MITRE matching,
+CVE/CWE extraction and severity/quality/risk scoring as vectorized expressions.
+Produces exactly the same enriched dicts as Pipeline._prepare (the row path).
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+import polars as pl
+
+from .enricher import Enricher, _MITRE_RULES
+from .pipeline import RAW_SOURCE_LIMIT, _raw_source, _sha256
+from ..core.vulnintel_bridge import enrich_many
+
+if TYPE_CHECKING:
+    from .pipeline import Pipeline
+
+logger = logging.getLogger(__name__)
+
+_CVE_PATTERN = r"(?i)CVE-\d{4}-\d{1,7}"
+_CWE_PATTERN = r"(?i)CWE-\d+"
+
+# Rule indices ordered the way infer_mitre resolves them: highest confidence
+# first, ties broken by position in _MITRE_RULES (first rule wins).
+_MITRE_PRIORITY = sorted(range(len(_MITRE_RULES)), key=lambda i: (-_MITRE_RULES[i][1], i))
+
+_FRAME_SCHEMA = {
+    "source_host": pl.Utf8,
+    "target_host": pl.Utf8,
+    "user": pl.Utf8,
+    "protocol": pl.Utf8,
+    "raw_text": pl.Utf8,
+    "log_category": pl.Utf8,
+    "parsing_type": pl.Utf8,
+    "rule_groups": pl.List(pl.Utf8),
+    "text": pl.Utf8,
+}
+
+
+class BatchProcessor:
+    """
+    Vectorized counterpart of Pipeline._prepare.
+    Field extraction and text flattening stay per-record (heterogeneous nested
+    dicts); everything downstream of them runs once per batch as column expressions.
+    """
+
+    def __init__(self, pipeline: "Pipeline"):
+        self.pipeline = pipeline
+        self.enricher = pipeline.enricher
+        self.normalizer = pipeline.normalizer
+
+    def process(self, raw_events: List[Any]) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Prepare a batch of raw events. Returns one entry per input, in order:
+        the enriched dict, or the Exception that rejected that event.
+        """
+        results: List[Union[Dict[str, Any], Exception, None]] = [None] * len(raw_events)
+        staged: List[Tuple[int, Dict[str, Any], Tuple[str, Optional[str]], Any]] = []
+        columns: Dict[str, List[Any]] = {name: [] for name in _FRAME_SCHEMA}
+
+        clock = time.perf_counter
+        stages = self.pipeline.stage_seconds
+
+        # ── 1. Per-record extraction (nested dicts do not vectorize) ─────────
+        for i, raw in enumerate(raw_events):
+            try:
+                t0 = clock()
+                fields = self.pipeline._extract_fields(raw)
+                t1 = clock()
+                raw_source = _raw_source(raw)  # (text, record_hash)
+                t2 = clock()
+                text = self.enricher._build_enrichment_text(fields["raw_text"], raw)
+                stages["enrichment_text"] += clock() - t2
+                stages["raw_source"] += t2 - t1
+                stages["extract"] += t1 - t0
+                groups = None
+                if isinstance(raw.get("rule"), dict):
+                    groups = [g.lower() for g in raw["rule"].get("groups", [])]
+                row = {
+                    "source_host": fields["source_host"],
+                    "target_host": fields["target_host"],
+                    "user": fields["user"],
+                    "protocol": fields["protocol"],
+                    "raw_text": fields["raw_text"],
+                    "log_category": fields["log_category"],
+                    "parsing_type": str(raw.get("_parsing_type", "")),
+                    "rule_groups": groups,
+                    "text": text,
+                }
+            except Exception as e:
+                results[i] = e
+                continue
+            for name, value in row.items():
+                columns[name].append(value)
+            staged.append((i, fields, raw_source, self.pipeline._raw_timestamp(raw)))
+
+        if not staged:
+            return results
+
+        # ── 2. Vectorized normalization, typing and scoring ──────────────────
+        try:
+            t0 = clock()
+            frame = pl.DataFrame(columns, schema=_FRAME_SCHEMA, strict=True)
+            scored = self._score(frame)
+            stages["enrich"] += clock() - t0
+        except Exception as e:
+            logger.warning(f"[Tool1] Batch scoring failed ({e}); falling back to row path for {len(staged)} events")
+            for i, _, _, _ in staged:
+                try:
+                    results[i] = self.pipeline._prepare(raw_events[i])
+                except Exception as row_err:
+                    results[i] = row_err
+            return results
+
+        # ── 3. Assemble enriched dicts ───────────────────────────────────────
+        assembled = self._assemble(
+            scored,
+            ports=[fields["port"] for _, fields, _, _ in staged],
+            agent_names=[fields.get("agent_name") for _, fields, _, _ in staged],
+            raw_sources=[raw_source for _, _, (raw_source, _), _ in staged],
+            record_hashes=[record_hash for _, _, (_, record_hash), _ in staged],
+            raw_timestamps=[raw_ts for _, _, _, raw_ts in staged],
+        )
+        for (i, _, _, _), enriched in zip(staged, assembled):
+            results[i] = enriched
+        return results
+
+    def process_frame(self, frame: pl.DataFrame) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Prepare a flat record batch from a columnar ingestor (iter_batches) without
+        building per-row dicts: field extraction, enrichment text and raw_source
+        are column expressions too. Same output as process(frame.to_dicts()).
+        """
+        if frame.is_empty():
+            return []
+        if any(dtype.is_nested() or dtype == pl.Object for dtype in frame.dtypes):
+            return self.process(frame.to_dicts())
+        stages = self.pipeline.stage_seconds
+        try:
+            t0 = time.perf_counter()
+            extracted, raw_timestamps = self._extract_frame(frame)
+            t1 = time.perf_counter()
+            scored = self._score(extracted.select(list(_FRAME_SCHEMA)))
+            stages["enrich"] += time.perf_counter() - t1
+            stages["extract"] += t1 - t0
+        except Exception as e:
+            logger.warning(f"[Tool1] Columnar extraction failed ({e}); falling back to per-record batch path")
+            return self.process(frame.to_dicts())
+
+        texts = extracted["raw_source"]
+        return self._assemble(
+            scored,
+            ports=extracted["port"].to_list(),
+            agent_names=[None] * frame.height,
+            raw_sources=texts.str.slice(0, RAW_SOURCE_LIMIT).to_list(),
+            record_hashes=[_sha256(text) if cut else None  # as _raw_source
+                           for text, cut in zip(texts, texts.str.len_chars() > RAW_SOURCE_LIMIT)],
+            raw_timestamps=raw_timestamps,
+        )
+
+    def _assemble(
+        self,
+        scored: pl.DataFrame,
+        ports: List[Optional[int]],
+        agent_names: List[Optional[str]],
+        raw_sources: List[str],
+        record_hashes: List[Optional[str]],
+        raw_timestamps: List[Any],
+    ) -> List[Dict[str, Any]]:
+        """Build the enriched dicts (same keys/values as the row path)."""
+        t0 = time.perf_counter()
+        timestamps = self.normalizer.timestamps.parse_many(raw_timestamps, scored["log_category"].to_list())
+        t1 = time.perf_counter()
+        out = []
+        for row, port, agent_name, raw_source, record_hash, ts in zip(
+            scored.iter_rows(named=True), ports, agent_names, raw_sources, record_hashes, timestamps
+        ):
+            rule_idx = row["mitre_idx"]
+            if rule_idx is None:
+                tech_id, confidence, tactic, tech_name = None, 0.0, None, None
+            else:
+                tech_id, confidence, tactic, tech_name, _ = _MITRE_RULES[rule_idx]
+            out.append({
+                "event_type": row["event_type"],
+                "source_host": row["norm_host"],
+                "target_host": row["norm_target"],
+                "user": row["norm_user"],
+                "agent_name": agent_name,
+                "protocol": row["norm_protocol"],
+                "port": port,
+                "log_category": row["log_category"],
+                "mitre_technique": tech_id,
+                "mitre_tactic": tactic,
+                "mitre_technique_name": tech_name,
+                "confidence_score": round(confidence, 3),
+                "observed_cve_ids": row["cve_ids"],
+                "observed_cwe_ids": row["cwe_ids"],
+                "cve_max_cvss": row["cve_max_cvss"],
+                "cve_severity": row["cve_severity"],
+                "is_kev": row["is_kev"],
+                "severity": row["severity"],
+                "data_quality_score": max(0.0, round(row["data_quality"], 2)),
+                "risk_score": round(row["risk"], 3),
+                "model_version": Enricher.MODEL_VERSION,
+                "timestamp": ts,
+                "raw_source": raw_source,
+                "record_hash": record_hash,
+            })
+        stages = self.pipeline.stage_seconds
+        stages["normalize"] += t1 - t0
+        stages["enrich"] += time.perf_counter() - t1
+        return out
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Vectorized stages
+    # ─────────────────────────────────────────────────────────────────────────
+    def _extract_frame(self, frame: pl.DataFrame) -> Tuple[pl.DataFrame, List[Any]]:
+        """
+        Columnar Pipeline._extract_fields for flat records. Nested-dict fallbacks
+        (Wazuh agent/manager/data/rule/syscheck) cannot apply, and dotted key
+        paths never resolve against flat columns, so each field is a coalesce
+        over the candidate columns present plus the raw-text regex fallbacks.
+        Returns the _FRAME_SCHEMA columns plus port and raw_source (whole, not yet
+        cut to RAW_SOURCE_LIMIT), and the raw timestamp value per row.
+        """
+        from .pipeline import (
+            _SOURCE_HOST_KEYS, _TARGET_HOST_KEYS, _USER_KEYS, _PORT_KEYS,
+            _PROTOCOL_KEYS, _RAW_TEXT_KEYS, _TIMESTAMP_KEYS, _IP_RE, _USER_RE,
+        )
+
+        # Source columns as str(value), under private names so derived fields
+        # (source_host, user, raw_text, ...) never shadow a same-named column
+        source = {name: f"_src{i}" for i, name in enumerate(frame.columns)}
+        texts = pl.DataFrame([_as_text(frame[name]).alias(source[name]) for name in frame.columns])
+
+        def first(keys: Sequence[str]) -> pl.Expr:
+            present = [pl.col(source[k]) for k in keys if "." not in k and k in source]
+            if not present:
+                return pl.lit(None, dtype=pl.Utf8)
+            return pl.coalesce(present) if len(present) > 1 else present[0]
+
+        def blank(expr: pl.Expr) -> pl.Expr:
+            return expr.is_null() | (expr == "")
+
+        # `raw.get("_wazuh_category") or raw.get("_parsing_type") or "generic"`
+        log_category = pl.lit("generic")
+        for key in ("_parsing_type", "_wazuh_category"):
+            if key in source:
+                log_category = pl.when(_truthy(frame[key])).then(pl.col(source[key])).otherwise(log_category)
+        parsing_type = pl.col(source["_parsing_type"]).fill_null("None") if "_parsing_type" in source else pl.lit("")
+
+        port_raw = first(_PORT_KEYS)
+        raw_text = first(_RAW_TEXT_KEYS)
+        has_text = ~blank(raw_text)
+        ips = raw_text.str.extract_all(_IP_RE.pattern)
+        host = first(_SOURCE_HOST_KEYS)
+        needs_host = has_text & blank(host)
+        user = first(_USER_KEYS)
+        user_match = raw_text.str.extract("(?i)" + _USER_RE.pattern, 1)
+
+        # Enricher._build_enrichment_text: raw text, then every string value
+        text_parts = [pl.when(blank(raw_text)).then(pl.lit(None, dtype=pl.Utf8)).otherwise(raw_text)]
+        for name in frame.columns:
+            if frame[name].dtype == pl.Utf8:
+                col = pl.col(source[name])
+                text_parts.append(pl.when(blank(col)).then(pl.lit(None, dtype=pl.Utf8)).otherwise(col))
+
+        extracted = texts.select(
+            pl.when(needs_host & (ips.list.len() > 0))
+            .then(ips.list.get(0, null_on_oob=True))
+            .otherwise(host)
+            .alias("source_host"),
+            pl.when(needs_host & (ips.list.len() > 1))
+            .then(ips.list.get(1, null_on_oob=True))
+            .otherwise(first(_TARGET_HOST_KEYS))
+            .alias("target_host"),
+            pl.when(has_text & blank(user) & user_match.is_not_null())
+            .then(user_match)
+            .otherwise(user)
+            .alias("user"),
+            first(_PROTOCOL_KEYS).alias("protocol"),
+            raw_text.fill_null("").alias("raw_text"),
+            log_category.alias("log_category"),
+            parsing_type.alias("parsing_type"),
+            pl.lit(None, dtype=pl.List(pl.Utf8)).alias("rule_groups"),
+            pl.concat_str(text_parts, separator=" ", ignore_nulls=True).str.to_lowercase().alias("text"),
+            pl.when(port_raw.str.contains(r"^[0-9]+$"))
+            .then(port_raw.cast(pl.Int64, strict=False))
+            .otherwise(pl.lit(None, dtype=pl.Int64))
+            .alias("port"),
+            pl.lit(_json_rows(frame)).alias("raw_source"),
+        )
+
+        # Pipeline._raw_timestamp: first truthy value among the timestamp keys
+        ts_columns = [frame[k].to_list() for k in _TIMESTAMP_KEYS if k in frame.columns]
+        if not ts_columns:
+            raw_timestamps: List[Any] = [None] * frame.height
+        elif len(ts_columns) == 1:
+            raw_timestamps = ts_columns[0]
+        else:
+            raw_timestamps = [next((v for v in values if v), None) for values in zip(*ts_columns)]
+
+        return extracted, raw_timestamps
+
+    def _score(self, frame: pl.DataFrame) -> pl.DataFrame:
+        from .pipeline import _EVENT_TYPE_KEYWORDS
+
+        def norm(col: str) -> pl.Expr:
+            c = pl.col(col)
+            return (
+                pl.when(c.is_null() | (c == "") | (c == "?"))
+                .then(pl.lit(None, dtype=pl.Utf8))
+                .otherwise(c.str.strip_chars().str.to_lowercase())
+            )
+
+        combined = pl.concat_str(
+            [pl.col("raw_text"), pl.lit(" "), pl.col("log_category"), pl.lit(" "), pl.col("parsing_type")]
+        ).str.to_lowercase()
+
+        # Event type: first keyword group that hits, then Wazuh rule groups
+        groups = pl.col("rule_groups")
+        event_type = pl.when(pl.lit(False)).then(pl.lit(None, dtype=pl.Utf8))
+        for name, keywords in _EVENT_TYPE_KEYWORDS:
+            event_type = event_type.when(combined.str.contains_any(keywords)).then(pl.lit(name))
+        event_type = (
+            event_type
+            .when(groups.list.contains("syscheck_file") | groups.list.contains("syscheck_registry"))
+            .then(pl.lit("file_integrity"))
+            .when(groups.list.contains("authentication_success")).then(pl.lit("auth_success"))
+            .when(groups.list.contains("authentication_failed")).then(pl.lit("auth_failure"))
+            .otherwise(pl.lit("unknown"))
+        )
+
+        # MITRE: best rule index in infer_mitre priority order
+        text = pl.col("text")
+        mitre_idx = pl.when(pl.lit(False)).then(pl.lit(None, dtype=pl.Int32))
+        for idx in _MITRE_PRIORITY:
+            mitre_idx = mitre_idx.when(text.str.contains_any(_MITRE_RULES[idx][4])).then(pl.lit(idx, dtype=pl.Int32))
+        mitre_idx = mitre_idx.otherwise(pl.lit(None, dtype=pl.Int32))
+
+        protocol = pl.col("protocol")
+        scored = frame.with_columns(
+            norm("source_host").alias("norm_host"),
+            norm("target_host").alias("norm_target"),
+            norm("user").alias("norm_user"),
+            pl.when(protocol.is_null() | (protocol == ""))
+            .then(pl.lit("unknown"))
+            .otherwise(protocol)
+            .str.to_uppercase()
+            .alias("norm_protocol"),
+            event_type.alias("event_type"),
+            mitre_idx.alias("mitre_idx"),
+            text.str.extract_all(_CVE_PATTERN).list.unique().list.sort().alias("cve_ids"),
+            text.str.extract_all(_CWE_PATTERN).list.unique().list.sort().alias("cwe_ids"),
+        )
+
+        scored = scored.with_columns(self._vulnintel(scored["cve_ids"]))
+
+        confidence = pl.col("mitre_idx").replace_strict(
+            list(range(len(_MITRE_RULES))),
+            [rule[1] for rule in _MITRE_RULES],
+            default=0.0,
+            return_dtype=pl.Float64,
+        )
+        cvss = pl.col("cve_max_cvss")
+        severity = (
+            pl.when(cvss >= 9.0).then(pl.lit("critical"))
+            .when(cvss >= 7.0).then(pl.lit("high"))
+            .when(cvss >= 4.0).then(pl.lit("medium"))
+            .when(cvss.is_not_null()).then(pl.lit("low"))
+            .when(confidence >= 0.80).then(pl.lit("high"))
+            .when(confidence >= 0.65).then(pl.lit("medium"))
+            .when(confidence > 0.0).then(pl.lit("low"))
+            .when(pl.col("event_type").is_in(["auth_failure", "security_alert"])).then(pl.lit("medium"))
+            .otherwise(pl.lit("info"))
+        )
+
+        host, user, proto = pl.col("norm_host"), pl.col("norm_user"), pl.col("norm_protocol")
+        quality = (
+            pl.lit(1.0)
+            - pl.when(host.is_null() | (host == "") | (host == "unknown")).then(0.15).otherwise(0.0)
+            - pl.when(user.is_null() | (user == "")).then(0.15).otherwise(0.0)
+            - pl.when(proto.is_null() | proto.str.to_uppercase().is_in(["UNKNOWN", ""])).then(0.10).otherwise(0.0)
+        )
+
+        floor = (
+            pl.col("severity")
+            .replace_strict(
+                ["critical", "high", "medium", "low", "info"],
+                [0.80, 0.60, 0.40, 0.20, 0.0],
+                default=0.0,
+                return_dtype=pl.Float64,
+            )
+        )
+        base = (
+            confidence * 0.4
+            + (pl.min_horizontal(cvss.fill_null(0.0), pl.lit(10.0)) / 10.0) * 0.4
+            + pl.when(pl.col("is_kev")).then(0.20).otherwise(0.0)
+        )
+
+        return (
+            scored
+            .with_columns(severity.alias("severity"), quality.alias("data_quality"))
+            .with_columns(pl.min_horizontal(pl.lit(1.0), pl.max_horizontal(floor, base)).alias("risk"))
+        )
+
+    @staticmethod
+    def _vulnintel(cve_lists: pl.Series) -> List[pl.Series]:
+        """VulnIntel lookups: one batched query for the batch, combined once per distinct CVE set."""
+        keys = [tuple(ids) for ids in cve_lists.to_list()]
+        distinct = list(dict.fromkeys(keys))
+        memo: Dict[Tuple[str, ...], Tuple[Any, Any, bool]] = dict(
+            zip(distinct, enrich_many([list(key) for key in distinct]))
+        )
+        cvss, severity, kev = [], [], []
+        for key in keys:
+            c, s, k = memo[key]
+            cvss.append(c)
+            severity.append(s)
+            kev.append(k)
+        return [
+            pl.Series("cve_max_cvss", cvss, dtype=pl.Float64),
+            pl.Series("cve_severity", severity, dtype=pl.Utf8),
+            pl.Series("is_kev", kev, dtype=pl.Boolean),
+        ]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Column helpers for process_frame
+# ─────────────────────────────────────────────────────────────────────────────
+def _as_text(series: pl.Series) -> pl.Series:
+    """str(value) per element (None stays null), as Pipeline._get returns it."""
+    if series.dtype == pl.Utf8:
+        return series
+    if series.dtype.is_integer():
+        return series.cast(pl.Utf8)
+    return pl.Series(series.name, [None if v is None else str(v) for v in series.to_list()], dtype=pl.Utf8)
+
+
+def _truthy(series: pl.Series) -> pl.Series:
+    """Python truthiness per element."""
+    if series.dtype == pl.Utf8:
+        return series.is_not_null() & (series != "")
+    if series.dtype.is_numeric():
+        return series.is_not_null() & (series != 0)
+    if series.dtype == pl.Boolean:
+        return series.fill_null(False)
+    return pl.Series([bool(v) for v in series.to_list()], dtype=pl.Boolean)
+
+
+def _json_values(series: pl.Series) -> pl.Series:
+    """json.dumps(value, default=str) per element."""
+    if series.dtype == pl.Utf8:
+        # Printable ASCII only needs quote/backslash escaping; anything else
+        # (control characters, non-ASCII under ensure_ascii) goes through json.dumps.
+        encoded = (
+            '"' + series.str.replace_all("\\", "\\\\", literal=True).str.replace_all('"', '\\"', literal=True) + '"'
+        )
+        special = series.str.contains(r"[^\x20-\x7e]").fill_null(False)
+        if special.any():
+            idx = special.arg_true()
+            encoded = encoded.scatter(idx, [json.dumps(v) for v in series.gather(idx).to_list()])
+        return encoded.fill_null("null")
+    if series.dtype.is_integer():
+        return series.cast(pl.Utf8).fill_null("null")
+    if series.dtype == pl.Boolean:
+        return series.replace_strict([True, False], ["true", "false"], default="null", return_dtype=pl.Utf8).fill_null("null")
+    return pl.Series([json.dumps(v, default=str) for v in series.to_list()], dtype=pl.Utf8)
+
+
+def _json_rows(frame: pl.DataFrame) -> pl.Series:
+    """json.dumps(row, default=str) for every row, as a column expression."""
+    parts: List[Any] = []
+    for n, name in enumerate(frame.columns):
+        parts.append(pl.lit(("{" if n == 0 else ", ") + json.dumps(name) + ": "))
+        parts.append(pl.lit(_json_values(frame[name])))
+    parts.append(pl.lit("}"))
+    return frame.select(pl.concat_str(parts)).to_series()
@@ -11,6 +11,7 @@ from ..core.vulnintel_bridge import (
     extract_cwe_ids,
     enrich_with_vulnintel,
 )
+from .matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +114,9 @@ _MITRE_RULES: List[Tuple[str, float, str, str, List[str]]] = [
       "hklm\\software\\microsoft\\windows\\currentversion\\run", "startup folder"]),
 ]
 
+# One automaton over every rule keyword, built once per process
+_MITRE_MATCHER = KeywordMatcher([rule[4] for rule in _MITRE_RULES])
+
 
 class Enricher:
     """
@@ -130,18 +134,14 @@ class Enricher:
         if not text:
             return None, 0.0, None, None
 
-        text_lower = text.lower()
-
-        # Find the best (highest confidence) matching rule
-        best = (None, 0.0, None, None)
-        for tech_id, confidence, tactic, tech_name, keywords in _MITRE_RULES:
-            for kw in keywords:
-                if kw in text_lower:
-                    if confidence > best[1]:
-                        best = (tech_id, confidence, tactic, tech_name)
-                    break  # Only match once per rule
+        hits = _MITRE_MATCHER.match(text.lower())
+        if not hits:
+            return None, 0.0, None, None
 
-        return best
+        # Best (highest confidence) matching rule; ties go to the earlier rule
+        idx = min(hits, key=lambda i: (-_MITRE_RULES[i][1], i))
+        tech_id, confidence, tactic, tech_name, _ = _MITRE_RULES[idx]
+        return tech_id, confidence, tactic, tech_name
 
     def calculate_severity(self, event_type: str, mitre_conf: float, cve_max_cvss: Optional[float]) -> str:
         """Map event attributes to a severity label."""
@@ -201,14 +201,17 @@ class Enricher:
 
         return round(min(1.0, max(floor, base)), 3)
 
-    def enrich(self, normalized: Dict[str, Any], rich_text: str, raw_dict: Any) -> Dict[str, Any]:
+    def enrich(self, normalized: Dict[str, Any], rich_text: str, raw_dict: Any,
+               all_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Main enrichment entry point. Mutates and returns the normalized dict.
+        all_text: the _build_enrichment_text result, when the caller already has it.
         Never raises — guarantees safe defaults.
         """
         try:
             # Build enrichment text from all available fields
-            all_text = self._build_enrichment_text(rich_text, raw_dict)
+            if all_text is None:
+                all_text = self._build_enrichment_text(rich_text, raw_dict)
 
             # 1. MITRE ATT&CK
             tech_id, confidence, tactic, tech_name = self.infer_mitre(all_text)
@@ -0,0 +1,105 @@
+"""
+RateGovernor - Opt-in ingest rate control for the Tool1 pipeline.
+Modes:
+  unlimited    - no throttling (offline backfills of historical logs)
+  token_bucket - fixed events/sec ceiling (live tailing)
+  adaptive     - AIMD rate that backs off when the writer's flushes slow down
+Tokens are charged per batch, and each deficit is paid with a single sleep.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateGovernor:
+    """Batch-aware token bucket with unlimited / fixed / adaptive refill rates."""
+
+    MODES = ("unlimited", "token_bucket", "adaptive")
+
+    # Adaptive mode bounds (events/sec)
+    MIN_RATE = 50.0
+    INCREASE_FRACTION = 0.10   # additive increase per healthy flush (of the starting rate)
+    DECREASE_FACTOR = 0.5      # multiplicative decrease on a slow flush
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        rate: Optional[float] = None,
+        flush_target_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.mode = (mode or settings.INGEST_RATE_MODE).lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown rate mode '{self.mode}' (expected one of {', '.join(self.MODES)})")
+
+        self.base_rate = float(rate or settings.MAX_INGEST_RATE)
+        self.rate = self.base_rate
+        self.max_rate = self.base_rate * 10
+        self.flush_target = float(flush_target_seconds or settings.ADAPTIVE_FLUSH_TARGET_SECONDS)
+
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.rate
+        self._last_refill = clock()
+        self._started: Optional[float] = None
+        self._events = 0
+        self._throttled = 0.0
+        self._backoffs = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "unlimited"
+
+    def acquire(self, n: int = 1) -> None:
+        """Charge n events against the bucket, sleeping once if it runs dry."""
+        now = self._clock()
+        if self._started is None:
+            self._started = now
+        self._events += n
+        if not self.enabled or n <= 0:
+            return
+
+        elapsed = now - self._last_refill
+        self._tokens = min(self.rate, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+        if self._tokens >= n:
+            self._tokens -= n
+            return
+
+        wait = (n - self._tokens) / self.rate
+        self._sleep(wait)
+        self._throttled += wait
+        self._tokens = 0.0
+        self._last_refill = self._clock()
+
+    def observe_flush(self, events: int, seconds: float) -> None:
+        """Writer backpressure signal; only adaptive mode reacts to it."""
+        if self.mode != "adaptive" or events <= 0:
+            return
+        if seconds > self.flush_target:
+            self.rate = max(self.MIN_RATE, self.rate * self.DECREASE_FACTOR)
+            self._backoffs += 1
+            logger.info(f"[Tool1] Writer flush took {seconds:.2f}s; ingest rate backed off to {self.rate:.0f}/s")
+        else:
+            self.rate = min(self.max_rate, self.rate + self.base_rate * self.INCREASE_FRACTION)
+        self._tokens = min(self._tokens, self.rate)
+
+    def stats(self) -> Dict[str, Any]:
+        """Achieved-rate report for the ingestion summary."""
+        elapsed = (self._clock() - self._started) if self._started is not None else 0.0
+        return {
+            "mode": self.mode,
+            "configured_rate": None if not self.enabled else self.base_rate,
+            "current_rate": None if not self.enabled else round(self.rate, 1),
+            "events": self._events,
+            "elapsed_seconds": round(elapsed, 3),
+            "achieved_rate": round(self._events / elapsed, 1) if elapsed > 0 else None,
+            "throttled_seconds": round(self._throttled, 3),
+            "backoffs": self._backoffs,
+        }
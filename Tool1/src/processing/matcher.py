@@ -0,0 +1,114 @@
+"""
+KeywordMatcher - Aho-Corasick multi-pattern matching for keyword rule tables.
+One automaton per rule table, built once per process, finds every rule hit in a
+single pass over the text. Uses pyahocorasick when installed, otherwise a
+pure-Python automaton compiled to a DFA (one dict lookup per character).
+"""
+import logging
+from collections import deque
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Matches a text against groups of literal keywords.
+    groups[i] is the keyword list for rule i; match() returns the set of rule
+    indices with at least one keyword occurring anywhere in the text
+    (exactly what `any(kw in text for kw in groups[i])` gives, for every i).
+    """
+
+    def __init__(self, groups: Sequence[Sequence[str]], backend: Optional[str] = None):
+        owners: Dict[str, Set[int]] = {}
+        for idx, keywords in enumerate(groups):
+            for kw in keywords:
+                if kw:
+                    owners.setdefault(kw, set()).add(idx)
+        self._owners = {kw: frozenset(ids) for kw, ids in owners.items()}
+
+        if backend is None:
+            backend = "pyahocorasick" if _ahocorasick is not None else "python"
+        self.backend = backend
+
+        if backend == "pyahocorasick":
+            automaton = _ahocorasick.Automaton()
+            for kw, ids in self._owners.items():
+                automaton.add_word(kw, ids)
+            automaton.make_automaton()
+            self._automaton = automaton
+        elif backend == "python":
+            self._delta, self._out = self._compile_dfa(self._owners)
+        else:
+            raise ValueError(f"Unknown matcher backend: {backend}")
+
+    def match(self, text: str) -> Set[int]:
+        """Return the indices of every group with a keyword in text."""
+        hits: Set[int] = set()
+        if not text:
+            return hits
+        if self.backend == "pyahocorasick":
+            for _, ids in self._automaton.iter(text):
+                hits |= ids
+            return hits
+
+        delta, out = self._delta, self._out
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            ids = out[state]
+            if ids:
+                hits |= ids
+        return hits
+
+    def first(self, text: str) -> Optional[int]:
+        """Lowest matching group index (first rule in table order), or None."""
+        hits = self.match(text)
+        return min(hits) if hits else None
+
+    @staticmethod
+    def _compile_dfa(owners: Dict[str, FrozenSet[int]]):
+        """Build the goto/fail trie, then fold failure links into a full DFA."""
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Set[int]] = [set()]
+        for kw, ids in owners.items():
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    out.append(set())
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            out[state] |= ids
+
+        alphabet = {ch for edges in goto for ch in edges}
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [{}] * len(goto)
+
+        # Breadth-first: a state's fail target is always shallower, so its row
+        # of the DFA is complete before we need it.
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state] |= out[fail[state]]
+            row: Dict[str, int] = {}
+            for ch in alphabet:
+                nxt = goto[state].get(ch)
+                if nxt is not None:
+                    fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                    queue.append(nxt)
+                    row[ch] = nxt
+                else:
+                    target = delta[fail[state]].get(ch, 0)
+                    if target:
+                        row[ch] = target
+            delta[state] = row
+
+        return delta, [frozenset(ids) if ids else None for ids in out]
@@ -1,6 +1,7 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Dict, Any, Optional
-import dateutil.parser
+
+from .timestamps import TimestampParser
 
 class Normalizer:
     """
@@ -8,28 +9,15 @@ class Normalizer:
     Handles timestamp conversion (to UTC), host canonicalization, etc.
     """
 
-    @staticmethod
-    def normalize_timestamp(raw_ts: Any) -> datetime:
+    def __init__(self):
+        self.timestamps = TimestampParser()
+
+    def normalize_timestamp(self, raw_ts: Any, source: str = "") -> datetime:
         """
         Convert various timestamp formats to Strict UTC datetime.
+        source (the log category) lets the parser learn that source's format.
         """
-        if isinstance(raw_ts, datetime):
-             if raw_ts.tzinfo is None:
-                 return raw_ts.replace(tzinfo=timezone.utc)
-             return raw_ts.astimezone(timezone.utc)
-        
-        try:
-            # Attempt integer/float timestamp (seconds)
-            if isinstance(raw_ts, (int, float)):
-                return datetime.fromtimestamp(raw_ts, tz=timezone.utc)
-            
-            # Attempt ISO/String parsing
-            dt = dateutil.parser.parse(str(raw_ts))
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc)
-        except Exception:
-            raise ValueError(f"Could not normalize timestamp: {raw_ts}")
+        return self.timestamps.parse(raw_ts, source)
 
     @staticmethod
     def normalize_host(host: Optional[str]) -> Optional[str]:
@@ -0,0 +1,154 @@
+"""
+ParallelRunner - Multi-process extraction/enrichment for the Tool1 pipeline.
+Raw records (or record-batch slices) are sharded into chunks and prepared by a
+pool of worker processes running the same _prepare / BatchProcessor code as the
+single-process paths. The parent commits the prepared chunks strictly in input
+order, so previous_event_hash chaining, output order and the summary are the
+same as with workers=1.
+"""
+import logging
+import multiprocessing
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from ..ingestion.base import BaseIngestor
+
+if TYPE_CHECKING:
+    from .pipeline import Pipeline, _RunStats
+
+logger = logging.getLogger(__name__)
+
+ROW_CHUNK = 256       # Raw events per task in row mode (batch mode uses batch_size)
+PENDING_PER_WORKER = 4  # In-flight chunks per worker; bounds parent memory
+
+# Per-process state, built once by _init_worker
+_worker_pipeline = None
+_worker_processor = None
+
+
+def _init_worker(ingestor: BaseIngestor) -> None:
+    global _worker_pipeline, _worker_processor
+    from .batch import BatchProcessor
+    from .pipeline import Pipeline
+
+    _worker_pipeline = Pipeline(ingestor)
+    _worker_processor = BatchProcessor(_worker_pipeline)
+
+
+def _portable(error: Exception) -> Exception:
+    """Exceptions travel back to the parent pickled; degrade those that cannot."""
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(str(error))
+
+
+def _prepare_chunk(chunk: Any, batched: bool) -> Tuple[List[Union[dict, Exception]], Dict[str, Dict[str, Any]]]:
+    """
+    Worker task: one result per input record, in order (enriched dict or Exception),
+    plus the worker's parser/cache counters for the chunk.
+    """
+    if batched:
+        if isinstance(chunk, list):
+            prepared = _worker_processor.process(chunk)
+        else:
+            prepared = _worker_processor.process_frame(chunk)
+    else:
+        prepared = []
+        for raw_event in chunk:
+            try:
+                prepared.append(_worker_pipeline._prepare(raw_event))
+            except Exception as e:
+                prepared.append(e)
+    counters = _worker_pipeline._take_counters()
+    return [_portable(p) if isinstance(p, Exception) else p for p in prepared], counters
+
+
+class ParallelRunner:
+    """
+    Shards a pipeline run over a process pool.
+    Only extraction, normalization and enrichment run in the workers; the
+    CanonicalEvent build, hash chain, writer and stats stay in the parent,
+    which consumes results in submission order from a bounded window.
+    """
+
+    def __init__(self, pipeline: "Pipeline", workers: int, worker_ingestor: Optional[BaseIngestor] = None):
+        self.pipeline = pipeline
+        self.workers = workers
+        # Only used to construct each worker's Pipeline; defaults to the pipeline's own ingestor
+        self.worker_ingestor = worker_ingestor or pipeline.ingestor
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ParallelRunner":
+        """Keep one pool across several run() calls (multi-file ingestion)."""
+        # spawn, not fork: the parent may already hold Polars/Arrow thread pools
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.worker_ingestor,),
+        )
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._pool.shutdown()
+        self._pool = None
+
+    def run(self, max_lines: int, batch_size: int, stats: "_RunStats") -> None:
+        if self._pool is None:
+            with self:
+                self._run(max_lines, batch_size, stats)
+        else:
+            self._run(max_lines, batch_size, stats)
+
+    def _run(self, max_lines: int, batch_size: int, stats: "_RunStats") -> None:
+        pipeline = self.pipeline
+        batched = batch_size > 0
+        pending: Deque[tuple] = deque()
+        seen = 0
+
+        for chunk, size in self._chunks(max_lines, batch_size):
+            pipeline.governor.acquire(size)
+            pending.append((self._pool.submit(_prepare_chunk, chunk, batched), seen))
+            seen += size
+            if len(pending) >= self.workers * PENDING_PER_WORKER:
+                self._commit_next(pending, stats)
+        while pending:
+            self._commit_next(pending, stats)
+
+    def _commit_next(self, pending: Deque[tuple], stats: "_RunStats") -> None:
+        future, first_index = pending.popleft()
+        prepared, counters = future.result()
+        self.pipeline._merge_counters(counters)
+        self.pipeline._commit_batch(prepared, first_index, stats)
+
+    def _chunks(self, max_lines: int, batch_size: int) -> Iterator[tuple]:
+        """Yield (chunk, record_count) up to max_lines records."""
+        ingestor = self.pipeline.ingestor
+        size = batch_size if batch_size > 0 else ROW_CHUNK
+        seen = 0
+
+        if batch_size > 0 and ingestor.supports_batches:
+            for frame in ingestor.iter_batches():
+                for offset in range(0, frame.height, size):
+                    if seen >= max_lines:
+                        logger.info(f"[Tool1] Reached max limit of {max_lines}")
+                        return
+                    chunk = frame.slice(offset, min(size, max_lines - seen))
+                    seen += chunk.height
+                    yield chunk, chunk.height
+            return
+
+        events = ingestor.ingest()
+        while seen < max_lines:
+            chunk = list(islice(events, min(size, max_lines - seen)))
+            if not chunk:
+                return
+            seen += len(chunk)
+            yield chunk, len(chunk)
+        if next(events, None) is not None:
+            logger.info(f"[Tool1] Reached max limit of {max_lines}")
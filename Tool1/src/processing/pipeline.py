@@ -2,18 +2,24 @@
 Pipeline - Orchestrates: Ingest → Normalize → Enrich → Store → Report.
 Production-grade: fully fault-tolerant, captures 100% of events.
 """
+import contextlib
+import hashlib
 import json
 import logging
 import time
-import uuid
 import re
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from ..ingestion.base import BaseIngestor
+from ..ingestion.base import BaseIngestor, RawEvent
 from ..processing.normalizer import Normalizer
 from ..processing.enricher import Enricher
+from ..processing.governor import RateGovernor
+from ..processing.matcher import KeywordMatcher
+from ..storage.dedup import DedupIndex
 from ..storage.writer import StorageWriter
 from ..core.schema import CanonicalEvent
 from ..core.config import settings
@@ -47,6 +53,157 @@ _EVENT_TYPE_KEYWORDS = [
     ("scan_result",    ["nmap", "port scan", "host discovery", "open port", "service scan"]),
 ]
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Candidate key paths for canonical field extraction (first non-None wins)
+# ─────────────────────────────────────────────────────────────────────────────
+_SOURCE_HOST_KEYS = (
+    "source_host", "src_ip", "source_computer", "client_ip", "src_host", "src",
+    "agent.ip", "agent.name", "hostname", "uri", "IP Source", "Source IP",
+)
+_TARGET_HOST_KEYS = (
+    "dest_host", "dest_ip", "target_host", "server_ip", "dst",
+    "Destination IP", "target_computer",
+)
+_USER_KEYS = (
+    "user", "username", "uid", "source_user",
+    "data.srcuser", "data.dstuser",
+    "data.win.eventdata.targetUserName",
+    "data.win.eventdata.subjectUserName",
+    "win.eventdata.targetUserName",
+    "user.name", "principal", "Account Name",
+)
+_PORT_KEYS = ("dest_port", "dst_port", "port", "remote_port", "Destination Port")
+_PROTOCOL_KEYS = (
+    "protocol", "proto", "service", "auth_type",
+    "decoder.name", "location",
+)
+_RAW_TEXT_KEYS = (
+    "raw_text", "full_log", "message", "log_line", "description",
+    "rule.description", "syslog_message", "alert", "name", "desc",
+)
+_TIMESTAMP_KEYS = (
+    "timestamp", "@timestamp", "time", "Timestamp",
+    "event_time", "date", "created", "scan_start",
+)
+
+_EVENT_TYPE_MATCHER = KeywordMatcher([keywords for _, keywords in _EVENT_TYPE_KEYWORDS])
+
+_IP_RE = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+_USER_RE = re.compile(r'(?:user|account|principal|from user)[:=\s]+([^\s,;@\]]+)', re.I)
+
+RAW_SOURCE_LIMIT = 4000  # Characters of the raw record stored as raw_source
+
+# Per-stage wall time reported in the summary (stage_seconds)
+_STAGES = ("extract", "raw_source", "enrichment_text", "normalize", "enrich", "store")
+
+
+def _raw_source(raw: Any) -> Tuple[str, Optional[str]]:
+    """
+    raw_source for a record - the original JSON line when the ingestor kept it,
+    else its JSON encoding - cut to RAW_SOURCE_LIMIT, and its record_hash for
+    dedup: the sha256 of the whole text when it was cut (records that only
+    differ past the cut must not collide), else None - raw_hash is that hash.
+    """
+    text = raw.source_text if isinstance(raw, RawEvent) else json.dumps(raw, default=str)
+    if len(text) > RAW_SOURCE_LIMIT:
+        return text[:RAW_SOURCE_LIMIT], _sha256(text)
+    return text, None
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+# (key, dotted path parts or None) per candidate, as _get reads them
+_KeyPaths = Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...]
+
+
+def _compile_paths(keys: Tuple[str, ...], present: frozenset) -> _KeyPaths:
+    """Candidates that can resolve for a record with these top-level keys, in order."""
+    paths = []
+    for key in keys:
+        parts = tuple(key.split(".")) if "." in key else None
+        if (parts[0] if parts else key) in present:
+            paths.append((key, parts))
+    return tuple(paths)
+
+
+def _first_value(raw: Dict[str, Any], paths: _KeyPaths) -> Optional[str]:
+    """_get over precompiled key paths."""
+    for key, parts in paths:
+        if parts is None:
+            val = raw.get(key)
+        else:
+            val = raw
+            for p in parts:
+                if isinstance(val, dict):
+                    val = val.get(p)
+                else:
+                    val = None
+                    break
+        if val is not None:
+            return str(val)
+    return None
+
+
+class _FieldPlan:
+    """
+    Candidate key paths per canonical field, pruned to one record shape (top-level
+    keys), plus which nested Wazuh fallbacks (agent, manager, ...) the shape can reach.
+    """
+
+    __slots__ = ("source_host", "target_host", "user", "port", "protocol", "raw_text",
+                 "agent", "manager", "data", "decoder", "rule", "syscheck")
+
+    def __init__(self, shape: Tuple[Any, ...]):
+        present = frozenset(shape)
+        for key in ("agent", "manager", "data", "decoder", "rule", "syscheck"):
+            setattr(self, key, key in present)
+        self.source_host = _compile_paths(_SOURCE_HOST_KEYS, present)
+        self.target_host = _compile_paths(_TARGET_HOST_KEYS, present)
+        self.user = _compile_paths(_USER_KEYS, present)
+        self.port = _compile_paths(_PORT_KEYS, present)
+        self.protocol = _compile_paths(_PROTOCOL_KEYS, present)
+        self.raw_text = _compile_paths(_RAW_TEXT_KEYS, present)
+
+
+class _PlanCache:
+    """Bounded (FIFO) map from record shape to its _FieldPlan, with hit/miss counters."""
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = settings.EXTRACTION_PLAN_CACHE_SIZE if size is None else size
+        self._plans: "OrderedDict[Tuple[Any, ...], _FieldPlan]" = OrderedDict()
+        self.counts: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    def get(self, raw: Dict[str, Any]) -> _FieldPlan:
+        shape = tuple(raw)
+        plan = self._plans.get(shape)
+        if plan is not None:
+            self.counts["hits"] += 1
+            return plan
+        self.counts["misses"] += 1
+        plan = self._plans[shape] = _FieldPlan(shape)
+        if len(self._plans) > self.size:
+            self._plans.popitem(last=False)
+        return plan
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = self.counts["hits"], self.counts["misses"]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "cached_plans": len(self._plans),
+        }
+
+    def merge(self, counts: Dict[str, int]) -> None:
+        for name, n in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def take_counts(self) -> Dict[str, int]:
+        counts, self.counts = self.counts, {"hits": 0, "misses": 0}
+        return counts
+
 
 class Pipeline:
     """
@@ -55,30 +212,33 @@ class Pipeline:
     """
 
     PARSER_VERSION = "2.0.0"
+    RATE_CHUNK = 100  # Row path charges the rate governor once per this many events
 
-    def __init__(self, ingestor: BaseIngestor):
+    def __init__(self, ingestor: BaseIngestor, governor: Optional[RateGovernor] = None,
+                 hash_scheme: Optional[str] = None, dedup: Optional[bool] = None):
         self.ingestor = ingestor
         self.normalizer = Normalizer()
         self.enricher = Enricher()
         self.writer = StorageWriter()
         self.previous_event_hash: Optional[str] = None
-
-        # Rate limiting (token bucket)
-        self.rate_limit = settings.MAX_INGEST_RATE
-        self._tokens = float(self.rate_limit)
-        self._last_refill = time.time()
-
-    # ─────────────────────────────────────────────────────────────────────────
-    # Rate Limiting
-    # ─────────────────────────────────────────────────────────────────────────
-    def _throttle(self) -> None:
-        now = time.time()
-        elapsed = now - self._last_refill
-        self._tokens = min(float(self.rate_limit), self._tokens + elapsed * self.rate_limit)
-        self._last_refill = now
-        if self._tokens < 1.0:
-            time.sleep(1.0 / self.rate_limit)
-        self._tokens = max(0.0, self._tokens - 1.0)
+        self.hash_scheme = hash_scheme or settings.HASH_SCHEME
+        self.summary_path = settings.BASE_DIR / "ingestion_summary.json"
+        self.plans = _PlanCache()
+        self.stage_seconds: Dict[str, float] = dict.fromkeys(_STAGES, 0.0)
+        # Content-addressed dedup (opened on first commit; worker processes never commit).
+        # The source events are deduplicated as: one per ingested file per run, the file
+        # identity when following (where dedup_position, the line's offset, is set too)
+        self.dedup_enabled = settings.DEDUP_ENABLED if dedup is None else dedup
+        self._dedup: Optional[DedupIndex] = None
+        self.dedup_source = self._new_dedup_source()
+        self.dedup_position: Optional[int] = None
+
+        # Rate limiting (opt-in; unlimited by default)
+        self.governor = governor or RateGovernor()
+        self.writer.flush_listener = self.governor.observe_flush
+        if settings.CATALOG_ENABLED:
+            from ..storage.catalog import register_files
+            self.writer.file_listener = register_files
 
     # ─────────────────────────────────────────────────────────────────────────
     # Field Extraction (universal field mapping)
@@ -112,77 +272,60 @@ class Pipeline:
         """
         if not isinstance(raw, dict):
             return {"raw_text": str(raw)}
+        # Candidate key lists pruned once per record shape
+        plan = self.plans.get(raw)
 
         # ── Source Host ──────────────────────────────────────────────────────
-        source_host = self._get(raw,
-            "source_host", "src_ip", "source_computer", "client_ip", "src_host", "src",
-            "agent.ip", "agent.name", "hostname", "uri", "IP Source", "Source IP",
-        )
+        source_host = _first_value(raw, plan.source_host)
         # Wazuh agent fallback
-        if not source_host and isinstance(raw.get("agent"), dict):
+        if not source_host and plan.agent and isinstance(raw["agent"], dict):
             source_host = raw["agent"].get("ip") or raw["agent"].get("name")
 
         # Manager fallback for Wazuh
-        if not source_host and isinstance(raw.get("manager"), dict):
+        if not source_host and plan.manager and isinstance(raw["manager"], dict):
             source_host = raw["manager"].get("name")
 
         # ── Target Host ──────────────────────────────────────────────────────
-        target_host = self._get(raw,
-            "dest_host", "dest_ip", "target_host", "server_ip", "dst",
-            "Destination IP", "target_computer",
-        )
+        target_host = _first_value(raw, plan.target_host)
 
         # ── User ─────────────────────────────────────────────────────────────
-        user = self._get(raw,
-            "user", "username", "uid", "source_user",
-            "data.srcuser", "data.dstuser",
-            "data.win.eventdata.targetUserName",
-            "data.win.eventdata.subjectUserName",
-            "win.eventdata.targetUserName",
-            "user.name", "principal", "Account Name",
-        )
+        user = _first_value(raw, plan.user)
         # Wazuh data dict
-        if not user and isinstance(raw.get("data"), dict):
+        if not user and plan.data and isinstance(raw["data"], dict):
             data = raw["data"]
             user = (data.get("srcuser") or data.get("dstuser") or
                     data.get("win", {}).get("eventdata", {}).get("targetUserName") if isinstance(data.get("win"), dict) else None)
 
         # ── Port ─────────────────────────────────────────────────────────────
-        port_raw = self._get(raw, "dest_port", "dst_port", "port", "remote_port", "Destination Port")
+        port_raw = _first_value(raw, plan.port)
         port: Optional[int] = None
         if port_raw and str(port_raw).isdigit():
             port = int(port_raw)
 
         # ── Protocol ─────────────────────────────────────────────────────────
-        protocol = self._get(raw,
-            "protocol", "proto", "service", "auth_type",
-            "decoder.name", "location",
-        )
-        if not protocol and isinstance(raw.get("decoder"), dict):
+        protocol = _first_value(raw, plan.protocol)
+        if not protocol and plan.decoder and isinstance(raw["decoder"], dict):
             protocol = raw["decoder"].get("name")
 
         # ── Rich Text (for enrichment) ────────────────────────────────────────
-        raw_text = self._get(raw,
-            "raw_text", "full_log", "message", "log_line", "description",
-            "rule.description", "syslog_message", "alert", "name", "desc",
-        )
+        raw_text = _first_value(raw, plan.raw_text)
         if not raw_text:
             # Wazuh rule description
-            if isinstance(raw.get("rule"), dict):
+            if plan.rule and isinstance(raw["rule"], dict):
                 raw_text = raw["rule"].get("description", "")
             # Syscheck path as fallback
-            if not raw_text and isinstance(raw.get("syscheck"), dict):
+            if not raw_text and plan.syscheck and isinstance(raw["syscheck"], dict):
                 sc = raw["syscheck"]
                 raw_text = f"File/registry {sc.get('event', 'modified')}: {sc.get('path', '')}"
 
         # ── Agent Name ────────────────────────────────────────────────────────
         agent_name = None
-        if isinstance(raw.get("agent"), dict):
+        if plan.agent and isinstance(raw["agent"], dict):
             agent_name = raw["agent"].get("name")
 
         # ── Log Category ─────────────────────────────────────────────────────
         log_category = raw.get("_wazuh_category") or raw.get("_parsing_type") or "generic"
-        if isinstance(raw.get("rule"), dict):
+        if plan.rule and isinstance(raw["rule"], dict):
             groups = raw["rule"].get("groups", [])
             if groups:
                 if "syscheck" in groups:
@@ -194,14 +337,14 @@ class Pipeline:
 
         # ── Regex fallback for IPs / users from raw text ──────────────────────
         if raw_text and not source_host:
-            ips = re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', raw_text)
+            ips = _IP_RE.findall(raw_text)
             if ips:
                 source_host = ips[0]
                 if len(ips) > 1:
                     target_host = ips[1]
 
         if raw_text and not user:
-            m = re.search(r'(?:user|account|principal|from user)[:=\s]+([^\s,;@\]]+)', raw_text, re.I)
+            m = _USER_RE.search(raw_text)
             if m:
                 user = m.group(1)
 
@@ -223,9 +366,9 @@ class Pipeline:
         """Determine semantic event type from log signals."""
         combined = (raw_text + " " + log_category + " " + str(raw.get("_parsing_type", ""))).lower()
 
-        for event_type, keywords in _EVENT_TYPE_KEYWORDS:
-            if any(kw in combined for kw in keywords):
-                return event_type
+        first = _EVENT_TYPE_MATCHER.first(combined)
+        if first is not None:
+            return _EVENT_TYPE_KEYWORDS[first][0]
 
         # Wazuh rule groups
         if isinstance(raw.get("rule"), dict):
@@ -242,193 +385,518 @@ class Pipeline:
     # ─────────────────────────────────────────────────────────────────────────
     # Timestamp Extraction
     # ─────────────────────────────────────────────────────────────────────────
-    def _extract_timestamp(self, raw: Dict[str, Any]) -> datetime:
-        """Extract and normalize timestamp from raw event dict."""
+    @staticmethod
+    def _raw_timestamp(raw: Any) -> Any:
+        """Return the first truthy timestamp-like value in a raw event, or None."""
         if not isinstance(raw, dict):
-            return datetime.now(timezone.utc)
+            return None
+        for key in _TIMESTAMP_KEYS:
+            val = raw.get(key)
+            if val:
+                return val
+        return None
 
-        raw_ts = (
-            raw.get("timestamp") or raw.get("@timestamp") or
-            raw.get("time") or raw.get("Timestamp") or
-            raw.get("event_time") or raw.get("date") or
-            raw.get("created") or raw.get("scan_start")
-        )
+    def _extract_timestamp(self, raw: Dict[str, Any], source: str = "") -> datetime:
+        """Extract and normalize timestamp from raw event dict (wall clock when missing/unreadable)."""
+        return self.normalizer.timestamps.parse_or_now(self._raw_timestamp(raw), source)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Per-Event Processing (row path)
+    # ─────────────────────────────────────────────────────────────────────────
+    def _prepare(self, raw_event: Any) -> Dict[str, Any]:
+        """
+        Extract → normalize → enrich a single raw event.
+        Returns the enriched dict plus 'timestamp', 'raw_source' and 'record_hash', ready for _commit.
+        """
+        clock = time.perf_counter
+        t0 = clock()
+        # ── 1. Extract canonical fields ──────────────────────────────────────
+        fields = self._extract_fields(raw_event)
+        t1 = clock()
+        raw_source, record_hash = _raw_source(raw_event)
+        t2 = clock()
+        # Flattened once; MITRE matching and the CVE/CWE regexes all read it
+        all_text = self.enricher._build_enrichment_text(fields["raw_text"], raw_event)
+        t3 = clock()
+
+        # ── 2. Normalize ─────────────────────────────────────────────────────
+        timestamp = self._extract_timestamp(raw_event, fields["log_category"])
+
+        norm_host = self.normalizer.normalize_host(fields["source_host"])
+        norm_target = self.normalizer.normalize_host(fields["target_host"])
+        norm_user = self.normalizer.normalize_user(fields["user"])
+        norm_protocol = (fields["protocol"] or "unknown").upper()
+        log_category = fields["log_category"]
+        raw_text = fields["raw_text"]
+
+        event_type = self._infer_event_type(raw_event, raw_text, log_category)
+
+        # ── 3. Build normalized dict for enrichment ──────────────────────────
+        normalized = {
+            "event_type": event_type,
+            "source_host": norm_host,
+            "target_host": norm_target,
+            "user": norm_user,
+            "agent_name": fields.get("agent_name"),
+            "protocol": norm_protocol,
+            "port": fields["port"],
+            "log_category": log_category,
+        }
 
-        if not raw_ts:
-            return datetime.now(timezone.utc)
+        t4 = clock()
+        # ── 4. Enrich (MITRE + CVE + VulnIntel) ─────────────────────────────
+        enriched = self.enricher.enrich(normalized, raw_text, raw_event, all_text=all_text)
+        enriched["timestamp"] = timestamp
+        enriched["raw_source"] = raw_source
+        enriched["record_hash"] = record_hash
+
+        stages = self.stage_seconds
+        stages["extract"] += t1 - t0
+        stages["raw_source"] += t2 - t1
+        stages["enrichment_text"] += t3 - t2
+        stages["normalize"] += t4 - t3
+        stages["enrich"] += clock() - t4
+        return enriched
+
+    @property
+    def dedup(self) -> DedupIndex:
+        if self._dedup is None:
+            # In the output directory: deleting the output discards the index with it
+            self._dedup = DedupIndex(self.writer.output_dir / settings.DEDUP_FILE)
+        return self._dedup
+
+    def _new_dedup_source(self) -> str:
+        return f"{self.ingestor.file_path}#{uuid.uuid4().hex}"
+
+    def _finalize(self) -> None:
+        """Finalize the open Parquet files, then commit the dedup keys of the events in them."""
+        self.writer.close()
+        if self._dedup is not None:
+            self._dedup.commit()
+
+    def _commit(self, enriched: Dict[str, Any], stats: "_RunStats") -> None:
+        """Build the CanonicalEvent, chain its hash, store it and record stats."""
+        started = time.perf_counter()
+        # ── 5. Create CanonicalEvent ──────────────────────────────────────────
+        event = CanonicalEvent.create(
+            event_type=enriched["event_type"],
+            timestamp=enriched["timestamp"],
+            source_file=str(self.ingestor.file_path),
+            parser_version=self.PARSER_VERSION,
+            raw_source=enriched["raw_source"],
+            log_category=enriched["log_category"],
+            source_host=enriched.get("source_host"),
+            target_host=enriched.get("target_host"),
+            user=enriched.get("user"),
+            agent_name=enriched.get("agent_name"),
+            protocol=enriched.get("protocol"),
+            port=enriched.get("port"),
+            mitre_technique=enriched.get("mitre_technique"),
+            mitre_tactic=enriched.get("mitre_tactic"),
+            mitre_technique_name=enriched.get("mitre_technique_name"),
+            observed_cve_ids=enriched.get("observed_cve_ids", []),
+            observed_cwe_ids=enriched.get("observed_cwe_ids", []),
+            cve_max_cvss=enriched.get("cve_max_cvss"),
+            cve_severity=enriched.get("cve_severity"),
+            is_kev=enriched.get("is_kev", False),
+            confidence_score=enriched.get("confidence_score", 0.0),
+            data_quality_score=enriched.get("data_quality_score", 0.0),
+            risk_score=enriched.get("risk_score", 0.0),
+            severity=enriched.get("severity", "info"),
+            model_version=enriched.get("model_version", "v1.0"),
+            previous_event_hash=self.previous_event_hash,
+            hash_scheme=self.hash_scheme,
+        )
 
-        try:
-            return self.normalizer.normalize_timestamp(raw_ts)
-        except Exception:
-            return datetime.now(timezone.utc)
+        # ── 6. Chain hash ─────────────────────────────────────────────────────
+        event.compute_event_hash(self.previous_event_hash)
+
+        # ── 7. Skip already-stored events ─────────────────────────────────────
+        duplicate = self.dedup.seen_or_add(
+            event.log_category, enriched.get("record_hash") or event.raw_hash, event.event_hash,
+            self.dedup_source, self.dedup_position,
+        ) if self.dedup_enabled else None
+        if duplicate is not None:
+            if duplicate.replay and duplicate.event_hash:
+                # This very line was stored before a crash: the chain goes on from it, not past it
+                self.previous_event_hash = duplicate.event_hash
+            stats.duplicates += 1
+            self.stage_seconds["store"] += time.perf_counter() - started
+            return
+        self.previous_event_hash = event.event_hash
+
+        # ── 8. Store ──────────────────────────────────────────────────────────
+        self.writer.write(event)
+
+        # ── 9. Track stats ────────────────────────────────────────────────────
+        stats.record(enriched)
+        self.stage_seconds["store"] += time.perf_counter() - started
 
     # ─────────────────────────────────────────────────────────────────────────
     # Main Run Loop
     # ─────────────────────────────────────────────────────────────────────────
-    def run(self, max_lines: int = 5000) -> Dict[str, Any]:
+    def run(self, max_lines: int = 5000, batch_size: int = 0, workers: int = 1) -> Dict[str, Any]:
         """
         Execute the full pipeline. Returns a summary dict.
         Guarantees: every parseable event is processed; zero silent data loss.
+
+        batch_size > 0 switches to columnar batch mode: raw events are collected
+        into batches and typed/scored with vectorized Polars expressions
+        (see BatchProcessor). Output is identical to the row-at-a-time path.
+
+        workers > 1 prepares events in that many worker processes (see
+        ParallelRunner); hashing and storage stay here, in input order.
         """
-        logger.info(f"[Tool1] Pipeline starting: {self.ingestor.file_path} (limit={max_lines})")
+        logger.info(
+            f"[Tool1] Pipeline starting: {self.ingestor.file_path} "
+            f"(limit={max_lines}, batch={batch_size}, workers={workers})"
+        )
         print(f"[Tool1] Processing: {self.ingestor.file_path.name}")
 
-        count_success = 0
-        count_fail = 0
-        type_counts: Dict[str, int] = {}
-        host_counts: Dict[str, int] = {}
-        user_counts: Dict[str, int] = {}
-        mitre_counts: Dict[str, int] = {}
-        cve_encountered: list = []
-        severity_counts: Dict[str, int] = {}
+        self.dedup_source = self._new_dedup_source()
+        stats = _RunStats()
+        started = time.perf_counter()
 
         try:
-            for i, raw_event in enumerate(self.ingestor.ingest()):
-                if i >= max_lines:
-                    logger.info(f"[Tool1] Reached max limit of {max_lines}")
-                    break
-
-                self._throttle()
-
-                try:
-                    # ── 1. Extract canonical fields ──────────────────────────
-                    fields = self._extract_fields(raw_event)
-                    raw_source = json.dumps(raw_event, default=str)[:4000]
-
-                    # ── 2. Normalize ─────────────────────────────────────────
-                    timestamp = self._extract_timestamp(raw_event)
-
-                    norm_host = self.normalizer.normalize_host(fields["source_host"])
-                    norm_target = self.normalizer.normalize_host(fields["target_host"])
-                    norm_user = self.normalizer.normalize_user(fields["user"])
-                    norm_protocol = (fields["protocol"] or "unknown").upper()
-                    log_category = fields["log_category"]
-                    raw_text = fields["raw_text"]
-
-                    event_type = self._infer_event_type(raw_event, raw_text, log_category)
-
-                    # ── 3. Build normalized dict for enrichment ──────────────
-                    normalized = {
-                        "event_type": event_type,
-                        "source_host": norm_host,
-                        "target_host": norm_target,
-                        "user": norm_user,
-                        "agent_name": fields.get("agent_name"),
-                        "protocol": norm_protocol,
-                        "port": fields["port"],
-                        "log_category": log_category,
-                    }
-
-                    # ── 4. Enrich (MITRE + CVE + VulnIntel) ─────────────────
-                    enriched = self.enricher.enrich(normalized, raw_text, raw_event)
-
-                    # ── 5. Create CanonicalEvent ──────────────────────────────
-                    event = CanonicalEvent.create(
-                        event_type=enriched["event_type"],
-                        timestamp=timestamp,
-                        source_file=str(self.ingestor.file_path),
-                        parser_version=self.PARSER_VERSION,
-                        raw_source=raw_source,
-                        log_category=enriched["log_category"],
-                        source_host=enriched.get("source_host"),
-                        target_host=enriched.get("target_host"),
-                        user=enriched.get("user"),
-                        agent_name=enriched.get("agent_name"),
-                        protocol=enriched.get("protocol"),
-                        port=enriched.get("port"),
-                        mitre_technique=enriched.get("mitre_technique"),
-                        mitre_tactic=enriched.get("mitre_tactic"),
-                        mitre_technique_name=enriched.get("mitre_technique_name"),
-                        observed_cve_ids=enriched.get("observed_cve_ids", []),
-                        observed_cwe_ids=enriched.get("observed_cwe_ids", []),
-                        cve_max_cvss=enriched.get("cve_max_cvss"),
-                        cve_severity=enriched.get("cve_severity"),
-                        is_kev=enriched.get("is_kev", False),
-                        confidence_score=enriched.get("confidence_score", 0.0),
-                        data_quality_score=enriched.get("data_quality_score", 0.0),
-                        risk_score=enriched.get("risk_score", 0.0),
-                        severity=enriched.get("severity", "info"),
-                        model_version=enriched.get("model_version", "v1.0"),
-                        previous_event_hash=self.previous_event_hash,
-                    )
-
-                    # ── 6. Chain hash ─────────────────────────────────────────
-                    event.compute_event_hash(self.previous_event_hash)
-                    self.previous_event_hash = event.event_hash
-
-                    # ── 7. Store ──────────────────────────────────────────────
-                    self.writer.write(event)
-                    count_success += 1
-
-                    # ── 8. Track stats ────────────────────────────────────────
-                    type_counts[event_type] = type_counts.get(event_type, 0) + 1
-                    sev = enriched.get("severity", "info")
-                    severity_counts[sev] = severity_counts.get(sev, 0) + 1
-                    if norm_host:
-                        host_counts[norm_host] = host_counts.get(norm_host, 0) + 1
-                    if norm_user:
-                        user_counts[norm_user] = user_counts.get(norm_user, 0) + 1
-                    if enriched.get("mitre_technique"):
-                        t = enriched["mitre_technique"]
-                        mitre_counts[t] = mitre_counts.get(t, 0) + 1
-                    cve_encountered.extend(enriched.get("observed_cve_ids", []))
-
-                    if (i + 1) % 100 == 0:
-                        print(f"[Tool1] Processed {i + 1} events... ({count_success} OK, {count_fail} failed)")
-
-                except Exception as e:
-                    count_fail += 1
-                    logger.warning(f"[Tool1] Event {i} rejected: {e}", exc_info=False)
+            if workers > 1:
+                from .parallel import ParallelRunner
+                ParallelRunner(self, workers).run(max_lines, batch_size, stats)
+            else:
+                self._run_source(max_lines, batch_size, stats)
 
         except Exception as fatal:
             logger.critical(f"[Tool1] Pipeline fatal error: {fatal}", exc_info=True)
             raise
 
         finally:
-            # Always flush remaining buffer
+            # Always flush the remaining buffer and finalize the open Parquet files
+            try:
+                self._finalize()
+            except Exception as e:
+                logger.error(f"[Tool1] Final flush failed: {e}")
+
+        elapsed = time.perf_counter() - started
+        return self._finish(stats, max_lines, elapsed, workers)
+
+    def run_many(self, ingestors: List[BaseIngestor], max_lines: int = 5000, batch_size: int = 0,
+                 workers: int = 1, readers: Optional[int] = None, source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run several sources into this pipeline's writer as one run: one hash
+        chain, one ingestion summary (with per-file stats under "files").
+        Files are read ahead on `readers` threads (see ingestion.multi) and
+        processed in the given order; max_lines applies per file. With
+        workers > 1 one process pool prepares every file. A file that fails
+        midway is recorded with its error and the run moves on.
+        """
+        from ..ingestion.multi import prefetch
+
+        source = source or str(ingestors[0].file_path if ingestors else "")
+        logger.info(f"[Tool1] Pipeline starting: {len(ingestors)} files from {source} "
+                    f"(limit={max_lines}/file, batch={batch_size}, workers={workers})")
+        stats = _RunStats()
+        files: List[Dict[str, Any]] = []
+        started = time.perf_counter()
+
+        runner: Any = contextlib.nullcontext()
+        if workers > 1 and ingestors:
+            from .parallel import ParallelRunner
+            runner = ParallelRunner(self, workers, worker_ingestor=ingestors[0])
+        try:
+            with runner:
+                for ingestor in prefetch(ingestors, batched=batch_size > 0, readers=readers):
+                    print(f"[Tool1] Processing: {ingestor.file_path.name}")
+                    self.ingestor = ingestor
+                    self.dedup_source = self._new_dedup_source()
+                    success, failed, duplicates = stats.success, stats.failed, stats.duplicates
+                    file_started = time.perf_counter()
+                    error = None
+                    try:
+                        if workers > 1:
+                            runner.run(max_lines, batch_size, stats)
+                        else:
+                            self._run_source(max_lines, batch_size, stats)
+                    except Exception as e:
+                        logger.error(f"[Tool1] {ingestor.file_path} failed: {e}", exc_info=True)
+                        error = str(e)
+                    finally:
+                        ingestor.close()
+                    files.append({
+                        "path": str(ingestor.file_path),
+                        "ingestor": type(ingestor.inner).__name__,
+                        "bytes": ingestor.file_path.stat().st_size,
+                        "success": stats.success - success,
+                        "failed": stats.failed - failed,
+                        "duplicates_skipped": stats.duplicates - duplicates,
+                        "elapsed_seconds": round(time.perf_counter() - file_started, 3),
+                        "read_seconds": round(ingestor.read_seconds, 3),
+                        "error": error,
+                    })
+        finally:
             try:
-                self.writer.flush()
+                self._finalize()
             except Exception as e:
                 logger.error(f"[Tool1] Final flush failed: {e}")
 
-        # ── 9. Build Summary ──────────────────────────────────────────────────
-        all_cve_unique = list(set(cve_encountered))
+        elapsed = time.perf_counter() - started
+        return self._finish(stats, max_lines, elapsed, workers, extra={"source_file": source, "files": files})
+
+    def follow(self, checkpoint_path: Path, flush_seconds: Optional[float] = None,
+               flush_events: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Tail a FollowIngestor until it goes idle (idle_timeout), is stopped, or
+        is interrupted. Events take the row path; once the oldest unflushed
+        event is flush_seconds old or flush_events are pending, the open Parquet
+        files are finalized (made visible) and the checkpoint saved with the
+        offset and previous_event_hash behind them. The hash chain continues
+        from the checkpoint. A crash between the two re-reads the events since
+        the last checkpoint (at-least-once), never skips them; with dedup on,
+        re-read lines already stored are recognized by their offset, skipped,
+        and the chain continues from their stored hashes, so it does not fork.
+        With --no-dedup they are stored again and the chain forks there.
+        """
+        from ..ingestion.follow import LatencyTracker
+
+        ingestor = self.ingestor
+        flush_seconds = settings.FOLLOW_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        flush_events = settings.FOLLOW_FLUSH_EVENTS if flush_events is None else flush_events
+        self.previous_event_hash = ingestor.checkpoint.previous_event_hash
+        logger.info(f"[Tool1] Following {ingestor.file_path} from offset {ingestor.checkpoint.offset} "
+                    f"(checkpoint {checkpoint_path})")
+        print(f"[Tool1] Following: {ingestor.file_path.name}")
+
+        stats = _RunStats()
+        latency = LatencyTracker()
+        unflushed: List[float] = []  # read time of each event since the last checkpoint
+        checkpoints = 0
+        started = time.perf_counter()
+
+        def checkpoint() -> None:
+            nonlocal checkpoints
+            self._finalize()  # flush + finalize: the events are now visible to readers
+            ingestor.mark(self.previous_event_hash).save(checkpoint_path)
+            visible = time.monotonic()
+            for read_at in unflushed:
+                latency.add(visible - read_at)
+            unflushed.clear()
+            checkpoints += 1
+
+        try:
+            for raw_event in ingestor.follow():
+                if raw_event is not None:
+                    self.governor.acquire(1)
+                    # Dedup by file identity and line offset: repeated lines are kept, re-read ones are not
+                    self.dedup_source, self.dedup_position = ingestor.identity, ingestor.position
+                    try:
+                        self._commit(self._prepare(raw_event), stats)
+                    except Exception as e:
+                        stats.failed += 1
+                        logger.warning(f"[Tool1] Event at offset {ingestor.position} rejected: {e}", exc_info=False)
+                    unflushed.append(ingestor.read_at)
+                    stats.progress(stats.success + stats.failed)
+                if unflushed and (len(unflushed) >= flush_events
+                                  or time.monotonic() - unflushed[0] >= flush_seconds):
+                    checkpoint()
+        except KeyboardInterrupt:
+            logger.info("[Tool1] Follow interrupted; checkpointing")
+        finally:
+            try:
+                checkpoint()
+            finally:
+                ingestor.close()
+
+        elapsed = time.perf_counter() - started
+        return self._finish(stats, 0, elapsed, extra={"follow": {
+            "checkpoint": str(checkpoint_path),
+            "offset": ingestor.position,
+            "rotations": ingestor.rotations,
+            "checkpoints": checkpoints,
+            "read_to_visible_latency": latency.summary(),
+        }})
+
+    def _run_source(self, max_lines: int, batch_size: int, stats: "_RunStats") -> None:
+        """In-process run over self.ingestor."""
+        if batch_size > 0:
+            self._run_batches(max_lines, batch_size, stats)
+        else:
+            self._run_rows(max_lines, stats)
+
+    def _run_rows(self, max_lines: int, stats: "_RunStats") -> None:
+        pending = 0
+        for i, raw_event in enumerate(self.ingestor.ingest()):
+            if i >= max_lines:
+                logger.info(f"[Tool1] Reached max limit of {max_lines}")
+                break
+
+            pending += 1
+            if pending >= self.RATE_CHUNK:
+                self.governor.acquire(pending)
+                pending = 0
+
+            try:
+                self._commit(self._prepare(raw_event), stats)
+            except Exception as e:
+                stats.failed += 1
+                logger.warning(f"[Tool1] Event {i} rejected: {e}", exc_info=False)
+
+            stats.progress(i + 1)
+
+        self.governor.acquire(pending)
+
+    def _run_batches(self, max_lines: int, batch_size: int, stats: "_RunStats") -> None:
+        from .batch import BatchProcessor
+
+        processor = BatchProcessor(self)
+        if self.ingestor.supports_batches:
+            self._run_frames(processor, max_lines, batch_size, stats)
+            return
+
+        batch: List[Any] = []
+        seen = 0
+
+        for raw_event in self.ingestor.ingest():
+            if seen >= max_lines:
+                logger.info(f"[Tool1] Reached max limit of {max_lines}")
+                break
+            batch.append(raw_event)
+            seen += 1
+            if len(batch) >= batch_size:
+                self.governor.acquire(len(batch))
+                self._commit_batch(processor.process(batch), seen - len(batch), stats)
+                batch.clear()
+
+        if batch:
+            self.governor.acquire(len(batch))
+            self._commit_batch(processor.process(batch), seen - len(batch), stats)
+
+    def _run_frames(self, processor: Any, max_lines: int, batch_size: int, stats: "_RunStats") -> None:
+        """Batch mode over an ingestor's record batches; no per-row dicts are built."""
+        seen = 0
+        for frame in self.ingestor.iter_batches():
+            for offset in range(0, frame.height, batch_size):
+                if seen >= max_lines:
+                    logger.info(f"[Tool1] Reached max limit of {max_lines}")
+                    return
+                chunk = frame.slice(offset, min(batch_size, max_lines - seen))
+                self.governor.acquire(chunk.height)
+                self._commit_batch(processor.process_frame(chunk), seen, stats)
+                seen += chunk.height
+
+    def _commit_batch(self, prepared_batch: List[Any], first_index: int, stats: "_RunStats") -> None:
+        for offset, prepared in enumerate(prepared_batch):
+            index = first_index + offset
+            if isinstance(prepared, Exception):
+                stats.failed += 1
+                logger.warning(f"[Tool1] Event {index} rejected: {prepared}", exc_info=False)
+            else:
+                try:
+                    self._commit(prepared, stats)
+                except Exception as e:
+                    stats.failed += 1
+                    logger.warning(f"[Tool1] Event {index} rejected: {e}", exc_info=False)
+            stats.progress(index + 1)
+
+    def _take_counters(self) -> Dict[str, Dict[str, Any]]:
+        """Per-process cache/parser counters since the last call (parallel workers ship these back)."""
+        stage_seconds, self.stage_seconds = self.stage_seconds, dict.fromkeys(_STAGES, 0.0)
+        return {
+            "timestamp_formats": self.normalizer.timestamps.take_counts(),
+            "extraction_plans": self.plans.take_counts(),
+            "stage_seconds": stage_seconds,
+        }
+
+    def _merge_counters(self, counters: Dict[str, Dict[str, Any]]) -> None:
+        self.normalizer.timestamps.merge(counters["timestamp_formats"])
+        self.plans.merge(counters["extraction_plans"])
+        for stage, seconds in counters["stage_seconds"].items():
+            self.stage_seconds[stage] += seconds
+
+    def _finish(self, stats: "_RunStats", max_lines: int, elapsed: float, workers: int = 1,
+                extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # ── 10. Build Summary ─────────────────────────────────────────────────
+        all_cve_unique = list(set(stats.cve_encountered))
         summary = {
-            "total_processed": count_success + count_fail,
+            "total_processed": stats.success + stats.failed + stats.duplicates,
             "ingestion_limit": max_lines,
-            "success": count_success,
-            "failed": count_fail,
+            "success": stats.success,
+            "failed": stats.failed,
+            "duplicates_skipped": stats.duplicates,
             "source_file": str(self.ingestor.file_path),
             "output_dir": str(self.writer.output_dir),
             "timestamp": datetime.now(timezone.utc).isoformat(),
+            "elapsed_seconds": round(elapsed, 3),
+            "workers": workers,
+            "throughput": self.governor.stats(),
+            "timestamp_formats": self.normalizer.timestamps.stats(),
+            "extraction_plans": self.plans.stats(),
+            "dedup": self._dedup.stats() if self._dedup is not None else {"enabled": self.dedup_enabled},
+            # Summed over worker processes when workers > 1
+            "stage_seconds": {stage: round(s, 3) for stage, s in self.stage_seconds.items()},
             "intelligence": {
-                "event_types": type_counts,
-                "severity_breakdown": severity_counts,
-                "mitre_breakdown": mitre_counts,
-                "top_hosts": dict(sorted(host_counts.items(), key=lambda x: x[1], reverse=True)[:10]),
-                "top_users": dict(sorted(user_counts.items(), key=lambda x: x[1], reverse=True)[:10]),
+                "event_types": stats.type_counts,
+                "severity_breakdown": stats.severity_counts,
+                "mitre_breakdown": stats.mitre_counts,
+                "top_hosts": dict(sorted(stats.host_counts.items(), key=lambda x: x[1], reverse=True)[:10]),
+                "top_users": dict(sorted(stats.user_counts.items(), key=lambda x: x[1], reverse=True)[:10]),
                 "cve_ids_observed": all_cve_unique[:50],
                 "total_unique_cves": len(all_cve_unique),
             },
-            "status": "success" if count_success > 0 else "empty",
+            "status": "success" if stats.success > 0 else "empty",
         }
+        if extra:
+            summary.update(extra)
 
         # Write ingestion_summary.json for the UI and downstream tools
         try:
-            tool1_root = Path(__file__).resolve().parent.parent.parent
-            summary_path = tool1_root / "ingestion_summary.json"
-            with open(summary_path, "w", encoding="utf-8") as f:
+            with open(self.summary_path, "w", encoding="utf-8") as f:
                 json.dump(summary, f, indent=2, default=str)
-            print(f"[Tool1] Summary written: {summary_path}")
+            print(f"[Tool1] Summary written: {self.summary_path}")
         except Exception as e:
             logger.error(f"[Tool1] Failed to write summary: {e}")
 
-        logger.info(f"[Tool1] Pipeline complete. Success={count_success}, Failed={count_fail}")
-        print(f"\n[Tool1] ✅ COMPLETE: {count_success} events ingested, {count_fail} failed")
+        logger.info(f"[Tool1] Pipeline complete. Success={stats.success}, Failed={stats.failed}, "
+                    f"Duplicates={stats.duplicates}")
+        print(f"\n[Tool1] ✅ COMPLETE: {stats.success} events ingested, {stats.failed} failed"
+              + (f", {stats.duplicates} duplicates skipped" if stats.duplicates else ""))
         print(f"[Tool1] Output: {self.writer.output_dir}")
-        if mitre_counts:
-            print(f"[Tool1] MITRE Techniques: {mitre_counts}")
+        if stats.mitre_counts:
+            print(f"[Tool1] MITRE Techniques: {stats.mitre_counts}")
         if all_cve_unique:
             print(f"[Tool1] CVEs Observed: {all_cve_unique[:10]}")
 
         return summary
+
+
+class _RunStats:
+    """Counters accumulated over one pipeline run (feeds the ingestion summary)."""
+
+    def __init__(self):
+        self.success = 0
+        self.failed = 0
+        self.duplicates = 0  # Skipped: already stored (dedup index)
+        self.type_counts: Dict[str, int] = {}
+        self.host_counts: Dict[str, int] = {}
+        self.user_counts: Dict[str, int] = {}
+        self.mitre_counts: Dict[str, int] = {}
+        self.severity_counts: Dict[str, int] = {}
+        self.cve_encountered: List[str] = []
+
+    def record(self, enriched: Dict[str, Any]) -> None:
+        self.success += 1
+        event_type = enriched["event_type"]
+        self.type_counts[event_type] = self.type_counts.get(event_type, 0) + 1
+        sev = enriched.get("severity", "info")
+        self.severity_counts[sev] = self.severity_counts.get(sev, 0) + 1
+        host = enriched.get("source_host")
+        if host:
+            self.host_counts[host] = self.host_counts.get(host, 0) + 1
+        user = enriched.get("user")
+        if user:
+            self.user_counts[user] = self.user_counts.get(user, 0) + 1
+        if enriched.get("mitre_technique"):
+            t = enriched["mitre_technique"]
+            self.mitre_counts[t] = self.mitre_counts.get(t, 0) + 1
+        self.cve_encountered.extend(enriched.get("observed_cve_ids", []))
+
+    def progress(self, n: int) -> None:
+        if n % 100 == 0:
+            print(f"[Tool1] Processed {n} events... ({self.success} OK, {self.failed} failed)")
@@ -0,0 +1,215 @@
+"""
+TimestampParser - Fast, format-learning timestamp normalization.
+dateutil.parser.parse stays the reference for what a string means, but it is
+slow and log sources repeat a handful of formats. For each source (log
+category) the parser checks its first few string timestamps against a set of
+compiled fast parsers (ISO 8601 incl. Wazuh "+0000" offsets, syslog
+"MMM dd HH:MM:SS", ctime / Nmap startstr) and, once one agrees with dateutil
+LEARN_SAMPLES times, tries that parser first for the rest of the run. Strings
+dateutil rejects are read as epoch seconds/milliseconds when they look like
+one (epoch strings are learned too). Repeated strings come from a bounded cache.
+"""
+import re
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import dateutil.parser
+
+from ..core.config import settings
+
+LEARN_SAMPLES = 3   # Agreeing samples before a source's format is fixed
+LEARN_LIMIT = 32    # Samples after which a source without a fast format stays on dateutil
+
+_MONTHS = {name: i for i, name in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1)}
+
+_ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+_SYSLOG_RE = re.compile(r"([A-Z][a-z]{2}) {1,2}(\d{1,2}) (\d{2}):(\d{2}):(\d{2})")
+_CTIME_RE = re.compile(r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) ([A-Z][a-z]{2}) {1,2}(\d{1,2}) (\d{2}):(\d{2}):(\d{2}) (\d{4})")
+# Digit strings dateutil rejects (it reads 6/8/12/14 digits as packed dates)
+_EPOCH_RE = re.compile(r"\d{9,10}(?:\.\d+)?|\d{13}")
+
+
+def _utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _parse_iso(text: str) -> Optional[datetime]:
+    if not _ISO_RE.fullmatch(text):
+        return None
+    try:
+        return _utc(datetime.fromisoformat(text))
+    except ValueError:
+        return None
+
+
+def _parse_syslog(text: str) -> Optional[datetime]:
+    m = _SYSLOG_RE.fullmatch(text)
+    if m is None or m.group(1) not in _MONTHS:
+        return None
+    try:
+        # No year: dateutil takes it from today's (local) date
+        return datetime(datetime.now().year, _MONTHS[m.group(1)], int(m.group(2)),
+                        int(m.group(3)), int(m.group(4)), int(m.group(5)), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _parse_ctime(text: str) -> Optional[datetime]:
+    m = _CTIME_RE.fullmatch(text)
+    if m is None or m.group(1) not in _MONTHS:
+        return None
+    try:
+        return datetime(int(m.group(6)), _MONTHS[m.group(1)], int(m.group(2)),
+                        int(m.group(3)), int(m.group(4)), int(m.group(5)), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _parse_epoch(text: str) -> Optional[datetime]:
+    if not _EPOCH_RE.fullmatch(text):
+        return None
+    seconds = float(text) / 1000 if len(text) == 13 else float(text)
+    try:
+        return datetime.fromtimestamp(seconds, tz=timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def _parse_dateutil(text: str) -> Optional[datetime]:
+    try:
+        return _utc(dateutil.parser.parse(text))
+    except Exception:
+        return None
+
+
+# Fast parsers, in detection order; each returns None for strings it does not handle.
+# All but "epoch" must read a string exactly as dateutil does; "epoch" only
+# accepts strings dateutil rejects.
+FAST_PARSERS: Dict[str, Callable[[str], Optional[datetime]]] = {
+    "iso": _parse_iso,
+    "syslog": _parse_syslog,
+    "ctime": _parse_ctime,
+    "epoch": _parse_epoch,
+}
+
+
+class _SourceFormat:
+    __slots__ = ("fmt", "samples", "votes")
+
+    def __init__(self):
+        self.fmt: Optional[str] = None  # fast parser name, "dateutil", or None while learning
+        self.samples = 0
+        self.votes: Dict[str, int] = {}
+
+
+class TimestampParser:
+    """Per-source format learning + bounded string cache in front of dateutil."""
+
+    def __init__(self, cache_size: Optional[int] = None):
+        self.cache_size = settings.TIMESTAMP_CACHE_SIZE if cache_size is None else cache_size
+        self._cache: "OrderedDict[str, Optional[datetime]]" = OrderedDict()
+        self._sources: Dict[str, _SourceFormat] = {}
+        self.counts: Dict[str, int] = {}
+
+    def parse(self, raw_ts: Any, source: str = "") -> datetime:
+        """Strict UTC datetime for raw_ts; raises ValueError if it cannot be read."""
+        if isinstance(raw_ts, datetime):
+            self._count("datetime")
+            return _utc(raw_ts)
+        if isinstance(raw_ts, (int, float)):
+            try:
+                dt = datetime.fromtimestamp(raw_ts, tz=timezone.utc)
+            except Exception:
+                self._count("invalid")
+                raise ValueError(f"Could not normalize timestamp: {raw_ts}")
+            self._count("epoch")
+            return dt
+
+        text = str(raw_ts)
+        if text in self._cache:
+            dt = self._cache[text]
+            self._count("cached" if dt is not None else "invalid")
+        else:
+            dt = self._parse_text(text, source)
+            if len(self._cache) >= self.cache_size:
+                self._cache.popitem(last=False)
+            self._cache[text] = dt
+        if dt is None:
+            raise ValueError(f"Could not normalize timestamp: {raw_ts}")
+        return dt
+
+    def parse_or_now(self, raw_ts: Any, source: str = "") -> datetime:
+        """parse(), with the wall clock for missing or unreadable timestamps (as the pipeline stores them)."""
+        if not raw_ts:
+            self._count("missing")
+            return datetime.now(timezone.utc)
+        try:
+            return self.parse(raw_ts, source)
+        except Exception:
+            return datetime.now(timezone.utc)
+
+    def parse_many(self, values: Sequence[Any], sources: Optional[Sequence[str]] = None) -> List[datetime]:
+        """Column variant of parse_or_now for batch mode (one source per value, or "")."""
+        parse = self.parse_or_now
+        if sources is None:
+            return [parse(value) for value in values]
+        return [parse(value, source) for value, source in zip(values, sources)]
+
+    def stats(self) -> Dict[str, int]:
+        """How many timestamps each path handled (format names, cached, epoch, dateutil, missing, invalid)."""
+        return dict(sorted(self.counts.items()))
+
+    def merge(self, counts: Dict[str, int]) -> None:
+        """Add counters from another parser (e.g. a worker process)."""
+        for name, n in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def take_counts(self) -> Dict[str, int]:
+        """Counters since the last call, resetting them."""
+        counts, self.counts = self.counts, {}
+        return counts
+
+    # ─────────────────────────────────────────────────────────────────────────
+    def _count(self, name: str) -> None:
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def _parse_text(self, text: str, source: str) -> Optional[datetime]:
+        state = self._sources.get(source)
+        if state is None:
+            state = self._sources[source] = _SourceFormat()
+
+        if state.fmt is not None and state.fmt != "dateutil":
+            dt = FAST_PARSERS[state.fmt](text)
+            if dt is not None:
+                self._count(state.fmt)
+                return dt
+
+        dt = _parse_dateutil(text)
+        if state.fmt is None:
+            self._learn(state, text, dt)
+        if dt is not None:
+            self._count("dateutil")
+            return dt
+
+        dt = _parse_epoch(text)
+        self._count("epoch" if dt is not None else "invalid")
+        return dt
+
+    @staticmethod
+    def _learn(state: _SourceFormat, text: str, reference: Optional[datetime]) -> None:
+        """Vote for the first fast parser that reproduces dateutil's reading of this sample."""
+        state.samples += 1
+        for name, fast in FAST_PARSERS.items():
+            dt = fast(text)
+            if dt is None or (dt != reference if name != "epoch" else reference is not None):
+                continue
+            state.votes[name] = state.votes.get(name, 0) + 1
+            if state.votes[name] >= LEARN_SAMPLES:
+                state.fmt = name
+            return
+        if state.samples >= LEARN_LIMIT:
+            state.fmt = "dateutil"
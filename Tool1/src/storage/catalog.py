@@ -0,0 +1,220 @@
+"""
+Catalog - Persistent DuckDB index over Tool1's Parquet output.
+Each finalized events_*.parquet file is registered once (path, date partition,
+size/mtime, row count, timestamp range) together with its share of the hourly
+rollups - events per host, user and MITRE technique - so rollup queries read a
+small table instead of every file. `events` is a view over the registered
+files; query() can narrow it to a date range, which prunes whole partitions
+before DuckDB opens a single file. refresh() reconciles the catalog with the
+directory (new, rewritten and vanished files, e.g. after compaction), and the
+writer registers files as it finalizes them when CATALOG_ENABLED is set.
+"""
+import logging
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import duckdb
+import polars as pl
+
+from ..core.config import settings
+from .writer import _PARQUET_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# Rollup dimension -> source column
+ROLLUP_DIMENSIONS = {"host": "source_host", "user": "user", "technique": "mitre_technique"}
+
+_DDL = [
+    """CREATE TABLE IF NOT EXISTS catalog_files (
+        path VARCHAR PRIMARY KEY,
+        partition DATE,
+        size BIGINT,
+        mtime DOUBLE,
+        row_count BIGINT,
+        min_timestamp VARCHAR,
+        max_timestamp VARCHAR,
+        registered_at TIMESTAMP DEFAULT current_timestamp
+    )""",
+    """CREATE TABLE IF NOT EXISTS catalog_rollups (
+        path VARCHAR,
+        dimension VARCHAR,
+        key VARCHAR,
+        hour TIMESTAMP,
+        events BIGINT
+    )""",
+]
+
+_DUCKDB_TYPES = {"Utf8": "VARCHAR", "String": "VARCHAR", "Int32": "INTEGER", "Float64": "DOUBLE",
+                 "Boolean": "BOOLEAN"}
+
+
+def _empty_events_sql() -> str:
+    """A zero-row SELECT with the Tool1 event columns, for an empty catalog."""
+    columns = []
+    for name, dtype in _PARQUET_SCHEMA.items():
+        sql_type = "VARCHAR[]" if str(dtype).startswith("List") else _DUCKDB_TYPES[str(dtype)]
+        columns.append(f'NULL::{sql_type} AS "{name}"')
+    return f"SELECT {', '.join(columns)} WHERE false"
+
+
+def _file_list(paths: Sequence[str]) -> str:
+    return "[" + ", ".join("'" + p.replace("'", "''") + "'" for p in paths) + "]"
+
+
+def _partition_of(path: Path) -> Optional[date]:
+    try:
+        return date.fromisoformat(path.parent.name)
+    except ValueError:
+        return None
+
+
+class Catalog:
+    """A DuckDB database file describing one Tool1 output directory."""
+
+    LOCK_RETRIES = 20  # Another process (e.g. a running ingest) may hold the database briefly
+
+    def __init__(self, db_path: Optional[Path] = None, output_dir: Optional[Path] = None):
+        self.db_path = Path(db_path or settings.CATALOG_PATH)
+        self.output_dir = Path(output_dir or settings.OUTPUT_DIR)
+        self.conn: Optional[duckdb.DuckDBPyConnection] = None
+
+    def __enter__(self) -> "Catalog":
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        for attempt in range(self.LOCK_RETRIES):
+            try:
+                self.conn = duckdb.connect(str(self.db_path))
+                break
+            except duckdb.IOException:
+                if attempt == self.LOCK_RETRIES - 1:
+                    raise
+                time.sleep(0.1)
+        for statement in _DDL:
+            self.conn.execute(statement)
+        self.conn.execute(f"CREATE VIEW IF NOT EXISTS events AS {_empty_events_sql()}")
+        self._create_rollup_views()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Registration
+    # ─────────────────────────────────────────────────────────────────────────
+    def register(self, paths: Sequence[Path]) -> int:
+        """Register (or re-register) finalized Parquet files; returns how many were added."""
+        added = 0
+        for path in paths:
+            path = Path(path).resolve()
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            self._unregister([str(path)])
+            source = _file_list([str(path)])
+            stats = self.conn.execute(
+                f"SELECT count(*), min(timestamp), max(timestamp) FROM read_parquet({source})"
+            ).fetchone()
+            self.conn.execute(
+                "INSERT INTO catalog_files (path, partition, size, mtime, row_count, min_timestamp, max_timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [str(path), _partition_of(path), st.st_size, st.st_mtime, *stats],
+            )
+            for dimension, column in ROLLUP_DIMENSIONS.items():
+                self.conn.execute(
+                    f"""INSERT INTO catalog_rollups
+                        SELECT ?, ?, "{column}", try_strptime(substr(timestamp, 1, 13), '%Y-%m-%dT%H'), count(*)
+                        FROM read_parquet({source})
+                        WHERE "{column}" IS NOT NULL
+                        GROUP BY ALL""",
+                    [str(path), dimension],
+                )
+            added += 1
+        if added:
+            self._refresh_views()
+        return added
+
+    def refresh(self) -> Dict[str, int]:
+        """Reconcile with the output directory: register new/changed files, drop vanished ones."""
+        on_disk = {}
+        for path in self.output_dir.glob("*/events_*.parquet"):
+            st = path.stat()
+            on_disk[str(path.resolve())] = (st.st_size, st.st_mtime)
+        known = {p: (size, mtime) for p, size, mtime in
+                 self.conn.execute("SELECT path, size, mtime FROM catalog_files").fetchall()}
+
+        removed = [p for p in known if p not in on_disk]
+        changed = [p for p, meta in on_disk.items() if known.get(p) != meta]
+        self._unregister(removed)
+        added = self.register([Path(p) for p in sorted(changed)])
+        if removed and not added:
+            self._refresh_views()
+        return {"added": added, "removed": len(removed), "files": len(on_disk)}
+
+    def _unregister(self, paths: List[str]) -> None:
+        if not paths:
+            return
+        self.conn.execute("DELETE FROM catalog_files WHERE path IN (SELECT unnest(?))", [paths])
+        self.conn.execute("DELETE FROM catalog_rollups WHERE path IN (SELECT unnest(?))", [paths])
+
+    def _refresh_views(self) -> None:
+        # read_parquet binds when the view is created, so `events` is rebuilt whenever the file set
+        # changes; files removed since the last refresh() (e.g. by compaction) are left out
+        existing = [p for p in self.files() if Path(p).exists()]
+        self.conn.execute(f"CREATE OR REPLACE VIEW events AS {self._events_sql(existing)}")
+
+    def _create_rollup_views(self) -> None:
+        for dimension, column in ROLLUP_DIMENSIONS.items():
+            self.conn.execute(
+                f"""CREATE OR REPLACE VIEW events_per_{dimension}_hour AS
+                    SELECT hour, key AS "{column}", sum(events) AS events
+                    FROM catalog_rollups WHERE dimension = '{dimension}'
+                    GROUP BY ALL"""
+            )
+
+    @staticmethod
+    def _events_sql(paths: Sequence[str]) -> str:
+        if not paths:
+            return _empty_events_sql()
+        return f"SELECT * FROM read_parquet({_file_list(paths)}, union_by_name=true)"
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Queries
+    # ─────────────────────────────────────────────────────────────────────────
+    def files(self, start: Optional[date] = None, end: Optional[date] = None) -> List[str]:
+        """Registered files whose date partition lies in [start, end] (inclusive; None = open)."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT path FROM catalog_files "
+            "WHERE (?::DATE IS NULL OR partition >= ?::DATE) AND (?::DATE IS NULL OR partition <= ?::DATE) "
+            "ORDER BY partition, path",
+            [start, start, end, end],
+        ).fetchall()]
+
+    def query(self, sql: str, start: Optional[date] = None, end: Optional[date] = None) -> pl.DataFrame:
+        """
+        Run sql (a DuckDB query over events / events_per_*_hour / catalog_files)
+        and return the result as a Polars DataFrame. With start/end, `events` only covers
+        those date partitions for this query.
+        """
+        if start is not None or end is not None:
+            pruned = [p for p in self.files(start, end) if Path(p).exists()]
+            self.conn.execute(f"CREATE OR REPLACE TEMP VIEW events AS {self._events_sql(pruned)}")
+        try:
+            return self.conn.execute(sql).pl()
+        finally:
+            if start is not None or end is not None:
+                self.conn.execute("DROP VIEW IF EXISTS temp.events")
+
+
+def register_files(paths: Sequence[Path]) -> None:
+    """Writer hook: register freshly finalized files; never fails the write path."""
+    if not paths:
+        return
+    try:
+        with Catalog() as catalog:
+            catalog.register(paths)
+    except Exception as e:
+        logger.warning(f"[Tool1] Catalog registration failed ({e}); `query --catalog` will pick the files up")
@@ -0,0 +1,281 @@
+"""
+Compactor - Merges Tool1 date partitions into a few large, sorted Parquet files.
+Every events_*.parquet of a partition, plus any emergency JSONL dump rows that
+belong to it, is rewritten sorted by (surrogate identity, timestamp) - the
+order Tool2 sessionizes in. New files are built in a staging directory next to
+the output directory (outside its **/*.parquet glob); then exactly the files
+that were read are moved out and the new ones in, per file, so files an ingest
+finalizes meanwhile (and its open .part files) are left alone. A manifest
+written before the swap lets the next run finish an interrupted one. It also
+names the dumps the partition folded: the swap removes that partition's rows
+from them (deleting a dump once it is empty), so a crash never folds a row twice.
+"""
+import json
+import logging
+import re
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import polars as pl
+import pyarrow.parquet as pq
+
+from ..core.config import settings
+from .writer import _PARQUET_SCHEMA, quarantine_orphans
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_LIST_COLUMNS = ("observed_cve_ids", "observed_cwe_ids")
+_MANIFEST = "manifest.json"  # Written once a partition's new files are complete; starts its swap
+
+
+@dataclass
+class PartitionResult:
+    partition: str
+    files_before: int = 0
+    files_after: int = 0
+    rows: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+@dataclass
+class CompactionReport:
+    partitions: List[PartitionResult] = field(default_factory=list)
+    dumps_folded: int = 0
+    scan_seconds_before: float = 0.0
+    scan_seconds_after: float = 0.0
+
+    @property
+    def files_before(self) -> int:
+        return sum(p.files_before for p in self.partitions)
+
+    @property
+    def files_after(self) -> int:
+        return sum(p.files_after for p in self.partitions)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files_before": self.files_before,
+            "files_after": self.files_after,
+            "dumps_folded": self.dumps_folded,
+            "scan_seconds_before": round(self.scan_seconds_before, 4),
+            "scan_seconds_after": round(self.scan_seconds_after, 4),
+            "partitions": [p.__dict__ for p in self.partitions],
+        }
+
+
+def normalize_frame(frame: pl.DataFrame) -> pl.DataFrame:
+    """Align a frame from any Tool1 version (pipe-joined ids, no hash_scheme) to the current schema."""
+    exprs = []
+    for name, dtype in _PARQUET_SCHEMA.items():
+        if name not in frame.columns:
+            exprs.append(pl.lit(None, dtype=dtype).alias(name))
+        elif name in _LIST_COLUMNS and frame.schema[name] == pl.Utf8:
+            exprs.append(
+                pl.when(pl.col(name).fill_null("") == "")
+                  .then(pl.lit([], dtype=dtype))
+                  .otherwise(pl.col(name).str.split("|"))
+                  .alias(name)
+            )
+        else:
+            exprs.append(pl.col(name).cast(dtype, strict=False))
+    return frame.select(exprs)
+
+
+def _dump_rows(path: Path) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            for name in _LIST_COLUMNS:  # older dumps hold pipe-joined strings
+                if isinstance(row.get(name), str):
+                    row[name] = row[name].split("|") if row[name] else []
+            rows.append(row)
+    return rows
+
+
+def _dump_date(row: Dict[str, Any], path: Path) -> str:
+    """
+    The partition a dump row belongs to: its event date, else (like the writer,
+    which used that day's partition) the day the dump was written - fixed, so a
+    resumed swap assigns the rows exactly as the run that folded them.
+    """
+    stamp = row.get("timestamp") or row.get("ingest_timestamp") or ""
+    if _PARTITION_RE.match(stamp[:10]):
+        return stamp[:10]
+    written = re.search(r"emergency_dump_(\d+)", path.name)
+    seconds = int(written.group(1)) if written else path.stat().st_mtime
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _scan_seconds(files: List[Path]) -> float:
+    """Time to load every file the way downstream readers do (one read per file)."""
+    started = time.perf_counter()
+    for path in files:
+        if path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                [json.loads(line) for line in f if line.strip()]
+        else:
+            pq.read_table(path)
+    return time.perf_counter() - started
+
+
+class Compactor:
+    """Rewrites the date partitions under an output directory."""
+
+    def __init__(self, output_dir: Path, rows_per_file: Optional[int] = None):
+        self.output_dir = Path(output_dir)
+        self.staging_dir = self.output_dir.with_name(self.output_dir.name + ".compact")
+        self.rows_per_file = rows_per_file or settings.COMPACT_ROWS_PER_FILE
+
+    def run(self, partitions: Optional[List[str]] = None) -> CompactionReport:
+        self._recover()
+        report = CompactionReport()
+
+        # Dumps are only folded on full runs: a filtered run would leave their
+        # other rows behind and fold the same rows again next time
+        dumps = [] if partitions else sorted(self.output_dir.glob("emergency_dump_*.jsonl"))
+        dump_rows = self._load_dumps(dumps)  # date -> dump name -> rows
+        names = sorted(
+            {p.name for p in self.output_dir.iterdir() if p.is_dir() and _PARTITION_RE.match(p.name)}
+            | set(dump_rows)
+        )
+        if partitions:
+            names = [n for n in names if n in partitions]
+        # .part files a crashed writer left behind are moved aside; live ones are left to finish
+        quarantine_orphans(self.output_dir, names)
+
+        report.scan_seconds_before = _scan_seconds(self._files(names) + dumps)
+
+        for name in names:
+            report.partitions.append(self._compact_partition(name, dump_rows.get(name, {})))
+        report.dumps_folded = sum(not path.exists() for path in dumps)
+
+        if self.staging_dir.is_dir() and not any(self.staging_dir.iterdir()):
+            self.staging_dir.rmdir()
+
+        report.scan_seconds_after = _scan_seconds(
+            self._files(names) + sorted(self.output_dir.glob("emergency_dump_*.jsonl"))
+        )
+        logger.info(f"[Tool1] Compaction: {report.files_before} -> {report.files_after} files")
+        return report
+
+    # ─────────────────────────────────────────────────────────────────────────
+    def _files(self, names: List[str]) -> List[Path]:
+        return [f for name in names for f in sorted((self.output_dir / name).glob("*.parquet"))]
+
+    def _load_dumps(self, dumps: List[Path]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Emergency dump rows by the date partition they belong to, then by dump file name."""
+        by_date: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for path in dumps:
+            for row in _dump_rows(path):
+                by_date.setdefault(_dump_date(row, path), {}).setdefault(path.name, []).append(row)
+        return by_date
+
+    def _compact_partition(self, name: str, dump_rows: Dict[str, List[Dict[str, Any]]]) -> PartitionResult:
+        partition_dir = self.output_dir / name
+        result = PartitionResult(partition=name)
+        files = sorted(partition_dir.glob("*.parquet")) if partition_dir.is_dir() else []
+        result.files_before = len(files)
+        result.bytes_before = sum(f.stat().st_size for f in files)
+
+        frames = [normalize_frame(pl.read_parquet(f)) for f in files]
+        if dump_rows:
+            rows = [{name: row.get(name) for name in _PARQUET_SCHEMA} for rows in dump_rows.values() for row in rows]
+            frames.append(pl.DataFrame(rows, schema=_PARQUET_SCHEMA, strict=False))
+        if not frames:
+            return result
+
+        df = pl.concat(frames, how="vertical")
+        # Tool2 sessionization order: surrogate identity, then parsed event time
+        df = df.sort(
+            pl.coalesce([pl.col("user"), pl.col("source_host"), pl.lit("System")]),
+            pl.col("timestamp").str.strptime(pl.Datetime("us", "UTC"), "%+", strict=False),
+            maintain_order=True,
+        )
+        result.rows = df.height
+
+        staging = self.staging_dir / name
+        if staging.exists():
+            shutil.rmtree(staging)
+        new_dir = staging / "new"
+        new_dir.mkdir(parents=True)
+        stamp = int(datetime.now(timezone.utc).timestamp() * 1000)
+        for i, offset in enumerate(range(0, df.height, self.rows_per_file)):
+            pq.write_table(
+                df.slice(offset, self.rows_per_file).to_arrow(),
+                str(new_dir / f"events_{stamp}_{i:03d}.parquet"),
+                row_group_size=settings.PARQUET_ROW_GROUP_ROWS,
+                compression=settings.PARQUET_COMPRESSION,
+                compression_level=settings.PARQUET_COMPRESSION_LEVEL,
+                use_dictionary=settings.PARQUET_USE_DICTIONARY,
+            )
+
+        # Swap only the files read above: anything finalized since (an ingest still
+        # writing this partition, its .part files) stays where it is
+        manifest = {"old": [f.name for f in files], "new": sorted(f.name for f in new_dir.iterdir()),
+                    "dumps": sorted(dump_rows)}
+        with open(staging / (_MANIFEST + ".tmp"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        (staging / (_MANIFEST + ".tmp")).replace(staging / _MANIFEST)
+        self._swap(partition_dir, staging, manifest)
+
+        new_files = [partition_dir / name for name in manifest["new"]]
+        result.files_after = len(new_files)
+        result.bytes_after = sum(f.stat().st_size for f in new_files)
+        logger.info(f"[Tool1] Compacted {name}: {result.files_before} -> {result.files_after} files, {result.rows} rows")
+        return result
+
+    def _swap(self, partition_dir: Path, staging: Path, manifest: Dict[str, List[str]]) -> None:
+        """
+        Move the replaced files out of the partition and the new ones in, take the
+        partition's rows out of the dumps it folded, then drop the old files.
+        Safe to repeat: the next run re-runs it after a crash.
+        """
+        old_dir, new_dir = staging / "old", staging / "new"
+        old_dir.mkdir(exist_ok=True)
+        partition_dir.mkdir(exist_ok=True)
+        for name in manifest["old"]:
+            if (partition_dir / name).exists():
+                (partition_dir / name).rename(old_dir / name)
+        for name in manifest["new"]:
+            if (new_dir / name).exists():
+                (new_dir / name).rename(partition_dir / name)
+        for name in manifest.get("dumps", []):
+            self._consume_dump(self.output_dir / name, partition_dir.name)
+        shutil.rmtree(staging)
+
+    @staticmethod
+    def _consume_dump(path: Path, date_str: str) -> None:
+        """Rewrite a dump without the rows of one partition (now in its Parquet files); delete it once empty."""
+        if not path.exists():
+            return
+        with open(path, encoding="utf-8") as f:
+            kept = [line for line in f if line.strip() and _dump_date(json.loads(line), path) != date_str]
+        if not kept:
+            path.unlink()
+            return
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        tmp.replace(path)
+
+    def _recover(self) -> None:
+        """Finish swaps interrupted by a crash in a previous run; drop unfinished rewrites."""
+        if not self.staging_dir.is_dir():
+            return
+        for staging in self.staging_dir.iterdir():
+            manifest_path = staging / _MANIFEST
+            if manifest_path.exists():  # the new files were complete: roll the swap forward
+                with open(manifest_path, encoding="utf-8") as f:
+                    self._swap(self.output_dir / staging.name, staging, json.load(f))
+            else:  # crashed while writing the new files; the partition was not touched
+                shutil.rmtree(staging)
+        self.staging_dir.rmdir()
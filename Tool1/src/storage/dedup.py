@@ -0,0 +1,148 @@
+"""
+DedupIndex - Persistent content-addressed index of stored events.
+An event is identified by its record - (log_category, record_hash), the sha256
+of the whole raw record (the event's raw_hash unless raw_source had to be cut) -
+and by which copy of that record it is within its source: the n-th identical
+line of a file is occurrence n. The same
+export re-ingested, or an overlapping one, yields the same (record, occurrence)
+keys and is skipped, while identical lines inside one source (brute-force
+attempts, LANL rows repeating within a second) are distinct occurrences and are
+all kept: a source never dedups against itself. The keys form an on-disk hash
+set - a SQLite WITHOUT ROWID table whose primary key is the key itself - so a
+new event costs a single INSERT OR IGNORE; only records repeated within a
+source or seen before walk their (few) stored occurrences.
+Each key also records the source and position it was stored from and the
+event's hash, so a followed file re-read after a crash recognizes its own
+events and can continue the hash chain from them (see Pipeline.follow).
+Keys are written in the pipeline's open transaction and committed after the
+writer has finalized the matching Parquet files, so a crash can at worst let
+some events be stored twice, never drop one.
+The index is a file in the output directory it describes (settings.DEDUP_FILE),
+so deleting the output deletes it too: an index outliving its output would
+skip every event of a re-ingest as already stored.
+"""
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Duplicate(NamedTuple):
+    """A record already stored: the event_hash stored with it, and whether it is this source's own copy re-read."""
+    event_hash: Optional[str]
+    replay: bool
+
+
+class DedupIndex:
+    """
+    seen_or_add(category, record_hash, ...): a Duplicate when that copy of the
+    record is already indexed, otherwise records it and returns None.
+    Sources are named by the caller (a unique name per batch ingest, the
+    file identity when following); position tells a re-read record from a
+    repeated one. commit() makes the keys recorded so far durable.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or settings.OUTPUT_DIR / settings.DEDUP_FILE)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MiB: keys land on random B-tree pages
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'seen'").fetchone():
+            # (log_category, raw_hash of the first 4 KB) keys: they collapsed repeated lines
+            logger.warning(f"[Tool1] Dropping the pre-occurrence dedup keys in {self.db_path}")
+            self.conn.execute("DROP TABLE seen")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records (category TEXT NOT NULL, record_hash BLOB NOT NULL, "
+            "occurrence INTEGER NOT NULL, source INTEGER NOT NULL, position INTEGER, event_hash BLOB, "
+            "PRIMARY KEY (category, record_hash, occurrence)) WITHOUT ROWID"
+        )
+        # Occurrence already used by the current source, for records it repeated or found stored
+        self.conn.execute(
+            "CREATE TEMP TABLE repeats (category TEXT NOT NULL, record_hash BLOB NOT NULL, "
+            "occurrence INTEGER NOT NULL, PRIMARY KEY (category, record_hash)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self._source_name: Optional[str] = None
+        self._source = 0
+        self._repeats = 0  # rows in temp.repeats (lookups are skipped while it is empty)
+        self.lookups = 0
+        self.added = 0
+
+    def seen_or_add(self, category: str, record_hash: str, event_hash: Optional[str] = None,
+                    source: str = "", position: Optional[int] = None) -> Optional[Duplicate]:
+        self.lookups += 1
+        if source != self._source_name:
+            self._use_source(source)
+        key = (category, bytes.fromhex(record_hash))
+        occurrence = self._next_occurrence(key)
+        if self._insert(key, occurrence, position, event_hash):
+            return None
+
+        # Taken: by an earlier copy from this source (this one comes after it), by
+        # this very copy re-read (same position), or by a copy from another source
+        rows = self.conn.execute(
+            "SELECT occurrence, source, position, event_hash FROM records "
+            "WHERE category = ? AND record_hash = ? AND occurrence >= ? ORDER BY occurrence",
+            (*key, occurrence),
+        ).fetchall()
+        for stored, source_id, stored_position, stored_hash in rows:
+            if source_id == self._source and position is not None and stored_position == position:
+                self._remember(key, stored)
+                return Duplicate(stored_hash.hex() if stored_hash else None, True)
+        own = [stored for stored, source_id, _, _ in rows if source_id == self._source]
+        occurrence = max([occurrence] + [stored + 1 for stored in own])
+        for stored, _, _, stored_hash in rows:
+            if stored == occurrence:  # another source's copy: this one is already stored
+                self._remember(key, occurrence)
+                return Duplicate(stored_hash.hex() if stored_hash else None, False)
+        self._insert(key, occurrence, position, event_hash)
+        return None
+
+    def commit(self) -> None:
+        """Persist the keys recorded so far (call once their events are stored)."""
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"lookups": self.lookups, "added": self.added, "duplicates": self.lookups - self.added}
+
+    # ─────────────────────────────────────────────────────────────────────────
+    def _use_source(self, name: str) -> None:
+        self.conn.execute("INSERT OR IGNORE INTO sources (name) VALUES (?)", (name,))
+        self._source = self.conn.execute("SELECT id FROM sources WHERE name = ?", (name,)).fetchone()[0]
+        self._source_name = name
+        if self._repeats:
+            self.conn.execute("DELETE FROM temp.repeats")
+            self._repeats = 0
+
+    def _next_occurrence(self, key) -> int:
+        if not self._repeats:
+            return 1
+        row = self.conn.execute("SELECT occurrence FROM temp.repeats WHERE category = ? AND record_hash = ?",
+                                key).fetchone()
+        return row[0] + 1 if row else 1
+
+    def _insert(self, key, occurrence: int, position: Optional[int], event_hash: Optional[str]) -> bool:
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO records VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, occurrence, self._source, position, bytes.fromhex(event_hash) if event_hash else None),
+        )
+        if not cursor.rowcount:
+            return False
+        self.added += 1
+        if occurrence > 1:
+            self._remember(key, occurrence)
+        return True
+
+    def _remember(self, key, occurrence: int) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO temp.repeats VALUES (?, ?, ?)", (*key, occurrence))
+        self._repeats += 1
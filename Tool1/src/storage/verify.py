@@ -0,0 +1,128 @@
+"""
+ChainVerifier - Bulk re-validation of the event hash chain in Tool1 output.
+Walks every Parquet file (and emergency JSONL dump) under an output directory,
+recomputes each event_hash with the scheme recorded for that event, and checks
+that every previous_event_hash links to an event that is present. v2 hashes
+cover raw_hash instead of raw_source, so for v2 events raw_hash is also checked
+against sha256(raw_source). The checks are order-independent, so files can be
+visited in any order.
+"""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set
+
+import polars as pl
+
+from ..core.schema import HASH_SCHEME_V1, HASH_SCHEME_V2, compute_row_hash
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED = 20  # Example event_ids kept per problem kind
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+@dataclass
+class ChainReport:
+    """Outcome of a verification run."""
+    files: int = 0
+    events: int = 0
+    schemes: Dict[str, int] = field(default_factory=dict)
+    chain_heads: int = 0            # Events with no previous_event_hash (one per run)
+    hash_mismatches: int = 0        # Stored event_hash differs from the recomputed one
+    raw_mismatches: int = 0         # v2: raw_source does not hash to the raw_hash the chain covers
+    dangling_links: int = 0         # previous_event_hash not found among verified events
+    forks: int = 0                  # Two events claiming the same predecessor
+    examples: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.events > 0 and not (
+            self.hash_mismatches or self.raw_mismatches or self.dangling_links or self.forks)
+
+    def _example(self, kind: str, event_id: Any) -> None:
+        bucket = self.examples.setdefault(kind, [])
+        if len(bucket) < MAX_REPORTED:
+            bucket.append(str(event_id))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "files": self.files,
+            "events": self.events,
+            "schemes": self.schemes,
+            "chain_heads": self.chain_heads,
+            "hash_mismatches": self.hash_mismatches,
+            "raw_mismatches": self.raw_mismatches,
+            "dangling_links": self.dangling_links,
+            "forks": self.forks,
+            "examples": self.examples,
+        }
+
+
+class ChainVerifier:
+    """Recomputes and cross-links event hashes across an output directory."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+
+    def verify(self) -> ChainReport:
+        report = ChainReport()
+        hashes: Set[str] = set()
+        links: Dict[str, str] = {}  # previous_event_hash -> event_id of its successor
+
+        for path in self._files():
+            report.files += 1
+            for row in self._rows(path):
+                report.events += 1
+                scheme = row.get("hash_scheme") or HASH_SCHEME_V1
+                report.schemes[scheme] = report.schemes.get(scheme, 0) + 1
+
+                try:
+                    expected = compute_row_hash(row)
+                except ValueError:
+                    expected = None
+                if row.get("event_hash") != expected:
+                    report.hash_mismatches += 1
+                    report._example("hash_mismatches", row.get("event_id"))
+                if scheme == HASH_SCHEME_V2 and row.get("raw_source") is not None \
+                        and row.get("raw_hash") != _sha256(row["raw_source"]):
+                    report.raw_mismatches += 1
+                    report._example("raw_mismatches", row.get("event_id"))
+                if row.get("event_hash"):
+                    hashes.add(row["event_hash"])
+
+                previous = row.get("previous_event_hash")
+                if not previous:
+                    report.chain_heads += 1
+                elif previous in links:
+                    report.forks += 1
+                    report._example("forks", row.get("event_id"))
+                else:
+                    links[previous] = row.get("event_id")
+
+        for previous, event_id in links.items():
+            if previous not in hashes:
+                report.dangling_links += 1
+                report._example("dangling_links", event_id)
+
+        logger.info(f"[Tool1] Chain verification: {report.events} events in {report.files} files, ok={report.ok}")
+        return report
+
+    def _files(self) -> List[Path]:
+        return sorted(self.output_dir.rglob("*.parquet")) + sorted(self.output_dir.rglob("emergency_dump_*.jsonl"))
+
+    @staticmethod
+    def _rows(path: Path) -> Iterator[Dict[str, Any]]:
+        if path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            return
+        yield from pl.read_parquet(path).iter_rows(named=True)
@@ -1,14 +1,26 @@
 """
 StorageWriter - Writes CanonicalEvents to Parquet (columnar) + JSON summary.
 Production-grade: batching, emergency fallback, zero data loss guarantee.
+Crash window: rows are durable once their file is finalized. A crash or kill
+leaves the open events_*.parquet.part files without a footer, unreadable -
+up to PARQUET_ROLL_SECONDS / PARQUET_ROLL_BYTES of events per partition (a
+whole run for a short batch ingest). Their dedup keys and --follow checkpoint
+are only committed after finalization, so re-running the ingest (or resuming
+the follow) stores those events again. A writer locks the .part files it owns;
+any other .part is an orphan and is moved to <output_dir>.orphans when the
+next writer starts or compaction runs.
 """
 import json
 import logging
+import shutil
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Optional
 
 import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from ..core.config import settings
 from ..core.schema import CanonicalEvent
@@ -30,8 +42,8 @@ _PARQUET_SCHEMA = {
     "mitre_technique": pl.Utf8,
     "mitre_tactic": pl.Utf8,
     "mitre_technique_name": pl.Utf8,
-    "observed_cve_ids": pl.Utf8,   # pipe-delimited
-    "observed_cwe_ids": pl.Utf8,   # pipe-delimited
+    "observed_cve_ids": pl.List(pl.Utf8),
+    "observed_cwe_ids": pl.List(pl.Utf8),
     "cve_max_cvss": pl.Float64,
     "cve_severity": pl.Utf8,
     "is_kev": pl.Boolean,
@@ -46,13 +58,128 @@ _PARQUET_SCHEMA = {
     "raw_hash": pl.Utf8,
     "previous_event_hash": pl.Utf8,
     "event_hash": pl.Utf8,
+    "hash_scheme": pl.Utf8,
 }
 
+try:
+    import fcntl
+except ImportError:  # Windows: an unowned .part is told apart by age alone
+    fcntl = None
+
+PART_SUFFIX = ".part"  # In-progress files; renamed to .parquet when rolled
+ORPHAN_GRACE_SECONDS = 60.0  # An unlocked .part modified more recently than this may still be opening
+
+
+def _owned(part_path: Path) -> bool:
+    """Whether a live writer holds the .part's lock (without fcntl: whether it was modified within a roll interval)."""
+    age = time.time() - part_path.stat().st_mtime
+    if fcntl is None:
+        return age < max(settings.PARQUET_ROLL_SECONDS, ORPHAN_GRACE_SECONDS)
+    with open(part_path, "rb") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+    return age < ORPHAN_GRACE_SECONDS
+
+
+def quarantine_orphans(output_dir: Path, partitions: Optional[List[str]] = None) -> List[Path]:
+    """
+    Move the .part files no writer owns (left by a crash) from output_dir's date
+    partitions to <output_dir>.orphans/<date>/; returns their new paths.
+    """
+    output_dir = Path(output_dir)
+    moved = []
+    for part_path in sorted(output_dir.glob(f"*/*{PART_SUFFIX}")):
+        if partitions is not None and part_path.parent.name not in partitions:
+            continue
+        try:
+            if _owned(part_path):
+                continue
+            target = output_dir.with_name(output_dir.name + ".orphans") / part_path.parent.name / part_path.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(part_path), str(target))
+        except FileNotFoundError:  # finalized or moved meanwhile
+            continue
+        logger.warning(f"[Tool1] Quarantined unfinished {part_path} (left by a crashed writer) -> {target}")
+        moved.append(target)
+    return moved
+
+
+class _PartitionFile:
+    """
+    One open Parquet file of a date partition. Flushed batches are held (as
+    Arrow tables, which a failed write dumps to JSONL) until PARQUET_ROW_GROUP_ROWS
+    rows are pending, or the writer's PARQUET_PENDING_ROWS cap picks this
+    partition, and then written as one row group. The .part file is locked
+    until it is finalized (see quarantine_orphans).
+    """
+
+    def __init__(self, final_path: Path, schema: pa.Schema):
+        self.final_path = final_path
+        self.part_path = final_path.with_name(final_path.name + PART_SUFFIX)
+        self._lock = open(self.part_path, "xb")
+        if fcntl is not None:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self.opened_at = time.monotonic()
+        self.rows = 0
+        self.pending: List[pa.Table] = []
+        self.pending_rows = 0
+        self.writer = pq.ParquetWriter(
+            str(self.part_path),
+            schema,
+            compression=settings.PARQUET_COMPRESSION,
+            compression_level=settings.PARQUET_COMPRESSION_LEVEL,
+            use_dictionary=settings.PARQUET_USE_DICTIONARY,
+        )
+
+    def append(self, table: pa.Table) -> None:
+        self.pending.append(table)
+        self.pending_rows += table.num_rows
+
+    def drop_pending(self) -> List[Dict[str, Any]]:
+        """Give up the pending rows (as dicts, for the JSONL fallback)."""
+        rows = [row for table in self.pending for row in table.to_pylist()]
+        self.pending.clear()
+        self.pending_rows = 0
+        return rows
+
+    def write_pending(self) -> int:
+        """Write the pending batches as one row group; returns the rows written."""
+        if not self.pending:
+            return 0
+        table = pa.concat_tables(self.pending)
+        self.writer.write_table(table, row_group_size=table.num_rows)
+        written = table.num_rows
+        self.rows += written
+        self.pending.clear()
+        self.pending_rows = 0
+        return written
+
+    def due(self, now: float) -> bool:
+        return (
+            self.part_path.stat().st_size >= settings.PARQUET_ROLL_BYTES
+            or now - self.opened_at >= settings.PARQUET_ROLL_SECONDS
+        )
+
+    def close(self) -> Path:
+        try:
+            self.writer.close()
+            self.part_path.replace(self.final_path)
+        finally:
+            self._lock.close()
+        return self.final_path
+
 
 class StorageWriter:
     """
-    Buffers CanonicalEvents and batch-writes to Parquet partitioned by date.
-    Falls back to JSONL if Parquet write fails.
+    Buffers CanonicalEvents and appends them to one long-lived Parquet file per
+    date partition, in row groups of up to PARQUET_ROW_GROUP_ROWS. Files are written as *.parquet.part
+    and renamed once rolled (by size or age) or closed, so globbing readers
+    only ever see complete files. Falls back to JSONL if a Parquet write fails.
+    A multi-date backfill is bounded by PARQUET_PENDING_ROWS rows held across
+    partitions (the largest partition's row group is written past it) and by
+    PARQUET_MAX_OPEN_FILES open files (the least recently written is finalized).
     """
 
     BATCH_SIZE = 500  # Write every 500 events
@@ -62,9 +189,16 @@ class StorageWriter:
         self.dlq_dir = settings.DEAD_LETTER_QUEUE_DIR
         self._buffer: List[CanonicalEvent] = []
         self._write_count = 0
+        self._open: Dict[str, _PartitionFile] = {}
+        self._arrow_schema: Optional[pa.Schema] = None
+        # Backpressure hook: called with (events, seconds) after every flush
+        self.flush_listener: Optional[Callable[[int, float], None]] = None
+        # Catalog hook: called with the paths finalized by each flush/roll
+        self.file_listener: Optional[Callable[[List[Path]], None]] = None
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.dlq_dir.mkdir(parents=True, exist_ok=True)
+        quarantine_orphans(self.output_dir)
 
     def write(self, event: CanonicalEvent) -> None:
         """Buffer an event and flush when batch is full."""
@@ -73,66 +207,126 @@ class StorageWriter:
             self.flush()
 
     def flush(self) -> None:
-        """Write all buffered events to Parquet, partitioned by date."""
+        """Stage buffered events in their date partitions; write full row groups, roll due files."""
         if not self._buffer:
             return
 
+        flushed = len(self._buffer)
+        started = time.perf_counter()
+        staged = set()
+        finalized = []
         try:
-            rows: List[Dict[str, Any]] = []
-            for evt in self._buffer:
-                d = evt.to_dict()
-                # Enforce correct types
-                d["port"] = int(d["port"]) if d.get("port") is not None else None
-                d["confidence_score"] = float(d.get("confidence_score") or 0.0)
-                d["data_quality_score"] = float(d.get("data_quality_score") or 0.0)
-                d["risk_score"] = float(d.get("risk_score") or 0.0)
-                d["cve_max_cvss"] = float(d["cve_max_cvss"]) if d.get("cve_max_cvss") is not None else None
-                d["is_kev"] = bool(d.get("is_kev", False))
-                # Ensure all string fields are str or None (not list)
-                for k in ("observed_cve_ids", "observed_cwe_ids"):
-                    v = d.get(k)
-                    if isinstance(v, list):
-                        d[k] = "|".join(v)
-                    elif v is None:
-                        d[k] = ""
-                rows.append(d)
-
-            df = pl.DataFrame(rows, schema_overrides=_PARQUET_SCHEMA, infer_schema_length=len(rows))
-
-            # Partition by event date
-            date_groups: Dict[str, List[Dict]] = {}
-            for row in rows:
-                ts = row.get("timestamp", "")
-                date_part = ts[:10] if ts else datetime.now(timezone.utc).strftime("%Y-%m-%d")
-                date_groups.setdefault(date_part, []).append(row)
-
-            for date_str, group_rows in date_groups.items():
-                df_part = pl.DataFrame(group_rows, schema_overrides=_PARQUET_SCHEMA, infer_schema_length=len(group_rows))
-                part_dir = self.output_dir / date_str
-                part_dir.mkdir(parents=True, exist_ok=True)
-                ts_suffix = int(datetime.now(timezone.utc).timestamp() * 1000)
-                out_path = part_dir / f"events_{ts_suffix}.parquet"
-                df_part.write_parquet(str(out_path))
-                logger.info(f"[Tool1] Wrote {len(group_rows)} events -> {out_path}")
-                self._write_count += len(group_rows)
+            # Rows are built (and type-enforced) once per event; the v2 hash already used them
+            rows: List[Dict[str, Any]] = [evt.to_row() for evt in self._buffer]
+            df = pl.DataFrame(rows, schema=_PARQUET_SCHEMA).with_row_index("_i")
+
+            # Partition by event date (events without a timestamp go to today's)
+            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            dates = df["timestamp"].str.slice(0, 10).fill_null("").replace("", today)
+            partitions = df.with_columns(dates.alias("_date")).partition_by(
+                "_date", as_dict=True, maintain_order=True, include_key=False,
+            )
+            for (date_str,), df_part in partitions.items():
+                table = df_part.drop("_i").to_arrow()
+                if self._arrow_schema is None:
+                    self._arrow_schema = table.schema
+                if date_str not in self._open and len(self._open) >= settings.PARQUET_MAX_OPEN_FILES:
+                    finalized.append(self._close_partition(next(iter(self._open))))  # least recently written
+                self._partition(date_str).append(table.cast(self._arrow_schema))
+                staged.update(df_part["_i"].to_list())
 
             self._buffer.clear()
 
         except Exception as e:
             logger.error(f"[Tool1] Parquet flush failed: {e} — falling back to JSONL", exc_info=True)
-            self._emergency_jsonl_dump()
+            self._emergency_jsonl_dump(evt.to_row() for i, evt in enumerate(self._buffer) if i not in staged)
+            self._buffer.clear()
 
-    def _emergency_jsonl_dump(self) -> None:
-        """Last-resort: dump buffer to JSONL file so NO data is lost."""
+        for date_str, current in list(self._open.items()):
+            if current.pending_rows >= settings.PARQUET_ROW_GROUP_ROWS:
+                self._write_row_group(date_str)
+        pending = sum(current.pending_rows for current in self._open.values())
+        while pending > settings.PARQUET_PENDING_ROWS:
+            date_str = max(self._open, key=lambda d: self._open[d].pending_rows)
+            pending -= self._open[date_str].pending_rows
+            self._write_row_group(date_str)
+        now = time.monotonic()
+        for date_str, current in list(self._open.items()):
+            if current.due(now):
+                finalized.append(self._close_partition(date_str))
+        self._notify_finalized(finalized)
+
+        if self.flush_listener is not None:
+            self.flush_listener(flushed, time.perf_counter() - started)
+
+    def roll(self) -> List[Path]:
+        """Close every open partition file now; the next flush starts new ones."""
+        closed = [self._close_partition(date_str) for date_str in list(self._open)]
+        return self._notify_finalized(closed)
+
+    def close(self) -> List[Path]:
+        """Flush the buffer and finalize all open files."""
+        self.flush()
+        return self.roll()
+
+    def _partition(self, date_str: str) -> _PartitionFile:
+        current = self._open.pop(date_str, None)  # re-inserted last: _open is least recently written first
+        if current is None:
+            part_dir = self.output_dir / date_str
+            part_dir.mkdir(parents=True, exist_ok=True)
+            ts_suffix = int(datetime.now(timezone.utc).timestamp() * 1000)
+            out_path = part_dir / f"events_{ts_suffix}.parquet"
+            while out_path.exists() or out_path.with_name(out_path.name + PART_SUFFIX).exists():
+                ts_suffix += 1
+                out_path = part_dir / f"events_{ts_suffix}.parquet"
+            current = _PartitionFile(out_path, self._arrow_schema)
+        self._open[date_str] = current
+        return current
+
+    def _write_row_group(self, date_str: str) -> None:
+        current = self._open[date_str]
         try:
+            written = current.write_pending()
+            self._write_count += written
+            logger.info(f"[Tool1] Wrote {written} events -> {current.part_path}")
+        except Exception as e:
+            logger.error(f"[Tool1] Row group write failed: {e} — falling back to JSONL", exc_info=True)
+            self._emergency_jsonl_dump(current.drop_pending())
+            self._close_partition(date_str)
+
+    def _close_partition(self, date_str: str) -> Optional[Path]:
+        if self._open[date_str].pending:
+            self._write_row_group(date_str)
+            if date_str not in self._open:  # the write failed and already closed it
+                return None
+        current = self._open.pop(date_str)
+        try:
+            path = current.close()
+            logger.info(f"[Tool1] Finalized {current.rows} events -> {path}")
+            return path
+        except Exception as e:
+            logger.error(f"[Tool1] Failed to finalize {current.part_path}: {e}")
+            return None
+
+    def _notify_finalized(self, closed: List[Optional[Path]]) -> List[Path]:
+        paths = [path for path in closed if path is not None]
+        if paths and self.file_listener is not None:
+            self.file_listener(paths)
+        return paths
+
+    def _emergency_jsonl_dump(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Last-resort: dump event rows to a JSONL file so NO data is lost."""
+        try:
+            rows = list(rows)
+            if not rows:
+                return
             ts = int(datetime.now(timezone.utc).timestamp())
             path = self.output_dir / f"emergency_dump_{ts}.jsonl"
-            with open(path, "w", encoding="utf-8") as f:
-                for evt in self._buffer:
-                    f.write(json.dumps(evt.to_dict(), default=str) + "\n")
-            logger.warning(f"[Tool1] Emergency JSONL dump: {path} ({len(self._buffer)} events)")
-            self._write_count += len(self._buffer)
-            self._buffer.clear()
+            with open(path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=str) + "\n")
+            logger.warning(f"[Tool1] Emergency JSONL dump: {path} ({len(rows)} events)")
+            self._write_count += len(rows)
         except Exception as e2:
             logger.critical(f"[Tool1] EMERGENCY DUMP FAILED: {e2} — DATA LOSS OCCURRING")
 
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from src.core.config import settings
+
+
+SAMPLE_EVENTS = [
+    {
+        "timestamp": "2024-03-01T10:15:02.123+0000",
+        "rule": {"level": 5, "description": "sshd: authentication failed.", "groups": ["syslog", "sshd", "authentication_failed"]},
+        "agent": {"id": "001", "name": "web-01", "ip": "10.0.0.5"},
+        "manager": {"name": "wazuh-manager"},
+        "data": {"srcip": "192.168.1.50", "srcuser": "Admin"},
+        "full_log": "Mar  1 10:15:02 web-01 sshd[811]: Failed password for admin from 192.168.1.50 port 22 ssh2",
+        "decoder": {"name": "sshd"},
+        "location": "/var/log/auth.log",
+    },
+    {
+        "timestamp": "2024-03-01T10:16:40.000+0000",
+        "rule": {"level": 7, "description": "Integrity checksum changed.", "groups": ["ossec", "syscheck", "syscheck_file"]},
+        "agent": {"id": "002", "name": "db-01"},
+        "syscheck": {"path": "/etc/passwd", "event": "modified"},
+        "_wazuh_category": "malware_behavior",
+    },
+    {
+        "pluginid": "40018", "alert": "SQL Injection", "name": "SQL Injection", "riskcode": "3",
+        "desc": "SQL injection may be possible. See CVE-2021-44228 and CWE-89.",
+        "uri": "http://shop.local/item?id=1", "method": "GET", "param": "id",
+        "cweid": "89",
+    },
+    {
+        "source_host": "10.0.0.9", "hostname": "fileserver", "port": "445", "protocol": "tcp",
+        "service_name": "microsoft-ds", "port_state": "open",
+        "raw_text": "Nmap: 10.0.0.9:445/tcp open - Samba smbd 4.6 (microsoft-ds)",
+        "scan_start": "Fri Mar  1 09:00:00 2024", "_parsing_type": "nmap_port",
+    },
+    {"raw_text": "user=bob logged in from 172.16.0.4 via powershell -enc ZQBjAGgAbwA=", "_parsing_type": "raw_log"},
+    {"time": 1709287200, "source_user": "U12@DOM1", "source_computer": "C17", "dest_computer": "C42",
+     "auth_type": "Kerberos", "status": "Success"},
+    {"message": "nothing interesting here"},
+    {"timestamp": "not a date", "msg": 42, "tags": ["a", {"b": "sudo su -"}]},
+]
+
+
+@pytest.fixture
+def sample_events():
+    """Representative Wazuh / ZAP / Nmap / syslog / LANL raw records."""
+    return [dict(e) for e in SAMPLE_EVENTS]
+
+
+@pytest.fixture
+def tool1_output(tmp_path, monkeypatch):
+    """Redirect all Tool1 output directories into a temporary tree."""
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(settings, "OUTPUT_DIR", tmp_path / "data" / "output")
+    monkeypatch.setattr(settings, "DEAD_LETTER_QUEUE_DIR", tmp_path / "data" / "dlq")
+    monkeypatch.setattr(settings, "CATALOG_PATH", tmp_path / "data" / "catalog.duckdb")
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", False)  # Mode comparisons ingest the same file twice on purpose
+    return tmp_path
+
+
+@pytest.fixture
+def ndjson_file(tmp_path):
+    """Write SAMPLE_EVENTS as an NDJSON log file."""
+    path = tmp_path / "sample.ndjson"
+    with open(path, "w", encoding="utf-8") as f:
+        for event in SAMPLE_EVENTS:
+            f.write(json.dumps(event) + "\n")
+    return path
@@ -0,0 +1,56 @@
+import polars as pl
+
+from src.ingestion.universal import UniversalIngestor
+from src.processing.batch import BatchProcessor
+from src.processing.pipeline import Pipeline
+
+# Fields that legitimately differ between two runs (wall clock / random ids)
+_VOLATILE = {"event_id", "ingest_timestamp", "event_hash", "previous_event_hash"}
+
+
+def _make_pipeline(ndjson_file, tmp_path):
+    pipeline = Pipeline(UniversalIngestor(ndjson_file))
+    pipeline.summary_path = tmp_path / "ingestion_summary.json"
+    return pipeline
+
+
+def test_batch_prepare_matches_row_path(tool1_output, ndjson_file, sample_events):
+    pipeline = _make_pipeline(ndjson_file, tool1_output)
+    batch = BatchProcessor(pipeline).process(sample_events)
+
+    for raw, batched in zip(sample_events, batch):
+        row = pipeline._prepare(raw)
+        assert not isinstance(batched, Exception)
+        if not pipeline._raw_timestamp(raw) or raw.get("timestamp") == "not a date":
+            # Wall-clock fallback timestamps can only be compared loosely
+            assert abs((row.pop("timestamp") - batched.pop("timestamp")).total_seconds()) < 5
+        assert batched == row
+
+
+def test_batch_rejects_same_events_as_row_path(tool1_output, ndjson_file, sample_events):
+    pipeline = _make_pipeline(ndjson_file, tool1_output)
+    results = BatchProcessor(pipeline).process(["not a dict", sample_events[4]])
+    assert isinstance(results[0], Exception)
+    assert results[1]["event_type"] == pipeline._prepare(sample_events[4])["event_type"]
+
+
+def test_run_batch_mode_writes_identical_events(tool1_output, ndjson_file, sample_events):
+    row_pipeline = _make_pipeline(ndjson_file, tool1_output)
+    row_pipeline.writer.output_dir = tool1_output / "rows"
+    row_summary = row_pipeline.run(max_lines=100)
+
+    batch_pipeline = _make_pipeline(ndjson_file, tool1_output)
+    batch_pipeline.writer.output_dir = tool1_output / "batch"
+    batch_summary = batch_pipeline.run(max_lines=100, batch_size=3)
+
+    assert batch_summary["success"] == row_summary["success"] == len(sample_events)
+    assert batch_summary["intelligence"] == row_summary["intelligence"]
+
+    def load(directory):
+        df = pl.read_parquet(str(directory / "**" / "*.parquet"))
+        df = df.filter(pl.col("raw_source").str.contains("not a date").not_())
+        return df.drop(sorted(_VOLATILE)).sort("raw_hash")
+
+    rows, batched = load(tool1_output / "rows"), load(tool1_output / "batch")
+    keep = [c for c in rows.columns if c != "timestamp"]
+    assert rows.select(keep).equals(batched.select(keep))
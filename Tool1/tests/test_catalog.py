@@ -0,0 +1,85 @@
+import json
+from datetime import date
+
+import duckdb
+
+from src.core.config import settings
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline
+from src.storage.catalog import Catalog
+from src.storage.compact import Compactor
+
+
+def _line(day, hour, i):
+    return json.dumps({"timestamp": f"2024-03-{day:02d}T{hour:02d}:{i % 60:02d}:00Z",
+                       "full_log": f"sshd: Failed password for u{i % 3} from 10.0.0.{i % 2} port 22",
+                       "src_ip": f"10.0.0.{i % 2}", "user": f"u{i % 3}"}) + "\n"
+
+
+def _ingest(tmp_path, days, name):
+    path = tmp_path / f"{name}.ndjson"
+    path.write_text("".join(_line(day, hour, i) for day in days for hour in (9, 10) for i in range(5)),
+                    encoding="utf-8")
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.summary_path = tmp_path / f"{name}_summary.json"
+    return pipeline.run()
+
+
+def _direct(sql):
+    glob = str(settings.OUTPUT_DIR / "**" / "*.parquet")
+    return duckdb.connect().execute(sql.replace("events", f"read_parquet('{glob}', union_by_name=true)")).fetchall()
+
+
+ROLLUP_CHECK = ("SELECT date_trunc('hour', strptime(substr(timestamp, 1, 13), '%Y-%m-%dT%H')) AS hour, "
+                "source_host, count(*) FROM events GROUP BY ALL ORDER BY ALL")
+
+
+def test_writer_registers_files_and_rollups_match(tool1_output, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_ENABLED", True)
+    _ingest(tmp_path, (1, 2), "a")
+    with Catalog() as catalog:
+        files = catalog.files()
+        assert len(files) == 2 and all(p.endswith(".parquet") for p in files)
+        assert catalog.refresh() == {"added": 0, "removed": 0, "files": 2}  # already registered by the writer
+
+        rollup = catalog.query("SELECT hour, source_host, events FROM events_per_host_hour ORDER BY ALL")
+        assert rollup.rows() == _direct(ROLLUP_CHECK)
+        users = catalog.query("SELECT user, sum(events) AS n FROM events_per_user_hour GROUP BY ALL ORDER BY ALL")
+        assert users.rows() == \
+               _direct("SELECT user, count(*) FROM events WHERE user IS NOT NULL GROUP BY ALL ORDER BY ALL")
+        assert catalog.query("SELECT count(*) AS n FROM events").item() == 20
+
+
+def test_date_range_prunes_partitions(tool1_output, tmp_path):
+    _ingest(tmp_path, (1, 2, 3), "a")
+    with Catalog() as catalog:
+        assert catalog.refresh()["added"] == 3
+        assert len(catalog.files(date(2024, 3, 2), date(2024, 3, 2))) == 1
+        assert len(catalog.files(start=date(2024, 3, 2))) == 2
+
+        pruned = catalog.query("SELECT min(timestamp) AS lo, count(*) AS n FROM events",
+                               start=date(2024, 3, 2), end=date(2024, 3, 2))
+        assert pruned["n"][0] == 10 and pruned["lo"][0].startswith("2024-03-02")
+        assert catalog.query("SELECT count(*) AS n FROM events").item() == 30  # pruning was per query
+        assert catalog.query("SELECT count(*) AS n FROM events", start=date(2025, 1, 1)).item() == 0
+
+
+def test_refresh_follows_compaction_and_deletes(tool1_output, tmp_path):
+    _ingest(tmp_path, (1,), "a")
+    _ingest(tmp_path, (1, 2), "b")
+    with Catalog() as catalog:
+        assert catalog.refresh() == {"added": 3, "removed": 0, "files": 3}
+        before = catalog.query("SELECT * FROM events_per_technique_hour ORDER BY ALL")
+
+    Compactor(settings.OUTPUT_DIR).run()
+    with Catalog() as catalog:  # a new connection sees the persisted state
+        changes = catalog.refresh()
+        assert changes["files"] == 2 and changes["removed"] == 3 and changes["added"] == 2
+        assert catalog.query("SELECT * FROM events_per_technique_hour ORDER BY ALL").equals(before)
+
+    for path in (settings.OUTPUT_DIR / "2024-03-02").glob("*.parquet"):
+        path.unlink()
+    with Catalog() as catalog:
+        assert catalog.refresh() == {"added": 0, "removed": 1, "files": 1}
+        assert catalog.query("SELECT count(*) AS n FROM events").item() == 20
+        assert catalog.query("SELECT count(*) AS n FROM catalog_rollups WHERE path LIKE '%2024-03-02%'").item() == 0
@@ -0,0 +1,190 @@
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+import pytest
+
+from src.core.config import settings
+from src.core.schema import HASH_SCHEME_V1, CanonicalEvent
+from src.storage import compact as compact_module
+from src.storage import writer as writer_module
+from src.storage.compact import Compactor
+from src.storage.verify import ChainVerifier
+from src.storage.writer import StorageWriter
+
+_USERS = ["alice", None, "bob"]
+
+
+def _chain(n, scheme, offset=0):
+    previous = None
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    for i in range(offset, offset + n):
+        event = CanonicalEvent.create(
+            event_type="auth_failure", timestamp=start + timedelta(hours=i * 2),
+            source_file="auth.log", parser_version="2.0.0", raw_source=f'{{"n": {i}}}',
+            user=_USERS[i % 3], source_host=f"10.0.0.{i % 2}",
+            observed_cve_ids=["CVE-2021-44228", "CVE-2023-0001"] if i % 4 == 0 else [],
+            hash_scheme=scheme,
+        ).compute_event_hash(previous)
+        previous = event.event_hash
+        yield event
+
+
+def _populate(output_dir, monkeypatch):
+    """Many small v2 files, a legacy v1 file with pipe-joined ids, and emergency dumps."""
+    monkeypatch.setattr(settings, "PARQUET_ROLL_BYTES", 1)
+    monkeypatch.setattr(settings, "PARQUET_ROW_GROUP_ROWS", 1)
+    writer = StorageWriter()
+    writer.output_dir = output_dir
+    writer.BATCH_SIZE = 3
+    for event in _chain(24, "v2"):
+        writer.write(event)
+    writer.close()
+
+    legacy = []
+    for event in _chain(6, HASH_SCHEME_V1, offset=100):
+        row = dict(event.to_row())
+        row.pop("hash_scheme")
+        row["observed_cve_ids"] = "|".join(row["observed_cve_ids"])
+        row["observed_cwe_ids"] = "|".join(row["observed_cwe_ids"])
+        legacy.append(row)
+    pl.DataFrame(legacy).write_parquet(output_dir / "2024-03-01" / "events_legacy.parquet")
+
+    with open(output_dir / "emergency_dump_1.jsonl", "w", encoding="utf-8") as f:
+        for event in _chain(2, "v2", offset=200):
+            f.write(json.dumps(event.to_row(), default=str) + "\n")
+    with open(output_dir / "emergency_dump_2.jsonl", "w", encoding="utf-8") as f:
+        for event in _chain(2, HASH_SCHEME_V1, offset=300):
+            row = event.to_dict()  # legacy dump format: pipe-joined ids, no hash_scheme
+            row.pop("hash_scheme")
+            f.write(json.dumps(row, default=str) + "\n")
+    return 24 + 6 + 2 + 2
+
+
+def test_compacts_sorts_and_folds_dumps(tool1_output, monkeypatch):
+    output_dir = tool1_output / "out"
+    total = _populate(output_dir, monkeypatch)
+    before = ChainVerifier(output_dir).verify()
+    assert before.ok and before.events == total
+
+    report = Compactor(output_dir).run()
+
+    assert report.files_before > 2 * report.files_after
+    assert report.files_after == len(report.partitions) == len(list(output_dir.rglob("*.parquet")))
+    assert report.dumps_folded == 2 and not list(output_dir.glob("*.jsonl"))
+    assert not (tool1_output / "out.compact").exists()
+
+    after = ChainVerifier(output_dir).verify()
+    assert after.ok and after.events == total
+    assert after.schemes == before.schemes
+
+    for path in output_dir.rglob("*.parquet"):
+        df = pl.read_parquet(path)
+        assert df.schema["observed_cve_ids"] == pl.List(pl.Utf8)
+        keyed = df.select(
+            pl.coalesce([pl.col("user"), pl.col("source_host"), pl.lit("System")]).alias("sid"),
+            pl.col("timestamp").str.strptime(pl.Datetime("us", "UTC"), "%+"),
+        )
+        assert keyed.equals(keyed.sort("sid", "timestamp"))
+
+
+def test_files_finalized_during_compaction_are_kept(tool1_output, monkeypatch):
+    output_dir = tool1_output / "out"
+    total = _populate(output_dir, monkeypatch)
+    monkeypatch.setattr(settings, "PARQUET_ROLL_BYTES", 1 << 30)
+    live = StorageWriter()  # an ingest still writing 2024-03-02: its .part stays open
+    live.output_dir = output_dir
+    live.BATCH_SIZE = 1
+    live.write(next(_chain(1, "v2", offset=13)))
+    live.flush()
+    busy = next(output_dir.rglob("*.part"))
+
+    late = []
+    write_table = compact_module.pq.write_table
+
+    def finalize_another_file(*args, **kwargs):
+        if not late:  # another ingest finalizes a 2024-03-01 file while that partition is rewritten
+            other = StorageWriter()
+            other.output_dir = output_dir
+            for event in _chain(1, "v2", offset=1):
+                other.write(event)
+            late.extend(other.close())
+        write_table(*args, **kwargs)
+
+    monkeypatch.setattr(compact_module.pq, "write_table", finalize_another_file)
+    Compactor(output_dir).run()
+    assert busy.exists() and late and late[0].exists()
+    assert not list(output_dir.glob("emergency_dump_*.jsonl"))
+    assert ChainVerifier(output_dir).verify().events == total + 1
+
+    live.close()
+    assert ChainVerifier(output_dir).verify().events == total + 2
+
+
+def test_recovers_interrupted_swap(tool1_output, monkeypatch):
+    output_dir = tool1_output / "out"
+    _populate(output_dir, monkeypatch)
+    Compactor(output_dir).run()
+    events = ChainVerifier(output_dir).verify().events
+
+    # Crash mid-swap: manifest written, a replaced file still in the partition,
+    # the new files not moved in yet
+    partition = output_dir / "2024-03-02"
+    staging = tool1_output / "out.compact" / partition.name
+    (staging / "new").mkdir(parents=True)
+    new = sorted(f.name for f in partition.glob("*.parquet"))
+    for name in new:
+        (partition / name).rename(staging / "new" / name)
+    shutil.copy(staging / "new" / new[0], partition / "events_replaced.parquet")
+    (staging / "manifest.json").write_text(json.dumps({"old": ["events_replaced.parquet"], "new": new}))
+    # Crash while writing another partition's new files: dropped, the partition untouched
+    (tool1_output / "out.compact" / "2024-03-01" / "new").mkdir(parents=True)
+    untouched = sorted((output_dir / "2024-03-01").glob("*.parquet"))
+
+    Compactor(output_dir).run(partitions=["2024-03-03"])
+    assert sorted(f.name for f in partition.glob("*.parquet")) == new
+    assert sorted((output_dir / "2024-03-01").glob("*.parquet")) == untouched
+    assert not (tool1_output / "out.compact").exists()
+    assert ChainVerifier(output_dir).verify().events == events
+
+
+def test_crash_after_a_swap_folds_dump_rows_once(tool1_output, monkeypatch):
+    output_dir = tool1_output / "out"
+    total = _populate(output_dir, monkeypatch)
+    with open(output_dir / "emergency_dump_3.jsonl", "w", encoding="utf-8") as f:
+        for event in _chain(13, "v2", offset=500):  # two partitions
+            f.write(json.dumps(event.to_row(), default=str) + "\n")
+
+    consume = Compactor._consume_dump
+
+    def killed(path, date_str):  # after the partition's files were swapped, before its dump rows are consumed
+        raise RuntimeError("killed")
+
+    monkeypatch.setattr(Compactor, "_consume_dump", staticmethod(killed))
+    with pytest.raises(RuntimeError):
+        Compactor(output_dir).run()
+    monkeypatch.setattr(Compactor, "_consume_dump", staticmethod(consume))
+
+    report = Compactor(output_dir).run()
+    assert not list(output_dir.glob("emergency_dump_*"))
+    after = ChainVerifier(output_dir).verify()
+    assert after.ok and after.events == total + 13
+    assert report.dumps_folded == 2  # the resumed swap consumed the first one
+
+
+def test_orphaned_part_files_do_not_block_compaction(tool1_output, monkeypatch):
+    output_dir = tool1_output / "out"
+    total = _populate(output_dir, monkeypatch)
+    partition = sorted(p for p in output_dir.iterdir() if p.is_dir())[0]
+    orphan = partition / "events_999.parquet.part"
+    orphan.write_bytes(b"PAR1 no footer")
+    old = time.time() - writer_module.ORPHAN_GRACE_SECONDS - 1
+    os.utime(orphan, (old, old))
+
+    report = Compactor(output_dir).run()
+    assert report.files_after == len(report.partitions)
+    assert (output_dir.with_name("out.orphans") / partition.name / orphan.name).exists()
+    assert ChainVerifier(output_dir).verify().events == total
@@ -0,0 +1,60 @@
+import bz2
+import gzip
+import json
+import lzma
+
+import pytest
+
+from src.ingestion.universal import UniversalIngestor
+
+CODECS = {
+    ".gz": gzip.compress,
+    ".bz2": bz2.compress,
+    ".xz": lzma.compress,
+}
+try:
+    import zstandard
+    CODECS[".zst"] = zstandard.ZstdCompressor().compress
+except ImportError:
+    pass
+
+
+def _ingest(tmp_path, text, suffix):
+    path = tmp_path / f"archive{suffix}"
+    path.write_bytes(CODECS.get(suffix, gzip.compress)(text.encode("utf-8")))
+    return list(UniversalIngestor(path).ingest())
+
+
+@pytest.mark.parametrize("suffix", sorted(CODECS))
+def test_ndjson_and_raw_lines_stream(tmp_path, suffix):
+    text = '{"a": 1}\n\n{"b": 2}\nMar  1 10:15:02 web-01 sshd[811]: Failed password\n'
+    assert _ingest(tmp_path, text, suffix) == [
+        {"a": 1},
+        {"b": 2},
+        {"raw_text": "Mar  1 10:15:02 web-01 sshd[811]: Failed password", "_parsing_type": f"{suffix[1:]}_raw"},
+    ]
+
+
+@pytest.mark.parametrize("suffix", sorted(CODECS))
+def test_json_documents(tmp_path, suffix):
+    assert _ingest(tmp_path, json.dumps([{"a": 1}, 2], indent=2), suffix) == [{"a": 1}, {"raw_text": "2"}]
+    assert _ingest(tmp_path, json.dumps({"a": {"b": [1]}}, indent=2), suffix) == [{"a": {"b": [1]}}]
+
+
+def test_bracketed_log_lines_are_not_json(tmp_path):
+    text = "[2024-03-01 10:15:02] service started\n[2024-03-01 10:15:03] ready\n"
+    events = _ingest(tmp_path, text, ".gz")
+    assert [e["raw_text"] for e in events] == ["[2024-03-01 10:15:02] service started", "[2024-03-01 10:15:03] ready"]
+
+
+def test_compression_detected_from_magic_bytes(tmp_path):
+    path = tmp_path / "export.dat"
+    path.write_bytes(bz2.compress(b'{"a": 1}\n{"a": 2}\n'))
+    assert list(UniversalIngestor(path).ingest()) == [{"a": 1}, {"a": 2}]
+
+
+def test_corrupt_archive_yields_error_record(tmp_path):
+    path = tmp_path / "broken.xz"
+    path.write_bytes(b"not an xz stream")
+    events = list(UniversalIngestor(path).ingest())
+    assert events[-1]["_parsing_type"] == "xz_error"
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import shutil
+
+from src.ingestion.universal import UniversalIngestor
+from src.core.config import settings
+from src.processing.pipeline import Pipeline, RAW_SOURCE_LIMIT
+from src.storage.dedup import DedupIndex
+
+
+def _h(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _line(i):
+    return json.dumps({"timestamp": f"2024-03-01T10:00:{i:02d}Z", "full_log": f"sshd: Failed password for u{i}",
+                       "src_ip": "10.0.0.1"}) + "\n"
+
+
+def _run(path, tmp_path, name, **kwargs):
+    pipeline = Pipeline(UniversalIngestor(path), dedup=True)
+    pipeline.summary_path = tmp_path / f"{name}_summary.json"
+    written = []
+    write = pipeline.writer.write
+    pipeline.writer.write = lambda event: (written.append(event), write(event))
+    return pipeline.run(**kwargs), written
+
+
+def test_index_is_exact_and_persistent(tmp_path):
+    index = DedupIndex(tmp_path / "dedup.sqlite")
+    assert index.seen_or_add("network", _h("a"), source="run1") is None
+    assert index.seen_or_add("network", _h("a"), source="run1") is None  # a repeat within a source is kept
+    assert index.seen_or_add("auth", _h("a"), source="run1") is None  # keyed per log category
+    assert index.seen_or_add("network", _h("a"), _h("e"), source="run2") == (None, False)
+    assert index.seen_or_add("network", _h("a"), source="run2") is not None
+    assert index.seen_or_add("network", _h("a"), source="run2") is None  # run2's third copy is new
+    index.commit()
+    assert index.seen_or_add("network", _h("uncommitted"), source="run2") is None
+    assert index.stats() == {"lookups": 7, "added": 5, "duplicates": 2}
+    index.close()  # without commit: as if the run crashed before its Parquet files were finalized
+
+    reopened = DedupIndex(tmp_path / "dedup.sqlite")
+    assert all(reopened.seen_or_add("network", _h("a"), source="run3") for _ in range(3))
+    assert reopened.seen_or_add("network", _h("a"), source="run3") is None
+    assert reopened.seen_or_add("network", _h("uncommitted"), source="run3") is None
+    reopened.close()
+
+
+def test_followed_file_tells_reread_lines_from_repeated_ones(tmp_path):
+    index = DedupIndex(tmp_path / "dedup.sqlite")
+    assert index.seen_or_add("auth", _h("x"), _h("e1"), "alerts@1", position=10) is None
+    assert index.seen_or_add("auth", _h("x"), _h("e2"), "alerts@1", position=20) is None
+    index.commit()
+    index.close()
+
+    restarted = DedupIndex(tmp_path / "dedup.sqlite")  # same file identity after a restart
+    assert restarted.seen_or_add("auth", _h("x"), _h("f"), "alerts@1", position=20) == (_h("e2"), True)
+    assert restarted.seen_or_add("auth", _h("x"), _h("g"), "alerts@1", position=30) is None
+    restarted.close()
+
+
+def test_repeated_lines_are_all_stored_with_default_settings(tool1_output, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    line = "Mar  1 10:15:02 web-01 sshd[811]: Failed password for admin from 192.168.1.50 port 22 ssh2\n"
+    path = tmp_path / "auth.log"
+    path.write_text(line * 3, encoding="utf-8")
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.summary_path = tmp_path / "summary.json"
+    summary = pipeline.run()
+    assert summary["success"] == 3 and summary["duplicates_skipped"] == 0
+
+    path.write_text(line * 4, encoding="utf-8")  # the same log again, one more attempt since
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.summary_path = tmp_path / "summary.json"
+    summary = pipeline.run(batch_size=2)
+    assert summary["success"] == 1 and summary["duplicates_skipped"] == 3
+
+
+def test_records_differing_past_raw_source_limit_are_distinct(tool1_output, tmp_path):
+    head = '{"message": "' + "x" * RAW_SOURCE_LIMIT
+    path = tmp_path / "big.ndjson"
+    path.write_text(head + 'a"}\n' + head + 'b"}\n', encoding="utf-8")
+    summary, stored = _run(path, tmp_path, "big")
+    assert summary["success"] == 2 and stored[0].raw_source == stored[1].raw_source
+    assert stored[0].raw_hash == stored[1].raw_hash == _h(stored[0].raw_source)  # raw_hash covers what is stored
+
+    summary, _ = _run(path, tmp_path, "again", batch_size=2)
+    assert summary["success"] == 0 and summary["duplicates_skipped"] == 2
+
+
+def test_reingesting_overlapping_export_skips_stored_events(tool1_output, tmp_path):
+    first, second = tmp_path / "scan1.ndjson", tmp_path / "scan2.ndjson"
+    first.write_text("".join(_line(i) for i in range(5)), encoding="utf-8")
+    second.write_text("".join(_line(i) for i in range(3, 8)), encoding="utf-8")
+
+    summary, stored = _run(first, tmp_path, "first")
+    assert summary["success"] == 5 and summary["duplicates_skipped"] == 0
+
+    summary, stored_again = _run(second, tmp_path, "second", batch_size=2)
+    assert summary["success"] == 3 and summary["duplicates_skipped"] == 2
+    assert summary["total_processed"] == 5 and summary["dedup"] == {"lookups": 5, "added": 3, "duplicates": 2}
+    assert [e.source_host for e in stored_again] == ["10.0.0.1"] * 3
+    assert {e.raw_hash for e in stored_again}.isdisjoint(e.raw_hash for e in stored)
+    previous = None  # duplicates do not enter the hash chain
+    for event in stored_again:
+        assert event.previous_event_hash == previous
+        previous = event.event_hash
+
+    summary, _ = _run(second, tmp_path, "third")
+    assert summary["success"] == 0 and summary["duplicates_skipped"] == 5
+
+
+def test_index_is_deleted_with_the_output(tool1_output, tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from src.main import app
+
+    monkeypatch.setattr(settings, "BASE_DIR", tmp_path)  # ingestion_summary.json
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    path = tmp_path / "scan.ndjson"
+    path.write_text("".join(_line(i) for i in range(4)), encoding="utf-8")
+    runner = CliRunner()
+    assert runner.invoke(app, ["ingest", str(path), "--dedup"]).exit_code == 0
+    assert (settings.OUTPUT_DIR / settings.DEDUP_FILE).exists()
+
+    again = runner.invoke(app, ["ingest", str(path), "--dedup"])
+    assert again.exit_code == 2 and "all 4 events were already in" in again.output
+
+    shutil.rmtree(settings.OUTPUT_DIR)  # what the UI reset does
+    assert runner.invoke(app, ["ingest", str(path), "--dedup"]).exit_code == 0
+    assert len(list(settings.OUTPUT_DIR.rglob("*.parquet")))
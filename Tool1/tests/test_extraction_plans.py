@@ -0,0 +1,59 @@
+from src.ingestion.universal import UniversalIngestor
+from src.processing import pipeline as pipeline_module
+from src.processing.pipeline import Pipeline, _FieldPlan, _first_value, _PlanCache
+
+_FIELDS = {
+    "source_host": pipeline_module._SOURCE_HOST_KEYS,
+    "target_host": pipeline_module._TARGET_HOST_KEYS,
+    "user": pipeline_module._USER_KEYS,
+    "port": pipeline_module._PORT_KEYS,
+    "protocol": pipeline_module._PROTOCOL_KEYS,
+    "raw_text": pipeline_module._RAW_TEXT_KEYS,
+}
+
+_SHAPES = [
+    {"agent": {"name": "web-01"}, "data": {"srcuser": "bob", "win": {"eventdata": {"targetUserName": "x"}}}},
+    {"agent": "not-a-dict", "user": {"name": "alice"}, "data": None, "port": 0},
+    {"src": None, "src_ip": "10.0.0.1", "user": None, "username": "carol", "proto": 6, "message": ""},
+    {"rule": {"description": "sshd"}, "decoder": {"name": "sshd"}, "location": "/var/log/auth.log"},
+    {"agent.ip": "flat dotted keys are not read", "uid": 0, "Destination Port": "443", "desc": "d"},
+]
+
+
+def test_plans_resolve_like_the_full_candidate_lists(sample_events, tool1_output, ndjson_file):
+    pipeline = Pipeline(UniversalIngestor(ndjson_file))
+    for raw in sample_events + _SHAPES:
+        plan = _FieldPlan(tuple(raw))
+        for field, keys in _FIELDS.items():
+            assert _first_value(raw, getattr(plan, field)) == pipeline._get(raw, *keys), (field, raw)
+
+    plan = _FieldPlan(tuple(_SHAPES[2]))
+    assert [key for key, _ in plan.source_host] == ["src_ip", "src"]
+    assert [key for key, _ in plan.user] == ["user", "username", "user.name"]
+    assert plan.port == ()
+
+
+def test_plan_cache_is_bounded_and_counts_hits():
+    cache = _PlanCache(size=2)
+    a, b, c = {"x": 1}, {"y": 1}, {"x": 2, "y": 2}
+    assert cache.get(a) is cache.get({"x": 3})
+    cache.get(b)
+    cache.get(c)  # evicts a's shape
+    cache.get(a)
+    assert cache.stats() == {"hits": 1, "misses": 4, "hit_rate": 0.2, "cached_plans": 2}
+    assert cache.take_counts() == {"hits": 1, "misses": 4}
+    cache.merge({"hits": 3, "misses": 1})
+    assert cache.stats()["hit_rate"] == 0.75
+
+
+def test_summary_reports_plan_hit_rate(tool1_output, tmp_path):
+    path = tmp_path / "auth.ndjson"
+    path.write_text("".join(
+        f'{{"timestamp": "2024-03-01T10:00:{i:02d}Z", "src_ip": "10.0.0.{i}", "user": "u{i}", '
+        f'"message": "Failed password for u{i}"}}\n' for i in range(20)
+    ), encoding="utf-8")
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.summary_path = tool1_output / "summary.json"
+    summary = pipeline.run(max_lines=100)
+    assert summary["success"] == 20
+    assert summary["extraction_plans"] == {"hits": 19, "misses": 1, "hit_rate": 0.95, "cached_plans": 1}
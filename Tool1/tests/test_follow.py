@@ -0,0 +1,139 @@
+import json
+import os
+
+from src.core.config import settings
+from src.ingestion.follow import Checkpoint, FollowIngestor
+from src.processing.pipeline import Pipeline
+from src.storage.verify import ChainVerifier
+
+
+def _line(i):
+    return json.dumps({"timestamp": f"2024-03-01T10:00:{i:02d}Z", "full_log": f"sshd: Failed password for u{i}",
+                       "src_ip": f"10.0.0.{i}"}) + "\n"
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _follow(path, tmp_path, checkpoint_path):
+    ingestor = FollowIngestor(path, Checkpoint.load(checkpoint_path, path), poll_seconds=0.01, idle_timeout=0.05)
+    pipeline = Pipeline(ingestor)
+    pipeline.summary_path = tmp_path / "summary.json"
+    written = []
+    write = pipeline.writer.write
+    pipeline.writer.write = lambda event: (written.append(event), write(event))
+    summary = pipeline.follow(checkpoint_path, flush_seconds=60, flush_events=2)
+    return summary, written
+
+
+def _drain(events):
+    """Events from follow() up to its next idle poll."""
+    out = []
+    for event in events:
+        if event is None:
+            return out
+        out.append(event)
+    return out
+
+
+def test_restart_resumes_offset_and_hash_chain(tool1_output, tmp_path):
+    path, checkpoint_path = tmp_path / "alerts.json", tmp_path / "cp" / "alerts.json.cp"
+    path.write_text(_line(1) + _line(2) + _line(3), encoding="utf-8")
+    summary, first = _follow(path, tmp_path, checkpoint_path)
+    assert summary["success"] == 3
+    assert summary["follow"]["checkpoints"] == 2  # after 2 events, then at the end
+    assert summary["follow"]["read_to_visible_latency"]["events"] == 3
+
+    saved = json.loads(checkpoint_path.read_text())
+    assert saved["offset"] == path.stat().st_size and saved["inode"] == path.stat().st_ino
+    assert saved["previous_event_hash"] == first[-1].event_hash
+
+    _append(path, _line(4) + _line(5) + '{"timestamp": "2024-03-01T10:00:06Z", "full_lo')  # last line unfinished
+    summary, second = _follow(path, tmp_path, checkpoint_path)
+    assert [e.source_host for e in second] == ["10.0.0.4", "10.0.0.5"]
+    assert second[0].previous_event_hash == first[-1].event_hash
+    assert json.loads(checkpoint_path.read_text())["offset"] == path.stat().st_size - len(
+        '{"timestamp": "2024-03-01T10:00:06Z", "full_lo')
+
+    _append(path, 'g": "done"}\n')
+    _, third = _follow(path, tmp_path, checkpoint_path)
+    assert len(third) == 1 and third[0].previous_event_hash == second[-1].event_hash
+    assert len(list(tool1_output.glob("data/output/**/*.parquet"))) >= 3
+
+
+def test_rename_and_copytruncate_rotation(tmp_path):
+    path = tmp_path / "syslog"
+    path.write_text("Mar  1 10:00:01 web-01 sshd: one\n", encoding="utf-8")
+    ingestor = FollowIngestor(path, poll_seconds=0)
+    events = ingestor.follow()
+    assert [e["raw_text"] for e in _drain(events)] == ["Mar  1 10:00:01 web-01 sshd: one"]
+
+    _append(path, "Mar  1 10:00:02 web-01 sshd: two (no newline)")
+    assert _drain(events) == []
+    os.rename(path, tmp_path / "syslog.1")
+    path.write_text("Mar  1 10:00:03 web-01 sshd: three\n", encoding="utf-8")
+    assert [e["raw_text"] for e in _drain(events)] == [
+        "Mar  1 10:00:02 web-01 sshd: two (no newline)", "Mar  1 10:00:03 web-01 sshd: three"]
+    assert ingestor.rotations == 1 and ingestor.position == path.stat().st_size
+
+    with open(path, "w", encoding="utf-8") as f:  # copytruncate
+        f.write("4\n")
+    assert [e["raw_text"] for e in _drain(events)] == ["4"]
+    assert ingestor.rotations == 2
+    ingestor.close()
+
+
+def test_rotation_while_stopped_finishes_the_old_file(tmp_path):
+    path = tmp_path / "alerts.json"
+    path.write_text(_line(1), encoding="utf-8")
+    ingestor = FollowIngestor(path, poll_seconds=0)
+    assert len(_drain(ingestor.follow())) == 1
+    checkpoint = ingestor.mark("abc")
+    ingestor.close()
+
+    _append(path, _line(2))
+    os.rename(path, tmp_path / "alerts.json.1")
+    path.write_text(_line(3), encoding="utf-8")
+
+    resumed = FollowIngestor(path, Checkpoint(**vars(checkpoint)), poll_seconds=0)
+    assert [e["src_ip"] for e in _drain(resumed.follow())] == ["10.0.0.2", "10.0.0.3"]
+    resumed.close()
+
+    # A checkpoint whose file no longer exists anywhere: read the current file from the start
+    replaced = FollowIngestor(path, Checkpoint(**{**vars(checkpoint), "inode": -1}), poll_seconds=0)
+    assert [e["src_ip"] for e in _drain(replaced.follow())] == ["10.0.0.3"]
+    replaced.close()
+
+
+def test_repeated_lines_survive_restarts_with_dedup(tool1_output, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    line = "Mar  1 10:15:02 web-01 sshd[811]: Failed password for admin from 192.168.1.50 port 22 ssh2\n"
+    path, checkpoint_path = tmp_path / "auth.log", tmp_path / "cp" / "auth.log.cp"
+    path.write_text(line * 2, encoding="utf-8")
+    summary, first = _follow(path, tmp_path, checkpoint_path)
+    assert summary["success"] == 2
+
+    _append(path, line * 3)
+    summary, second = _follow(path, tmp_path, checkpoint_path)
+    assert summary["success"] == 3 and summary["duplicates_skipped"] == 0
+    assert second[0].previous_event_hash == first[-1].event_hash
+
+
+def test_crash_before_checkpoint_save_does_not_fork_the_chain(tool1_output, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    path, checkpoint_path = tmp_path / "alerts.json", tmp_path / "cp" / "alerts.json.cp"
+    path.write_text(_line(1) + _line(2), encoding="utf-8")
+    _follow(path, tmp_path, checkpoint_path)
+    stale = checkpoint_path.read_text()
+
+    _append(path, _line(3) + _line(4))
+    _follow(path, tmp_path, checkpoint_path)
+    checkpoint_path.write_text(stale)  # as if the run died after finalizing, before saving its checkpoint
+
+    _append(path, _line(5))
+    summary, resumed = _follow(path, tmp_path, checkpoint_path)
+    assert summary["success"] == 1 and summary["duplicates_skipped"] == 2
+    report = ChainVerifier(tool1_output / "data" / "output").verify()
+    assert report.ok and report.events == 5 and report.chain_heads == 1 and report.forks == 0
@@ -0,0 +1,64 @@
+import pytest
+
+from src.processing.governor import RateGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _governor(mode, rate=100, **kwargs):
+    clock = FakeClock()
+    return RateGovernor(mode=mode, rate=rate, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_unlimited_never_sleeps():
+    governor, clock = _governor("unlimited")
+    for _ in range(50):
+        governor.acquire(1000)
+    assert clock.sleeps == []
+    assert governor.stats()["events"] == 50_000
+
+
+def test_token_bucket_sleeps_once_per_batch_deficit():
+    governor, clock = _governor("token_bucket", rate=100)
+    governor.acquire(100)          # full bucket covers the first batch
+    governor.acquire(50)           # empty bucket: one sleep for the whole batch
+    assert clock.sleeps == [pytest.approx(0.5)]
+    assert governor.stats()["throttled_seconds"] == pytest.approx(0.5)
+
+
+def test_token_bucket_holds_configured_rate():
+    governor, clock = _governor("token_bucket", rate=200)
+    for _ in range(100):
+        governor.acquire(20)
+    assert governor.stats()["achieved_rate"] == pytest.approx(200, rel=0.15)
+
+
+def test_adaptive_backs_off_on_slow_flush_and_recovers():
+    governor, _ = _governor("adaptive", rate=1000, flush_target_seconds=0.5)
+    governor.observe_flush(500, 2.0)
+    assert governor.rate == 500
+    governor.observe_flush(500, 0.1)
+    assert governor.rate == 600
+    assert governor.stats()["backoffs"] == 1
+
+
+def test_non_adaptive_ignores_backpressure():
+    governor, _ = _governor("token_bucket", rate=1000)
+    governor.observe_flush(500, 10.0)
+    assert governor.rate == 1000
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        RateGovernor(mode="turbo")
@@ -0,0 +1,100 @@
+import io
+import json
+
+import pytest
+
+from src.ingestion.json_stream import JsonStreamReader
+from src.ingestion.universal import UniversalIngestor
+
+ZAP_REPORT = {
+    "@version": "2.14.0",
+    "site": [
+        {
+            "@name": "http://shop.local",
+            "@port": "80",
+            "alerts": [
+                {"pluginid": "40018", "alert": "SQL Injection", "instances": [{"uri": "/a"}, {"uri": "/b", "param": "id"}]},
+                {"pluginid": "10021", "alert": "X-Content-Type-Options Header Missing"},
+            ],
+        }
+    ],
+    "vulnerability": [{"rule": {"id": "ignored"}}],
+}
+
+WAZUH_REPORT = {
+    "malware_behavior": [{"rule": {"id": "550"}}],
+    "vulnerability": [{"rule": {"id": "23505"}}, "scalar note"],
+    "persistence": [],
+    "summary": {"total": 3},
+}
+
+
+def _ingest(tmp_path, text, name="report.json"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return list(UniversalIngestor(path).ingest())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 20])
+def test_reader_values_survive_chunk_boundaries(chunk_size):
+    doc = {"n": [-0.0125e-3, 12345, True, None], "s": "café \\ \"q\"", "nested": {"a": [{"b": []}]}}
+    reader = JsonStreamReader(io.StringIO(json.dumps(doc)), chunk_size=chunk_size)
+    decoded = {}
+    for key in reader.iter_object():
+        decoded[key] = reader.read_value()
+    reader.expect_end()
+    assert decoded == doc
+
+
+def test_reader_rejects_malformed_input():
+    reader = JsonStreamReader(io.StringIO('{"a" 1}'), chunk_size=2)
+    with pytest.raises(json.JSONDecodeError):
+        list(reader.iter_object())
+
+
+def test_zap_report_streams_alert_instances(tmp_path):
+    events = _ingest(tmp_path, json.dumps(ZAP_REPORT, indent=2))
+    assert [e.get("uri") for e in events] == ["/a", "/b", None]
+    assert all("instances" not in e for e in events)
+    assert events[1]["param"] == "id"
+
+
+def test_wazuh_categories_are_tagged_in_file_order(tmp_path):
+    events = _ingest(tmp_path, json.dumps(WAZUH_REPORT))
+    assert events == [
+        {"rule": {"id": "550"}, "_wazuh_category": "malware_behavior"},
+        {"rule": {"id": "23505"}, "_wazuh_category": "vulnerability"},
+        {"raw_text": "scalar note", "_wazuh_category": "vulnerability"},
+    ]
+
+
+def test_elasticsearch_hits_yield_source(tmp_path):
+    doc = {"took": 3, "hits": {"total": 2, "hits": [{"_source": {"a": 1}}, {"b": 2}]}}
+    assert _ingest(tmp_path, json.dumps(doc)) == [{"a": 1}, {"b": 2, "_wazuh_category": "hits"}]
+
+
+def test_plain_dict_cases(tmp_path):
+    discovered = {"meta": {"v": 1}, "records": [{"x": 1}, {"x": 2}], "nums": [1, 2]}
+    assert _ingest(tmp_path, json.dumps(discovered)) == [{"x": 1}, {"x": 2}]
+
+    single = {"a": 1, "b": {"c": [1, 2]}}
+    assert _ingest(tmp_path, json.dumps(single)) == [single]
+
+
+def test_top_level_list_and_scalar(tmp_path):
+    assert _ingest(tmp_path, json.dumps([{"a": 1}, 2])) == [
+        {"a": 1},
+        {"raw_text": "2", "_parsing_type": "list_scalar"},
+    ]
+    assert _ingest(tmp_path, "12345.678") == [{"raw_text": "12345.678", "_parsing_type": "json_scalar"}]
+
+
+def test_ndjson_with_json_suffix_and_garbage_fall_back(tmp_path):
+    assert _ingest(tmp_path, '{"a": 1}\n{"a": 2}\n') == [{"a": 1}, {"a": 2}]
+    assert _ingest(tmp_path, '{"a" 1}') == [{"raw_text": '{"a" 1}', "_parsing_type": "raw_log"}]
+
+
+def test_truncated_report_keeps_events_read_so_far(tmp_path):
+    events = _ingest(tmp_path, '{"events": [{"a": 1}, {"b": ')
+    assert events[0] == {"a": 1, "_wazuh_category": "events"}
+    assert events[-1]["_parsing_type"] == "ingestion_error"
@@ -0,0 +1,64 @@
+import pytest
+
+from src.processing.enricher import Enricher, _MITRE_RULES
+from src.processing.matcher import KeywordMatcher
+from src.processing.pipeline import _EVENT_TYPE_KEYWORDS
+
+from benchmarks._synthetic import events
+
+BACKENDS = ["python"]
+try:
+    import ahocorasick  # noqa: F401
+    BACKENDS.append("pyahocorasick")
+except ImportError:
+    pass
+
+
+def _reference_mitre(text):
+    """The original per-rule, per-keyword scan."""
+    best = (None, 0.0, None, None)
+    for tech_id, confidence, tactic, tech_name, keywords in _MITRE_RULES:
+        for kw in keywords:
+            if kw in text:
+                if confidence > best[1]:
+                    best = (tech_id, confidence, tactic, tech_name)
+                break
+    return best
+
+
+@pytest.fixture(scope="module")
+def texts():
+    enricher = Enricher()
+    corpus = [enricher._build_enrichment_text(r.get("raw_text", ""), r) for r in events(1500)]
+    corpus += ["", "sudo", "bash -c", "hklm\\software\\microsoft\\windows\\currentversion\\run\\evil",
+               "pass the hash then kerberoast", "ssh -enc iex downloadstring"]
+    return corpus
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_match_equals_substring_scan(backend, texts):
+    groups = [rule[4] for rule in _MITRE_RULES]
+    matcher = KeywordMatcher(groups, backend=backend)
+    for text in texts:
+        expected = {i for i, kws in enumerate(groups) if any(kw in text for kw in kws)}
+        assert matcher.match(text) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_overlapping_and_prefix_keywords(backend):
+    matcher = KeywordMatcher([["hklm"], ["hklm\\software"], ["software"], ["ft"]], backend=backend)
+    assert matcher.match("x hklm\\software y") == {0, 1, 2, 3}
+    assert matcher.first("software") == 2
+    assert matcher.first("nothing") is None
+
+
+def test_infer_mitre_matches_reference(texts):
+    enricher = Enricher()
+    for text in texts:
+        assert enricher.infer_mitre(text) == _reference_mitre(text)
+
+
+def test_event_type_first_group_wins():
+    matcher = KeywordMatcher([kws for _, kws in _EVENT_TYPE_KEYWORDS], backend="python")
+    # "failed login" (auth_failure) beats "ssh" (network_connect) by table order
+    assert _EVENT_TYPE_KEYWORDS[matcher.first("ssh failed login")][0] == "auth_failure"
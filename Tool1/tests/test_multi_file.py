@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from src.ingestion.auth_lanl import LanlAuthIngestor
+from src.ingestion.base import BaseIngestor
+from src.ingestion.multi import expand_sources
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline
+
+
+def _pipeline(ingestor, tmp_path, name):
+    pipeline = Pipeline(ingestor)
+    pipeline.summary_path = tmp_path / f"{name}_summary.json"
+    pipeline.writer.output_dir = tmp_path / name
+    written = []
+    write = pipeline.writer.write
+    pipeline.writer.write = lambda event: (written.append(event), write(event))
+    return pipeline, written
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    logs = tmp_path / "saved-logs"
+    (logs / "nested").mkdir(parents=True)
+    (logs / "a.ndjson").write_text("".join(
+        json.dumps({"timestamp": f"2024-03-01T10:00:{i:02d}Z", "full_log": f"sshd: Failed password for u{i}",
+                    "src_ip": "10.0.0.1"}) + "\n" for i in range(6)), encoding="utf-8")
+    (logs / "b.log").write_text("".join(f"Mar  1 10:01:{i:02d} web-01 sudo: u{i} : COMMAND=/bin/sh\n"
+                                        for i in range(4)), encoding="utf-8")
+    (logs / "nested" / "auth.txt").write_text("".join(
+        f"{t},U{t}@DOM1,U{t}@DOM1,C{t},C1,NTLM,Network,LogOn,Success\n" for t in range(5)), encoding="utf-8")
+    (logs / ".hidden.json").write_text("{}", encoding="utf-8")
+    return logs
+
+
+def test_expand_sources(log_dir):
+    assert [p.name for p in expand_sources(str(log_dir))] == ["a.ndjson", "b.log", "auth.txt"]
+    assert [p.name for p in expand_sources(str(log_dir / "**" / "*.txt"))] == ["auth.txt"]
+    assert [p.name for p in expand_sources(str(log_dir / "*.*"))] == ["a.ndjson", "b.log"]
+    assert expand_sources(str(log_dir / "missing.json")) == []
+
+
+@pytest.mark.parametrize("batch_size", [0, 3])
+def test_one_run_over_many_files(tool1_output, log_dir, batch_size):
+    def ingestors():
+        return [UniversalIngestor(log_dir / "a.ndjson"), UniversalIngestor(log_dir / "b.log"),
+                LanlAuthIngestor(log_dir / "nested" / "auth.txt")]
+
+    # Baseline: each file on its own, as separate ingest runs did
+    serial = []
+    for i, ingestor in enumerate(ingestors()):
+        pipeline, written = _pipeline(ingestor, tool1_output, f"single{i}")
+        pipeline.run(max_lines=5, batch_size=batch_size)
+        serial.append(written)
+
+    runs = []
+    for readers in (1, 3):
+        pipeline, written = _pipeline(ingestors()[0], tool1_output, f"many{readers}")
+        summary = pipeline.run_many(ingestors(), max_lines=5, batch_size=batch_size, readers=readers,
+                                    source=str(log_dir))
+        runs.append(written)
+
+    assert [e.raw_hash for e in runs[0]] == [e.raw_hash for e in runs[1]] == \
+           [e.raw_hash for events in serial for e in events]
+    assert [e.source_file for e in runs[1]] == [e.source_file for events in serial for e in events]
+    previous = None
+    for event in runs[1]:  # one hash chain across files
+        assert event.previous_event_hash == previous
+        previous = event.event_hash
+
+    assert summary["source_file"] == str(log_dir)
+    assert summary["success"] == 14 and summary["ingestion_limit"] == 5
+    assert [(f["ingestor"], f["success"], f["failed"], f["error"]) for f in summary["files"]] == [
+        ("UniversalIngestor", 5, 0, None), ("UniversalIngestor", 4, 0, None), ("LanlAuthIngestor", 5, 0, None)]
+    assert json.loads((tool1_output / "many3_summary.json").read_text())["files"] == summary["files"]
+    partitions = [d for d in (tool1_output / "many3").iterdir()]
+    assert all(len(list(d.glob("*.parquet"))) == 1 for d in partitions)  # one shared writer
+
+
+class _Broken(BaseIngestor):
+    def ingest(self):
+        yield {"message": "sudo su -"}
+        raise OSError("disk went away")
+
+
+def test_failing_file_does_not_stop_the_run(tool1_output, log_dir):
+    ingestors = [_Broken(log_dir / "b.log"), UniversalIngestor(log_dir / "a.ndjson")]
+    pipeline, written = _pipeline(ingestors[0], tool1_output, "many")
+    summary = pipeline.run_many(ingestors)
+    assert [f["success"] for f in summary["files"]] == [1, 6]
+    assert summary["files"][0]["error"] == "disk went away" and summary["files"][1]["error"] is None
+    assert len(written) == 7
@@ -0,0 +1,53 @@
+import pytest
+
+from src.ingestion.auth_lanl import LanlAuthIngestor
+from src.ingestion.universal import UniversalIngestor
+from src.processing import parallel
+from src.processing.pipeline import Pipeline
+
+
+def _run(ingestor, tmp_path, name, **kwargs):
+    pipeline = Pipeline(ingestor)
+    pipeline.summary_path = tmp_path / f"{name}_summary.json"
+    pipeline.writer.output_dir = tmp_path / name
+    written = []
+    write = pipeline.writer.write
+    pipeline.writer.write = lambda event: (written.append(event), write(event))
+    summary = pipeline.run(**kwargs)
+    return summary, written
+
+
+def _assert_same_run(serial, parallel_run):
+    (serial_summary, serial_events), (summary, events) = serial, parallel_run
+    assert summary["success"] == serial_summary["success"]
+    assert summary["failed"] == serial_summary["failed"]
+    assert summary["intelligence"] == serial_summary["intelligence"]
+    # Same events in the same order, and an unbroken hash chain
+    assert [e.raw_hash for e in events] == [e.raw_hash for e in serial_events]
+    previous = None
+    for event in events:
+        assert event.previous_event_hash == previous
+        previous = event.event_hash
+
+
+@pytest.mark.parametrize("batch_size", [0, 4])
+def test_workers_match_serial_run(tool1_output, ndjson_file, monkeypatch, batch_size):
+    monkeypatch.setattr(parallel, "ROW_CHUNK", 3)
+    serial = _run(UniversalIngestor(ndjson_file), tool1_output, "serial", max_lines=7, batch_size=batch_size)
+    workers = _run(UniversalIngestor(ndjson_file), tool1_output, "workers", max_lines=7,
+                   batch_size=batch_size, workers=2)
+    assert workers[0]["workers"] == 2
+    assert len(workers[1]) == 7
+    _assert_same_run(serial, workers)
+
+
+def test_workers_over_record_batches(tool1_output, tmp_path):
+    path = tmp_path / "auth.txt"
+    path.write_text(
+        "\n".join(f"{t},U{t}@DOM1,U{t}@DOM1,C{t},C1,NTLM,Network,LogOn,Success" for t in range(50)) + "\n",
+        encoding="utf-8",
+    )
+    serial = _run(LanlAuthIngestor(path), tool1_output, "serial", max_lines=45, batch_size=10)
+    workers = _run(LanlAuthIngestor(path), tool1_output, "workers", max_lines=45, batch_size=10, workers=2)
+    assert workers[0]["success"] == 45
+    _assert_same_run(serial, workers)
@@ -0,0 +1,136 @@
+import socket
+import struct
+
+from src.ingestion.pcap import FlowAggregator, iter_flows
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline
+
+T0 = 1709287200  # 2024-03-01T10:00:00Z
+
+
+def _tcp(sport, dport, flags, payload=b""):
+    return struct.pack("!HHIIBBHHH", sport, dport, 0, 0, 5 << 4, flags, 1024, 0, 0) + payload
+
+
+def _udp(sport, dport, payload=b""):
+    return struct.pack("!HHHH", sport, dport, 8 + len(payload), 0) + payload
+
+
+def _ipv4(src, dst, proto, body, fragment=0):
+    header = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(body), 0, fragment, 64, proto, 0,
+                         socket.inet_aton(src), socket.inet_aton(dst))
+    return header + body
+
+
+def _ipv6(src, dst, next_header, body):
+    return struct.pack("!IHBB16s16s", 6 << 28, len(body), next_header, 64,
+                       socket.inet_pton(socket.AF_INET6, src), socket.inet_pton(socket.AF_INET6, dst)) + body
+
+
+def _eth(ip_packet, ethertype=0x0800, vlan=None):
+    header = b"\x00\x11\x22\x33\x44\x55" + b"\x66\x77\x88\x99\xaa\xbb"
+    if vlan is not None:
+        header += struct.pack("!HH", 0x8100, vlan)
+    return header + struct.pack("!H", ethertype) + ip_packet
+
+
+def _pcap(path, packets, linktype=1, endian="<"):
+    with open(path, "wb") as f:
+        f.write(struct.pack(endian + "IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, linktype))
+        for ts, data in packets:
+            sec = int(ts)
+            f.write(struct.pack(endian + "IIII", sec, round((ts - sec) * 1e6), len(data), len(data)) + data)
+    return path
+
+
+def _pcapng(path, packets, linktype=1):
+    def block(block_type, body):
+        body += b"\x00" * (-len(body) % 4)
+        return struct.pack("<II", block_type, len(body) + 12) + body + struct.pack("<I", len(body) + 12)
+
+    with open(path, "wb") as f:
+        f.write(block(0x0A0D0D0A, struct.pack("<IHHq", 0x1A2B3C4D, 1, 0, -1)))
+        tsresol = struct.pack("<HHB3x", 9, 1, 9) + struct.pack("<HH", 0, 0)  # nanoseconds
+        f.write(block(1, struct.pack("<HHI", linktype, 0, 65535) + tsresol))
+        f.write(block(5, b"statistics block, ignored"))
+        for ts, data in packets:
+            units = round(ts * 1e9)
+            f.write(block(6, struct.pack("<IIIII", 0, units >> 32, units & 0xFFFFFFFF, len(data), len(data)) + data))
+    return path
+
+
+def _conversation():
+    """A TCP handshake + data both ways, a VLAN-tagged DNS query/answer, IPv6 UDP, ICMP, ARP."""
+    client, server = "10.0.0.5", "10.0.0.9"
+    return [
+        (T0 + 0.0, _eth(_ipv4(client, server, 6, _tcp(51000, 22, 0x02)))),
+        (T0 + 0.1, _eth(_ipv4(server, client, 6, _tcp(22, 51000, 0x12)))),
+        (T0 + 0.2, _eth(_ipv4(client, server, 6, _tcp(51000, 22, 0x18, b"SSH-2.0-OpenSSH")))),
+        (T0 + 0.3, _eth(_ipv4(client, "8.8.8.8", 17, _udp(53000, 53, b"q" * 20)), vlan=10)),
+        (T0 + 0.4, _eth(_ipv4("8.8.8.8", client, 17, _udp(53, 53000, b"a" * 60)), vlan=10)),
+        (T0 + 0.5, _eth(_ipv6("fe80::1", "ff02::fb", 17, _udp(5353, 5353, b"mdns")), ethertype=0x86DD)),
+        (T0 + 0.6, _eth(_ipv4(client, server, 1, struct.pack("!BBHI", 8, 0, 0, 0)))),
+        (T0 + 0.7, _eth(b"\x00\x01\x08\x00\x06\x04\x00\x01" + b"\x00" * 20, ethertype=0x0806)),
+        (T0 + 1.5, _eth(_ipv4(server, client, 6, _tcp(22, 51000, 0x11)))),
+    ]
+
+
+def test_pcap_and_pcapng_decode_to_the_same_flows(tmp_path):
+    packets = _conversation()
+    classic = list(iter_flows(_pcap(tmp_path / "a.pcap", packets)))
+    big_endian = list(iter_flows(_pcap(tmp_path / "b.pcap", packets, endian=">")))
+    ng = list(iter_flows(_pcapng(tmp_path / "c.pcapng", packets)))
+    assert classic == big_endian == ng
+
+    by_proto = {(f["protocol"], f["source_host"]): f for f in classic}
+    assert len(classic) == 4  # ARP is not IP
+    ssh = by_proto[("tcp", "10.0.0.5")]
+    assert (ssh["target_host"], ssh["src_port"], ssh["dst_port"]) == ("10.0.0.9", 51000, 22)
+    assert (ssh["packets"], ssh["rev_packets"]) == (2, 2)
+    assert ssh["bytes"] == 2 * 54 + len(b"SSH-2.0-OpenSSH") and ssh["rev_bytes"] == 2 * 54
+    assert ssh["tcp_flags"] == "FSPA"
+    assert ssh["timestamp"] == "2024-03-01T10:00:00+00:00" and ssh["duration"] == 1.5
+    assert ssh["raw_text"].startswith("TCP 10.0.0.5:51000 -> 10.0.0.9:22 packets=2/2")
+
+    dns = by_proto[("udp", "10.0.0.5")]
+    assert (dns["dst_port"], dns["packets"], dns["rev_packets"]) == (53, 1, 1)
+    mdns = by_proto[("udp", "fe80::1")]
+    assert mdns["target_host"] == "ff02::fb" and mdns["raw_text"].startswith("UDP [fe80::1]:5353 ->")
+    icmp = by_proto[("icmp", "10.0.0.5")]
+    assert (icmp["icmp_type"], icmp["icmp_code"]) == (8, 0) and "src_port" not in icmp
+
+
+def test_idle_active_and_capacity_limits_split_flows(tmp_path):
+    syn = _ipv4("10.0.0.5", "10.0.0.9", 6, _tcp(51000, 22, 0x02))
+    packets = [(T0 + t, syn) for t in (0, 1, 2, 100, 101)]  # 98s gap > 60s idle
+    path = _pcap(tmp_path / "raw.pcap", packets, linktype=101)
+    flows = list(iter_flows(path))
+    assert [f["packets"] for f in flows] == [3, 2]
+
+    flows = list(iter_flows(path, FlowAggregator(idle_seconds=1000, active_seconds=1.5)))
+    assert [f["packets"] for f in flows] == [2, 1, 2]
+
+    scan = [(T0 + port * 0.01, _ipv4("10.0.0.5", "10.0.0.9", 6, _tcp(40000, port, 0x02)))
+            for port in range(1, 51)]
+    aggregator = FlowAggregator(max_flows=10)
+    flows = list(iter_flows(_pcap(tmp_path / "scan.pcap", scan, linktype=101), aggregator))
+    assert len(flows) == 50 and len(aggregator) == 0
+    assert sorted(f["dst_port"] for f in flows) == list(range(1, 51))
+
+
+def test_ingestor_streams_flows_into_the_pipeline(tmp_path, tool1_output):
+    path = _pcap(tmp_path / "capture.pcap", _conversation())
+    # Truncate the last record: every complete packet before it is still used
+    path.write_bytes(path.read_bytes()[:-10])
+    records = list(UniversalIngestor(path).ingest())
+    assert [r["_parsing_type"] for r in records] == ["pcap_flow"] * 4
+    assert sum(r["packets"] + r["rev_packets"] for r in records) == 7
+
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.summary_path = tool1_output / "summary.json"
+    summary = pipeline.run()
+    assert summary["success"] == 4 and summary["failed"] == 0
+
+    junk = tmp_path / "junk.pcap"
+    junk.write_bytes(b"\x00" * 64)
+    assert [r["_parsing_type"] for r in UniversalIngestor(junk).ingest()] == ["binary_unknown"]
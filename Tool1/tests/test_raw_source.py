@@ -0,0 +1,62 @@
+import gzip
+import hashlib
+import json
+import pickle
+
+from src.ingestion.base import RawEvent
+from src.ingestion.universal import UniversalIngestor
+from src.processing.pipeline import Pipeline, RAW_SOURCE_LIMIT, _STAGES
+
+LINES = [
+    '{"timestamp":"2024-03-01T10:15:02Z","full_log":"Failed password for admin — ünïcode","srcip":"10.0.0.5"}',
+    '{"message": "powershell -enc ZQBj", "big": "' + "x" * 5000 + '"}',
+]
+
+
+def _run(path, tmp_path, name, **kwargs):
+    pipeline = Pipeline(UniversalIngestor(path))
+    pipeline.summary_path = tmp_path / f"{name}_summary.json"
+    pipeline.writer.output_dir = tmp_path / name
+    written = []
+    write = pipeline.writer.write
+    pipeline.writer.write = lambda event: (written.append(event), write(event))
+    return pipeline.run(max_lines=100, **kwargs), written
+
+
+def test_json_lines_keep_their_source_text(tmp_path):
+    path = tmp_path / "events.ndjson"
+    path.write_text("\n".join(LINES) + "\nnot json\n", encoding="utf-8")
+    events = list(UniversalIngestor(path).ingest())
+    assert [type(e) for e in events] == [RawEvent, RawEvent, dict]
+    assert events[0] == json.loads(LINES[0]) and events[0].source_text == LINES[0]
+
+    clone = pickle.loads(pickle.dumps(events[0]))
+    assert type(clone) is RawEvent and clone == events[0] and clone.source_text == LINES[0]
+
+    archive = tmp_path / "events.ndjson.gz"
+    archive.write_bytes(gzip.compress(path.read_bytes()))
+    assert [getattr(e, "source_text", None) for e in UniversalIngestor(archive).ingest()] == LINES + [None]
+
+
+def test_raw_source_is_the_original_line(tool1_output, tmp_path):
+    path = tmp_path / "events.ndjson"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    summary, rows = _run(path, tool1_output, "rows")
+    _, batched = _run(path, tool1_output, "batch", batch_size=2)
+
+    assert [e.raw_source for e in rows] == [LINES[0], LINES[1][:RAW_SOURCE_LIMIT]]
+    assert rows[0].raw_hash == hashlib.sha256(LINES[0].encode("utf-8")).hexdigest()
+    assert [e.raw_source for e in batched] == [e.raw_source for e in rows]
+    assert rows[1].event_type == batched[1].event_type == "process_start"
+
+    assert set(summary["stage_seconds"]) == set(_STAGES)
+    assert all(seconds >= 0 for seconds in summary["stage_seconds"].values())
+
+
+def test_plain_dicts_still_serialize(tool1_output, ndjson_file, sample_events):
+    pipeline = Pipeline(UniversalIngestor(ndjson_file))
+    prepared = pipeline._prepare(sample_events[0])
+    assert prepared["raw_source"] == json.dumps(sample_events[0], default=str)
+    from_line = pipeline._prepare(RawEvent(sample_events[0], json.dumps(sample_events[0])))
+    assert {k: v for k, v in from_line.items() if k != "raw_source"} == \
+           {k: v for k, v in prepared.items() if k != "raw_source"}
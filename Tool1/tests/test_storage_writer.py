@@ -0,0 +1,143 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+
+from src.core.config import settings
+from src.core.schema import CanonicalEvent
+from src.storage import writer as writer_module
+from src.storage.verify import ChainVerifier
+from src.storage.writer import StorageWriter
+
+
+def _events(n, days=1):
+    previous = None
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        event = CanonicalEvent.create(
+            event_type="auth_failure", timestamp=start + timedelta(days=i % days, seconds=i),
+            source_file="auth.log", parser_version="2.0.0", raw_source=f'{{"n": {i}}}',
+            observed_cve_ids=["CVE-2021-44228", "CVE-2023-0001"] if i % 3 == 0 else [],
+            previous_event_hash=previous,
+        ).compute_event_hash(previous)
+        previous = event.event_hash
+        yield event
+
+
+def _writer(batch_size=10):
+    writer = StorageWriter()
+    writer.BATCH_SIZE = batch_size
+    return writer
+
+
+def test_flushes_append_row_groups_to_one_file_per_partition(tool1_output, monkeypatch):
+    monkeypatch.setattr(settings, "PARQUET_ROW_GROUP_ROWS", 20)
+    writer = _writer()
+    for event in _events(95, days=2):
+        writer.write(event)
+    # Still open: only in-progress .part files exist
+    assert not list(writer.output_dir.rglob("*.parquet"))
+    assert len(list(writer.output_dir.rglob("*.parquet.part"))) == 2
+
+    closed = writer.close()
+    assert sorted(p.parent.name for p in closed) == ["2024-03-01", "2024-03-02"]
+    assert not list(writer.output_dir.rglob("*.part"))
+    # 5 rows per partition per flush: row groups of 20, then the remainder on close
+    row_groups = {}
+    for path in closed:
+        metadata = pq.ParquetFile(path).metadata
+        row_groups[path.parent.name] = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    assert row_groups == {"2024-03-01": [20, 20, 8], "2024-03-02": [20, 20, 7]}
+
+    df = pl.read_parquet(str(writer.output_dir / "**" / "*.parquet"))
+    assert df.height == writer.total_written == 95
+    assert df.schema["observed_cve_ids"] == pl.List(pl.Utf8)
+    assert df.filter(pl.col("raw_source") == '{"n": 3}')["observed_cve_ids"].to_list() == [
+        ["CVE-2021-44228", "CVE-2023-0001"]
+    ]
+    assert ChainVerifier(writer.output_dir).verify().ok
+
+
+def test_rolls_by_size_and_time(tool1_output, monkeypatch):
+    monkeypatch.setattr(settings, "PARQUET_ROW_GROUP_ROWS", 10)
+    monkeypatch.setattr(settings, "PARQUET_ROLL_BYTES", 1)
+    writer = _writer()
+    for event in _events(30):
+        writer.write(event)
+    writer.close()
+    assert len(list(writer.output_dir.rglob("*.parquet"))) == 3
+
+    monkeypatch.setattr(settings, "PARQUET_ROLL_BYTES", 1 << 30)
+    monkeypatch.setattr(settings, "PARQUET_ROLL_SECONDS", 0.0)
+    writer = _writer()
+    writer.output_dir = tool1_output / "by_time"
+    for event in _events(20):
+        writer.write(event)
+    assert len(list(writer.output_dir.rglob("*.parquet"))) == 2
+    assert writer.roll() == []
+
+
+def test_backfill_bounds_pending_rows_and_open_files(tool1_output, monkeypatch):
+    monkeypatch.setattr(settings, "PARQUET_PENDING_ROWS", 25)
+    monkeypatch.setattr(settings, "PARQUET_MAX_OPEN_FILES", 3)
+    writer = _writer()
+    for i, event in enumerate(_events(200, days=8)):
+        writer.write(event)
+        if i % writer.BATCH_SIZE == writer.BATCH_SIZE - 1:
+            assert len(writer._open) <= 3
+            assert sum(f.pending_rows for f in writer._open.values()) <= 25
+            assert len(list(writer.output_dir.rglob("*.part"))) <= 3
+    writer.close()
+
+    assert writer.total_written == 200
+    assert len(list(writer.output_dir.rglob("*.parquet"))) > 8  # partitions closed early are reopened
+    report = ChainVerifier(writer.output_dir).verify()
+    assert report.ok and report.events == 200
+
+
+@pytest.mark.parametrize("method", ["append", "write_pending"])
+def test_failed_partition_falls_back_to_jsonl_without_duplicates(tool1_output, monkeypatch, method):
+    original = getattr(writer_module._PartitionFile, method)
+    calls = {"n": 0}
+
+    def flaky(self, *args):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise OSError("disk full")
+        return original(self, *args)
+
+    monkeypatch.setattr(writer_module._PartitionFile, method, flaky)
+    writer = _writer(batch_size=100)
+    for event in _events(10, days=2):
+        writer.write(event)
+    writer.close()
+
+    assert writer.total_written == 10
+    assert len(list(writer.output_dir.rglob("emergency_dump_*.jsonl"))) == 1
+    assert not list(writer.output_dir.rglob("*.part"))
+    report = ChainVerifier(writer.output_dir).verify()
+    assert report.ok and report.events == 10
+
+
+def test_orphaned_part_files_are_quarantined(tool1_output, monkeypatch):
+    live = _writer()
+    for event in _events(12):
+        live.write(event)
+    owned = next(live.output_dir.rglob("*.part"))
+
+    crashed = _writer()
+    for event in _events(12):
+        crashed.write(event)
+    orphan = next(p for p in crashed.output_dir.rglob("*.part") if p != owned)
+    crashed._open.popitem()[1]._lock.close()  # killed: the lock goes, the footer never comes
+    old = time.time() - writer_module.ORPHAN_GRACE_SECONDS - 1
+    os.utime(orphan, (old, old))
+
+    StorageWriter()
+    assert owned.exists() and not orphan.exists()
+    quarantined = tool1_output / "data" / "output.orphans" / orphan.parent.name / orphan.name
+    assert quarantined.exists()
+    assert [p.name for p in live.close()] == [owned.name[:-len(".part")]]
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+import dateutil.parser
+import pytest
+
+from src.processing.pipeline import Pipeline
+from src.processing.timestamps import LEARN_SAMPLES, TimestampParser
+from src.ingestion.universal import UniversalIngestor
+
+
+def _reference(text):
+    dt = dateutil.parser.parse(text)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+@pytest.mark.parametrize("source, values, fmt", [
+    ("wazuh", ["2024-03-01T10:15:02.123+0000", "2024-03-01T12:00:00.5-0500", "2024-02-29T23:59:59+0000",
+               "2024-03-02T00:00:01.000001+0000"], "iso"),
+    ("zeek", ["2024-03-01 10:15:02", "2024-03-01T10:15:02Z", "2024-03-01T10:15:02+02:00",
+              "2024-03-01"], "iso"),
+    ("syslog", ["Mar  1 10:15:02", "Feb 28 00:00:00", "Dec 31 23:59:59", "Jan 10 08:00:00"], "syslog"),
+    ("nmap", ["Fri Mar  1 09:00:00 2024", "Thu Feb 29 23:00:00 2024", "Sun Dec 31 01:02:03 2023",
+              "Mon Jan 15 12:00:00 2024"], "ctime"),
+])
+def test_fast_formats_match_dateutil(source, values, fmt):
+    parser = TimestampParser()
+    for text in values * 2:
+        assert parser.parse(text, source) == _reference(text)
+    counts = parser.stats()
+    assert counts["dateutil"] == LEARN_SAMPLES
+    assert counts[fmt] == len(values) - LEARN_SAMPLES
+    assert counts["cached"] == len(values)
+
+
+def test_epoch_numbers_strings_and_fallbacks():
+    parser = TimestampParser(cache_size=2)
+    t0 = datetime(2024, 3, 1, 10, 0, tzinfo=timezone.utc)
+    assert parser.parse(1709287200) == t0
+    assert parser.parse("1709287200", "lanl") == t0
+    assert parser.parse("1709287200.5", "lanl") == t0 + timedelta(milliseconds=500)
+    assert parser.parse("1709287200000", "lanl") == t0
+    assert parser.parse("1709287201", "lanl") == t0 + timedelta(seconds=1)  # learned: no dateutil call
+    # Packed dates stay dateutil's reading even once epoch is the source's format
+    assert parser.parse("20240301", "lanl") == datetime(2024, 3, 1, tzinfo=timezone.utc)
+    assert parser.parse(datetime(2024, 3, 1, 11, 0, tzinfo=timezone(timedelta(hours=1)))) == t0
+
+    with pytest.raises(ValueError):
+        parser.parse("not a date")
+    before = datetime.now(timezone.utc)
+    assert parser.parse_or_now("not a date") >= before
+    assert parser.parse_or_now(None) >= before
+    assert len(parser._cache) == 2
+
+    assert parser.stats() == {"dateutil": 1, "datetime": 1, "epoch": 5, "invalid": 2, "missing": 1}
+    counts = parser.take_counts()
+    assert parser.stats() == {}
+    parser.merge(counts)
+    parser.merge(counts)
+    assert parser.stats()["epoch"] == 10
+
+
+def test_pipeline_summary_reports_formats(tool1_output, ndjson_file, sample_events):
+    pipeline = Pipeline(UniversalIngestor(ndjson_file))
+    pipeline.summary_path = tool1_output / "summary.json"
+    summary = pipeline.run(max_lines=100)
+    # Two Wazuh strings + the Nmap scan_start, one epoch int, one unreadable string, three without
+    assert summary["timestamp_formats"] == {"dateutil": 3, "epoch": 1, "invalid": 1, "missing": 3}
+
+    batch = Pipeline(UniversalIngestor(ndjson_file))
+    batch.summary_path = tool1_output / "batch_summary.json"
+    assert batch.run(max_lines=100, batch_size=3)["timestamp_formats"] == summary["timestamp_formats"]
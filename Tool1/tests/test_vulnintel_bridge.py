@@ -0,0 +1,101 @@
+import os
+import sqlite3
+
+import pytest
+
+from src.core import vulnintel_bridge as vib
+from src.core.config import settings
+
+_CVES = [
+    ("CVE-2021-44228", 10.0, "CRITICAL"),
+    ("CVE-2023-0001", 7.5, "HIGH"),
+    ("CVE-2022-1000", 5.3, None),
+    ("CVE-2020-0002", None, None),
+]
+_KEV = ["CVE-2021-44228", "CVE-2019-9999"]  # the second one has no cve row
+_LISTS = [
+    ["CVE-2023-0001", "cve-2021-44228"],
+    ["CVE-2022-1000"],
+    ["CVE-2020-0002", "CVE-2019-9999"],
+    ["CVE-1999-0000"],
+    [],
+]
+_EXPECTED = [
+    (10.0, "CRITICAL", True),
+    (5.3, "MEDIUM", False),
+    (None, None, True),
+    (None, None, False),
+    (None, None, False),
+]
+
+
+@pytest.fixture
+def vuln_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "vuln.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE cve (cve_id TEXT PRIMARY KEY, description TEXT, cvss_v3_score REAL, "
+        "cvss_v3_severity TEXT, attack_vector TEXT, affected_cpes TEXT)"
+    )
+    conn.execute("CREATE TABLE kev (id INTEGER PRIMARY KEY, cve_id TEXT)")
+    conn.executemany(
+        "INSERT INTO cve (cve_id, description, cvss_v3_score, cvss_v3_severity) VALUES (?, 'x', ?, ?)", _CVES
+    )
+    conn.executemany("INSERT INTO kev (cve_id) VALUES (?)", [(c,) for c in _KEV])
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(vib, "_VULN_DB_PATH", db_path)
+    monkeypatch.setattr(settings, "VULNINTEL_SCORE_TABLE", tmp_path / "cve_scores.bin")
+    vib.reset()
+    yield db_path
+    vib.reset()
+
+
+def test_batched_lookups_share_one_connection_and_lru(vuln_db, monkeypatch):
+    queries = []
+    vib._get_conn().set_trace_callback(queries.append)
+
+    assert vib.enrich_many(_LISTS) == _EXPECTED
+    cve_queries = [q for q in queries if "FROM cve" in q]
+    assert len(cve_queries) == 1 and " IN (" in cve_queries[0]
+
+    assert vib.enrich_with_vulnintel(["CVE-2023-0001"]) == (7.5, "HIGH", False)
+    assert len([q for q in queries if "FROM cve" in q]) == 1  # served from the cache
+    assert vib._get_conn() is vib._get_conn()
+    stats = vib.cache_stats()
+    assert stats["mode"] == "sqlite" and stats["misses"] == 6 and stats["hits"] == 1
+
+    monkeypatch.setattr(settings, "CVE_CACHE_SIZE", 2)
+    vib.reset()
+    assert vib.get_cve_data("cve-2021-44228")["cvss_v3_score"] == 10.0
+    vib.lookup_cves(["CVE-2023-0001", "CVE-2022-1000"])
+    assert list(vib._cve_cache.data) == ["CVE-2023-0001", "CVE-2022-1000"]
+
+
+def test_score_table_matches_sqlite_without_the_db(vuln_db):
+    assert vib.build_score_table() == 5
+    # The table is newer than the DB, so it is used even while the DB exists
+    vib.reset()
+    assert vib.cache_stats()["mode"] == "score_table"
+    assert vib.enrich_many(_LISTS) == _EXPECTED
+
+    vuln_db.unlink()
+    vib.reset()
+    assert vib.enrich_many(_LISTS) == _EXPECTED
+    assert vib.get_kev_ids() == set(_KEV)
+    assert vib._conn is None
+
+
+def test_stale_or_disabled_score_table_falls_back_to_sqlite(vuln_db, monkeypatch):
+    vib.build_score_table()
+    later = settings.VULNINTEL_SCORE_TABLE.stat().st_mtime + 10
+    os.utime(vuln_db, (later, later))
+    vib.reset()
+    assert vib.cache_stats()["mode"] == "sqlite"
+    assert vib.enrich_many(_LISTS) == _EXPECTED
+
+    os.utime(vuln_db, (0, 0))
+    monkeypatch.setattr(settings, "VULNINTEL_USE_SCORE_TABLE", False)
+    vib.reset()
+    assert vib.cache_stats()["mode"] == "sqlite"
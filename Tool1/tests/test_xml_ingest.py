@@ -0,0 +1,90 @@
+from src.ingestion.universal import UniversalIngestor
+
+NMAP_XML = """<?xml version="1.0"?>
+<!DOCTYPE nmaprun>
+<nmaprun scanner="nmap" args="nmap -sV -O 10.0.0.0/24" startstr="Fri Mar  1 09:00:00 2024">
+  <scaninfo type="syn" protocol="tcp" numservices="1000"/>
+  <host>
+    <status state="up"/>
+    <address addr="10.0.0.9" addrtype="ipv4"/>
+    <hostnames><hostname name="fileserver" type="PTR"/></hostnames>
+    <ports>
+      <extraports state="closed" count="997"/>
+      <port protocol="tcp" portid="22">
+        <state state="open"/><service name="ssh" product="OpenSSH" version="8.9p1" extrainfo="Ubuntu"/>
+      </port>
+      <port protocol="tcp" portid="445">
+        <state state="open"/><service name="microsoft-ds" product="Samba smbd" version="4.6"/>
+        <script id="smb-vuln-ms17-010" output="VULNERABLE: CVE-2017-0143"/>
+        <script id="smb-os-discovery" output="Windows 6.1"/>
+      </port>
+      <port protocol="udp" portid="161"><state state="open|filtered"/></port>
+    </ports>
+    <os><osmatch name="Linux 5.X" accuracy="96"/></os>
+  </host>
+  <host>
+    <status state="down"/>
+    <address addr="10.0.0.10" addrtype="ipv4"/>
+  </host>
+  <runstats><finished time="1709287300"/></runstats>
+</nmaprun>
+"""
+
+_SCAN = {"scan_args": "nmap -sV -O 10.0.0.0/24", "scan_start": "Fri Mar  1 09:00:00 2024"}
+_HOST = {"source_host": "10.0.0.9", "hostname": "fileserver", "host_state": "up", "os": "Linux 5.X"}
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_nmap_ports_and_hosts(tmp_path):
+    events = list(UniversalIngestor(_write(tmp_path, "scan.xml", NMAP_XML)).ingest())
+    assert events == [
+        {**_HOST, "port": "22", "protocol": "tcp", "service_name": "ssh", "service_product": "OpenSSH",
+         "service_version": "8.9p1", "port_state": "open", "script_output": "", **_SCAN,
+         "raw_text": "Nmap: 10.0.0.9:22/tcp open - OpenSSH 8.9p1 (ssh) Ubuntu", "_parsing_type": "nmap_port"},
+        {**_HOST, "port": "445", "protocol": "tcp", "service_name": "microsoft-ds",
+         "service_product": "Samba smbd", "service_version": "4.6", "port_state": "open",
+         "script_output": "smb-vuln-ms17-010: VULNERABLE: CVE-2017-0143; smb-os-discovery: Windows 6.1", **_SCAN,
+         "raw_text": "Nmap: 10.0.0.9:445/tcp open - Samba smbd 4.6 (microsoft-ds)  | Scripts: "
+                     "smb-vuln-ms17-010: VULNERABLE: CVE-2017-0143; smb-os-discovery: Windows 6.1",
+         "_parsing_type": "nmap_port"},
+        {**_HOST, "port": "161", "protocol": "udp", "service_name": "", "service_product": "",
+         "service_version": "", "port_state": "open|filtered", "script_output": "", **_SCAN,
+         "raw_text": "Nmap: 10.0.0.9:161/udp open|filtered -   () ", "_parsing_type": "nmap_port"},
+        {"source_host": "10.0.0.10", "hostname": "10.0.0.10", "host_state": "down", "os": "", "port": None,
+         "protocol": "icmp", "service_name": "host_discovery", "service_product": "", "port_state": "down",
+         **_SCAN, "raw_text": "Nmap host 10.0.0.10 (10.0.0.10) is down", "_parsing_type": "nmap_host"},
+    ]
+
+
+def test_events_stream_before_a_truncated_tail(tmp_path):
+    truncated = NMAP_XML[:NMAP_XML.index("<runstats>")] + "<host><status state="
+    stream = UniversalIngestor(_write(tmp_path, "partial.xml", truncated)).ingest()
+    first = next(stream)
+    assert first["port"] == "22"
+    rest = list(stream)
+    assert [e["_parsing_type"] for e in rest] == ["nmap_port", "nmap_port", "nmap_host", "xml_parse_error"]
+
+    broken = UniversalIngestor(_write(tmp_path, "broken.xml", "<nmaprun><host>")).ingest()
+    assert [e["_parsing_type"] for e in broken] == ["xml_parse_error"]
+    empty = UniversalIngestor(_write(tmp_path, "empty.xml", "<nmaprun args='x'><runstats/></nmaprun>")).ingest()
+    assert [e["_parsing_type"] for e in empty] == ["nmap_empty"]
+
+
+def test_generic_xml_records(tmp_path):
+    text = """<report>
+      <finding id="1" severity="high">SQL injection<cwe>89</cwe><target name="shop"/></finding>
+      <finding id="2"><detail><cwe>79</cwe></detail></finding>
+    </report>"""
+    events = list(UniversalIngestor(_write(tmp_path, "report.xml", text)).ingest())
+    assert events == [
+        {"_xml_tag": "finding", "id": "1", "severity": "high", "raw_text": "SQL injection", "cwe": "89",
+         "target": "shop"},
+        {"_xml_tag": "finding", "id": "2", "detail": ""},
+    ]
+    empty = UniversalIngestor(_write(tmp_path, "empty.xml", "<report/>")).ingest()
+    assert [e["_parsing_type"] for e in empty] == ["xml_empty"]
@@ -0,0 +1,89 @@
+"""
+Benchmark: scoring sessions one at a time vs analyze_sessions.
+The per-session loop does what main.py did before: rebuild the temporal
+graph, then score the session on its own (one Polars pass and its own
+vulnerability DB queries each). analyze_sessions scores all sessions in one
+pass with batched lookups and builds no graph.
+Run from the Tool2 directory:
+    python -m benchmarks.bench_graph_engine [n_events]
+"""
+import logging
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import polars as pl
+
+from src.domain import Session
+from src.engine import GraphEngine
+from src.ingest import _assign_sessions, _event_frame, _session_summary
+
+from benchmarks.bench_session_objects import _loaded
+
+_RAW = ["sshd: Failed password for root", "exploit CVE-2021-44228 seen", '{"cweid": "89", "alert": "SQLi"}',
+        "CVE-2017-0144 CWE-287", "nothing to see"]
+
+
+def _sessions(n: int):
+    df = _loaded(n).with_columns(
+        raw_source=pl.lit(pl.Series(_RAW)).gather(pl.int_range(pl.len()) % len(_RAW)),
+        mitre_technique=pl.when(pl.int_range(pl.len()) % 3 == 0).then(None).otherwise(pl.lit("T1110")),
+        user=pl.format("user{}", pl.int_range(pl.len()) % 2000),
+    )
+    df = _assign_sessions(df, timedelta(minutes=60), timedelta(hours=24), 10_000)
+    events = _event_frame(df)
+    sessions, offset = [], 0
+    for s in _session_summary(df).iter_rows(named=True):
+        sessions.append(Session(session_id=s["unique_session_id"], user=s["user"], start_time=s["start_time"],
+                                end_time=s["end_time"], frame=events.slice(offset, s["n_events"])))
+        offset += s["n_events"]
+    return sessions
+
+
+def _vuln_db(path: Path) -> str:
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE cve (cve_id TEXT, cvss_v3_score REAL, description TEXT);
+        CREATE TABLE cve_cwe_map (cve_id TEXT, cwe_id TEXT);
+        CREATE TABLE kev (cve_id TEXT, vulnerability_name TEXT);
+        CREATE TABLE cwe (cwe_id TEXT, name TEXT, abstraction TEXT);
+        INSERT INTO cve VALUES ('CVE-2021-44228', 10.0, 'Log4Shell. RCE');
+        INSERT INTO cve_cwe_map VALUES ('CVE-2021-44228', 'CWE-502');
+        INSERT INTO kev VALUES ('CVE-2021-44228', 'Apache Log4j2 RCE');
+        INSERT INTO cwe VALUES ('CWE-502', 'Deserialization', 'Base'), ('CWE-89', 'SQLi', 'Base');
+    """)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def main(n: int = 100_000) -> None:
+    logging.disable(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _vuln_db(Path(tmp) / "vuln.db")
+
+        def per_session():
+            engine = GraphEngine()
+            engine.vuln_manager.db_path = db
+            for session in _sessions(n):
+                engine.build_graph(session)
+                engine.build_and_analyze(session)
+
+        def batch():
+            engine = GraphEngine()
+            engine.vuln_manager.db_path = db
+            engine.analyze_sessions(_sessions(n))
+
+        sessions = len(_sessions(n))
+        print(f"{n:,} events, {sessions:,} sessions")
+        for name, fn in (("graph + score per session", per_session), ("analyze_sessions", batch)):
+            start = time.perf_counter()
+            fn()
+            print(f"  {name:<26}: {time.perf_counter() - start:6.2f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
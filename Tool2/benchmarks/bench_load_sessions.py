@@ -0,0 +1,121 @@
+"""
+Benchmark: DataIngester.load_sessions loading stage - eager per-file reads vs
+the lazy, projected scan.
+Builds a Tool 1-shaped dataset (ISO-string timestamps, List id columns, a
+raw_source line per event) split over daily partitions, then times loading
+it into the sorted, UTC-parsed frame that sessionization starts from. Each
+variant runs in its own process so peak RSS is its own; the Session objects
+built afterwards are the same for both loaders and are left out.
+Run from the Tool2 directory:
+    python -m benchmarks.bench_load_sessions [n_events]   (10_000_000 for the full-size run)
+"""
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import polars as pl
+
+from src.ingest import RAW_SOURCE_COLUMN, SESSION_COLUMNS, _id_list_column, _scan_events
+
+FILES_PER_DAY = 4
+EVENTS_PER_DAY = 500_000
+
+
+def _write_dataset(root: Path, n: int) -> str:
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    per_file = EVENTS_PER_DAY // FILES_PER_DAY
+    for part, offset in enumerate(range(0, n, per_file)):
+        rows = min(per_file, n - offset)
+        i = pl.int_range(offset, offset + rows, eager=True)
+        day, seq = divmod(part, FILES_PER_DAY)
+        df = pl.DataFrame({"i": i}).select(
+            event_id=pl.format("evt-{}", pl.col("i")),
+            timestamp=(pl.lit(base) + pl.duration(milliseconds=pl.col("i") * (86_400_000 // EVENTS_PER_DAY)))
+            .dt.strftime("%Y-%m-%dT%H:%M:%S%.6f+00:00"),
+            user=pl.when(pl.col("i") % 7 == 0).then(None).otherwise(pl.format("user{}", pl.col("i") % 500)),
+            source_host=pl.format("10.0.{}.{}", pl.col("i") % 16, pl.col("i") % 250),
+            target_host=pl.format("host-{}", pl.col("i") % 40),
+            event_type=pl.lit("authentication_failure"),
+            protocol=pl.lit("ssh"),
+            mitre_technique=pl.lit("T1110"),
+            confidence_score=(pl.col("i") % 100) / 100,
+            data_quality_score=pl.lit(0.9),
+            observed_cve_ids=pl.when(pl.col("i") % 50 == 0).then(pl.lit(["CVE-2021-44228"]))
+            .otherwise(pl.lit([], dtype=pl.List(pl.Utf8))),
+            observed_cwe_ids=pl.lit([], dtype=pl.List(pl.Utf8)),
+            log_category=pl.lit("auth"),
+            parser_version=pl.lit("1.0"),
+            event_hash=pl.format("{}", pl.col("i")).str.pad_start(64, "0"),
+            previous_event_hash=pl.format("{}", pl.col("i") - 1).str.pad_start(64, "0"),
+            raw_source=pl.format("Mar  1 10:00:00 host sshd[811]: Failed password for user{} from 192.168.1.{} "
+                                 "port 22 ssh2 session={}", pl.col("i") % 500, pl.col("i") % 250, pl.col("i")),
+        )
+        folder = root / (base + timedelta(days=day)).date().isoformat()
+        folder.mkdir(exist_ok=True)
+        df.write_parquet(folder / f"events_{seq}.parquet", row_group_size=50_000)
+    return str(root / "**" / "*.parquet")
+
+
+def _eager(pattern: str) -> pl.DataFrame:
+    """The previous loader: read every file whole, align per file, concat, sort, parse."""
+    import glob
+    frames = []
+    for f in glob.glob(pattern, recursive=True):
+        f_df = pl.read_parquet(f)
+        for col in ("observed_cve_ids", "observed_cwe_ids"):
+            f_df = f_df.with_columns(_id_list_column(col, f_df.schema.get(col)))
+        frames.append(f_df)
+    df = pl.concat(frames, how="diagonal").sort("timestamp")
+    return df.with_columns(pl.col("timestamp").str.strptime(pl.Datetime("us", "UTC"), "%+", strict=False))
+
+
+def _lazy(pattern: str, raw: bool = False, filtered: bool = False) -> pl.DataFrame:
+    import glob
+    columns = dict(SESSION_COLUMNS)
+    if raw:
+        columns[RAW_SOURCE_COLUMN] = pl.Utf8
+    kwargs = {}
+    if filtered:
+        kwargs = {"start": datetime(2024, 3, 2, 6), "end": datetime(2024, 3, 2, 12), "identities": ["user42"]}
+    return _scan_events(sorted(glob.glob(pattern, recursive=True)), columns, **kwargs).collect().sort("timestamp")
+
+
+VARIANTS = {
+    "eager read_parquet + concat": lambda p: _eager(p),
+    "lazy scan, raw_source": lambda p: _lazy(p, raw=True),
+    "lazy scan": lambda p: _lazy(p),
+    "lazy scan, 6h + 1 identity": lambda p: _lazy(p, filtered=True),
+}
+
+
+def _child(name: str, pattern: str) -> None:
+    start = time.perf_counter()
+    rows = len(VARIANTS[name](pattern))
+    elapsed = time.perf_counter() - start
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"rows": rows, "seconds": elapsed, "peak_mib": peak_mib}))
+
+
+def main(n: int = 1_000_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        pattern = _write_dataset(Path(tmp), n)
+        size = sum(p.stat().st_size for p in Path(tmp).rglob("*.parquet")) / 2**20
+        print(f"{n:,} events, {size:.0f} MiB Parquet")
+        for name in VARIANTS:
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_load_sessions", "--child", name, pattern],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.splitlines()[-1])
+            print(f"  {name:<30}: {result['seconds']:7.2f}s  peak RSS {result['peak_mib']:7.0f} MiB  "
+                  f"({result['rows']:,} rows)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(sys.argv[2], sys.argv[3])
+    else:
+        main(*(int(a) for a in sys.argv[1:2]))
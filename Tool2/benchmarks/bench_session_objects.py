@@ -0,0 +1,95 @@
+"""
+Benchmark: cost of holding loaded events in Sessions.
+Before: one pydantic EnrichedEvent per row, built from iter_rows (what
+load_sessions did). After: Sessions over zero-copy slices of one event frame.
+Reports construction time and memory per event - Python heap (tracemalloc)
+plus, for the columnar form, the frame's Arrow buffers - and the time to
+score all sessions with GraphEngine.
+Run from the Tool2 directory:
+    python -m benchmarks.bench_session_objects [n_events]
+"""
+import logging
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+
+from src.domain import EnrichedEvent, Session
+from src.engine import GraphEngine
+from src.ingest import _assign_sessions, _event_frame, _session_summary
+
+
+def _loaded(n: int) -> pl.DataFrame:
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    i = pl.int_range(0, n, eager=True)
+    return pl.DataFrame({"i": i}).select(
+        event_id=pl.format("evt-{}", pl.col("i")),
+        timestamp=pl.lit(base) + pl.duration(seconds=(pl.col("i") // 200) * 60),
+        user=pl.format("user{}", pl.col("i") % 200),
+        source_host=pl.format("10.0.0.{}", pl.col("i") % 7),
+        target_host=pl.lit("db-01"),
+        event_type=pl.lit("auth_failure"),
+        protocol=pl.lit("ssh"),
+        mitre_technique=pl.lit("T1110"),
+        observed_cve_ids=pl.lit([], dtype=pl.List(pl.Utf8)),
+        observed_cwe_ids=pl.lit([], dtype=pl.List(pl.Utf8)),
+        confidence_score=(pl.col("i") % 100) / 100,
+        data_quality_score=pl.lit(0.9),
+        raw_source=pl.format("sshd[811]: Failed password for user{} from 192.168.1.{} port 22",
+                             pl.col("i") % 200, pl.col("i") % 250),
+    )
+
+
+def _objects(df: pl.DataFrame, summary: pl.DataFrame):
+    """The previous construction: an EnrichedEvent per row."""
+    events = [EnrichedEvent(**{**{k: v for k, v in row.items() if k != "raw_source"}, "raw_text": row["raw_source"]})
+              for row in df.drop("surrogate_id", "session_group_id").iter_rows(named=True)]
+    sessions, offset = [], 0
+    for s in summary.iter_rows(named=True):
+        sessions.append(Session(session_id=s["unique_session_id"], user=s["user"], start_time=s["start_time"],
+                                end_time=s["end_time"], events=events[offset:offset + s["n_events"]]))
+        offset += s["n_events"]
+    return sessions
+
+
+def _columnar(df: pl.DataFrame, summary: pl.DataFrame):
+    events = _event_frame(df)
+    sessions, offset = [], 0
+    for s in summary.iter_rows(named=True):
+        sessions.append(Session(session_id=s["unique_session_id"], user=s["user"], start_time=s["start_time"],
+                                end_time=s["end_time"], frame=events.slice(offset, s["n_events"])))
+        offset += s["n_events"]
+    return sessions, events.estimated_size()
+
+
+def main(n: int = 200_000) -> None:
+    logging.disable(logging.ERROR)
+    df = _assign_sessions(_loaded(n), timedelta(minutes=60), timedelta(hours=24), 10_000)
+    summary = _session_summary(df)
+    print(f"{n:,} events, {len(summary):,} sessions")
+
+    for name, build in (("EnrichedEvent objects", lambda: (_objects(df, summary), 0)),
+                        ("frame slices", lambda: _columnar(df, summary))):
+        start = time.perf_counter()
+        sessions, arrow_bytes = build()
+        elapsed = time.perf_counter() - start
+        del sessions
+        tracemalloc.start()  # separate build: tracing slows allocation down
+        sessions, arrow_bytes = build()
+        heap = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        engine = GraphEngine()
+        engine.vuln_manager.db_path = "/nonexistent/vuln.db"  # score without the vulnerability DB
+        start = time.perf_counter()
+        for session in sessions:
+            engine.build_and_analyze(session)
+        scored = time.perf_counter() - start
+        print(f"  {name:<22}: build {elapsed:6.2f}s, {(heap + arrow_bytes) / n:6.0f} B/event "
+              f"({heap / n:.0f} heap + {arrow_bytes / n:.0f} Arrow); score {scored:6.2f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,68 @@
+"""
+Benchmark: session splitting and per-session aggregates.
+Baseline is the previous shape of the code with the gap split honoured:
+partition_by on the session id, then to_dicts(), n_unique() and max() per
+group. Against it, _assign_sessions plus one group_by pass and a single
+iter_rows over the frame. EnrichedEvent construction is the same for both
+and left out.
+Run from the Tool2 directory:
+    python -m benchmarks.bench_sessionize [n_events]
+"""
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+
+from src.ingest import _assign_sessions, _session_summary
+
+
+def _frame(n: int) -> pl.DataFrame:
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    i = pl.int_range(0, n, eager=True)
+    # 500 identities, an event per identity every ~40 minutes with a long pause every 8 events
+    return pl.DataFrame({"i": i}).select(
+        event_id=pl.format("evt-{}", pl.col("i")),
+        timestamp=pl.lit(base) + pl.duration(minutes=(pl.col("i") // 500) * 40 + (pl.col("i") // 4000) * 120),
+        user=pl.format("user{}", pl.col("i") % 500),
+        source_host=pl.format("10.0.0.{}", pl.col("i") % 7),
+        confidence_score=(pl.col("i") % 100) / 100,
+    )
+
+
+def _partitioned(df: pl.DataFrame, gap: timedelta) -> int:
+    df = df.with_columns(
+        pl.coalesce([pl.col("user"), pl.col("source_host"), pl.lit("System")]).alias("surrogate_id")
+    ).sort(["surrogate_id", "timestamp"])
+    df = df.with_columns(
+        (pl.col("timestamp").diff() > gap).fill_null(True).cast(pl.Int32).cum_sum().over("surrogate_id")
+        .alias("session_group_id")
+    ).with_columns(pl.format("Activity on {} #{}", "surrogate_id", "session_group_id").alias("unique_session_id"))
+    sessions = 0
+    for _, group_df in df.partition_by("unique_session_id", as_dict=True).items():
+        rows = group_df.to_dicts()
+        _ = (rows[0]["timestamp"], rows[-1]["timestamp"],
+             group_df["source_host"].n_unique() > 1 or group_df["confidence_score"].max() > 0.8)
+        sessions += 1
+    return sessions
+
+
+def _grouped(df: pl.DataFrame, gap: timedelta) -> int:
+    df = _assign_sessions(df, gap, timedelta(hours=24), 10_000)
+    summary = _session_summary(df)
+    for _ in df.iter_rows(named=True):
+        pass
+    return len(summary)
+
+
+def main(n: int = 1_000_000) -> None:
+    df = _frame(n)
+    gap = timedelta(minutes=60)
+    for name, fn in (("partition_by + to_dicts per session", _partitioned), ("group_by aggregates", _grouped)):
+        start = time.perf_counter()
+        sessions = fn(df, gap)
+        print(f"{name:<38}: {time.perf_counter() - start:6.2f}s  ({sessions:,} sessions from {n:,} events)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
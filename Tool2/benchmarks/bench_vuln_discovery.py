@@ -0,0 +1,75 @@
+"""
+Benchmark: CVE/CWE discovery over session events.
+Before: the per-event scan (import re, three re.findall calls with inline
+patterns, list-membership dedupe) over every event's raw line. After:
+GraphEngine._discover_vulnerabilities - one vectorized extraction over the
+distinct raw lines, skipping lists Tool 1 already filled - cold, with 10% of
+events carrying Tool 1 ids, and again on a warm engine (every raw_hash known).
+Run from the Tool2 directory:
+    python -m benchmarks.bench_vuln_discovery [n_events]
+"""
+import hashlib
+import random
+import sys
+import time
+
+import polars as pl
+
+from src.engine import GraphEngine
+
+
+def _old_discover(text: str):
+    import re
+    cve_pattern = r'CVE-\d{4}-\d{4,7}'
+    cwe_pattern = r'CWE-\d{1,5}'
+    cves = list(set(re.findall(cve_pattern, text, re.I)))
+    cwes = list(set(re.findall(cwe_pattern, text, re.I)))
+    structural_cwe_pattern = r'[\'"]cwe_?id[\'"]:\s*[\'"]?(\d+)[\'"]?'
+    for m in re.findall(structural_cwe_pattern, text, re.I):
+        cwe_id = f"CWE-{m}"
+        if cwe_id not in cwes:
+            cwes.append(cwe_id)
+    return cves, cwes
+
+
+def _frame(n: int, tool1_share: float = 0.0) -> pl.DataFrame:
+    rng = random.Random(5)
+    raws, cves = [], []
+    for i in range(n):
+        body = " ".join(f"k{j}={rng.getrandbits(32):x}" for j in range(rng.randint(20, 400)))
+        mention = rng.random() < 0.05
+        raws.append(f'{{"id": {i}, "cweid": "79", "msg": "exploit CVE-2021-44228 {body}"}}' if mention
+                    else f"Mar  1 10:00:00 host sshd[{i}]: Failed password {body}")
+        cves.append(["CVE-2021-44228"] if mention and rng.random() < tool1_share * 20 else [])
+    return pl.DataFrame({
+        "raw_text": raws,
+        "raw_hash": [hashlib.sha256(r.encode()).hexdigest() for r in raws],
+        "event_type": "auth_failure", "mitre_technique": "T1110",
+        "observed_cve_ids": pl.Series(cves, dtype=pl.List(pl.Utf8)),
+        "observed_cwe_ids": pl.Series([["CWE-79"] if c else [] for c in cves], dtype=pl.List(pl.Utf8)),
+    }).with_columns(pl.col("raw_text").alias("_scan"))
+
+
+def main(n: int = 100_000) -> None:
+    frame = _frame(n)
+    size = frame["raw_text"].str.len_bytes().mean()
+    print(f"{n:,} events, {size:.0f} B average raw line")
+
+    start = time.perf_counter()
+    for text in frame["_scan"]:
+        _old_discover(text)
+    print(f"  {'per-event re.findall':<34}: {time.perf_counter() - start:6.2f}s")
+
+    for name, data in (("vectorized, cold", frame), ("vectorized, cold, 10% Tool 1 ids", _frame(n, 0.1))):
+        engine = GraphEngine()
+        start = time.perf_counter()
+        engine._discover_vulnerabilities(data)
+        cold = time.perf_counter() - start
+        print(f"  {name:<34}: {cold:6.2f}s")
+    start = time.perf_counter()
+    engine._discover_vulnerabilities(data)
+    print(f"  {'vectorized, warm (raw_hash cache)':<34}: {time.perf_counter() - start:6.2f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
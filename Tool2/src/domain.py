@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List, Optional, Dict
-from pydantic import BaseModel, Field
+from typing import Any, List, Optional, Dict, Sequence
+import polars as pl
+from pydantic import BaseModel, Field, PrivateAttr
 
 class EnrichedEvent(BaseModel):
     """
@@ -19,18 +20,83 @@ class EnrichedEvent(BaseModel):
     confidence_score: float = Field(..., ge=0.0, le=1.0)
     data_quality_score: float = Field(..., ge=0.0, le=1.0)
     raw_text: Optional[str] = None
+    raw_hash: Optional[str] = None  # SHA256 of raw_text, as written by Tool 1
+
+# Columns of a Session's event frame: one per EnrichedEvent field, holding the field's value
+EVENT_SCHEMA: Dict[str, pl.DataType] = {
+    "event_id": pl.Utf8,
+    "timestamp": pl.Datetime("us", "UTC"),
+    "user": pl.Utf8,
+    "source_host": pl.Utf8,
+    "target_host": pl.Utf8,
+    "event_type": pl.Utf8,
+    "protocol": pl.Utf8,
+    "mitre_technique": pl.Utf8,
+    "observed_cve_ids": pl.List(pl.Utf8),
+    "observed_cwe_ids": pl.List(pl.Utf8),
+    "confidence_score": pl.Float64,
+    "data_quality_score": pl.Float64,
+    "raw_text": pl.Utf8,
+    "raw_hash": pl.Utf8,
+}
 
 class Session(BaseModel):
     """
     Represents a grouped set of events for an identity within a time window.
+    The events are held as a Polars frame (EVENT_SCHEMA, usually a zero-copy
+    slice of everything load_sessions read); EnrichedEvent objects are only
+    built when `events` or head() is used, e.g. for visualization.
+    A Session can also be created from a list of events.
     """
     session_id: str
     user: Optional[str] = "Unknown"
     start_time: datetime
     end_time: datetime
-    events: List[EnrichedEvent]
     is_high_priority: bool = False
 
+    _frame: Optional[pl.DataFrame] = PrivateAttr(default=None)
+    _events: Optional[List[EnrichedEvent]] = PrivateAttr(default=None)
+
+    def __init__(self, events: Optional[Sequence[EnrichedEvent]] = None,
+                 frame: Optional[pl.DataFrame] = None, **data: Any):
+        super().__init__(**data)
+        if events is None and frame is None:
+            raise ValueError("Session needs events or an event frame")
+        self._events = list(events) if events is not None else None
+        self._frame = frame
+
+    @property
+    def frame(self) -> pl.DataFrame:
+        """The events as columns (EVENT_SCHEMA)."""
+        if self._frame is None:
+            self._frame = pl.DataFrame([e.model_dump() for e in self._events], schema=EVENT_SCHEMA)
+        return self._frame
+
+    @property
+    def events(self) -> List[EnrichedEvent]:
+        if self._events is None:
+            self._events = self.head(len(self._frame))
+        return self._events
+
+    @property
+    def event_count(self) -> int:
+        return len(self._events) if self._events is not None else len(self._frame)
+
+    def head(self, n: int) -> List[EnrichedEvent]:
+        """The first n events, materializing only those."""
+        if self._events is not None:
+            return self._events[:n]
+        return [EnrichedEvent(**row) for row in self._frame.head(n).iter_rows(named=True)]
+
+    def replace_column(self, name: str, values: Sequence[Any]) -> None:
+        """Overwrite one event field for all events (frame and any materialized objects)."""
+        frame = self.frame.clone()  # shares the buffers; other slices of the same data are untouched
+        frame.replace_column(frame.get_column_index(name), pl.Series(name, values, dtype=EVENT_SCHEMA[name]))
+        self._frame = frame
+        if self._events is not None:
+            for event, value in zip(self._events, values):
+                setattr(event, name, value)
+
 class PathPrediction(BaseModel):
     """
     Prediction for the next likely steps in the attack path.
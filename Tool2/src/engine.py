@@ -1,8 +1,9 @@
 import networkx as nx
+import polars as pl
 import logging
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from datetime import datetime
-from .domain import Session, EnrichedEvent, PathReport, PathPrediction
+from .domain import Session, PathReport, PathPrediction
 from .vuln import VulnManager
 
 logger = logging.getLogger(__name__)
@@ -85,86 +86,163 @@ CWE_TECH_MAP = {
     "CWE-200": "T1046",  # General Info Exposure -> Discovery
 }
 
+CVE_PATTERN = r"(?i)CVE-\d{4}-\d{4,7}"
+CWE_PATTERN = r"(?i)CWE-\d{1,5}"
+STRUCTURAL_CWE_PATTERN = r"""(?i)['"]cwe_?id['"]:\s*['"]?(\d+)['"]?"""
+
 class GraphEngine:
     def __init__(self):
         self.graph = nx.MultiDiGraph()
         self.vuln_manager = VulnManager()
-    
-    def build_and_analyze(self, session: Session) -> Optional[PathReport]:
-        # ... (implementation remains same until _compute_metrics call) ...
-        self.graph.clear()
-        events = sorted(session.events, key=lambda x: x.timestamp)
-        
-        if not events:
-            return None
+        # IDs found per scanned text (see _discover_vulnerabilities; null: not scanned), kept for the engine's lifetime
+        self._discovered = pl.DataFrame(
+            schema={"_key": pl.Utf8, "_found_cves": pl.List(pl.Utf8), "_found_cwes": pl.List(pl.Utf8),
+                    "_found_structural": pl.List(pl.Utf8)})
 
-        for i, event in enumerate(events):
-            technique = event.mitre_technique or "Unknown"
+    def build_graph(self, session: Session) -> nx.MultiDiGraph:
+        """The session's directed temporal graph (events in time order), kept as self.graph."""
+        self.graph.clear()
+        ordered = session.frame.sort("timestamp", maintain_order=True)
+        timestamps = ordered["timestamp"].to_list()
+        event_ids = ordered["event_id"].to_list()
+        for i, (event_id, ts, host, technique) in enumerate(zip(
+                event_ids, timestamps, ordered["source_host"].to_list(), ordered["mitre_technique"].to_list())):
+            technique = technique or "Unknown"
             phase = MITRE_PHASE_MAP.get(technique, "Unknown")
-            
+
             self.graph.add_node(
-                event.event_id,
-                timestamp=event.timestamp,
-                host=event.source_host,
+                event_id,
+                timestamp=ts,
+                host=host,
                 technique=technique,
                 phase=phase
             )
-            
+
             if i > 0:
-                prev_event = events[i-1]
-                delta_t = (event.timestamp - prev_event.timestamp).total_seconds()
-                self.graph.add_edge(prev_event.event_id, event.event_id, delta_t=delta_t)
+                delta_t = (ts - timestamps[i-1]).total_seconds()
+                self.graph.add_edge(event_ids[i-1], event_id, delta_t=delta_t)
+        return self.graph
 
-        return self._compute_metrics(session)
+    def build_and_analyze(self, session: Session) -> Optional[PathReport]:
+        """Report for one session (see analyze_sessions); the graph is left to build_graph()."""
+        return self.analyze_sessions([session])[0]
 
-    def _compute_metrics(self, session: Session) -> PathReport:
-        base_risk = 0.0
-        events = session.events
-        
-        for e in events:
-            tech = e.mitre_technique or "Unknown"
-            weight = MITRE_SEVERITY_WEIGHTS.get(tech, 1.0)
-            if e.confidence_score > 0.0:
-                base_risk += weight * e.confidence_score
-            else:
-                base_risk += weight * 0.1
+    def analyze_sessions(self, sessions: List[Session]) -> List[Optional[PathReport]]:
+        """
+        Reports for many sessions (None for an empty one). The per-event work -
+        risk weights, hosts, CVE/CWE discovery, technique inference, event type
+        counts - runs over all sessions' events in one Polars pass; only the
+        vulnerability lookups and the narrative are per session.
+        """
+        metrics = self._session_metrics(sessions)
+        self._prefetch_vulnerabilities([m for m in metrics if m])
+        return [self._compute_metrics(session, m) if m else None for session, m in zip(sessions, metrics)]
+
+    def _prefetch_vulnerabilities(self, metrics: List[Dict[str, Any]], chunk: int = 10_000) -> None:
+        """Look up every session's CVEs, then their CWEs and the technique heuristics, in a few queries."""
+        cves = list(dict.fromkeys(c for m in metrics for c in m["cves"]))
+        cwes = {c for m in metrics for t in m["techniques"] for c in MITRE_CWE_HEURISTICS.get(t, [])}
+        for i in range(0, len(cves), chunk):
+            for v in self.vuln_manager.batch_lookup_cves(cves[i:i + chunk]).values():
+                cwes.update(v["cwe_ids"])
+        cwes = sorted(cwes)
+        for i in range(0, len(cwes), chunk):
+            self.vuln_manager.batch_lookup_cwes(cwes[i:i + chunk])
+
+    def _session_metrics(self, sessions: List[Session]) -> List[Optional[Dict[str, Any]]]:
+        """Per-session metrics; events are scanned in each session's own order."""
+        metrics: List[Optional[Dict[str, Any]]] = [None] * len(sessions)
+        indices = [i for i, s in enumerate(sessions) if s.event_count]
+        if not indices:
+            return metrics
+        counts = [sessions[i].event_count for i in indices]
+        frame = pl.concat([sessions[i].frame for i in indices], rechunk=False).with_columns(
+            pl.select(pl.int_range(len(indices), dtype=pl.UInt32).repeat_by(pl.Series(counts)).explode())
+              .to_series().alias("_session")
+        )
+
+        # Deep Scan raw log source if available
+        scan_text = (
+            pl.when(pl.col("raw_text").fill_null("") != "")
+              .then(pl.col("raw_text"))
+              .otherwise(pl.format("{} {}", pl.col("event_type").fill_null("None"),
+                                   pl.col("mitre_technique").fill_null("None")))
+        )
+        frame = self._discover_vulnerabilities(frame.with_columns(scan_text.alias("_scan")))
+
+        # Enrich Event: If no technique found by Tool 1, infer it from the first mapped CWE
+        missing = pl.col("mitre_technique").is_null() | pl.col("mitre_technique").is_in(["Unknown", ""])
+        from_cwe = (pl.col("_cwes").list.eval(pl.element().replace_strict(CWE_TECH_MAP, default=None))
+                    .list.drop_nulls().list.first())
+        frame = frame.with_columns(
+            (missing & from_cwe.is_not_null()).alias("_inferred"),
+            pl.when(missing & from_cwe.is_not_null()).then(from_cwe).otherwise(pl.col("mitre_technique"))
+              .alias("_technique"),
+        )
+
+        weight = pl.col("mitre_technique").fill_null("Unknown").replace_strict(
+            MITRE_SEVERITY_WEIGHTS, default=1.0, return_dtype=pl.Float64)
+        confidence = pl.col("confidence_score")
+        hosts = pl.concat_list("source_host", "target_host").explode()
+        technique = pl.col("_technique")
+
+        def ordered_ids(col: str) -> pl.Expr:
+            # Event by event, in the order the IDs were found: sets built from these iterate like before
+            return pl.col(col).explode().drop_nulls().unique(maintain_order=True)
+
+        per_session = frame.group_by("_session", maintain_order=True).agg(
+            pl.len().alias("n_events"),
+            pl.col("event_id").first().alias("first_event_id"),
+            pl.col("timestamp").first().alias("first_timestamp"),
+            pl.col("timestamp").last().alias("last_timestamp"),
+            (weight * pl.when(confidence > 0.0).then(confidence).otherwise(0.1)).sum().alias("base_risk"),
+            # Source then target host of each event
+            hosts.filter(hosts.fill_null("") != "").unique(maintain_order=True).alias("hosts"),
+            # _cves/_cwes already hold Tool 1's lists (upper-cased)
+            ordered_ids("_cves").alias("cves"),
+            ordered_ids("_cwes").alias("cwes"),
+            # Unique Techniques for Tool 3, in order of first appearance (temporal pivots)
+            technique.filter(~technique.fill_null("").is_in(["", "Unknown"])).unique(maintain_order=True)
+              .alias("techniques"),
+            pl.col("_inferred").any().alias("inferred"),
+        )
+        # Build event summary (Group counts by type for large volume handling)
+        event_counts: Dict[int, Dict[str, int]] = {}
+        for session_index, event_type, count in frame.group_by(
+                ["_session", "event_type"], maintain_order=True).len().iter_rows():
+            event_counts.setdefault(session_index, {})[event_type] = count
+
+        offsets = [0]
+        for n in counts:
+            offsets.append(offsets[-1] + n)
+        for k, row in enumerate(per_session.iter_rows(named=True)):
+            session = sessions[indices[k]]
+            if row["inferred"]:
+                # Keep the inferred techniques on the session (visualization shows them)
+                session.replace_column("mitre_technique", frame["_technique"][offsets[k]:offsets[k + 1]])
+            row["event_counts"] = event_counts[k]
+            metrics[indices[k]] = row
+        return metrics
+
+    def _compute_metrics(self, session: Session, m: Dict[str, Any]) -> PathReport:
+        n_events = m["n_events"]
+        base_risk = m["base_risk"]
 
         velocity_mult = 1.0
-        if len(events) > 1:
-            total_duration = (events[-1].timestamp - events[0].timestamp).total_seconds()
-            avg_delta = total_duration / (len(events) - 1)
+        if n_events > 1:
+            total_duration = (m["last_timestamp"] - m["first_timestamp"]).total_seconds()
+            avg_delta = total_duration / (n_events - 1)
             if avg_delta < 0.2: velocity_mult = 1.5
         
-        touched_hosts = set()
-        for e in events:
-            if e.source_host: touched_hosts.add(e.source_host)
-            if e.target_host: touched_hosts.add(e.target_host)
+        touched_hosts = set(m["hosts"])
         
         blast_penalty = max(0, len(touched_hosts) - 2) * 1.5
         final_score = (base_risk * velocity_mult) + blast_penalty
 
         # --- VULNERABILITY INTELLIGENCE DISCOVERY (Responsibility moved from Tool 1) ---
-        all_cves = []
-        discovered_explicit_cwes = []
-        
-        for e in events:
-            # Deep Scan raw log source if available
-            scan_text = e.raw_text or f"{e.event_type} {e.mitre_technique}"
-            cves, cwes = self._discover_vulnerabilities(scan_text)
-            
-            # Enrich Event: If no technique found by Tool 1, infer it from the CWE
-            if e.mitre_technique in [None, "Unknown", ""]:
-                for cwe in cwes:
-                    if cwe in CWE_TECH_MAP:
-                        e.mitre_technique = CWE_TECH_MAP[cwe]
-                        break
-            
-            all_cves.extend(cves)
-            discovered_explicit_cwes.extend(cwes)
-            
-            # Incorporate any pre-discovered IDs (if any)
-            all_cves.extend(e.observed_cve_ids)
-            discovered_explicit_cwes.extend(e.observed_cwe_ids)
+        # IDs found in the raw logs plus any pre-discovered by Tool 1, in order of appearance
+        all_cves = m["cves"]
+        discovered_explicit_cwes = m["cwes"]
         
         vuln_data = self.vuln_manager.batch_lookup_cves(list(set(all_cves)))
         
@@ -186,22 +264,17 @@ class GraphEngine:
         explicit_cwes = list(set(discovered_explicit_cwes))
         
         # PROACTIVE: Add likely CWEs based on MITRE technique
-        for e in events:
-            if e.mitre_technique in MITRE_CWE_HEURISTICS:
-                heuristics = MITRE_CWE_HEURISTICS[e.mitre_technique]
+        for tech in m["techniques"]:
+            if tech in MITRE_CWE_HEURISTICS:
+                heuristics = MITRE_CWE_HEURISTICS[tech]
                 all_cwes.extend(heuristics)
                 explicit_cwes.extend(heuristics)
         
         cwe_details = self.vuln_manager.batch_lookup_cwes(list(set(all_cwes)))
         cwe_clusters = list(set([d['abstraction'] for d in cwe_details.values() if d['abstraction'] != 'Unknown']))
         
-        # Prepare Unique Techniques for Tool 3 (Preserving order for temporal pivots)
-        unique_techniques = []
-        seen_t = set()
-        for e in events:
-            if e.mitre_technique and e.mitre_technique != "Unknown" and e.mitre_technique not in seen_t:
-                unique_techniques.append(e.mitre_technique)
-                seen_t.add(e.mitre_technique)
+        # Unique Techniques for Tool 3 (order preserved for temporal pivots)
+        unique_techniques = list(m["techniques"])
 
         vuln_summary = []
         for cid, v in vuln_data.items():
@@ -289,13 +362,10 @@ class GraphEngine:
         for name, prob in potential_next:
             predictions.append(PathPrediction(next_node=name, probability=prob))
             
-        # Build event summary (Group counts by type for large volume handling)
-        evt_counts = {}
-        for e in events:
-            evt_counts[e.event_type] = evt_counts.get(e.event_type, 0) + 1
+        evt_counts = m["event_counts"]
 
         # Build tactical narrative for the analyst (Mentor Grade)
-        narrative = f"Detected {len(events)} correlated events in this behavioral session. "
+        narrative = f"Detected {n_events} correlated events in this behavioral session. "
         if kev_count > 0:
             narrative += f"CRITICAL: Found {kev_count} vulnerabilities from the CISA Known Exploited Vulnerabilities (KEV) catalog! "
         elif highest_cvss >= 9.0:
@@ -315,7 +385,7 @@ class GraphEngine:
         
         # Volume score (Logarithmic, Max 30) - prevents 15,000 events from blowing up the score
         import math
-        volume_score = min(math.log(len(events) + 1, 10) * 10, 30.0)
+        volume_score = min(math.log(n_events + 1, 10) * 10, 30.0)
         
         # Final Scoring (Logarithmic/Diversity)
         final_score = diversity_score + volume_score
@@ -349,7 +419,7 @@ class GraphEngine:
 
         return PathReport(
             session_id=session.session_id,
-            root_cause_node=events[0].event_id,
+            root_cause_node=m["first_event_id"],
             blast_radius=list(touched_hosts),
             path_anomaly_score=round(min(final_score, 100.0), 2),
             prediction_vector=predictions,
@@ -362,21 +432,69 @@ class GraphEngine:
             business_risk_level=business_risk
         )
 
-    def _discover_vulnerabilities(self, text: str) -> tuple[list[str], list[str]]:
-        import re
-        cve_pattern = r'CVE-\d{4}-\d{4,7}'
-        cwe_pattern = r'CWE-\d{1,5}'
-        
-        cves = list(set(re.findall(cve_pattern, text, re.I)))
-        cwes = list(set(re.findall(cwe_pattern, text, re.I)))
-        
-        # Structural Discovery: Find "cweid": "693" or "cwe_id": 693 in stringified logs
-        # This is critical for ZAP/Burp/Wazuh JSON data
-        structural_cwe_pattern = r'[\'"]cwe_?id[\'"]:\s*[\'"]?(\d+)[\'"]?'
-        struct_matches = re.findall(structural_cwe_pattern, text, re.I)
-        for m in struct_matches:
-            cwe_id = f"CWE-{m}"
-            if cwe_id not in cwes:
-                cwes.append(cwe_id)
-        
-        return cves, cwes
+    def _discover_vulnerabilities(self, frame: pl.DataFrame) -> pl.DataFrame:
+        """
+        Adds _cves/_cwes per event: the IDs in its scan text, upper-cased, in order
+        of appearance. Where Tool 1 already filled observed_cve_ids /
+        observed_cwe_ids (extracted from the same text) that list is used and the
+        CVE / CWE-NNN scan is skipped; Tool 1 does not read structural "cweid"
+        fields, so those are always extracted and added to the CWE list. Each
+        extraction is vectorized over the distinct texts that still need it;
+        results are remembered by raw_hash (by the text itself for events without
+        a raw line), so a repeated event is scanned once.
+        """
+        has_raw = (pl.col("raw_text").fill_null("") != "") & pl.col("raw_hash").is_not_null()
+        frame = frame.with_columns(
+            pl.when(has_raw).then(pl.col("raw_hash")).otherwise(pl.col("_scan")).alias("_key")
+        )
+        upper = pl.element().str.to_uppercase()
+        text = pl.col("_scan")
+        # Per distinct text: which scans are still missing (a null list was never scanned)
+        keys = frame.group_by("_key", maintain_order=True).agg(
+            pl.col("_scan").first(),
+            (pl.col("observed_cve_ids").list.len() == 0).any().alias("_need_cves"),
+            (pl.col("observed_cwe_ids").list.len() == 0).any().alias("_need_cwes"),
+        ).join(self._discovered, on="_key", how="left", maintain_order="left").with_columns(
+            (pl.col("_need_cves") & pl.col("_found_cves").is_null()).alias("_scan_cves"),
+            (pl.col("_need_cwes") & pl.col("_found_cwes").is_null()).alias("_scan_cwes"),
+            pl.col("_found_structural").is_null().alias("_scan_structural"),
+        )
+        todo = keys.filter(pl.col("_scan_cves") | pl.col("_scan_cwes") | pl.col("_scan_structural"))
+        if len(todo):
+            scans = [
+                todo.filter("_scan_cves").select(
+                    "_key", text.str.extract_all(CVE_PATTERN).list.eval(upper).list.unique(maintain_order=True)
+                                .alias("_cves")),
+                todo.filter("_scan_cwes").select(
+                    "_key", text.str.extract_all(CWE_PATTERN).list.eval(upper).list.unique(maintain_order=True)
+                                .alias("_cwes")),
+                # Structural Discovery: "cweid": "693" or "cwe_id": 693 (ZAP/Burp/Wazuh JSON)
+                todo.filter("_scan_structural").select(
+                    "_key", text.str.extract_all(STRUCTURAL_CWE_PATTERN).list.eval(
+                        pl.format("CWE-{}", pl.element().str.extract(r"(\d+)", 1))).list.unique(maintain_order=True)
+                                .alias("_structural")),
+            ]
+            found = todo.select("_key", "_found_cves", "_found_cwes", "_found_structural")
+            for scan in scans:
+                found = found.join(scan, on="_key", how="left", maintain_order="left")
+            found = found.select(
+                "_key",
+                pl.coalesce("_found_cves", "_cves").alias("_found_cves"),
+                pl.coalesce("_found_cwes", "_cwes").alias("_found_cwes"),
+                pl.coalesce("_found_structural", "_structural").alias("_found_structural"),
+            )
+            known = self._discovered
+            if todo["_found_structural"].is_not_null().any():  # texts scanned before for fewer lists
+                known = known.join(found, on="_key", how="anti")
+            self._discovered = pl.concat([known, found])
+
+        frame = frame.join(self._discovered, on="_key", how="left", maintain_order="left")
+        return frame.with_columns(
+            pl.when(pl.col("observed_cve_ids").list.len() > 0)
+              .then(pl.col("observed_cve_ids").list.eval(upper).list.unique(maintain_order=True))
+              .otherwise(pl.col("_found_cves")).alias("_cves"),
+            pl.when(pl.col("observed_cwe_ids").list.len() > 0)
+              .then(pl.col("observed_cwe_ids").list.eval(upper))
+              .otherwise(pl.col("_found_cwes"))
+              .list.concat("_found_structural").list.unique(maintain_order=True).alias("_cwes"),
+        )
@@ -1,11 +1,221 @@
+import re
 import polars as pl
-from typing import List, Dict, Any
-from datetime import timedelta
+from typing import List, Dict, Any, Optional, Sequence
+from datetime import datetime, timedelta, timezone
 import logging
-from .domain import EnrichedEvent, Session
+from .domain import Session
 
 logger = logging.getLogger(__name__)
 
+# Columns load_sessions reads for a Session's events, with the type each is cast to.
+# raw_source (the original log line, by far the widest column) is only read on request.
+SESSION_COLUMNS: Dict[str, pl.DataType] = {
+    "event_id": pl.Utf8,
+    "timestamp": pl.Datetime("us", "UTC"),
+    "user": pl.Utf8,
+    "source_host": pl.Utf8,
+    "target_host": pl.Utf8,
+    "event_type": pl.Utf8,
+    "protocol": pl.Utf8,
+    "mitre_technique": pl.Utf8,
+    "observed_cve_ids": pl.List(pl.Utf8),
+    "observed_cwe_ids": pl.List(pl.Utf8),
+    "confidence_score": pl.Float64,
+    "data_quality_score": pl.Float64,
+}
+RAW_SOURCE_COLUMN = "raw_source"
+RAW_HASH_COLUMN = "raw_hash"  # Read with raw_source: identifies repeated raw lines
+
+# Session boundaries: a silence longer than the gap (load_sessions' time_window_params)
+# ends a session, and no session spans more than MAX_SESSION_DURATION or holds more than
+# MAX_SESSION_EVENTS events, so a long-lived service account is cut into reviewable pieces.
+SESSION_GAP = "60m"
+MAX_SESSION_DURATION = "24h"
+MAX_SESSION_EVENTS = 10_000
+
+_WINDOW_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def _id_list_column(col: str, dtype: Optional[pl.DataType]) -> pl.Expr:
+    """CVE/CWE ids as List[Utf8]: native in current Tool 1 output, pipe-joined in older files."""
+    if dtype is None:
+        return pl.lit([]).cast(pl.List(pl.Utf8)).alias(col)
+    if dtype == pl.Utf8:
+        return (
+            pl.when(pl.col(col).fill_null("") == "")
+              .then(pl.lit([]).cast(pl.List(pl.Utf8)))
+              .otherwise(pl.col(col).str.split("|"))
+              .alias(col)
+        )
+    return pl.col(col).cast(pl.List(pl.Utf8))
+
+
+def _timestamp_expr(dtype: Optional[pl.DataType]) -> pl.Expr:
+    """Timestamps as UTC datetimes: Tool 1 writes ISO strings, other producers naive or zoned datetimes."""
+    target = SESSION_COLUMNS["timestamp"]
+    if dtype is None:
+        return pl.lit(None, dtype=target).alias("timestamp")
+    if dtype == pl.Utf8:
+        return pl.col("timestamp").str.strptime(target, "%+", strict=False).alias("timestamp")
+    if isinstance(dtype, pl.Datetime) and dtype.time_zone is None:
+        return pl.col("timestamp").dt.replace_time_zone("UTC").cast(target).alias("timestamp")
+    if isinstance(dtype, pl.Datetime):
+        return pl.col("timestamp").dt.convert_time_zone("UTC").cast(target).alias("timestamp")
+    return pl.col("timestamp").cast(target, strict=False).alias("timestamp")
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _scan_events(files: Sequence[str], columns: Dict[str, pl.DataType],
+                 start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 identities: Optional[Sequence[str]] = None) -> pl.LazyFrame:
+    """
+    One lazy plan over all files. Files are grouped by the Parquet types of the
+    wanted columns (read from the footers only) and each group is a single
+    scan_parquet that projects just those columns; the per-type normalization
+    (pipe-joined id lists, timestamp parsing, missing columns) is applied once
+    per group rather than once per file.
+    The [start, end) range and identity filters are part of the plan, so Polars
+    evaluates them inside the reader and skips row groups whose statistics rule
+    them out. For ISO-string timestamps a date-granular string comparison (one
+    day of slack for UTC offsets) is applied before parsing, which is what lets
+    the string statistics prune; the exact range is checked after parsing.
+    """
+    groups: Dict[tuple, List[str]] = {}
+    for f in files:
+        schema = pl.read_parquet_schema(f)
+        key = tuple((col, schema[col]) for col in columns if col in schema)
+        groups.setdefault(key, []).append(f)
+    if not any("timestamp" in dict(key) for key in groups):
+        raise ValueError("column 'timestamp' not found in any file")
+
+    start = _utc(start) if start is not None else None
+    end = _utc(end) if end is not None else None
+    frames = []
+    for key, group_files in groups.items():
+        present = dict(key)
+        lf = pl.scan_parquet(group_files, schema=present, extra_columns="ignore").select(list(present))
+
+        ts_type = present.get("timestamp")
+        if ts_type == pl.Utf8:
+            if start is not None:
+                lf = lf.filter(pl.col("timestamp") >= (start - timedelta(days=1)).date().isoformat())
+            if end is not None:
+                lf = lf.filter(pl.col("timestamp") < (end + timedelta(days=2)).date().isoformat())
+
+        normalized = []
+        for col, dtype in columns.items():
+            if col == "timestamp":
+                normalized.append(_timestamp_expr(present.get(col)))
+            elif col in ("observed_cve_ids", "observed_cwe_ids"):
+                normalized.append(_id_list_column(col, present.get(col)))
+            elif col in present:
+                normalized.append(pl.col(col).cast(dtype, strict=False))
+            else:
+                normalized.append(pl.lit(None, dtype=dtype).alias(col))
+        frames.append(lf.select(normalized))
+
+    lf = pl.concat(frames, how="vertical") if len(frames) > 1 else frames[0]
+    if start is not None:
+        lf = lf.filter(pl.col("timestamp") >= start)
+    if end is not None:
+        lf = lf.filter(pl.col("timestamp") < end)
+    if identities is not None:
+        lf = lf.filter(
+            pl.coalesce([pl.col("user"), pl.col("source_host"), pl.lit("System")]).is_in(list(identities))
+        )
+    return lf
+
+
+def _parse_window(spec: str) -> timedelta:
+    """'90s', '60m', '2h', '1d' -> timedelta."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd])\s*", spec or "")
+    if not match:
+        raise ValueError(f"invalid time window {spec!r}, expected e.g. '60m', '2h', '1d'")
+    return timedelta(**{_WINDOW_UNITS[match.group(2)]: float(match.group(1))})
+
+
+def _assign_sessions(df: pl.DataFrame, gap: timedelta, max_duration: Optional[timedelta] = None,
+                     max_events: Optional[int] = None) -> pl.DataFrame:
+    """
+    Adds surrogate_id (user, else source_host, else "System") and session_group_id
+    (1, 2, ... per identity), sorted by identity and time.
+    A session starts at an identity's first event or after more than `gap` of
+    silence; a burst longer than max_duration is cut into max_duration windows
+    measured from its first event, and a window with more than max_events
+    events into chunks of max_events.
+    """
+    df = df.with_columns(
+        pl.coalesce([pl.col("user"), pl.col("source_host"), pl.lit("System")]).alias("surrogate_id")
+    ).sort(["surrogate_id", "timestamp"], maintain_order=True)
+
+    # First event of an identity (null diff) always starts a burst
+    df = df.with_columns(
+        (pl.col("timestamp").diff() > gap).fill_null(True).cum_sum().over("surrogate_id").alias("_burst")
+    )
+    parts = ["_burst"]
+    if max_duration is not None:
+        df = df.with_columns(
+            ((pl.col("timestamp") - pl.col("timestamp").first()).dt.total_microseconds()
+             // int(max_duration / timedelta(microseconds=1)))
+            .over(["surrogate_id", "_burst"]).alias("_window")
+        )
+        parts.append("_window")
+    if max_events:
+        df = df.with_columns(
+            (pl.int_range(pl.len()) // max_events).over(["surrogate_id", *parts]).alias("_chunk")
+        )
+        parts.append("_chunk")
+
+    # Parts only grow along an identity's timeline, so every change is a new session
+    return df.with_columns(
+        pl.any_horizontal([pl.col(p).diff() != 0 for p in parts]).fill_null(True)
+          .cum_sum().over("surrogate_id").cast(pl.Int32).alias("session_group_id")
+    ).drop(parts)
+
+
+def _event_frame(df: pl.DataFrame) -> pl.DataFrame:
+    """The loaded columns as EnrichedEvent field values (EVENT_SCHEMA)."""
+    def known(col: str) -> pl.Expr:
+        return pl.when(pl.col(col).fill_null("") == "").then(pl.lit("Unknown")).otherwise(pl.col(col)).alias(col)
+
+    def optional(col: str) -> pl.Expr:
+        return pl.col(col) if col in df.columns else pl.lit(None, dtype=pl.Utf8)
+
+    return df.select(
+        pl.col("event_id").fill_null(""), "timestamp", known("user"), known("source_host"), "target_host",
+        "event_type", "protocol", "mitre_technique", "observed_cve_ids", "observed_cwe_ids",
+        "confidence_score", "data_quality_score", optional(RAW_SOURCE_COLUMN).alias("raw_text"),
+        optional(RAW_HASH_COLUMN).alias("raw_hash"),
+    )
+
+
+def _session_summary(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Per-session aggregates in one group_by pass over (surrogate_id,
+    session_group_id), in (identity, time) order like the rows of df, plus the
+    display unique_session_id (not a key: "alice"'s second session and the first
+    of an identity named "alice #2" share one).
+    """
+    return df.group_by(["surrogate_id", "session_group_id"], maintain_order=True).agg(
+        pl.len().alias("n_events"),
+        pl.col("timestamp").first().alias("start_time"),
+        pl.col("timestamp").last().alias("end_time"),
+        pl.col("user").first(),
+        # IP switching (source_host variance) or a high confidence score ("high" is an arbitrary 0.8)
+        ((pl.col("source_host").n_unique() > 1) | (pl.col("confidence_score").max() > 0.8))
+          .fill_null(False).alias("is_high_priority"),
+    ).with_columns(
+        # Human Friendly ids for the Mentor: an identity's first session keeps the plain name
+        pl.when(pl.col("session_group_id") == 1)
+          .then(pl.format("Activity on {}", pl.col("surrogate_id")))
+          .otherwise(pl.format("Activity on {} #{}", pl.col("surrogate_id"), pl.col("session_group_id")))
+          .alias("unique_session_id")
+    )
+
+
 class DataIngester:
     def __init__(self, parquet_path: str):
         self.parquet_path = parquet_path
@@ -19,158 +229,55 @@ class DataIngester:
         # Skip redundant scan to prevent schema mismatch crashes in the CLI
         return True
 
-    def load_sessions(self, time_window_params: str = "60m") -> List[Session]:
+    def load_sessions(self, time_window_params: str = SESSION_GAP, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None, identities: Optional[Sequence[str]] = None,
+                      include_raw_source: bool = False,
+                      max_session_duration: Optional[str] = MAX_SESSION_DURATION,
+                      max_session_events: Optional[int] = MAX_SESSION_EVENTS) -> List[Session]:
         """
         Loads data, groups by user, and creates session windows.
+        time_window_params is the inactivity gap that ends a session ("60m");
+        max_session_duration / max_session_events cap a session (None = no cap).
+        start/end restrict to events in [start, end) and identities to the given
+        surrogate ids (user, else source_host, else "System"); both are applied
+        while scanning. raw_source is only read when include_raw_source is set.
         """
         import glob
-        files = glob.glob(self.parquet_path, recursive=True)
+        files = sorted(glob.glob(self.parquet_path, recursive=True))
         if not files:
             logger.error(f"No files found matching: {self.parquet_path}")
             return []
-            
+
+        columns = dict(SESSION_COLUMNS)
+        if include_raw_source:
+            columns[RAW_SOURCE_COLUMN] = pl.Utf8
+            columns[RAW_HASH_COLUMN] = pl.Utf8
         try:
-            # Manual unification because Polars/PyArrow fail on List vs Null mismatches in globs
-            dataframes = []
-            for f in files:
-                f_df = pl.read_parquet(f)
-                
-                # Force schema alignment for problematic columns
-                if "observed_cve_ids" in f_df.columns:
-                    f_df = f_df.with_columns(pl.col("observed_cve_ids").cast(pl.List(pl.Utf8)))
-                else:
-                    f_df = f_df.with_columns(pl.lit([]).cast(pl.List(pl.Utf8)).alias("observed_cve_ids"))
-
-                if "observed_cwe_ids" in f_df.columns:
-                    f_df = f_df.with_columns(pl.col("observed_cwe_ids").cast(pl.List(pl.Utf8)))
-                else:
-                    f_df = f_df.with_columns(pl.lit([]).cast(pl.List(pl.Utf8)).alias("observed_cwe_ids"))
-                
-                dataframes.append(f_df)
-            
-            df = pl.concat(dataframes, how="diagonal")
-            logger.info(f"Loaded {len(df)} events from {len(files)} files via manual schema alignment.")
+            df = _scan_events(files, columns, start, end, identities).collect()
+            logger.info(f"Loaded {len(df)} events from {len(files)} files.")
         except Exception as e:
             logger.error(f"Failed to load parquet file: {e}")
             return []
 
-        # Ensure timestamp is datetime
-        if "timestamp" not in df.columns:
-            # Fallback if timestamp is missing or named differently (e.g. parsed from ID?)
-            # Tool 1 logs implied timestamp exists. Let's assume 'timestamp' column.
-            # If not, we might need to derive it.
-            logger.warning("Column 'timestamp' not found, attempting detection...")
-            # For now, return empty if crucial data missing
-            return []
+        gap = _parse_window(time_window_params)
+        max_duration = _parse_window(max_session_duration) if max_session_duration else None
+        df = _assign_sessions(df, gap, max_duration, max_session_events)
 
-        df = df.sort("timestamp")
-        
-        # Cast timestamp to datetime if it came in as a string (Tool 1 writes ISO strings)
-        if df["timestamp"].dtype == pl.Utf8 or df["timestamp"].dtype == pl.String:
-            df = df.with_columns(
-                pl.col("timestamp").str.strptime(pl.Datetime("us", "UTC"), "%+", strict=False)
-                  .alias("timestamp")
-            )
-        elif df["timestamp"].dtype in (pl.Datetime("us"), pl.Datetime("ms"), pl.Datetime("ns")):
-            # Localize to UTC if no timezone present
-            df = df.with_columns(
-                pl.col("timestamp").dt.replace_time_zone("UTC").alias("timestamp")
-            )
-        
-        # State-Aware Sessionization
-        # We define a session as: Same user, events within 60 min gap
-        # Polars dynamic grouping can handle this.
-        
-        # However, for strict detailed control and mapping to our domain objects, 
-        # iterating might be safer for complex logic, but Polars is faster.
-        # Let's use Polars to assign session IDs.
-        
-        # 1. Create a "Surrogate Identity" for sessionization
-        # If user is missing, use source_host. If both missing, use "System"
-        df = df.with_columns([
-            pl.coalesce([pl.col("user"), pl.col("source_host"), pl.lit("System")]).alias("surrogate_id")
-        ])
-
-        # 2. Sort by surrogate_id, timestamp
-        df = df.sort(["surrogate_id", "timestamp"])
-        
-        # 3. Calculate time difference between consecutive events for each identity
-        df = df.with_columns([
-            pl.col("timestamp").diff().over("surrogate_id").alias("time_diff")
-        ])
-        
-        # 4. Mark start of new session if time_diff > window (60m)
-        #    fill_null with a large duration (first event in each group has null diff)
-        df = df.with_columns(
-            pl.when(pl.col("time_diff").is_null())
-              .then(pl.duration(days=365))   # First event → always starts a new session
-              .otherwise(pl.col("time_diff"))
-              .alias("time_diff_filled")
-        )
-        df = df.with_columns(
-            (pl.col("time_diff_filled") > pl.duration(minutes=60))
-              .cast(pl.Int32)
-              .cum_sum()
-              .over("surrogate_id")
-              .alias("session_group_id")
-        )
-        
-        # 5. Create unique session ID (Human Friendly for the Mentor)
-        df = df.with_columns(
-            pl.format("Activity on {}", pl.col("surrogate_id")).alias("unique_session_id")
-        )
+        summary = _session_summary(df)
 
-        # Convert to Domain Objects
+        # Each session's rows are contiguous in df: sessions hold zero-copy slices of one event frame
+        events = _event_frame(df)
         sessions: List[Session] = []
-        
-        # Group by unique_session_id and extract data
-        # This part effectively effectively "materializes" the sessions
-        grouped = df.partition_by("unique_session_id", as_dict=True)
-        
-        for s_id, group_df in grouped.items():
-            events = []
-            priority = False
-            
-            rows = group_df.to_dicts()
-            if not rows:
-                continue
-
-            start_t = rows[0]["timestamp"]
-            end_t = rows[-1]["timestamp"]
-            
-            # Check for IP switching (source_host variance)
-            unique_ips = group_df["source_host"].n_unique()
-            if unique_ips > 1:
-                priority = True
-                
-            # Check for high confidence scores
-            if group_df["confidence_score"].max() > 0.8: # Arbitrary threshold for "high"
-                priority = True
-
-            for row in rows:
-                events.append(EnrichedEvent(
-                    event_id=str(row.get("event_id", "")),
-                    timestamp=row["timestamp"],
-                    user=row.get("user") or "Unknown",
-                    source_host=row.get("source_host") or "Unknown",
-                    target_host=row.get("target_host"),
-                    event_type=row["event_type"],
-                    protocol=row.get("protocol"),
-                    mitre_technique=row.get("mitre_technique"),
-                    observed_cve_ids=row.get("observed_cve_ids", []),
-                    observed_cwe_ids=row.get("observed_cwe_ids", []),
-                    confidence_score=row["confidence_score"],
-                    data_quality_score=row["data_quality_score"],
-                    raw_text=row.get("raw_source")
-                ))
-            
+        offset = 0
+        for s in summary.iter_rows(named=True):
             sessions.append(Session(
-                session_id=str(s_id).replace("('", "").replace("',)", "").replace("(", "").replace(")", "").replace("'", ""),
-                user=rows[0]["user"],
-                start_time=start_t,
-                end_time=end_t,
-                events=events,
-                is_high_priority=priority
+                session_id=s["unique_session_id"],
+                user=s["user"],
+                start_time=s["start_time"],
+                end_time=s["end_time"],
+                frame=events.slice(offset, s["n_events"]),
+                is_high_priority=s["is_high_priority"]
             ))
-            
+            offset += s["n_events"]
+
         return sessions
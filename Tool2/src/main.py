@@ -1,12 +1,13 @@
 import argparse
 import sys
 import json
+from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 from rich.tree import Tree
 from rich.panel import Panel
 from rich.text import Text
-from .ingest import DataIngester
+from .ingest import DataIngester, MAX_SESSION_DURATION, MAX_SESSION_EVENTS, SESSION_GAP
 from .engine import GraphEngine
 
 console = Console()
@@ -34,11 +35,12 @@ def visualize_path(session, report):
     # Build a simple visualization of the sequence
     # Limit to first 10 events to avoid screen overflow
     last_node = tree
-    for i, event in enumerate(session.events[:10]):
+    events = session.head(10)  # only the events shown are materialized
+    for i, event in enumerate(events):
         # Calculate time delta from previous
         delta_msg = ""
         if i > 0:
-            prev = session.events[i-1]
+            prev = events[i-1]
             dt = (event.timestamp - prev.timestamp).total_seconds()
             delta_msg = f"  ⬇  (+{dt:.2f}s)"
             
@@ -58,8 +60,8 @@ def visualize_path(session, report):
         step_node.add(f"Host: {event.source_host} -> {event.target_host or 'N/A'}")
         last_node = step_node
 
-    if len(session.events) > 10:
-        last_node.add(f"... {len(session.events) - 10} more events ...")
+    if session.event_count > 10:
+        last_node.add(f"... {session.event_count - 10} more events ...")
 
     # Blast Radius
     blast_table = Table(title="Blast Radius")
@@ -101,6 +103,18 @@ def main():
     parser = argparse.ArgumentParser(description="Tool 2: Behavioral Path Reconstruction Engine")
     parser.add_argument("input_file", help="Path to input Parquet file (from Tool 1)")
     parser.add_argument("--threshold", type=float, default=5.0, help="Anomaly score threshold to alert on")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, default=None,
+                        help="Only events at or after this ISO time (UTC unless an offset is given)")
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, default=None,
+                        help="Only events before this ISO time (UTC unless an offset is given)")
+    parser.add_argument("--identity", action="append", default=None,
+                        help="Only sessions of this user / host (repeatable)")
+    parser.add_argument("--session-gap", default=SESSION_GAP,
+                        help="Inactivity that ends a session, e.g. 30m, 2h (default: %(default)s)")
+    parser.add_argument("--max-session-duration", default=MAX_SESSION_DURATION,
+                        help="Longest session before it is cut (default: %(default)s)")
+    parser.add_argument("--max-session-events", type=int, default=MAX_SESSION_EVENTS,
+                        help="Most events per session before it is cut (default: %(default)s)")
     
     args = parser.parse_args()
     
@@ -111,7 +125,10 @@ def main():
         console.print("[bold red]FATAL: Integrity Check Failed![/bold red]")
         sys.exit(1)
         
-    sessions = ingester.load_sessions()
+    # Vulnerability discovery reads the raw log lines
+    sessions = ingester.load_sessions(args.session_gap, start=args.start, end=args.end, identities=args.identity,
+                                      include_raw_source=True, max_session_duration=args.max_session_duration,
+                                      max_session_events=args.max_session_events)
     console.print(f"[bold green]Loaded {len(sessions)} sessions.[/bold green]")
     
     if not sessions:
@@ -123,8 +140,7 @@ def main():
     
     reports = []
     
-    for session in sessions:
-        report = engine.build_and_analyze(session)
+    for session, report in zip(sessions, engine.analyze_sessions(sessions)):
         if not report:
             continue
             
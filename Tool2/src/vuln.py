@@ -56,6 +56,9 @@ class VulnManager:
                 
                 conn.close()
                 self._cache.update(results)
+                for c in missing:
+                    # Not in the database: cache the miss too, so later batches do not query it again
+                    self._cache.setdefault(c, {"cvss": 0.0, "description": "", "cwe_ids": [], "is_kev": False, "kev_name": None})
             except Exception as e:
                 logger.error(f"Vulnerability DB Query Error: {e}")
 
@@ -122,6 +125,8 @@ class VulnManager:
                     }
                 conn.close()
                 self._cache.update(results)
+                for c in missing:
+                    self._cache.setdefault(c, {"name": self._humanize_cwe(c, "Unknown"), "abstraction": "Unknown"})
             except Exception as e:
                 logger.error(f"CWE Query Error: {e}")
 
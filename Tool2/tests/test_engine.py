@@ -0,0 +1,145 @@
+import hashlib
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+import pytest
+
+from src.domain import EnrichedEvent, Session
+from src.engine import GraphEngine
+
+BASE = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _session(name, specs):
+    events = [EnrichedEvent(event_id=f"{name}-{i}", timestamp=BASE + timedelta(seconds=10 * i), user=name,
+                            source_host=f"10.0.0.{i % 4}", event_type=event_type, confidence_score=0.7,
+                            data_quality_score=0.9, mitre_technique=technique, raw_text=raw)
+              for i, (event_type, technique, raw) in enumerate(specs)]
+    return Session(session_id=f"Activity on {name}", user=name, start_time=BASE,
+                   end_time=BASE + timedelta(seconds=10 * max(len(specs) - 1, 0)), events=events)
+
+
+def _sessions():
+    return [
+        _session("alice", [("auth_failure", "T1110", None), ("auth_failure", "T1110", None),
+                           ("security_alert", None, "Log4Shell CVE-2021-44228 probe"), ("web", "", '{"cweid": "89"}')]),
+        _session("empty", []),
+        _session("bob", [("system_audit", "T1059", "CVE-2019-0708 and CWE-22"), ("network", "T1046", None)]),
+    ]
+
+
+@pytest.fixture
+def vuln_db(tmp_path):
+    db = tmp_path / "vuln.db"
+    conn = sqlite3.connect(db)
+    conn.executescript("""
+        CREATE TABLE cve (cve_id TEXT, cvss_v3_score REAL, description TEXT);
+        CREATE TABLE cve_cwe_map (cve_id TEXT, cwe_id TEXT);
+        CREATE TABLE kev (cve_id TEXT, vulnerability_name TEXT);
+        CREATE TABLE cwe (cwe_id TEXT, name TEXT, abstraction TEXT);
+        INSERT INTO cve VALUES ('CVE-2021-44228', 10.0, 'Log4Shell. RCE');
+        INSERT INTO cve_cwe_map VALUES ('CVE-2021-44228', 'CWE-502');
+        INSERT INTO kev VALUES ('CVE-2021-44228', 'Apache Log4j2 RCE');
+        INSERT INTO cwe VALUES ('CWE-502', 'Deserialization', 'Base'), ('CWE-89', 'SQLi', 'Base');
+    """)
+    conn.commit()
+    conn.close()
+    return str(db)
+
+
+def _engine(db):
+    engine = GraphEngine()
+    engine.vuln_manager.db_path = db
+    return engine
+
+
+def _dump(report):
+    if report is None:
+        return None
+    report = report.model_dump()
+    report.pop("generated_at")
+    return report
+
+
+def test_batch_matches_single_session_reports(vuln_db):
+    batch = _engine(vuln_db).analyze_sessions(_sessions())
+    single = [_engine(vuln_db).build_and_analyze(s) for s in _sessions()]
+    assert [_dump(r) for r in batch] == [_dump(r) for r in single]
+
+    alice, empty, bob = batch
+    assert empty is None
+    assert alice.root_cause_node == "alice-0"
+    assert alice.event_summary == {"auth_failure": 2, "security_alert": 1, "web": 1}
+    assert alice.observed_techniques[:2] == ["T1110", "T1190"]  # T1190 inferred from CWE-89
+    assert alice.vulnerability_summary[0] == "CVE-2021-44228: Apache Log4j2 RCE (CVSS: 10.0) [KEV]"
+    assert alice.business_risk_level == "High"
+    assert sorted(bob.blast_radius) == ["10.0.0.0", "10.0.0.1"]
+    assert bob.observed_techniques[:2] == ["T1059", "T1046"]
+
+
+def test_vulnerability_lookups_are_batched_and_misses_cached(vuln_db, tmp_path):
+    engine = _engine(vuln_db)
+    engine.analyze_sessions(_sessions())
+    assert engine.vuln_manager._cache["CVE-2019-0708"]["cvss"] == 0.0  # not in the DB
+    engine.vuln_manager.db_path = str(tmp_path / "gone.db")  # every later lookup must come from the cache
+    assert [_dump(r) for r in engine.analyze_sessions(_sessions())] == \
+        [_dump(r) for r in _engine(vuln_db).analyze_sessions(_sessions())]
+
+
+def test_graph_is_built_on_demand(vuln_db):
+    engine = _engine(vuln_db)
+    session = _sessions()[0]
+    engine.build_and_analyze(session)
+    assert engine.graph.number_of_nodes() == 0
+
+    graph = engine.build_graph(session)
+    assert list(graph.nodes) == ["alice-0", "alice-1", "alice-2", "alice-3"]
+    assert graph.nodes["alice-3"]["technique"] == "T1190"  # inferred during analysis
+    assert [d["delta_t"] for _, _, d in graph.edges(data=True)] == [10.0, 10.0, 10.0]
+
+
+def test_discovery_normalizes_and_reuses_tool1_ids(vuln_db):
+    session = _session("carol", [("web", "", 'cve-2021-44228 then CWE-22, {"cwe_id": 89} and cwe-22'),
+                                 ("web", "", "CVE-2019-0708 seen by Tool 1")])
+    session.replace_column("observed_cve_ids", [[], ["CVE-2019-0708"]])
+    frame = _engine(vuln_db)._discover_vulnerabilities(
+        session.frame.with_columns(pl.col("raw_text").alias("_scan")))
+    assert frame["_cves"].to_list() == [["CVE-2021-44228"], ["CVE-2019-0708"]]
+    assert frame["_cwes"].to_list() == [["CWE-22", "CWE-89"], []]
+
+    report = _engine(vuln_db).analyze_sessions([session])[0]
+    assert "CVE-2021-44228: Apache Log4j2 RCE (CVSS: 10.0) [KEV]" in report.vulnerability_summary
+
+
+def test_discovery_adds_structural_cwes_to_tool1_ids(vuln_db):
+    session = _session("erin", [("web", "", 'XSS (CWE-79) then {"cweid": "89"}'),
+                                ("web", "", "cve-2021-44228 cwe-22")])
+    session.replace_column("observed_cwe_ids", [["CWE-79"], ["cwe-22"]])
+    session.replace_column("observed_cve_ids", [[], ["cve-2021-44228"]])
+    engine = _engine(vuln_db)
+    frame = engine._discover_vulnerabilities(session.frame.with_columns(pl.col("raw_text").alias("_scan")))
+    assert frame["_cwes"].to_list() == [["CWE-79", "CWE-89"], ["CWE-22"]]
+    assert frame["_cves"].to_list() == [[], ["CVE-2021-44228"]]
+    # Only the lists Tool 1 left empty were scanned for; the structural pattern always runs
+    assert engine._discovered["_found_cves"].to_list() == [[], None]
+    assert engine._discovered["_found_cwes"].to_list() == [None, None]
+    assert engine._discovered["_found_structural"].to_list() == [["CWE-89"], []]
+
+    session.replace_column("observed_cwe_ids", [[], []])  # the same texts, without Tool 1's CWEs
+    frame = engine._discover_vulnerabilities(session.frame.with_columns(pl.col("raw_text").alias("_scan")))
+    assert frame["_cwes"].to_list() == [["CWE-79", "CWE-89"], ["CWE-22"]]
+    assert engine._discovered.height == 2
+
+
+def test_discovery_is_cached_by_raw_hash(vuln_db):
+    engine = _engine(vuln_db)
+    raw = "Log4Shell CVE-2021-44228 probe"
+    session = _session("dave", [("security_alert", "T1190", raw)])
+    session.replace_column("raw_hash", [hashlib.sha256(raw.encode()).hexdigest()])
+    first = _dump(engine.analyze_sessions([session])[0])
+    assert engine._discovered["_key"].to_list() == session.frame["raw_hash"].to_list()
+
+    engine._discovered = engine._discovered.with_columns(pl.lit(["CVE-2099-0001"]).alias("_found_cves"))
+    assert "CVE-2099-0001" in engine.analyze_sessions([session])[0].vulnerability_summary[0]
+    assert _dump(_engine(vuln_db).analyze_sessions([session])[0]) == first
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+
+from src.ingest import DataIngester
+
+
+def _events(rows):
+    base = {"event_id": None, "timestamp": None, "user": None, "source_host": None, "target_host": None,
+            "event_type": "auth", "protocol": "tcp", "mitre_technique": "T1110", "confidence_score": 0.5,
+            "data_quality_score": 0.9, "raw_source": "line", "port": 22}
+    return [{**base, **row} for row in rows]
+
+
+def _write(tmp_path):
+    """Tool 1 output as it exists in the wild: native id lists, pipe-joined ids, no id columns at all."""
+    current = pl.DataFrame(_events([
+        {"event_id": "e1", "timestamp": "2024-03-01T10:00:00+00:00", "user": "alice", "source_host": "10.0.0.1",
+         "raw_source": "Failed password for alice"},
+        {"event_id": "e2", "timestamp": "2024-03-01T10:05:00.500000+00:00", "user": "alice",
+         "source_host": "10.0.0.2"},
+        {"event_id": "e3", "timestamp": "2024-03-02T09:00:00+00:00", "source_host": "10.0.0.9"},
+    ])).with_columns(observed_cve_ids=pl.Series([["CVE-2021-44228"], [], []], dtype=pl.List(pl.Utf8)),
+                     observed_cwe_ids=pl.Series([["CWE-502"], [], []], dtype=pl.List(pl.Utf8)))
+    legacy = pl.DataFrame(_events([
+        {"event_id": "e4", "timestamp": "2024-03-01T10:10:00+00:00", "user": "alice", "source_host": "10.0.0.1"},
+        {"event_id": "e5", "timestamp": "2024-03-03T00:00:00+00:00", "user": "bob", "source_host": "10.0.0.3"},
+    ])).with_columns(observed_cve_ids=pl.Series(["CVE-2014-0160|CVE-2017-0144", ""]),
+                     observed_cwe_ids=pl.Series([None, "CWE-79"], dtype=pl.Utf8))
+    bare = pl.DataFrame(_events([
+        {"event_id": "e6", "timestamp": "2024-03-01T11:00:00+00:00"},
+    ])).drop("raw_source")
+    (tmp_path / "2024-03-01").mkdir()
+    current.write_parquet(tmp_path / "2024-03-01" / "events_a.parquet")
+    legacy.write_parquet(tmp_path / "2024-03-01" / "events_b.parquet")
+    bare.write_parquet(tmp_path / "2024-03-01" / "events_c.parquet")
+    return str(tmp_path / "**" / "*.parquet")
+
+
+def _by_id(sessions):
+    return {s.session_id: s for s in sessions}
+
+
+def test_mixed_schemas_are_aligned(tmp_path):
+    sessions = _by_id(DataIngester(_write(tmp_path)).load_sessions())
+    assert set(sessions) == {"Activity on alice", "Activity on 10.0.0.9", "Activity on bob", "Activity on System"}
+
+    alice = sessions["Activity on alice"]
+    assert [e.event_id for e in alice.events] == ["e1", "e2", "e4"]
+    assert alice.events[0].timestamp == datetime(2024, 3, 1, 10, tzinfo=timezone.utc)
+    assert alice.events[0].observed_cve_ids == ["CVE-2021-44228"]
+    assert alice.events[2].observed_cve_ids == ["CVE-2014-0160", "CVE-2017-0144"]
+    assert alice.events[2].observed_cwe_ids == []
+    assert alice.is_high_priority  # two source hosts
+    assert sessions["Activity on bob"].events[0].observed_cwe_ids == ["CWE-79"]
+    assert sessions["Activity on System"].events[0].source_host == "Unknown"
+    assert all(e.raw_text is None for s in sessions.values() for e in s.events)
+
+
+def test_raw_source_only_when_requested(tmp_path):
+    sessions = _by_id(DataIngester(_write(tmp_path)).load_sessions(include_raw_source=True))
+    assert sessions["Activity on alice"].events[0].raw_text == "Failed password for alice"
+    assert sessions["Activity on System"].events[0].raw_text is None  # file without the column
+
+
+def test_time_range_and_identity_filters(tmp_path):
+    ingester = DataIngester(_write(tmp_path))
+    sessions = ingester.load_sessions(start=datetime(2024, 3, 1, 10, 5), end=datetime(2024, 3, 2, 9))
+    assert {e.event_id for s in sessions for e in s.events} == {"e2", "e4", "e6"}
+
+    sessions = ingester.load_sessions(identities=["alice", "10.0.0.9"])
+    assert sorted(s.session_id for s in sessions) == ["Activity on 10.0.0.9", "Activity on alice"]
+
+    # Offsets are honoured: 2024-03-02T09:00Z is 2024-03-02T11:00+02:00
+    sessions = ingester.load_sessions(start=datetime.fromisoformat("2024-03-02T11:00:00+02:00"),
+                                      end=datetime.fromisoformat("2024-03-02T11:00:01+02:00"))
+    assert [e.event_id for s in sessions for e in s.events] == ["e3"]
+
+
+def test_datetime_typed_timestamps(tmp_path):
+    pl.DataFrame(_events([{"event_id": "n1", "user": "carol", "timestamp": datetime(2024, 3, 1, 12)}])) \
+        .write_parquet(tmp_path / "naive.parquet")
+    pl.DataFrame(_events([{"event_id": "s1", "user": "carol", "timestamp": "2024-03-01T11:00:00+00:00"}])) \
+        .write_parquet(tmp_path / "strings.parquet")
+    sessions = DataIngester(str(tmp_path / "*.parquet")).load_sessions()
+    assert [e.event_id for e in sessions[0].events] == ["s1", "n1"]
+    assert sessions[0].end_time == datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def _timeline(tmp_path, minutes, user="svc"):
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    pl.DataFrame(_events([
+        {"event_id": f"t{m}", "user": user, "timestamp": (base + timedelta(minutes=m)).isoformat()} for m in minutes
+    ])).write_parquet(tmp_path / f"{user}.parquet")
+    return DataIngester(str(tmp_path / "*.parquet"))
+
+
+def test_sessions_split_on_gap(tmp_path):
+    ingester = _timeline(tmp_path, [0, 30, 90, 151, 152])
+    sessions = ingester.load_sessions()
+    assert [(s.session_id, [e.event_id for e in s.events]) for s in sessions] == [
+        ("Activity on svc", ["t0", "t30", "t90"]),  # 60 minutes exactly is not a gap
+        ("Activity on svc #2", ["t151", "t152"]),
+    ]
+    assert sessions[1].start_time == datetime(2024, 3, 1, 2, 31, tzinfo=timezone.utc)
+    assert sessions[1].end_time == datetime(2024, 3, 1, 2, 32, tzinfo=timezone.utc)
+    assert [len(s.events) for s in ingester.load_sessions("30m")] == [2, 1, 2]
+
+
+def test_sessions_capped_by_duration_and_size(tmp_path):
+    ingester = _timeline(tmp_path, range(0, 300, 10))  # one five-hour burst, an event every 10 minutes
+    assert [len(s.events) for s in ingester.load_sessions(max_session_duration=None)] == [30]
+    assert [len(s.events) for s in ingester.load_sessions(max_session_duration="2h")] == [12, 12, 6]
+    sessions = ingester.load_sessions(max_session_duration="2h", max_session_events=5)
+    assert [len(s.events) for s in sessions] == [5, 5, 2, 5, 5, 2, 5, 1]
+    assert [s.session_id for s in sessions][:3] == ["Activity on svc", "Activity on svc #2", "Activity on svc #3"]
+
+
+def test_sessions_with_colliding_display_ids_stay_apart(tmp_path):
+    # "alice"'s second session and the first of an identity named "alice #2" share a display id;
+    # "alice #1" sorts between them, so merging the two would also shift every later slice
+    rows = [("a1", "alice", 0), ("a2", "alice", 180), ("b1", "alice #1", 0), ("c1", "alice #2", 60),
+            ("c2", "alice #2", 61), ("d1", "bob", 0)]
+    pl.DataFrame(_events([
+        {"event_id": event_id, "user": user, "source_host": "10.0.0.1",
+         "timestamp": (datetime(2024, 3, 1, tzinfo=timezone.utc) + timedelta(minutes=m)).isoformat()}
+        for event_id, user, m in rows
+    ])).write_parquet(tmp_path / "events.parquet")
+    sessions = DataIngester(str(tmp_path / "*.parquet")).load_sessions()
+    assert [(s.session_id, [e.event_id for e in s.events]) for s in sessions] == [
+        ("Activity on alice", ["a1"]),
+        ("Activity on alice #2", ["a2"]),
+        ("Activity on alice #1", ["b1"]),
+        ("Activity on alice #2", ["c1", "c2"]),
+        ("Activity on bob", ["d1"]),
+    ]
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import polars as pl
+
+from src.domain import EnrichedEvent, Session
+from src.engine import GraphEngine
+from src.ingest import DataIngester
+
+BASE = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _event(i, **fields):
+    return EnrichedEvent(**{"event_id": f"e{i}", "timestamp": BASE + timedelta(seconds=i), "user": "alice",
+                            "source_host": f"10.0.0.{i % 3}", "event_type": "security_alert",
+                            "confidence_score": 0.5, "data_quality_score": 0.9, **fields})
+
+
+def _events():
+    return [
+        _event(0, mitre_technique="T1110", observed_cve_ids=["CVE-2021-44228"]),
+        _event(1, target_host="db-01", raw_text='ZAP alert {"cweid": "89"}'),
+        _event(2, mitre_technique="T1059", observed_cwe_ids=["CWE-79"], raw_text="see CVE-2014-0160"),
+    ]
+
+
+def _session(**kwargs):
+    return Session(session_id="Activity on alice", user="alice", start_time=BASE,
+                   end_time=BASE + timedelta(seconds=2), **kwargs)
+
+
+def _report(session):
+    engine = GraphEngine()
+    engine.vuln_manager.db_path = "/nonexistent/vuln.db"
+    report = engine.build_and_analyze(session).model_dump()
+    report.pop("generated_at")
+    return report
+
+
+def test_frame_backed_session_materializes_lazily(tmp_path):
+    rows = [e.model_dump() for e in _events()]
+    pl.DataFrame([{**{k: v for k, v in r.items() if k != "raw_text"}, "raw_source": r["raw_text"],
+                   "timestamp": r["timestamp"].isoformat()} for r in rows]).write_parquet(tmp_path / "e.parquet")
+    session, = DataIngester(str(tmp_path / "e.parquet")).load_sessions(include_raw_source=True)
+
+    assert session.event_count == 3 and session._events is None
+    assert [e.event_id for e in session.head(2)] == ["e0", "e1"] and session._events is None
+    assert session.events == _events()
+    assert session.frame["raw_text"].to_list() == [None, 'ZAP alert {"cweid": "89"}', "see CVE-2014-0160"]
+
+
+def test_engine_reads_columns_and_keeps_inferred_techniques():
+    from_objects, from_frame = _session(events=_events()), _session(frame=_session(events=_events()).frame)
+    assert _report(from_objects) == _report(from_frame)
+    assert _report(from_frame)["root_cause_node"] == "e0"
+
+    # e1 had no technique: CWE-89 from its raw line maps to T1190, for the report and for display
+    assert from_frame._events is None
+    assert [e.mitre_technique for e in from_frame.events] == ["T1110", "T1190", "T1059"]
+    assert [e.mitre_technique for e in from_objects.events] == ["T1110", "T1190", "T1059"]
@@ -113,7 +113,11 @@ async def reset_system(request: ResetRequest):
             {"path": os.path.join(TOOLS_ROOT, "Tool5", "execution_report.json"), "type": "file"},
             {"path": os.path.join(TOOLS_ROOT, "Tool5", "execution_audit.log"), "type": "file"},
         ]
-    
+
+    # Tool1's dedup index is cleared with data/output (it lives there); older versions kept it in data/
+    for db_file in glob.glob(os.path.join(TOOLS_ROOT, "Tool1", "data", "dedup.sqlite") + "*"):
+        artifacts.append({"path": db_file, "type": "file"})
+
     if request.type == "hard":
         # Delete main DB and any WAL/SHM files (sqlite artifacts)
         db_base = os.path.join(TOOLS_ROOT, "Tool6", "data", "governance.db")